@@ -0,0 +1,330 @@
+#!/usr/bin/env python3
+"""
+Benchmark corpus and regression harness for CuttingOptimizer.
+
+Runs a fixed set of cutting-stock instances (small workshop designs, large
+catalogs, adversarial near-capacity cases and mixed stock with offcuts) against
+every planning strategy, and reports wall time, waste, beams used and the gap to
+a lower bound on the number of beams.
+
+Usage:
+    python benchmarks/cutting_optimizer_benchmark.py
+    python benchmarks/cutting_optimizer_benchmark.py --save-baseline baseline.json
+    python benchmarks/cutting_optimizer_benchmark.py --baseline baseline.json
+"""
+
+import argparse
+import json
+import math
+import random
+import sys
+import time
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+# Add src directory to Python path
+src_path = Path(__file__).parent.parent / "src"
+sys.path.insert(0, str(src_path))
+
+from bridge_design_system.tools.material_tools import (  # noqa: E402
+    BeamUtilization,
+    CuttingOptimizer,
+    CuttingPlanCache,
+)
+
+STOCK_LENGTH_MM = 1980
+KERF_MM = 3
+
+
+@dataclass
+class Instance:
+    """A cutting-stock problem: required lengths and the beams to cut them from."""
+
+    name: str
+    category: str
+    lengths: List[int]
+    stock_lengths: List[int]
+    offcut_lengths: List[int] = field(default_factory=list)
+
+    def beams(self) -> List[BeamUtilization]:
+        """Build fresh beam objects for one run."""
+        beams = [
+            BeamUtilization(f"beam_{i:03d}", length, length, [], 0, 0.0)
+            for i, length in enumerate(self.stock_lengths, 1)
+        ]
+        beams += [
+            BeamUtilization(f"offcut_{i:03d}", length, length, [], 0, 0.0, source="offcut")
+            for i, length in enumerate(self.offcut_lengths, 1)
+        ]
+        return beams
+
+
+@dataclass
+class Measurement:
+    """Result of running one strategy on one instance."""
+
+    instance: str
+    strategy: str
+    wall_time_ms: float
+    feasible: bool
+    waste_mm: int
+    beams_used: int  # Fresh stock beams opened
+    offcuts_used: int
+    lower_bound_beams: int
+    gap_percent: float
+
+
+# ==================== CORPUS ====================
+
+
+def _stock_for(lengths: List[int], slack: float = 1.2) -> List[int]:
+    """Enough uniform stock beams for the lengths, with some slack."""
+    needed = sum(length + KERF_MM for length in lengths) / STOCK_LENGTH_MM
+    return [STOCK_LENGTH_MM] * max(1, math.ceil(needed * slack))
+
+
+def build_corpus(seed: int = 2025) -> List[Instance]:
+    """Build the deterministic benchmark corpus."""
+    rng = random.Random(seed)
+    corpus = []
+
+    # Small workshop designs: a few triangular modules against the 13-beam inventory
+    for modules in (1, 3, 6):
+        lengths = [rng.randint(300, 900) for _ in range(modules * 3)]
+        corpus.append(Instance(f"workshop_{modules}_modules", "small", lengths, [1980] * 13))
+
+    # Large catalogs
+    for count in (500, 1000):
+        lengths = [rng.randint(150, 1200) for _ in range(count)]
+        corpus.append(Instance(f"catalog_{count}", "large", lengths, _stock_for(lengths)))
+
+    # Adversarial: just over half a beam, so no two fit together
+    half = STOCK_LENGTH_MM // 2
+    lengths = [rng.randint(half - 1, half + 40) for _ in range(60)]
+    corpus.append(Instance("adversarial_half_plus", "adversarial", lengths, [1980] * 60))
+
+    # Adversarial: triples that fill a beam exactly including kerf, with no spare stock
+    third = (STOCK_LENGTH_MM - 3 * KERF_MM) // 3
+    lengths = [third + rng.choice((-1, 0, 1)) for _ in range(90)]
+    corpus.append(Instance("adversarial_exact_triples", "adversarial", lengths, [1980] * 30))
+
+    # Adversarial: big/small pairs that only pack perfectly when matched
+    lengths = []
+    for _ in range(40):
+        big = rng.randint(1200, 1700)
+        lengths += [big, STOCK_LENGTH_MM - big - 2 * KERF_MM]
+    rng.shuffle(lengths)
+    corpus.append(Instance("adversarial_matched_pairs", "adversarial", lengths, [1980] * 40))
+
+    # Mixed stock lengths plus reusable offcuts from earlier sessions
+    lengths = [rng.randint(200, 1100) for _ in range(120)]
+    stock = [rng.choice((1980, 2400, 3000)) for _ in range(40)]
+    offcuts = [rng.randint(200, 900) for _ in range(25)]
+    corpus.append(Instance("mixed_stock_offcuts", "mixed", lengths, stock, offcuts))
+
+    return corpus
+
+
+# ==================== STRATEGIES ====================
+
+
+def _first_fit(optimizer: CuttingOptimizer, cache: CuttingPlanCache, instance: Instance) -> Dict:
+    return optimizer.first_fit_decreasing(instance.lengths, instance.beams(), prefer_offcuts=False)
+
+
+def _offcut_best_fit(
+    optimizer: CuttingOptimizer, cache: CuttingPlanCache, instance: Instance
+) -> Dict:
+    return optimizer.first_fit_decreasing(instance.lengths, instance.beams(), prefer_offcuts=True)
+
+
+def _cached_repeat(
+    optimizer: CuttingOptimizer, cache: CuttingPlanCache, instance: Instance
+) -> Dict:
+    """Identical request to the primed plan: served from the cache."""
+    return optimizer.plan_cached({None: instance.lengths}, instance.beams(), instance.name, cache)
+
+
+def _repair_one(optimizer: CuttingOptimizer, cache: CuttingPlanCache, instance: Instance) -> Dict:
+    """One element shortened relative to the primed plan: served by plan repair."""
+    lengths = list(instance.lengths)
+    lengths[0] = max(50, lengths[0] - 25)
+    return optimizer.plan_cached({None: lengths}, instance.beams(), instance.name, cache)
+
+
+STRATEGIES: Dict[str, Callable[[CuttingOptimizer, CuttingPlanCache, Instance], Dict]] = {
+    "first_fit": _first_fit,
+    "offcut_best_fit": _offcut_best_fit,
+    "cached_repeat": _cached_repeat,
+    "repair_one": _repair_one,
+}
+
+# Strategies that need the instance's plan in the cache before the timed call
+PRIMED_STRATEGIES = {"cached_repeat", "repair_one"}
+
+
+# ==================== MEASUREMENT ====================
+
+
+def lower_bound_beams(instance: Instance) -> int:
+    """
+    Lower bound on fresh stock beams needed, treating offcuts as free.
+
+    Takes the larger of two classic bounds:
+    - continuous: the fewest longest stock beams whose total length covers the
+      demand (length plus kerf per element) left after using every offcut
+    - big items: elements longer than half of every stock beam cannot share a
+      beam with each other, so each of them needs its own
+    """
+    demand = sum(length + KERF_MM for length in instance.lengths) - sum(instance.offcut_lengths)
+    continuous = 0
+    covered = 0
+    for length in sorted(instance.stock_lengths, reverse=True):
+        if covered >= demand:
+            break
+        covered += length
+        continuous += 1
+
+    half_stock = max(instance.stock_lengths) / 2
+    big_items = sum(1 for length in instance.lengths if length + KERF_MM > half_stock)
+    return max(continuous, big_items)
+
+
+def run_strategy(name: str, instance: Instance, repeats: int) -> Measurement:
+    """Run one strategy on one instance and keep the fastest of the repeats."""
+    strategy = STRATEGIES[name]
+    best_ms = float("inf")
+    result = None
+
+    for _ in range(repeats):
+        optimizer = CuttingOptimizer(kerf_loss_mm=KERF_MM)
+        cache = CuttingPlanCache()
+        if name in PRIMED_STRATEGIES:
+            optimizer.plan_cached({None: instance.lengths}, instance.beams(), instance.name, cache)
+
+        start = time.perf_counter()
+        result = strategy(optimizer, cache, instance)
+        best_ms = min(best_ms, (time.perf_counter() - start) * 1000)
+
+    used_ids = {cut["beam_id"] for cut in result["cutting_plan"]}
+    beams_used = sum(1 for beam_id in used_ids if beam_id.startswith("beam_"))
+    bound = lower_bound_beams(instance)
+    return Measurement(
+        instance=instance.name,
+        strategy=name,
+        wall_time_ms=round(best_ms, 3),
+        feasible=result["summary"]["feasible"],
+        waste_mm=result["summary"]["total_waste_mm"],
+        beams_used=beams_used,
+        offcuts_used=len(used_ids) - beams_used,
+        lower_bound_beams=bound,
+        gap_percent=round((beams_used - bound) / bound * 100, 2) if bound else 0.0,
+    )
+
+
+def run_benchmark(
+    strategies: List[str], repeats: int, categories: Optional[List[str]] = None
+) -> List[Measurement]:
+    """Run every selected strategy on every instance of the corpus."""
+    measurements = []
+    for instance in build_corpus():
+        if categories and instance.category not in categories:
+            continue
+        for name in strategies:
+            measurements.append(run_strategy(name, instance, repeats))
+    return measurements
+
+
+def print_report(measurements: List[Measurement]) -> None:
+    """Print a fixed-width report table."""
+    header = (
+        f"{'instance':<28} {'strategy':<16} {'time ms':>10} {'feasible':>8} "
+        f"{'waste mm':>9} {'beams':>6} {'offcuts':>7} {'bound':>6} {'gap %':>7}"
+    )
+    print(header)
+    print("-" * len(header))
+    for m in measurements:
+        print(
+            f"{m.instance:<28} {m.strategy:<16} {m.wall_time_ms:>10.3f} {str(m.feasible):>8} "
+            f"{m.waste_mm:>9} {m.beams_used:>6} {m.offcuts_used:>7} {m.lower_bound_beams:>6} "
+            f"{m.gap_percent:>7.2f}"
+        )
+
+
+def compare_to_baseline(
+    measurements: List[Measurement], baseline_path: Path, time_tolerance: float
+) -> List[str]:
+    """
+    Compare measurements against a saved baseline.
+
+    Quality regressions (more beams, more waste, lost feasibility) always fail.
+    Wall time fails only when slower than the baseline by more than time_tolerance
+    (e.g. 0.5 allows 50% slower) to absorb machine noise.
+
+    Returns:
+        List of regression descriptions (empty when nothing regressed)
+    """
+    with open(baseline_path, "r") as f:
+        baseline = {(m["instance"], m["strategy"]): m for m in json.load(f)["measurements"]}
+
+    regressions = []
+    for m in measurements:
+        base = baseline.get((m.instance, m.strategy))
+        if base is None:
+            continue
+        label = f"{m.instance}/{m.strategy}"
+        if base["feasible"] and not m.feasible:
+            regressions.append(f"{label}: no longer feasible")
+        if m.beams_used > base["beams_used"]:
+            regressions.append(f"{label}: beams {base['beams_used']} -> {m.beams_used}")
+        if m.waste_mm > base["waste_mm"]:
+            regressions.append(f"{label}: waste {base['waste_mm']} -> {m.waste_mm}mm")
+        if m.wall_time_ms > base["wall_time_ms"] * (1 + time_tolerance):
+            regressions.append(
+                f"{label}: time {base['wall_time_ms']:.3f} -> {m.wall_time_ms:.3f}ms"
+            )
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="CuttingOptimizer benchmark and regression check")
+    parser.add_argument(
+        "--strategy", action="append", choices=list(STRATEGIES), help="Strategies to run"
+    )
+    parser.add_argument(
+        "--category",
+        action="append",
+        choices=["small", "large", "adversarial", "mixed"],
+        help="Only run instances of these categories",
+    )
+    parser.add_argument("--repeats", type=int, default=3, help="Runs per measurement (best kept)")
+    parser.add_argument("--baseline", type=Path, help="Fail on regressions against this baseline")
+    parser.add_argument("--save-baseline", type=Path, help="Write results as a new baseline")
+    parser.add_argument(
+        "--time-tolerance", type=float, default=0.5, help="Allowed relative slowdown vs baseline"
+    )
+    args = parser.parse_args()
+
+    measurements = run_benchmark(args.strategy or list(STRATEGIES), args.repeats, args.category)
+    print_report(measurements)
+
+    if args.save_baseline:
+        with open(args.save_baseline, "w") as f:
+            json.dump({"measurements": [asdict(m) for m in measurements]}, f, indent=2)
+        print(f"\nBaseline saved to {args.save_baseline}")
+
+    if args.baseline:
+        regressions = compare_to_baseline(measurements, args.baseline, args.time_tolerance)
+        if regressions:
+            print("\nREGRESSIONS:")
+            for regression in regressions:
+                print(f"  {regression}")
+            return 1
+        print("\nNo regressions against baseline")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,639 @@
+#!/usr/bin/env python3
+"""
+Benchmark suite for the memory subsystem.
+
+Measures how the memory tools and the agent memory queries degrade as a
+workshop day fills them up:
+
+- tools: remember / recall / search_memory of tools/memory_tools against
+  sessions pre-populated with 1k-100k memories, for each storage backend
+  (sqlite, json, and the shared memory service)
+- queries: memory/memory_queries on agents holding hundreds of synthetic
+  ActionSteps with [MEMORY_*] records: the step callback, original-state lookup
+  (warm and with a cold index), design history, transfer between agents,
+  cleanup to the token budget and statistics polling. Records are either
+  written by the step callback (current format) or embedded as legacy JSON
+  lines.
+- contention: several processes reading and writing one session at once
+
+Each measurement reports mean and p95 latency per operation. An operation
+series stops early once it has used --max-seconds, so slow backends at large
+sizes still finish.
+
+Usage:
+    python benchmarks/memory_benchmark.py
+    python benchmarks/memory_benchmark.py --suite tools --backend sqlite --size 100000
+    python benchmarks/memory_benchmark.py --save-baseline memory_baseline.json
+    python benchmarks/memory_benchmark.py --baseline memory_baseline.json
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, List, Optional
+
+# Add src directory to Python path
+src_path = Path(__file__).parent.parent / "src"
+sys.path.insert(0, str(src_path))
+
+CATEGORIES = [
+    "components",
+    "design_decisions",
+    "materials",
+    "element_history",
+    "user_preferences",
+    "errors",
+    "session",
+    "geometry",
+    "gaze",
+    "context",
+]
+VOCABULARY = (
+    "beam truss bridge span deck cable tower load steel timber joint node element "
+    "module triangle rotation center direction length material offcut cut kerf "
+    "gaze hololens parameter original restore height width support arch"
+).split()
+ELEMENT_COUNT = 40
+
+
+@dataclass
+class Measurement:
+    """Latency of one operation series."""
+
+    suite: str
+    benchmark: str
+    variant: str  # Backend, record format or backend x processes
+    size: int  # Memories in the session or steps in the agent
+    ops: int
+    mean_ms: float
+    p95_ms: float
+    errors: int = 0
+
+
+# ==================== TIMING ====================
+
+
+def time_ops(
+    operation: Callable[[Any], Any],
+    ops: int,
+    max_seconds: float,
+    setup: Optional[Callable[[int], Any]] = None,
+) -> List[float]:
+    """
+    Time operation(arg) up to ops times, stopping after max_seconds of operation time.
+
+    Args:
+        operation: Function timed per call
+        ops: Maximum number of calls
+        max_seconds: Budget of timed seconds for the series
+        setup: Untimed function returning the argument of call i (default: i)
+
+    Returns:
+        Latencies in milliseconds
+    """
+    latencies = []
+    spent = 0.0
+    for i in range(ops):
+        argument = setup(i) if setup else i
+        start = time.perf_counter()
+        operation(argument)
+        elapsed = time.perf_counter() - start
+        latencies.append(elapsed * 1000)
+        spent += elapsed
+        if spent > max_seconds:
+            break
+    return latencies
+
+
+def summarize(
+    suite: str, benchmark: str, variant: str, size: int, latencies: List[float], errors: int = 0
+) -> Measurement:
+    ordered = sorted(latencies) or [0.0]
+    p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+    return Measurement(
+        suite=suite,
+        benchmark=benchmark,
+        variant=variant,
+        size=size,
+        ops=len(latencies),
+        mean_ms=round(sum(ordered) / len(ordered), 4),
+        p95_ms=round(p95, 4),
+        errors=errors,
+    )
+
+
+# ==================== SYNTHETIC DATA ====================
+
+
+def synthetic_value(rng: random.Random, index: int) -> str:
+    words = " ".join(rng.choice(VOCABULARY) for _ in range(rng.randint(8, 30)))
+    return f"element {index % ELEMENT_COUNT:03d} {words}"
+
+
+def synthetic_memories(count: int, session_id: str, seed: int = 2025) -> Dict[str, Any]:
+    """A legacy memory dict with count memories spread over CATEGORIES."""
+    rng = random.Random(seed)
+    memories: Dict[str, Dict[str, Dict[str, Any]]] = {category: {} for category in CATEGORIES}
+    for i in range(count):
+        category = CATEGORIES[i % len(CATEGORIES)]
+        memories[category][f"{category}_{i:06d}"] = {
+            "value": synthetic_value(rng, i),
+            "timestamp": f"2025-06-01T{(i // 3600) % 24:02d}:{(i // 60) % 60:02d}:{i % 60:02d}",
+            "category": category,
+        }
+    return {"session_id": session_id, "memories": memories}
+
+
+def synthetic_observations(rng: random.Random, step_number: int) -> str:
+    """Observations of one step: design updates, MCP edits or plain reasoning."""
+    element = f"{rng.randrange(ELEMENT_COUNT):03d}"
+    roll = rng.random()
+    if roll < 0.45:
+        return (
+            f"Direct Parameter Update for element '{element}': "
+            f"center rg.Point3d({rng.uniform(-1, 1):.3f}, {rng.uniform(-1, 1):.3f}, 0.2), "
+            f"direction rg.Vector3d(0, 0, 1), length 0.{rng.randint(20, 60)}\n"
+            + "script line\n" * rng.randint(20, 120)
+        )
+    if roll < 0.7:
+        return f"edit_python3_script updated dynamic_{element}\n" + "x = 1\n" * rng.randint(10, 60)
+    return " ".join(rng.choice(VOCABULARY) for _ in range(rng.randint(40, 200)))
+
+
+def synthetic_step(rng: random.Random, step_number: int) -> Any:
+    """An ActionStep as the geometry agent produces it; every fifth one has an image."""
+    from smolagents import ActionStep
+
+    step = ActionStep(step_number=step_number, observations_images=[])
+    step.observations = synthetic_observations(rng, step_number)
+    step.model_output = "Thought: " + " ".join(rng.choice(VOCABULARY) for _ in range(60))
+    if step_number % 5 == 0:
+        step.observations_images = ["<image>"]
+    return step
+
+
+def new_agent() -> Any:
+    """Stand-in for a CodeAgent: the memory helpers only need memory.steps."""
+    return SimpleNamespace(memory=SimpleNamespace(steps=[]))
+
+
+def build_agent(steps: int, records: str, seed: int = 2025) -> Any:
+    """
+    Agent whose memory holds a task and `steps` synthetic ActionSteps.
+
+    Args:
+        steps: Number of ActionSteps
+        records: "callback" to let track_design_changes write the records (with
+            compaction disabled so every step stays), or "legacy" for steps
+            carrying [MEMORY_*] JSON lines as written by earlier versions
+
+    Returns:
+        Agent with agent.memory.steps populated
+    """
+    from smolagents import TaskStep
+
+    from bridge_design_system.memory.memory_callbacks import track_design_changes
+    from bridge_design_system.memory.memory_compaction import MemoryCompactor
+    from bridge_design_system.memory.memory_utils import extract_element_id_from_observations
+
+    rng = random.Random(seed)
+    agent = new_agent()
+    agent.memory_compactor = MemoryCompactor(max_context_tokens=sys.maxsize)
+    agent.memory.steps.append(TaskStep(task="Design a pedestrian bridge", task_images=[]))
+    originals: Dict[str, int] = {}
+
+    for step_number in range(1, steps + 1):
+        step = synthetic_step(rng, step_number)
+        if records == "callback":
+            track_design_changes(step, agent)
+        elif "parameter update" in step.observations.lower():
+            element_id = extract_element_id_from_observations(step.observations)
+            record = {
+                "element_id": element_id,
+                "timestamp": f"2025-06-01T10:{step_number // 60 % 60:02d}:{step_number % 60:02d}",
+                "step_number": step_number,
+            }
+            if element_id not in originals:
+                originals[element_id] = step_number
+                record.update(
+                    action="first_parameter_update",
+                    step_type="design_change_original",
+                    observations_snapshot=step.observations,
+                )
+                step.observations += f"\n[MEMORY_ORIGINAL] {json.dumps(record)}"
+            else:
+                record.update(
+                    action="parameter_update",
+                    step_type="design_change_update",
+                    original_step=originals[element_id],
+                )
+                step.observations += f"\n[MEMORY_UPDATE] {json.dumps(record)}"
+        agent.memory.steps.append(step)
+    return agent
+
+
+# ==================== TOOLS SUITE ====================
+
+
+def run_tools_suite(
+    backends: List[str], sizes: List[int], ops: int, max_seconds: float, workdir: Path
+) -> List[Measurement]:
+    """remember / recall / search_memory through the memory tools for each backend and size."""
+    from bridge_design_system.tools import memory_tools
+    from bridge_design_system.tools.memory_tools import recall, remember, search_memory
+
+    measurements = []
+    for backend_kind in backends:
+        for size in sizes:
+            directory = workdir / f"tools_{backend_kind}_{size}"
+            directory.mkdir(parents=True, exist_ok=True)
+            memory_tools.MEMORY_PATH = directory
+            memory_tools.SESSION_ID = f"bench_{backend_kind}_{size}"
+            backend = memory_tools.use_memory_backend(backend_kind)
+            variant = backend.name
+
+            start = time.perf_counter()
+            backend.replace_all(synthetic_memories(size, memory_tools.SESSION_ID))
+            populate_ms = (time.perf_counter() - start) * 1000
+            measurements.append(summarize("tools", "populate", variant, size, [populate_ms]))
+
+            rng = random.Random(size)
+            keys = [(CATEGORIES[i % len(CATEGORIES)], i) for i in range(size)]
+
+            def recall_key(i):
+                category, index = keys[rng.randrange(size)]
+                recall(category=category, key=f"{category}_{index:06d}")
+
+            def remember_new(i):
+                remember(category="design_decisions", key=f"bench_{i:06d}", value=f"choice {i}")
+
+            def search(i):
+                search_memory(query=rng.choice(VOCABULARY), limit=10)
+
+            def recall_external_write(i):
+                # Another writer invalidates this process's cache before the read
+                other.put("session", f"external_{i}", {"value": "x", "timestamp": "t"})
+                recall_key(i)
+
+            series = [
+                ("remember", remember_new, ops),
+                ("recall_key", recall_key, ops),
+                ("recall_category", lambda i: recall(category="materials"), max(ops // 10, 3)),
+                ("recall_overview", lambda i: recall(), ops),
+                ("search_memory", search, ops),
+            ]
+            other = _second_backend(backend_kind, directory, memory_tools.SESSION_ID)
+            if other is not None:
+                series.append(("recall_after_external_write", recall_external_write, ops))
+
+            for name, operation, count in series:
+                latencies = time_ops(operation, count, max_seconds)
+                measurements.append(summarize("tools", name, variant, size, latencies))
+                print(f"  tools {variant:<8} {size:>7} {name:<28} {len(latencies):>5} ops")
+
+            if other is not None:
+                other.close()
+            backend.close()
+    return measurements
+
+
+def _second_backend(kind: str, directory: Path, session_id: str) -> Any:
+    """Another handle on the same session, standing in for a second process."""
+    from bridge_design_system.tools.memory_backends import create_memory_backend
+
+    return create_memory_backend(kind, directory, session_id)
+
+
+# ==================== QUERIES SUITE ====================
+
+
+def run_queries_suite(
+    step_counts: List[int], formats: List[str], ops: int, max_seconds: float
+) -> List[Measurement]:
+    """Agent memory queries on synthetic agents of each size and record format."""
+    from bridge_design_system.memory.memory_callbacks import track_design_changes
+    from bridge_design_system.memory.memory_queries import (
+        get_original_element_state,
+        query_design_history,
+        transfer_agent_memory,
+    )
+    from bridge_design_system.memory.memory_utils import (
+        cleanup_old_memory_steps,
+        get_memory_statistics,
+        validate_memory_integrity,
+    )
+
+    measurements = []
+    for records in formats:
+        for steps in step_counts:
+            rng = random.Random(steps)
+            start = time.perf_counter()
+            agent = build_agent(steps, records)
+            build_ms = (time.perf_counter() - start) * 1000
+            measurements.append(summarize("queries", "build_agent", records, steps, [build_ms]))
+
+            def element(i):
+                return f"{rng.randrange(ELEMENT_COUNT):03d}"
+
+            def cold_lookup(element_id):
+                agent.__dict__.pop("element_history_index", None)
+                get_original_element_state(agent, element_id)
+
+            def fresh_target(i):
+                return new_agent()
+
+            def transfer_repeat(target):
+                transfer_agent_memory(agent, target)
+
+            repeat_target = new_agent()
+            transfer_agent_memory(agent, repeat_target)
+
+            def cleanup_copy(i):
+                return build_agent(steps, records)
+
+            series = [
+                ("original_lookup", lambda e: get_original_element_state(agent, e), ops, element),
+                ("original_lookup_cold", cold_lookup, ops, element),
+                ("design_history", lambda e: query_design_history(agent, e), ops, element),
+                (
+                    "transfer_first",
+                    lambda target: transfer_agent_memory(agent, target),
+                    ops,
+                    fresh_target,
+                ),
+                ("transfer_repeat", transfer_repeat, ops, lambda i: repeat_target),
+                ("statistics_poll", lambda i: get_memory_statistics(agent), ops, None),
+                ("integrity_poll", lambda i: validate_memory_integrity(agent), ops, None),
+                (
+                    "cleanup",
+                    lambda copy: cleanup_old_memory_steps(copy, keep_last_n=3),
+                    max(ops // 20, 3),
+                    cleanup_copy,
+                ),
+            ]
+            for name, operation, count, setup in series:
+                latencies = time_ops(operation, count, max_seconds, setup)
+                measurements.append(summarize("queries", name, records, steps, latencies))
+                print(f"  queries {records:<8} {steps:>6} {name:<22} {len(latencies):>5} ops")
+
+            if records == "callback":
+                # Callback cost on steps added to an already full memory (grows the agent: last)
+                latencies = time_ops(
+                    lambda step: track_design_changes(step, agent),
+                    ops,
+                    max_seconds,
+                    setup=lambda i: synthetic_step(rng, steps + i + 1),
+                )
+                measurements.append(
+                    summarize("queries", "step_callback", records, steps, latencies)
+                )
+    return measurements
+
+
+# ==================== CONTENTION SUITE ====================
+
+
+def _contention_worker(arguments: Dict[str, Any]) -> Dict[str, Any]:
+    """One process hammering a shared session with a read-heavy operation mix."""
+    from bridge_design_system.tools.memory_backends import create_memory_backend
+
+    rng = random.Random(arguments["seed"])
+    backend = create_memory_backend(
+        arguments["backend"], Path(arguments["directory"]), arguments["session_id"]
+    )
+    size = arguments["size"]
+    latencies: List[float] = []
+    errors = 0
+
+    deadline = time.perf_counter() + arguments["max_seconds"]
+    for i in range(arguments["ops"]):
+        roll = rng.random()
+        start = time.perf_counter()
+        try:
+            if roll < 0.2:
+                key = f"worker_{arguments['seed']}_{i}"
+                backend.put("session", key, {"value": f"write {i}", "timestamp": "t"})
+            elif roll < 0.3:
+                backend.search(rng.choice(VOCABULARY), limit=10)
+            else:
+                index = rng.randrange(size)
+                category = CATEGORIES[index % len(CATEGORIES)]
+                backend.get(category, f"{category}_{index:06d}")
+        except Exception:
+            errors += 1
+        latencies.append((time.perf_counter() - start) * 1000)
+        if time.perf_counter() > deadline:
+            break
+
+    backend.close()
+    return {"latencies": latencies, "errors": errors}
+
+
+def run_contention_suite(
+    backends: List[str],
+    sizes: List[int],
+    processes: int,
+    ops: int,
+    max_seconds: float,
+    workdir: Path,
+) -> List[Measurement]:
+    """Concurrent processes on one session; latency across all processes' operations."""
+    from bridge_design_system.tools.memory_backends import create_memory_backend
+
+    context = multiprocessing.get_context("spawn")
+    measurements = []
+    for backend_kind in backends:
+        for size in sizes:
+            directory = workdir / f"contention_{backend_kind}_{size}"
+            directory.mkdir(parents=True, exist_ok=True)
+            session_id = f"contention_{backend_kind}_{size}"
+            backend = create_memory_backend(backend_kind, directory, session_id)
+            backend.replace_all(synthetic_memories(size, session_id))
+            variant = f"{backend.name} x{processes}"
+            backend.close()
+
+            jobs = [
+                {
+                    "backend": backend_kind,
+                    "directory": str(directory),
+                    "session_id": session_id,
+                    "size": size,
+                    "ops": ops,
+                    "max_seconds": max_seconds,
+                    "seed": seed,
+                }
+                for seed in range(processes)
+            ]
+            with context.Pool(processes) as pool:
+                results = pool.map(_contention_worker, jobs)
+
+            latencies = [latency for result in results for latency in result["latencies"]]
+            errors = sum(result["errors"] for result in results)
+            measurements.append(
+                summarize("contention", "mixed_ops", variant, size, latencies, errors)
+            )
+            print(f"  contention {variant:<12} {size:>7} {len(latencies):>6} ops, {errors} errors")
+    return measurements
+
+
+# ==================== REPORTING ====================
+
+
+def print_report(measurements: List[Measurement]) -> None:
+    """Print a fixed-width report table."""
+    header = (
+        f"{'suite':<11} {'benchmark':<28} {'variant':<14} {'size':>7} {'ops':>6} "
+        f"{'mean ms':>10} {'p95 ms':>10} {'errors':>6}"
+    )
+    print(header)
+    print("-" * len(header))
+    for m in measurements:
+        print(
+            f"{m.suite:<11} {m.benchmark:<28} {m.variant:<14} {m.size:>7} {m.ops:>6} "
+            f"{m.mean_ms:>10.3f} {m.p95_ms:>10.3f} {m.errors:>6}"
+        )
+
+
+def compare_to_baseline(
+    measurements: List[Measurement], baseline_path: Path, time_tolerance: float
+) -> List[str]:
+    """
+    Compare measurements against a saved baseline.
+
+    New errors always fail. Mean latency fails only when slower than the
+    baseline by more than time_tolerance (e.g. 0.5 allows 50% slower) to absorb
+    machine noise.
+
+    Returns:
+        List of regression descriptions (empty when nothing regressed)
+    """
+    with open(baseline_path, "r") as f:
+        baseline = {
+            (m["suite"], m["benchmark"], m["variant"], m["size"]): m
+            for m in json.load(f)["measurements"]
+        }
+
+    regressions = []
+    for m in measurements:
+        base = baseline.get((m.suite, m.benchmark, m.variant, m.size))
+        if base is None:
+            continue
+        label = f"{m.suite}/{m.benchmark}/{m.variant}/{m.size}"
+        if m.errors > base["errors"]:
+            regressions.append(f"{label}: errors {base['errors']} -> {m.errors}")
+        if m.mean_ms > base["mean_ms"] * (1 + time_tolerance):
+            regressions.append(f"{label}: mean {base['mean_ms']:.3f} -> {m.mean_ms:.3f}ms")
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Memory subsystem benchmark and regression check")
+    parser.add_argument(
+        "--suite",
+        action="append",
+        choices=["tools", "queries", "contention"],
+        help="Suites to run (default: all)",
+    )
+    parser.add_argument(
+        "--backend",
+        action="append",
+        choices=["sqlite", "json", "service"],
+        help="Memory backends for the tools and contention suites (default: all)",
+    )
+    parser.add_argument(
+        "--size",
+        action="append",
+        type=int,
+        help="Memories per session (default: 1000, 10000, 100000)",
+    )
+    parser.add_argument(
+        "--steps",
+        action="append",
+        type=int,
+        help="ActionSteps per synthetic agent (default: 100, 300, 1000)",
+    )
+    parser.add_argument(
+        "--records",
+        action="append",
+        choices=["callback", "legacy"],
+        help="How synthetic steps carry their [MEMORY_*] records (default: both)",
+    )
+    parser.add_argument("--processes", type=int, default=4, help="Processes for contention")
+    parser.add_argument("--ops", type=int, default=200, help="Operations per measurement")
+    parser.add_argument(
+        "--max-seconds", type=float, default=5.0, help="Timed seconds per measurement at most"
+    )
+    parser.add_argument("--baseline", type=Path, help="Fail on regressions against this baseline")
+    parser.add_argument("--save-baseline", type=Path, help="Write results as a new baseline")
+    parser.add_argument(
+        "--time-tolerance", type=float, default=0.5, help="Allowed relative slowdown vs baseline"
+    )
+    args = parser.parse_args()
+
+    suites = args.suite or ["tools", "queries", "contention"]
+    backends = args.backend or ["sqlite", "json", "service"]
+    sizes = args.size or [1000, 10000, 100000]
+
+    workdir = Path(tempfile.mkdtemp(prefix="memory_bench_"))
+    # Private memory service for this run; spawned worker processes inherit the socket path
+    os.environ["BRIDGE_MEMORY_SOCKET"] = str(workdir / "memory.sock")
+    service_started = False
+    measurements: List[Measurement] = []
+    try:
+        if "service" in backends and {"tools", "contention"} & set(suites):
+            from bridge_design_system.ipc.memory_service import start_memory_service
+
+            start_memory_service(snapshot_path=None)
+            service_started = True
+
+        if "tools" in suites:
+            measurements += run_tools_suite(backends, sizes, args.ops, args.max_seconds, workdir)
+        if "queries" in suites:
+            measurements += run_queries_suite(
+                args.steps or [100, 300, 1000],
+                args.records or ["callback", "legacy"],
+                args.ops,
+                args.max_seconds,
+            )
+        if "contention" in suites:
+            measurements += run_contention_suite(
+                backends, sizes, args.processes, args.ops, args.max_seconds, workdir
+            )
+    finally:
+        if service_started:
+            from bridge_design_system.ipc.memory_service import stop_memory_service
+
+            stop_memory_service()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    print()
+    print_report(measurements)
+
+    if args.save_baseline:
+        with open(args.save_baseline, "w") as f:
+            json.dump({"measurements": [asdict(m) for m in measurements]}, f, indent=2)
+        print(f"\nBaseline saved to {args.save_baseline}")
+
+    if args.baseline:
+        regressions = compare_to_baseline(measurements, args.baseline, args.time_tolerance)
+        if regressions:
+            print("\nREGRESSIONS:")
+            for regression in regressions:
+                print(f"  {regression}")
+            return 1
+        print("\nNo regressions against baseline")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -20,9 +20,14 @@ The agents/geometry_agent_stdio.py will hold an instance to this class
 
 """
 
-from typing import Dict, Optional, Union
+from bisect import bisect_right
+from typing import Dict, Iterator, List, Optional, Tuple, Union
+import threading
 import time
 
+from ..state.transform_queue import TransformUpdateQueue
+from ..tools.ros_transforms import convert_model_message
+
 # Optional ROS imports with graceful fallback
 try:
     import roslibpy
@@ -38,6 +43,126 @@ except ImportError:
 Pose = dict if ROS_AVAILABLE else None
 
 
+class GazeHistory:
+    """Time-indexed ring buffer of gaze events with per-element counters.
+
+    Events live in a fixed-size circular buffer ordered by timestamp, so window
+    queries binary-search the window start instead of scanning. Each element also
+    keeps its own sorted timestamps, which gives per-element counts in any window
+    with one bisect. Memory is bounded by both retention time and max_entries,
+    however fast gaze messages arrive.
+    """
+
+    def __init__(self, retention_seconds: float = 10.0, max_entries: int = 4096):
+        self.retention_seconds = retention_seconds
+        self.max_entries = max_entries
+        self._timestamps: List[float] = [0.0] * max_entries
+        self._elements: List[Optional[str]] = [None] * max_entries
+        self._start = 0  # Buffer index of the oldest event
+        self._size = 0
+        # element -> [timestamps, index of oldest retained timestamp]
+        self._element_times: Dict[str, list] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __iter__(self) -> Iterator[Tuple[float, str]]:
+        """Iterate (timestamp, element) from oldest to newest."""
+        with self._lock:
+            events = [self._event(i) for i in range(self._size)]
+        return iter(events)
+
+    def append(self, timestamp: float, element: str):
+        """Record a gaze event and drop events older than the retention time."""
+        with self._lock:
+            cutoff = timestamp - self.retention_seconds
+            while self._size and (
+                self._size == self.max_entries or self._timestamps[self._start] <= cutoff
+            ):
+                self._evict_oldest()
+
+            index = (self._start + self._size) % self.max_entries
+            self._timestamps[index] = timestamp
+            self._elements[index] = element
+            self._size += 1
+            self._element_times.setdefault(element, [[], 0])[0].append(timestamp)
+
+    def clear(self):
+        with self._lock:
+            self._start = 0
+            self._size = 0
+            self._element_times.clear()
+
+    def latest(self, since: float) -> Optional[str]:
+        """Most recent element gazed at after the given time, or None. O(1)."""
+        with self._lock:
+            if not self._size:
+                return None
+            timestamp, element = self._event(self._size - 1)
+            return element if timestamp > since else None
+
+    def count_since(self, since: float) -> int:
+        """Number of gaze events after the given time. O(log n)."""
+        with self._lock:
+            return self._size - self._first_after(since)
+
+    def summary_since(self, since: float) -> dict:
+        """Counts per element and window bounds for events after the given time.
+
+        Costs one bisect per distinct element, independent of the gaze rate.
+        """
+        with self._lock:
+            first = self._first_after(since)
+            if first == self._size:
+                return {"total": 0, "counts": {}, "first_seen": {}, "span": 0}
+
+            counts = {}
+            first_seen = {}
+            for element, (times, offset) in self._element_times.items():
+                start = bisect_right(times, since, offset)
+                if start < len(times):
+                    counts[element] = len(times) - start
+                    first_seen[element] = times[start]
+
+            return {
+                "total": self._size - first,
+                "counts": counts,
+                "first_seen": first_seen,
+                "span": self._event(self._size - 1)[0] - self._event(first)[0],
+            }
+
+    def _event(self, position: int) -> Tuple[float, str]:
+        index = (self._start + position) % self.max_entries
+        return self._timestamps[index], self._elements[index]
+
+    def _first_after(self, since: float) -> int:
+        """Position (0 = oldest) of the first event with timestamp > since."""
+        lo, hi = 0, self._size
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._timestamps[(self._start + mid) % self.max_entries] > since:
+                hi = mid
+            else:
+                lo = mid + 1
+        return lo
+
+    def _evict_oldest(self):
+        element = self._elements[self._start]
+        self._elements[self._start] = None
+        self._start = (self._start + 1) % self.max_entries
+        self._size -= 1
+
+        entry = self._element_times[element]
+        entry[1] += 1
+        if entry[1] == len(entry[0]):
+            del self._element_times[element]
+        elif entry[1] > 64 and entry[1] * 2 > len(entry[0]):
+            # Compact the consumed prefix once it dominates the list
+            entry[0] = entry[0][entry[1]:]
+            entry[1] = 0
+
+
 class VizorListener:
     _instance = None
 
@@ -60,10 +185,11 @@ class VizorListener:
 
         self._initialized = True
         self.current_element: Optional[str] = None
-        self.gaze_history: list = []  # Store (timestamp, element) tuples
+        self.gaze_history = GazeHistory(retention_seconds=10.0)  # (timestamp, element) events
         self.gaze_window_seconds = 3.0  # Time window for gaze retrieval
         self.transforms: Dict[str, Union[dict, "Pose"]] = {}
-        self.update_queue = update_queue if update_queue is not None else []  # Queue for Direct Parameter Updates
+        # Coalescing, thread-safe queue for Direct Parameter Updates
+        self.update_queue = update_queue if update_queue is not None else TransformUpdateQueue()
         print(f"[DEBUG] VizorListener __init__: Queue reference set to ID {id(self.update_queue)}")
         self.ros_available = ROS_AVAILABLE
         self.client = None
@@ -175,61 +301,20 @@ class VizorListener:
 
         self.current_element = element
 
-        # Add to gaze history with timestamp
-        self.gaze_history.append((timestamp, element))
-
-        # Clean old entries (keep only last 10 seconds of history)
-        cutoff_time = timestamp - 10.0
-        self.gaze_history = [(ts, elem) for ts, elem in self.gaze_history if ts > cutoff_time]
+        # Add to gaze history; entries older than 10 seconds are dropped on the way
+        self.gaze_history.append(timestamp, element)
 
     def _handle_model_message(self, message):
         """Handle incoming model transform messages from ROS."""
-        self.transforms = {}
-        names = message["names"]
-        poses = message["poses"]
-
-        for name, pose in zip(names, poses):
-            position = pose["position"]
-            orientation = pose["orientation"]
-
-            is_identity_quat = (
-                (abs(orientation["w"] - 1.0) < 1e-6 or abs(orientation["w"] + 1.0) < 1e-6) and
-                abs(orientation["x"]) < 1e-6 and
-                abs(orientation["y"]) < 1e-6 and
-                abs(orientation["z"]) < 1e-6
-            )
-            
-            print(f"[DEBUG] Checking {name}: pos=({position['x']}, {position['y']}, {position['z']}), quat=({orientation['w']}, {orientation['x']}, {orientation['y']}, {orientation['z']})")
-            print(f"[DEBUG] is_identity_quat={is_identity_quat}")
-            
-            if (
-                abs(position["x"]) > 1e-6
-                or abs(position["y"]) > 1e-6
-                or abs(position["z"]) > 1e-6
-                or not is_identity_quat
-            ):
-
-                # STEP 1: Transform the POSITION vector from ROS (y-right) to Rhino.
-                pos = [position["y"], position["x"], position["z"]]
-
-                # STEP 2: Use the quaternion AS-IS. DO NOT transform its components.
-                rot = orientation
-
-                # Store the transformed position and the RAW quaternion.
-                transform = {"position": pos, "quaternion": rot}
-                self.transforms[name] = transform
-                print(f"[DEBUG] Including element {name} with non-zero transform")
-            else:
-                print(f"[DEBUG] Skipping element {name} - zero transform detected")
+        # One vectorized pass: unmoved elements dropped, positions and directions in Rhino axes
+        self.transforms = convert_model_message(message).to_transforms()
 
         if self.transforms and hasattr(self, "update_queue"):
-            self.update_queue.append(self.transforms.copy())
+            # Latest pose per element wins; a burst of messages never grows the queue
+            self.update_queue.put_batch(self.transforms)
             print(
                 f"\n[SYSTEM] Transform data for {len(self.transforms)} element(s) queued for update."
             )
-            print(f"[DEBUG] Queue reference ID in VizorListener: {id(self.update_queue)}")
-            print(f"[DEBUG] Queue length after append: {len(self.update_queue)}")
-            print(f"[DEBUG] Queue contents: {self.update_queue}")
 
     def get_transforms(self) -> Dict[str, Union[dict, "Pose"]]:
         """Return the current transforms dictionary."""
@@ -251,20 +336,18 @@ class VizorListener:
         if window_seconds is None:
             window_seconds = self.gaze_window_seconds
 
-        if not self.gaze_history:
-            return None
-
-        current_time = time.time()
-        cutoff_time = current_time - window_seconds
+        return self.gaze_history.latest(time.time() - window_seconds)
 
-        # Find the most recent gaze within the time window
-        recent_gazes = [(ts, elem) for ts, elem in self.gaze_history if ts > cutoff_time]
+    def get_gaze_count(self, window_seconds: float = 10.0) -> int:
+        """Get the number of gaze events within a time window.
 
-        if recent_gazes:
-            # Return the most recent element
-            return recent_gazes[-1][1]
+        Args:
+            window_seconds: Time window in seconds
 
-        return None
+        Returns:
+            Number of gaze events in the window
+        """
+        return self.gaze_history.count_since(time.time() - window_seconds)
 
     def get_gaze_history_summary(self, window_seconds: float = 10.0) -> dict:
         """Get a summary of recent gaze activity.
@@ -275,22 +358,9 @@ class VizorListener:
         Returns:
             Dictionary with gaze activity summary
         """
-        from collections import Counter
-
-        if not self.gaze_history:
-            return {
-                "total_gazes": 0,
-                "unique_elements": 0,
-                "most_gazed": None,
-                "recent_elements": [],
-            }
-
-        current_time = time.time()
-        cutoff_time = current_time - window_seconds
-
-        recent_gazes = [(ts, elem) for ts, elem in self.gaze_history if ts > cutoff_time]
+        window = self.gaze_history.summary_since(time.time() - window_seconds)
 
-        if not recent_gazes:
+        if not window["total"]:
             return {
                 "total_gazes": 0,
                 "unique_elements": 0,
@@ -298,19 +368,17 @@ class VizorListener:
                 "recent_elements": [],
             }
 
-        elements = [elem for ts, elem in recent_gazes]
-        element_counts = Counter(elements)
-        most_gazed = element_counts.most_common(1)[0] if element_counts else None
+        # Elements in order of first gaze within the window; ties go to the earliest
+        recent_elements = sorted(window["first_seen"], key=window["first_seen"].get)
+        most_gazed = max(recent_elements, key=window["counts"].get)
 
         return {
-            "total_gazes": len(recent_gazes),
-            "unique_elements": len(set(elements)),
-            "most_gazed": most_gazed[0] if most_gazed else None,
-            "most_gazed_count": most_gazed[1] if most_gazed else 0,
-            "recent_elements": list(dict.fromkeys(elements)),  # Preserve order, remove duplicates
-            "time_span_seconds": (
-                recent_gazes[-1][0] - recent_gazes[0][0] if len(recent_gazes) > 1 else 0
-            ),
+            "total_gazes": window["total"],
+            "unique_elements": len(recent_elements),
+            "most_gazed": most_gazed,
+            "most_gazed_count": window["counts"][most_gazed],
+            "recent_elements": recent_elements,
+            "time_span_seconds": window["span"],
         }
 
     def is_ros_connected(self) -> bool:
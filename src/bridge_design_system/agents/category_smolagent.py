@@ -1,6 +1,5 @@
 # File: src/bridge_design_system/agents/category_smolagent.py
 import json
-import math
 import argparse
 from pathlib import Path
 from typing import Dict, List, Any, Optional
@@ -11,6 +10,11 @@ from smolagents import CodeAgent, tool
 from src.bridge_design_system.config.logging_config import get_logger
 from src.bridge_design_system.config.model_config import ModelProvider
 from src.bridge_design_system.monitoring.workshop_logging import add_workshop_logging
+from src.bridge_design_system.tools.geometry_kernel import (
+    point_distances,
+    polygon_angles,
+    polygon_side_lengths,
+)
 
 logger = get_logger(__name__)
 
@@ -24,7 +28,6 @@ BASE_DIR = Path(__file__).resolve().parents[1] / "data"
 
 from smolagents import tool
 from typing import List
-import math
 
 @tool
 def calculate_distance(point1: List[float], point2: List[float]) -> float:
@@ -38,7 +41,7 @@ def calculate_distance(point1: List[float], point2: List[float]) -> float:
     Returns:
         The Euclidean distance between the two points.
     """
-    return math.sqrt((point1[0] - point2[0])**2 + (point1[1] - point2[1])**2)
+    return float(point_distances(point1[:2], point2[:2]))
 
 
 
@@ -54,21 +57,7 @@ def calculate_angles(vertices: List[List[float]]) -> List[float]:
     Returns:
         A list of angles (in degrees) between each pair of consecutive edges.
     """
-    if len(vertices) < 3:
-        return []
-    angles = []
-    n = len(vertices)
-    for i in range(n):
-        prev, curr, nxt = vertices[i], vertices[(i+1)%n], vertices[(i+2)%n]
-        v1 = (curr[0] - prev[0], curr[1] - prev[1])
-        v2 = (nxt[0] - curr[0], nxt[1] - curr[1])
-        mag1, mag2 = math.hypot(*v1), math.hypot(*v2)
-        if mag1 and mag2:
-            cos_a = max(-1.0, min(1.0, (v1[0]*v2[0]+v1[1]*v2[1])/(mag1*mag2)))
-            angles.append(math.degrees(math.acos(cos_a)))
-        else:
-            angles.append(0.0)
-    return angles
+    return polygon_angles(vertices).tolist()
 
 @tool
 def save_categorized_data(data: Dict[str, Any], filename: str) -> str:
@@ -215,8 +204,8 @@ def load_catalog(path: Path) -> Dict[str, Any]:
 def analyze_triangle_shape(verts: List[List[float]]) -> str:
     if len(verts) != 3:
         return "invalid_triangle"
-    sides = [calculate_distance(verts[i], verts[(i+1)%3]) for i in range(3)]
-    angles = calculate_angles(verts)
+    sides = polygon_side_lengths(verts)
+    angles = polygon_angles(verts)
     if any(a > 90 for a in angles):
         return "obtuse_triangle"
     if any(abs(a-90)<1 for a in angles):
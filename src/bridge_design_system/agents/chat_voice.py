@@ -25,7 +25,7 @@ except ImportError:
     CHAT_DEPENDENCIES_AVAILABLE = False
 
 from ..config.logging_config import get_logger
-from ..ipc import send_bridge_design_request
+from ..ipc import get_memory_client, send_bridge_design_request
 
 logger = get_logger(__name__)
 load_dotenv()
@@ -61,6 +61,10 @@ class BridgeChatHandler(AsyncStreamHandler):
         self.processing_tasks: Dict[str, Dict] = {}  # Track active processing tasks
         self.task_lock = asyncio.Lock()  # Thread-safe access to shared state
         
+        # Main terminal status pushed by the shared memory service (empty if not running)
+        self.bridge_status: Dict[str, Any] = {}
+        self.status_subscription = None
+        
         logger.info("🌉 Bridge chat handler initialized for two-terminal IPC architecture")
         
         # Add startup diagnostic info
@@ -78,6 +82,8 @@ class BridgeChatHandler(AsyncStreamHandler):
         """Initialize Gemini Live session with bridge design tools."""
         print("🔧 [DEBUG] Starting Gemini Live session initialization...")
         
+        self._subscribe_to_bridge_status()
+        
         # Enhanced startup with better error handling
         try:
             await self._check_microphone_availability()
@@ -327,6 +333,7 @@ class BridgeChatHandler(AsyncStreamHandler):
             
             # Thread-safe: Add to shared state
             self.processing_tasks[task_id] = task_state
+            self._share_task(task_id)
             
             print(f"🧵 [VOICE TERMINAL] Task {task_id} added to shared state")
             print("🎯 [VOICE TERMINAL] Starting IPC processing thread...")
@@ -342,6 +349,46 @@ class BridgeChatHandler(AsyncStreamHandler):
             traceback.print_exc()
             return f"❌ Error starting processing: {str(e)}"
     
+    def _subscribe_to_bridge_status(self):
+        """Follow the main terminal's status through the shared memory service."""
+        if self.status_subscription is not None:
+            return
+        try:
+            client = get_memory_client()
+            self.bridge_status = client.get("bridge", "status") or {}
+            self.status_subscription = client.subscribe("bridge", self._on_bridge_event)
+            logger.info("🧠 Subscribed to main terminal status via shared memory service")
+        except Exception as e:
+            logger.info(f"Shared memory service not available, status via TCP only: {e}")
+
+    def _on_bridge_event(self, event: Dict[str, Any]):
+        """Memory service callback (runs on the subscription thread)."""
+        if event.get("key") == "status" and event.get("value") is not None:
+            self.bridge_status = event["value"]
+
+    def _share_task(self, task_id: str):
+        """Publish a task's state (or its removal) so the other processes can see it."""
+        if self.status_subscription is None:
+            return
+        try:
+            client = get_memory_client()
+            task = self.processing_tasks.get(task_id)
+            if task is None:
+                client.delete("tasks/voice", task_id)
+            else:
+                client.put("tasks/voice", task_id, task)
+        except Exception as e:
+            logger.debug(f"Task {task_id} not shared: {e}")
+
+    def _describe_bridge_status(self) -> str:
+        """What the main terminal reports it is working on, if it is busy."""
+        status = self.bridge_status
+        if not status.get("busy"):
+            return ""
+        elapsed = time.time() - status.get("started_at", time.time())
+        request = status.get("request", "")[:50]
+        return f"\n🖥️ Main terminal is working on '{request}...' ({elapsed:.1f}s)"
+
     def _execute_are_smolagents_finished_yet(self, task_id: str = None) -> str:
         """Check if main.py processing has finished - Voice terminal polls status."""
         print(f"🔍 [VOICE TERMINAL] Checking main.py status for task_id: {task_id}")
@@ -363,15 +410,18 @@ class BridgeChatHandler(AsyncStreamHandler):
                     elapsed = task["finished_at"] - task["started_at"] 
                     # Clean up completed task
                     del self.processing_tasks[task_id]
+                    self._share_task(task_id)
                     return f"✅ Task {task_id} completed! ({elapsed:.1f}s)\n\nResult: {result}"
                 elif status == "error":
                     error = task["error"]
                     # Clean up failed task
                     del self.processing_tasks[task_id]
+                    self._share_task(task_id)
                     return f"❌ Task {task_id} failed: {error}"
                 else:
                     elapsed = time.time() - task["started_at"]
-                    return f"🔄 Task {task_id} still processing... ({elapsed:.1f}s elapsed). Request: '{task['user_request'][:50]}...'"
+                    return f"🔄 Task {task_id} still processing... ({elapsed:.1f}s elapsed). Request: '{task['user_request'][:50]}...'" + \
+                           self._describe_bridge_status()
             
             else:
                 # Check all tasks
@@ -382,10 +432,12 @@ class BridgeChatHandler(AsyncStreamHandler):
                         elapsed = task["finished_at"] - task["started_at"]
                         results.append(f"✅ Task {tid} completed ({elapsed:.1f}s): {result}")
                         del self.processing_tasks[tid]
+                        self._share_task(tid)
                     elif task["status"] == "error":
                         error = task["error"] 
                         results.append(f"❌ Task {tid} failed: {error}")
                         del self.processing_tasks[tid]
+                        self._share_task(tid)
                     else:
                         elapsed = time.time() - task["started_at"]
                         results.append(f"🔄 Task {tid} processing ({elapsed:.1f}s): '{task['user_request'][:30]}...'")
@@ -393,7 +445,7 @@ class BridgeChatHandler(AsyncStreamHandler):
                 if not results:
                     return "🤷 No active tasks found."
                     
-                return "\n".join(results)
+                return "\n".join(results) + self._describe_bridge_status()
                 
         except Exception as e:
             print(f"💥 [VOICE TERMINAL ERROR] Exception checking status: {e}")
@@ -416,6 +468,7 @@ class BridgeChatHandler(AsyncStreamHandler):
             # Update status to processing
             async with self.task_lock:
                 self.processing_tasks[task_id]["status"] = "processing"
+                self._share_task(task_id)
             
             # Send request via IPC to main.py (this is the heavy, blocking operation)
             print("🔧 [IPC THREAD] Sending request to main.py via TCP...")
@@ -443,6 +496,7 @@ class BridgeChatHandler(AsyncStreamHandler):
                     logger.error(f"❌ IPC task {task_id} failed: {response.message}")
                 
                 self.processing_tasks[task_id]["finished_at"] = time.time()
+                self._share_task(task_id)
                 
         except Exception as e:
             print(f"💥 [IPC THREAD] Exception in task {task_id}: {e}")
@@ -454,6 +508,7 @@ class BridgeChatHandler(AsyncStreamHandler):
                     self.processing_tasks[task_id]["status"] = "error"
                     self.processing_tasks[task_id]["error"] = str(e)
                     self.processing_tasks[task_id]["finished_at"] = time.time()
+                    self._share_task(task_id)
             
             import traceback
             traceback.print_exc()
@@ -717,6 +772,7 @@ REMEMBER: ALWAYS check task status BEFORE sending new bridge design requests. Th
         return {
             "startup_diagnostics": getattr(self, "startup_diagnostics", {}),
             "active_tasks": len(self.processing_tasks),
+            "bridge_status": self.bridge_status,
             "session_active": self.session is not None,
             "quit_requested": self.quit.is_set()
         }
@@ -725,6 +781,9 @@ REMEMBER: ALWAYS check task status BEFORE sending new bridge design requests. Th
         """Shutdown handler."""
         print("🔄 [DEBUG] Shutting down bridge chat handler...")
         self.quit.set()
+        if self.status_subscription is not None:
+            self.status_subscription.close()
+            self.status_subscription = None
 
 
 # Factory function to create the complete bridge chat system
@@ -470,6 +470,14 @@ General Recommendations:
                     context += f"Memory Step {i} (Step #{step.step_number}):\n"
                     context += f"{step.observations}\n\n"
 
+                # Original state snapshots live in the design record store, not in observations
+                from ..memory import get_original_element_state
+
+                original = get_original_element_state(self.agent, element_id)
+                if original:
+                    context += f"Original State (Step #{original['step_number']}):\n"
+                    context += f"{original['original_observations']}\n\n"
+
                 context += (
                     f"Found {len(relevant_steps)} memory entries about element {element_id}.\n"
                 )
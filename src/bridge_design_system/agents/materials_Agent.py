@@ -7,12 +7,12 @@ external tools to classify shapes.
 """
 
 import json
-import math
 from pathlib import Path
 from typing import Dict, List, Any, Tuple
 
 from smolagents import CodeAgent, tool
 from ..config.model_config import ModelProvider
+from ..tools.geometry_kernel import point_distances, polygon_angles, polygon_side_lengths
 
 
 # =============================================================================
@@ -33,7 +33,7 @@ def calculate_distance(point1: List[float], point2: List[float]) -> float:
     Returns:
         Distance between the points
     """
-    return math.sqrt((point2[0] - point1[0])**2 + (point2[1] - point1[1])**2)
+    return float(point_distances(point1[:2], point2[:2]))
 
 
 @tool
@@ -47,39 +47,7 @@ def calculate_angles(vertices: List[List[float]]) -> List[float]:
     Returns:
         List of angles in degrees
     """
-    if len(vertices) < 3:
-        return []
-    
-    angles = []
-    n = len(vertices)
-    
-    for i in range(n):
-        # Get three consecutive vertices
-        prev = vertices[i]
-        curr = vertices[(i + 1) % n]
-        next_vert = vertices[(i + 2) % n]
-        
-        # Calculate vectors
-        v1 = [curr[0] - prev[0], curr[1] - prev[1]]
-        v2 = [next_vert[0] - curr[0], next_vert[1] - curr[1]]
-        
-        # Calculate dot product
-        dot_product = v1[0] * v2[0] + v1[1] * v2[1]
-        
-        # Calculate magnitudes
-        mag1 = math.sqrt(v1[0]**2 + v1[1]**2)
-        mag2 = math.sqrt(v2[0]**2 + v2[1]**2)
-        
-        # Calculate angle
-        if mag1 > 0 and mag2 > 0:
-            cos_angle = dot_product / (mag1 * mag2)
-            cos_angle = max(-1, min(1, cos_angle))  # Clamp to valid range
-            angle = math.degrees(math.acos(cos_angle))
-            angles.append(angle)
-        else:
-            angles.append(0)
-    
-    return angles
+    return polygon_angles(vertices).tolist()
 
 
 @tool
@@ -184,15 +152,9 @@ def analyze_triangle_shape(vertices: List[List[float]]) -> str:
     if len(vertices) != 3:
         return "invalid_triangle"
     
-    # Calculate side lengths
-    sides = []
-    for i in range(3):
-        next_i = (i + 1) % 3
-        side = calculate_distance(vertices[i], vertices[next_i])
-        sides.append(side)
-    
-    # Calculate angles
-    angles = calculate_angles(vertices)
+    # Calculate side lengths and angles in one pass
+    sides = polygon_side_lengths(vertices)
+    angles = polygon_angles(vertices)
     
     # Classify triangle
     if any(angle > 90 for angle in angles):
@@ -6,21 +6,45 @@ following smolagents best practices, focusing on truss system validation and
 Grasshopper fix generation.
 """
 
-import math
+import copy
 from datetime import datetime
 from pathlib import Path
 from typing import Any, List, Optional
 
+import numpy as np
 from smolagents import CodeAgent, tool
 
 from ..config.logging_config import get_logger
 from ..config.model_config import ModelProvider
+from ..state.assembly_graph import Z_TOLERANCE_MM, get_assembly_graph
+from ..tools.correction_planner import closure_adjustment, plan_corrections
+from ..tools.endpoint_index import (
+    JOINT_OK,
+    JOINT_OVERLAP,
+    JOINT_SEARCH_RADIUS_MM,
+    MAX_JOINT_GAP_MM,
+    MIN_JOINT_GAP_MM,
+    classify_joint,
+    connection_suffix,
+    find_endpoint_pairs,
+)
+from ..tools.geometry_kernel import (
+    element_endpoints,
+    non_planar_indices,
+    point_distances,
+    z_components,
+)
 from ..tools.material_tools import (
+    MIN_USABLE_LENGTH_MM,
     CuttingOptimizer,
     MaterialInventoryManager,
+    beams_from_assignments,
     create_session_record,
-    extract_element_lengths,
+    group_lengths_by_cross_section,
+    plan_cache,
+    track_session_offcuts,
 )
+from ..tools.vertex_clustering import VERTEX_TOLERANCE_MM, cluster_vertices, detect_loops
 
 logger = get_logger(__name__)
 
@@ -45,52 +69,39 @@ def check_element_connectivity(elements: list) -> dict:
 
     result = {"valid": True, "gaps": {}, "overlaps": {}, "issues": []}
 
-    min_gap = 2.5  # Minimum 2.5mm gap for 5x5mm cross-sections (half the width)
-    max_gap = 5.0  # Maximum acceptable gap for connection
+    min_gap = MIN_JOINT_GAP_MM
+    max_gap = MAX_JOINT_GAP_MM
 
     try:
-        # Calculate actual endpoints for all elements
-        element_endpoints = []
-        for elem in elements:
-            endpoints = _calculate_beam_endpoints(elem)
-            element_endpoints.append((elem, endpoints["start"], endpoints["end"]))
-
-        # Check all pairs of elements for connection
-        for i, (elem1, start1, end1) in enumerate(element_endpoints):
-            for j, (elem2, start2, end2) in enumerate(element_endpoints[i + 1 :], i + 1):
-                elem1_id = elem1.get("id", i)
-                elem2_id = elem2.get("id", j)
-
-                # Check all endpoint combinations (ignore Z differences)
-                connections = [
-                    (start1, start2, f"{elem1_id}-{elem2_id}_ss"),
-                    (start1, end2, f"{elem1_id}-{elem2_id}_se"),
-                    (end1, start2, f"{elem1_id}-{elem2_id}_es"),
-                    (end1, end2, f"{elem1_id}-{elem2_id}_ee"),
-                ]
-
-                for pt1, pt2, connection_id in connections:
-                    # Calculate XY distance only (ignore Z differences)
-                    xy_distance = _calculate_xy_distance(pt1, pt2)
-
-                    if min_gap <= xy_distance <= max_gap:
-                        # Valid connection with proper gap
-                        continue
-                    elif xy_distance < min_gap:
-                        # Too close - physical overlap
-                        result["overlaps"][connection_id] = round(xy_distance, 3)
-                        result["valid"] = False
-                        result["issues"].append(
-                            f"Physical overlap: {xy_distance:.3f}mm gap (need ≥{min_gap}mm)"
-                        )
-                    elif (
-                        xy_distance > max_gap and xy_distance < 15.0
-                    ):  # Potential intended connection
-                        result["gaps"][connection_id] = round(xy_distance, 3)
-                        result["valid"] = False
-                        result["issues"].append(
-                            f"Connection gap: {xy_distance:.3f}mm (should be {min_gap}-{max_gap}mm)"
-                        )
+        # Calculate actual endpoints for all elements in one pass
+        starts, ends = element_endpoints(elements)
+        endpoint_pairs = list(zip(starts.tolist(), ends.tolist()))
+
+        # Only endpoint pairs within the search radius are candidates (grid hash lookup),
+        # reported in the same order as comparing every element pair
+        for i, j, end_i, end_j, xy_distance in find_endpoint_pairs(
+            endpoint_pairs, JOINT_SEARCH_RADIUS_MM
+        ):
+            status = classify_joint(xy_distance)
+            if status in (None, JOINT_OK):
+                continue
+
+            elem1_id = elements[i].get("id", i)
+            elem2_id = elements[j].get("id", j)
+            connection_id = f"{elem1_id}-{elem2_id}_{connection_suffix(end_i, end_j)}"
+            result["valid"] = False
+
+            if status == JOINT_OVERLAP:
+                # Too close - physical overlap
+                result["overlaps"][connection_id] = round(xy_distance, 3)
+                result["issues"].append(
+                    f"Physical overlap: {xy_distance:.3f}mm gap (need ≥{min_gap}mm)"
+                )
+            else:  # Potential intended connection
+                result["gaps"][connection_id] = round(xy_distance, 3)
+                result["issues"].append(
+                    f"Connection gap: {xy_distance:.3f}mm (should be {min_gap}-{max_gap}mm)"
+                )
 
         logger.info(
             f"✅ Connectivity check complete: {'VALID' if result['valid'] else 'ISSUES_FOUND'}"
@@ -161,6 +172,73 @@ def generate_geometry_agent_instructions(
         return {"error": str(e), "issue_type": issue_type, "success": False}
 
 
+@tool
+def plan_geometry_corrections(corrections: list) -> dict:
+    """
+    Merges all pending corrections into one batched update plan for the Geometry Agent.
+
+    Deduplicates corrections per element (one length change covers several gaps),
+    resolves conflicting requests (overlap > orientation > gap > closure) and groups
+    the updates by Grasshopper component so each component script is edited once.
+
+    Args:
+        corrections: List of {"issue_type", "element_data", "correction_data"} items, with
+            the same fields generate_geometry_agent_instructions takes
+
+    Returns:
+        Dict with updates (ordered per element), by_component, conflicts, skipped,
+        issue_count, update_count and batched instructions for the Geometry Agent
+    """
+    logger.info(f"🧩 Planning batched geometry corrections for {len(corrections)} issues")
+
+    try:
+        plan = plan_corrections(corrections)
+
+        changes_by_element = {update["element_id"]: update["changes"] for update in plan["updates"]}
+        instructions = []
+        for component_id, element_ids in plan["by_component"].items():
+            instructions.append(
+                f"Read '{component_id}' once and apply all updates below, then submit it "
+                f"with a single edit_python3_script call"
+                if component_id != "unassigned"
+                else "Locate the components of these elements and apply the updates below"
+            )
+            for element_id in element_ids:
+                changes = changes_by_element[element_id]
+                if "length" in changes:
+                    length = changes["length"]
+                    instructions.append(
+                        f"  {element_id}: length {length['old']}mm → {length['new']}mm"
+                    )
+                if "direction_z" in changes:
+                    instructions.append(
+                        f"  {element_id}: direction Z → {changes['direction_z']['new']}"
+                    )
+                if "position" in changes:
+                    instructions.append(
+                        f"  {element_id}: move to keep ≥{changes['position']['min_gap']}mm gap"
+                    )
+
+        plan.update(
+            {
+                "instructions": instructions,
+                "timestamp": datetime.now().isoformat(),
+                "requires_validation": True,
+                "target_agent": "geometry_agent",
+            }
+        )
+
+        logger.info(
+            f"✅ Merged {plan['issue_count']} issues into {plan['update_count']} element updates "
+            f"across {len(plan['by_component'])} components"
+        )
+        return plan
+
+    except Exception as e:
+        logger.error(f"❌ Correction planning failed: {e}")
+        return {"error": str(e), "updates": [], "success": False}
+
+
 @tool
 def calculate_closure_correction(elements: list, module_type: str) -> dict:
     """
@@ -221,6 +299,46 @@ def calculate_closure_correction(elements: list, module_type: str) -> dict:
         }
 
 
+@tool
+def detect_truss_modules(elements: list) -> dict:
+    """
+    Finds every closed or almost-closed module loop across a whole truss.
+
+    Merges beam endpoints within 0.5mm into shared vertices and detects triangles
+    and larger polygons, plus open chains whose free end nearly meets a vertex of
+    the loop (unclosed modules), including modules that share a vertex with a
+    neighbour. Works on any number of modules at once.
+
+    Args:
+        elements: List of all AssemblyElements with id, center_point, direction, length
+
+    Returns:
+        Dict with modules (list of loops with module_id, element_ids, vertices,
+        side_lengths, closed, closure_gap, required_adjustment), closed_count and
+        open_count
+    """
+    logger.info(f"🔺 Detecting truss modules across {len(elements)} elements")
+
+    try:
+        modules = detect_loops(elements)
+        for number, module in enumerate(modules, 1):
+            module["module_id"] = f"module_{number:03d}"
+            module["gap_location"] = "loop_perimeter" if module["closed"] else "open_chain_free_end"
+
+        closed_count = sum(1 for module in modules if module["closed"])
+        open_count = len(modules) - closed_count
+        logger.info(f"✅ Found {closed_count} closed and {open_count} open modules")
+        return {
+            "modules": modules,
+            "closed_count": closed_count,
+            "open_count": open_count,
+        }
+
+    except Exception as e:
+        logger.error(f"❌ Module detection failed: {e}")
+        return {"error": str(e), "modules": [], "closed_count": 0, "open_count": 0}
+
+
 @tool
 def validate_planar_orientation(elements: list) -> dict:
     """
@@ -230,7 +348,7 @@ def validate_planar_orientation(elements: list) -> dict:
     ensuring horizontal orientation as required by system specifications.
 
     Args:
-        elements: List of AssemblyElement objects to validate
+        elements: List of AssemblyElement objects with center_point, direction and length
 
     Returns:
         Dict with valid (bool), errors (list of elements with Z components)
@@ -240,35 +358,25 @@ def validate_planar_orientation(elements: list) -> dict:
     result = {"valid": True, "errors": [], "non_horizontal_elements": []}
 
     try:
-        z_tolerance = 0.001  # 1mm tolerance for Z component
+        # Z rise of every element at once; only offending elements are visited below.
+        # Endpoints come from center, direction and length, as in the assembly graph.
+        starts, ends = element_endpoints(elements)
+        rises = z_components(starts, ends)
 
-        for i, element in enumerate(elements):
-            start_point = element.get("start_point", [0, 0, 0])
-            end_point = element.get("end_point", [0, 0, 0])
+        for i in non_planar_indices(starts, ends, Z_TOLERANCE_MM):
+            element = elements[i]
             element_id = element.get("id", f"element_{i}")
-
-            # Calculate direction vector
-            direction = [
-                end_point[0] - start_point[0],
-                end_point[1] - start_point[1],
-                end_point[2] - start_point[2],
-            ]
-
-            # Check Z component
-            z_component = abs(direction[2])
-
-            if z_component > z_tolerance:
-                result["valid"] = False
-                error_info = {
-                    "element_id": element_id,
-                    "z_component": round(z_component, 4),
-                    "start_z": start_point[2],
-                    "end_z": end_point[2],
-                }
-                result["errors"].append(
-                    f"Element {element_id} has Z component: {z_component:.4f}mm"
-                )
-                result["non_horizontal_elements"].append(error_info)
+            z_component = float(rises[i])
+
+            result["valid"] = False
+            error_info = {
+                "element_id": element_id,
+                "z_component": round(z_component, 4),
+                "start_z": round(float(starts[i][2]), 4),
+                "end_z": round(float(ends[i][2]), 4),
+            }
+            result["errors"].append(f"Element {element_id} has Z component: {z_component:.4f}mm")
+            result["non_horizontal_elements"].append(error_info)
 
         logger.info(f"✅ Orientation validation: {'PASSED' if result['valid'] else 'FAILED'}")
         return result
@@ -282,6 +390,58 @@ def validate_planar_orientation(elements: list) -> dict:
         }
 
 
+@tool
+def validate_element_updates(elements: list, modules: list = None) -> dict:
+    """
+    Incrementally re-validates only the elements that changed.
+
+    Keeps a persistent assembly graph of endpoints and joint statuses across calls.
+    Seed it once with the full element list; after a Direct Parameter Update pass
+    only the moved elements to learn what broke and what got fixed.
+
+    Args:
+        elements: Changed AssemblyElements (id plus any of center_point, direction, length)
+        modules: Optional module definitions [{"id", "type", "element_ids"}] so closure is
+            re-checked only for modules containing changed elements
+
+    Returns:
+        Dict with valid (whole assembly), touched_elements, broken (new gaps, overlaps and
+        non-horizontal elements), fixed, open_issues, affected_modules and closure results
+    """
+    logger.info(f"🔁 Incrementally validating {len(elements)} changed elements")
+
+    try:
+        graph = get_assembly_graph()
+        for module in modules or []:
+            graph.set_module(str(module["id"]), module["type"], module["element_ids"])
+
+        report = graph.update_elements(elements)
+        result = report.to_dict()
+
+        result["closure"] = {}
+        for module_id in report.affected_modules:
+            module_type, module_elements = graph.module(module_id)
+            if module_type in ["A*", "B*"] and len(module_elements) == 3:
+                result["closure"][module_id] = _calculate_triangle_closure(
+                    module_elements, module_type
+                )
+
+        logger.info(
+            f"✅ Incremental validation: {len(result['broken']['gaps'])} new gaps, "
+            f"{len(result['broken']['overlaps'])} new overlaps, "
+            f"{len(result['fixed']['connections'])} fixed"
+        )
+        return result
+
+    except Exception as e:
+        logger.error(f"❌ Incremental validation failed: {e}")
+        return {
+            "valid": False,
+            "touched_elements": [],
+            "open_issues": [f"Incremental validation error: {str(e)}"],
+        }
+
+
 # Helper functions for generating Geometry Agent instructions
 def _generate_gap_instructions(element_data: dict, correction_data: dict) -> dict:
     """Generate instructions for fixing connectivity gaps."""
@@ -361,13 +521,13 @@ def _generate_closure_instructions(element_data: dict, correction_data: dict) ->
     """Generate instructions for fixing triangle closure."""
     affected_elements = correction_data.get("affected_elements", [])
     gap_size = correction_data.get("gap_size", 0)
-    adjustment = correction_data.get("adjustment", gap_size / 2)
+    adjustment = closure_adjustment(correction_data)  # Same split as plan_corrections
 
     return {
         "instructions": [
             f"Triangle closure issue detected with {gap_size:.2f}mm gap",
             f"Adjust lengths of beams: {', '.join(affected_elements)}",
-            f"Distribute {adjustment:.2f}mm adjustment across the triangle sides",
+            f"Change each listed beam's length by {adjustment:.2f}mm to close the gap",
             "Verify triangle closes properly after modifications",
         ],
         "target_elements": affected_elements,
@@ -386,75 +546,32 @@ def _calculate_beam_endpoints(element: dict) -> dict:
 
     For AssemblyElement: center ± (direction.normalized * length/2)
     """
-    center = element.get("center_point", [0, 0, 0])
-    direction = element.get("direction", [1, 0, 0])  # Should be unit vector
-    length = element.get("length", 0)
-
-    # Normalize direction vector
-    dir_length = math.sqrt(sum(d * d for d in direction))
-    if dir_length == 0:
-        normalized_dir = [0, 0, 0]
-    else:
-        normalized_dir = [d / dir_length for d in direction]
-
-    # Calculate half-length vector
-    half_vector = [d * length / 2 for d in normalized_dir]
-
-    # Calculate endpoints
-    start_point = [center[i] - half_vector[i] for i in range(3)]
-    end_point = [center[i] + half_vector[i] for i in range(3)]
-
-    return {"start": start_point, "end": end_point}
-
-
-def _calculate_xy_distance(pt1: List[float], pt2: List[float]) -> float:
-    """Calculate XY distance between two points (ignore Z component)."""
-    dx = pt1[0] - pt2[0]
-    dy = pt1[1] - pt2[1]
-    return math.sqrt(dx * dx + dy * dy)
-
-
-def _calculate_distance(pt1: List[float], pt2: List[float]) -> float:
-    """Calculate 3D distance between two points."""
-    return math.sqrt(sum((a - b) ** 2 for a, b in zip(pt1, pt2)))
+    starts, ends = element_endpoints([element])
+    return {"start": starts[0].tolist(), "end": ends[0].tolist()}
 
 
 def _calculate_triangle_closure(elements: List[dict], module_type: str) -> dict:
     """Calculate closure correction for triangular modules using actual beam endpoints."""
 
-    # Calculate actual endpoints for all beams
-    all_endpoints = []
-    for element in elements:
-        endpoints = _calculate_beam_endpoints(element)
-        all_endpoints.extend([endpoints["start"], endpoints["end"]])
-
-    # Find unique vertices (triangle corners) with small tolerance
-    unique_points = []
-    tolerance = 0.5  # 0.5mm tolerance for considering points the same
-
-    for pt in all_endpoints:
-        is_unique = True
-        for existing in unique_points:
-            if _calculate_distance(pt, existing) < tolerance:
-                is_unique = False
-                break
-        if is_unique:
-            unique_points.append(pt)
+    # Calculate actual endpoints for all beams, interleaved start/end per beam
+    starts, ends = element_endpoints(elements)
+    all_endpoints = np.stack([starts, ends], axis=1).reshape(-1, 3)
+
+    # Cluster endpoints into unique vertices (triangle corners) within 0.5mm
+    _, vertices = cluster_vertices(all_endpoints, VERTEX_TOLERANCE_MM)
 
-    if len(unique_points) != 3:
+    if len(vertices) != 3:
         return {
-            "error": f"Expected 3 unique vertices for triangle, found {len(unique_points)}",
+            "error": f"Expected 3 unique vertices for triangle, found {len(vertices)}",
             "gap_location": "vertex_detection_failed",
             "required_adjustment": 0,
             "affected_elements": [elem.get("id", f"elem_{i}") for i, elem in enumerate(elements)],
         }
 
-    # Calculate side lengths between vertices
-    side_lengths = [
-        _calculate_distance(unique_points[0], unique_points[1]),
-        _calculate_distance(unique_points[1], unique_points[2]),
-        _calculate_distance(unique_points[2], unique_points[0]),
-    ]
+    unique_points = np.asarray(vertices)
+
+    # Calculate side lengths between vertices (0-1, 1-2, 2-0)
+    side_lengths = point_distances(unique_points, np.roll(unique_points, -1, axis=0)).tolist()
 
     # Check for closure - in a perfect triangle, the sum of any two sides should exceed the third
     # Here we look for gaps by checking if the triangle actually closes
@@ -470,7 +587,7 @@ def _calculate_triangle_closure(elements: List[dict], module_type: str) -> dict:
         "affected_elements": [elem.get("id", f"elem_{i}") for i, elem in enumerate(elements)],
         "side_lengths": side_lengths,
         "closure_gap": closure_gap,
-        "vertices": unique_points,
+        "vertices": unique_points.tolist(),
     }
 
 
@@ -478,7 +595,7 @@ def _calculate_triangle_closure(elements: List[dict], module_type: str) -> dict:
 
 
 @tool
-def analyze_cutting_plan(required_lengths: list) -> dict:
+def analyze_cutting_plan(required_lengths: list, detail_level: str = "full") -> dict:
     """
     Analyzes and validates a cutting plan against the current material inventory.
 
@@ -487,17 +604,30 @@ def analyze_cutting_plan(required_lengths: list) -> dict:
     sequence and returns a detailed analysis including feasibility, projected waste,
     material efficiency, and a visual plan.
 
+    With detail_level="summary" only the feasibility verdict and key numbers are
+    returned, together with a plan_handle. Use 'get_cutting_plan_details' with that
+    handle to fetch the visual plan, recommendations or full beam assignments later.
+
     This is a READ-ONLY tool for planning and does NOT modify the inventory. Use
     'commit_material_usage' to apply the cuts after analysis.
 
     Args:
         required_lengths: List of required element lengths in mm.
+        detail_level: "full" for the complete analysis or "summary" for a compact verdict.
 
     Returns:
         Dict with feasibility status, optimization analysis, and potential alternatives.
     """
     logger.info(f"📊 Analyzing cutting plan for {len(required_lengths)} elements")
 
+    if detail_level not in DETAIL_LEVELS:
+        return {
+            "feasible": False,
+            "error": f"Unknown detail_level: {detail_level!r}",
+            "valid_detail_levels": list(DETAIL_LEVELS),
+            "analysis": None,
+        }
+
     try:
         # Initialize managers
         inventory_manager = MaterialInventoryManager()
@@ -514,9 +644,11 @@ def analyze_cutting_plan(required_lengths: list) -> dict:
                     element_lengths.append(int(length * 10))
                 else:  # Already mm
                     element_lengths.append(int(length))
+            requirements = {None: element_lengths}
         else:
-            # Extract from element objects
-            element_lengths = extract_element_lengths(required_lengths)
+            # Extract from element objects, keeping cross-sections apart
+            requirements = group_lengths_by_cross_section(required_lengths)
+            element_lengths = [length for lengths in requirements.values() for length in lengths]
 
         if not element_lengths:
             return {
@@ -525,57 +657,35 @@ def analyze_cutting_plan(required_lengths: list) -> dict:
                 "analysis": None,
             }
 
-        # Get current beams
-        beams = inventory_manager.get_beams()
-
-        # Perform comprehensive feasibility analysis
-        feasibility_result = optimizer.validate_feasibility(element_lengths, beams)
+        # Identical analyses share a handle, so already rendered sections are reused.
+        # Reports are attached to their plan in plan_cache and evicted with it.
+        inventory_version = inventory_manager.inventory_version()
+        plan_key = optimizer.plan_key(inventory_version, requirements)
+        plan_handle = plan_cache.handle_for(plan_key)
+        report = plan_cache.attached(plan_handle)
+
+        if report is None:
+            # Get current beams
+            beams = inventory_manager.get_beams()
+
+            # Get optimized cutting plan (offcuts are filled before fresh stock). Plans are
+            # memoized per inventory version, and a one-element change repairs the last plan.
+            cutting_result = optimizer.plan_cached(requirements, beams, inventory_version)
+
+            # Perform comprehensive feasibility analysis on the same plan
+            cross_section = next(iter(requirements)) if len(requirements) == 1 else None
+            feasibility_result = optimizer.validate_feasibility(
+                element_lengths, beams, cross_section, cutting_result=cutting_result
+            )
 
-        # Get optimized cutting plan
-        cutting_result = optimizer.first_fit_decreasing(element_lengths, beams)
+            report = CuttingPlanReport(
+                element_lengths, beams, cutting_result, feasibility_result, optimizer
+            )
+            plan_cache.attach(plan_key, report)
 
-        # Generate alternatives if not feasible
-        alternatives = []
-        if not feasibility_result["feasible"]:
-            alternatives = _generate_design_alternatives(element_lengths, beams, optimizer)
-
-        # Calculate design metrics
-        total_required = sum(element_lengths)
-        total_available = sum(beam.remaining_length_mm for beam in beams)
-
-        return {
-            "feasible": cutting_result["summary"]["feasible"],
-            "analysis": {
-                "total_elements": len(element_lengths),
-                "total_length_required_mm": total_required,
-                "total_length_available_mm": total_available,
-                "capacity_utilization_percent": (
-                    (total_required / total_available * 100) if total_available > 0 else 0
-                ),
-                "largest_element_mm": max(element_lengths) if element_lengths else 0,
-                "smallest_element_mm": min(element_lengths) if element_lengths else 0,
-            },
-            "optimization_results": {
-                "efficiency_percent": cutting_result["summary"]["material_efficiency_percent"],
-                "waste_mm": cutting_result["summary"]["total_waste_mm"],
-                "unassigned_elements": cutting_result["summary"]["unassigned_elements"],
-                "cutting_plan": cutting_result["cutting_plan"],
-                "beam_assignments": cutting_result["beam_assignments"],
-            },
-            "feasibility_details": feasibility_result,
-            "alternatives": alternatives,
-            "recommendations": _generate_feasibility_recommendations(
-                feasibility_result, element_lengths, beams
-            ),
-            "visual_plan": _format_cutting_plan_visual(cutting_result),
-            "constraints": {
-                "max_beam_length_available_mm": max(
-                    (beam.remaining_length_mm for beam in beams), default=0
-                ),
-                "min_cut_length_recommended_mm": 50,
-                "kerf_loss_per_cut_mm": 3,
-            },
-        }
+        if detail_level == "summary":
+            return report.summary(plan_handle)
+        return report.full(plan_handle)
 
     except Exception as e:
         logger.error(f"❌ Cutting plan analysis failed: {e}")
@@ -586,6 +696,47 @@ def analyze_cutting_plan(required_lengths: list) -> dict:
         }
 
 
+@tool
+def get_cutting_plan_details(plan_handle: str, sections: list = None) -> dict:
+    """
+    Retrieves detail sections of a plan analyzed with 'analyze_cutting_plan'.
+
+    Sections are rendered on first request and cached, so fetching the visual plan
+    after a summary-only analysis does not re-run the optimizer.
+
+    Args:
+        plan_handle: The plan_handle returned by analyze_cutting_plan.
+        sections: Section names to return (defaults to all). Valid names are "analysis",
+            "cutting_plan", "beam_assignments", "feasibility_details", "alternatives",
+            "recommendations", "visual_plan" and "constraints".
+
+    Returns:
+        Dict with the plan_handle and the requested sections.
+    """
+    report = plan_cache.attached(plan_handle)
+    if report is None:
+        return {
+            "success": False,
+            "error": f"Unknown or expired plan handle: {plan_handle}",
+            "recommendation": "Run 'analyze_cutting_plan' again to get a fresh handle",
+        }
+
+    sections = sections or list(CuttingPlanReport.SECTIONS)
+    unknown = [name for name in sections if name not in CuttingPlanReport.SECTIONS]
+    if unknown:
+        return {
+            "success": False,
+            "error": f"Unknown sections: {unknown}",
+            "valid_sections": list(CuttingPlanReport.SECTIONS),
+        }
+
+    return {
+        "success": True,
+        "plan_handle": plan_handle,
+        **{name: report.section(name) for name in sections},
+    }
+
+
 @tool
 def commit_material_usage(elements: list, session_id: str = None) -> dict:
     """
@@ -612,8 +763,9 @@ def commit_material_usage(elements: list, session_id: str = None) -> dict:
         inventory_manager = MaterialInventoryManager()
         optimizer = CuttingOptimizer()
 
-        # Extract element lengths
-        element_lengths = extract_element_lengths(elements)
+        # Extract element lengths grouped by cross-section
+        requirements = group_lengths_by_cross_section(elements)
+        element_lengths = [length for lengths in requirements.values() for length in lengths]
 
         if not element_lengths:
             return {
@@ -627,8 +779,12 @@ def commit_material_usage(elements: list, session_id: str = None) -> dict:
             session_id = f"session_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
 
         # Get current beams and plan cutting
+        # Element IDs are namespaced by session so remnant beams can carry cuts
+        # from several sessions and still be reversed per session
         beams = inventory_manager.get_beams()
-        cutting_result = optimizer.first_fit_decreasing(element_lengths, beams)
+        cutting_result = optimizer.plan_cross_sections(
+            requirements, beams, element_id_prefix=f"{session_id}_element"
+        )
 
         # Check if cutting is feasible
         if not cutting_result["summary"]["feasible"]:
@@ -646,31 +802,15 @@ def commit_material_usage(elements: list, session_id: str = None) -> dict:
                 ),
             }
 
-        # Apply cuts to inventory
-        updated_beams = []
-        for beam_assignment in cutting_result["beam_assignments"]:
-            # Find the corresponding beam
-            beam = next((b for b in beams if b.beam_id == beam_assignment["beam_id"]), None)
-            if beam:
-                # Update beam with new cuts from the optimization result
-                beam.remaining_length_mm = beam_assignment["remaining_length_mm"]
-                beam.utilization_percent = beam_assignment["utilization_percent"]
-                beam.waste_mm = beam_assignment["waste_mm"]
-                # Add new cuts
-                for cut_data in beam_assignment["cuts"]:
-                    if cut_data["element_id"] not in [cut.element_id for cut in beam.cuts]:
-                        beam.add_cut(
-                            cut_data["element_id"],
-                            cut_data["length_mm"],
-                            cut_data.get("kerf_loss_mm", 3),
-                        )
-                updated_beams.append(beam)
-
-        # Update inventory
+        # Record remnants consumed/produced so offcuts stay traceable across sessions
+        offcuts = track_session_offcuts(beams, cutting_result, session_id)
+
+        # Apply cuts to inventory from the planned beam state
+        updated_beams = beams_from_assignments(cutting_result["beam_assignments"])
         inventory_manager.update_beams(updated_beams)
 
         # Create session record
-        session_record = create_session_record(session_id, elements, cutting_result)
+        session_record = create_session_record(session_id, elements, cutting_result, offcuts)
 
         # Add session to inventory data
         inventory_manager.inventory_data.setdefault("cutting_sessions", []).append(session_record)
@@ -691,8 +831,10 @@ def commit_material_usage(elements: list, session_id: str = None) -> dict:
                 "efficiency_percent": cutting_result["summary"]["material_efficiency_percent"],
             },
             "inventory_status": status,
+            "offcuts": offcuts,
             "optimization_applied": {
                 "algorithm": "first_fit_decreasing",
+                "offcut_cuts": cutting_result["summary"]["offcut_cuts"],
                 "beam_assignments": len(cutting_result["beam_assignments"]),
                 "total_cuts_applied": sum(
                     len(ba["cuts"]) for ba in cutting_result["beam_assignments"]
@@ -765,6 +907,9 @@ def get_material_status(
         total_cuts = sum(len(beam.cuts) for beam in beams)
         recent_sessions = inventory_manager.inventory_data.get("cutting_sessions", [])
 
+        if detailed:
+            status["offcut_pool"] = inventory_manager.get_offcut_pool().summary()
+
         return {
             "success": True,
             "inventory_status": status,
@@ -793,6 +938,84 @@ def get_material_status(
         }
 
 
+@tool
+def add_material_stock(length_mm: int, count: int = 1, cross_section: str = None) -> dict:
+    """
+    Registers newly delivered stock beams in the material inventory.
+
+    Beams may differ in length and cross-section from the existing stock; the cutting
+    optimizer only cuts elements from beams of the element's cross-section.
+
+    Args:
+        length_mm: Length of each new beam in mm.
+        count: Number of beams to add.
+        cross_section: Cross-section of the beams, e.g. "5x5cm" (defaults to the inventory's).
+
+    Returns:
+        Dict with the IDs of the added beams and the updated inventory status.
+    """
+    logger.info(f"➕ Adding {count} stock beams of {length_mm}mm")
+
+    try:
+        if length_mm <= 0 or count <= 0:
+            return {"success": False, "error": "length_mm and count must be positive"}
+
+        inventory_manager = MaterialInventoryManager()
+        beam_ids = inventory_manager.add_stock_beams(length_mm, count, cross_section)
+
+        return {
+            "success": True,
+            "added_beams": beam_ids,
+            "inventory_status": inventory_manager.get_status(detailed=False),
+        }
+
+    except Exception as e:
+        logger.error(f"❌ Failed to add stock beams: {e}")
+        return {"success": False, "error": f"Stock registration error: {str(e)}"}
+
+
+@tool
+def register_offcut(
+    length_mm: int, cross_section: str = None, origin_session_id: str = None
+) -> dict:
+    """
+    Registers a reclaimed offcut so that later cutting plans can reuse it.
+
+    Offcuts are filled before fresh stock is opened. Remnants left by
+    'commit_material_usage' are tracked automatically; use this tool for pieces
+    that come from elsewhere, e.g. material returned from a dismantled module.
+
+    Args:
+        length_mm: Usable length of the offcut in mm.
+        cross_section: Cross-section of the offcut (defaults to the inventory's).
+        origin_session_id: Cutting session that produced the offcut, if known.
+
+    Returns:
+        Dict with the offcut ID and the current offcut pool.
+    """
+    logger.info(f"♻️ Registering {length_mm}mm offcut")
+
+    try:
+        if length_mm < MIN_USABLE_LENGTH_MM:
+            return {
+                "success": False,
+                "error": f"Offcuts shorter than {MIN_USABLE_LENGTH_MM}mm count as waste",
+            }
+
+        inventory_manager = MaterialInventoryManager()
+        offcut_id = inventory_manager.add_offcut(length_mm, cross_section, origin_session_id)
+
+        return {
+            "success": True,
+            "offcut_id": offcut_id,
+            "offcut_pool": inventory_manager.get_offcut_pool().summary(),
+        }
+
+    except Exception as e:
+        logger.error(f"❌ Failed to register offcut: {e}")
+        return {"success": False, "error": f"Offcut registration error: {str(e)}"}
+
+
 # Note: validate_material_feasibility functionality has been consolidated into analyze_cutting_plan
 
 
@@ -927,55 +1150,16 @@ def reset_material_inventory(reset_type: str = "full", backup_name: str = None)
 def _perform_full_reset(inventory_manager) -> dict:
     """Perform full reset of all beams to pristine state."""
     try:
-        # Create fresh inventory data with all 13 beams at 1980mm
-        fresh_inventory = {
-            "total_stock_mm": 25740,  # 13 * 1980
-            "beam_length_mm": 1980,
-            "kerf_loss_mm": 3,
-            "available_beams": [],
-            "used_elements": [],
-            "total_waste_mm": 0,
-            "total_utilization_percent": 0.0,
-            "cutting_sessions": [],
-            "last_updated": datetime.now().isoformat(),
-            "metadata": {
-                "cross_section": "5x5cm",
-                "material_type": "timber",
-                "project": "bridge_design",
-                "version": "1.0",
-                "units": "millimeters",
-            },
-            "statistics": {
-                "total_beams": 13,
-                "full_beams": 13,
-                "partial_beams": 0,
-                "average_beam_length_mm": 1980.0,
-                "material_efficiency_target": 95.0,
-                "waste_tolerance_mm": 100,
-            },
-        }
-
-        # Create 13 pristine beams
-        for i in range(1, 14):
-            beam_data = {
-                "id": f"beam_{i:03d}",
-                "original_length_mm": 1980,
-                "remaining_length_mm": 1980,
-                "cuts": [],
-                "waste_mm": 0,
-                "utilization_percent": 0.0,
-            }
-            fresh_inventory["available_beams"].append(beam_data)
+        # Keep the configured stock mix and registered offcuts, clear every cut
+        reset = inventory_manager.reset_to_stock()
 
-        # Save the fresh inventory
-        inventory_manager.inventory_data = fresh_inventory
-        inventory_manager._save_inventory()
-
-        logger.info("✅ Full reset completed - all 13 beams restored to 1980mm")
+        logger.info(
+            f"✅ Full reset completed - {reset['beams_reset']} beams and "
+            f"{reset['offcuts_reset']} offcuts restored"
+        )
         return {
             "operation": "full_reset",
-            "beams_reset": 13,
-            "total_material_restored_mm": 25740,
+            **reset,
             "sessions_cleared": "all",
             "cuts_cleared": "all",
         }
@@ -1009,6 +1193,7 @@ def _perform_session_reset(inventory_manager, session_id: str) -> dict:
         # Start with current beams and reverse the operations
         beams = inventory_manager.get_beams()
         cuts_removed = 0
+        reversed_session_ids = {session["session_id"] for session in sessions_to_reverse}
 
         for session in reversed(sessions_to_reverse):
             cutting_plan = session.get("cutting_plan", {}).get("cutting_plan", [])
@@ -1028,6 +1213,11 @@ def _perform_session_reset(inventory_manager, session_id: str) -> dict:
                         cuts_removed += 1
                         break
 
+        # Remnants produced by reversed sessions no longer exist
+        for beam in beams:
+            if beam.source == "stock" and beam.origin_session_id in reversed_session_ids:
+                beam.origin_session_id = None
+
         # Update inventory with reversed state
         inventory_manager.update_beams(beams)
 
@@ -1068,6 +1258,143 @@ def _perform_backup_restore(inventory_manager, backup_name: str) -> dict:
         raise
 
 
+# ==================== CUTTING PLAN REPORTS ====================
+
+DETAIL_LEVELS = ("full", "summary")
+
+
+class CuttingPlanReport:
+    """
+    Sections of an analyzed cutting plan, each rendered once on first request.
+
+    Rendered sections share data with the cached plan, so callers get copies.
+    """
+
+    SECTIONS = (
+        "analysis",
+        "cutting_plan",
+        "beam_assignments",
+        "feasibility_details",
+        "alternatives",
+        "recommendations",
+        "visual_plan",
+        "constraints",
+    )
+
+    def __init__(
+        self,
+        element_lengths: list,
+        beams: list,
+        cutting_result: dict,
+        feasibility_result: dict,
+        optimizer: CuttingOptimizer,
+    ):
+        self.element_lengths = element_lengths
+        self.beams = beams
+        self.cutting_result = cutting_result
+        self.feasibility_result = feasibility_result
+        self.optimizer = optimizer
+        self._rendered: dict = {}
+
+    @property
+    def feasible(self) -> bool:
+        return self.cutting_result["summary"]["feasible"]
+
+    def section(self, name: str):
+        """Return a copy of a section, rendering it on first request."""
+        if name not in self._rendered:
+            self._rendered[name] = getattr(self, f"_render_{name}")()
+        return copy.deepcopy(self._rendered[name])
+
+    def summary(self, plan_handle: str) -> dict:
+        """Compact verdict without the detail sections."""
+        cutting_summary = self.cutting_result["summary"]
+        return {
+            "feasible": self.feasible,
+            "plan_handle": plan_handle,
+            "summary": {
+                "total_elements": len(self.element_lengths),
+                "efficiency_percent": round(cutting_summary["material_efficiency_percent"], 1),
+                "waste_mm": cutting_summary["total_waste_mm"],
+                "unassigned_elements": cutting_summary["unassigned_elements"],
+                "beams_cut": len({cut["beam_id"] for cut in self.cutting_result["cutting_plan"]}),
+                "offcut_cuts": cutting_summary["offcut_cuts"],
+                "reason": self.feasibility_result.get("reason"),
+            },
+            "available_sections": list(self.SECTIONS),
+        }
+
+    def full(self, plan_handle: str) -> dict:
+        """Complete analysis, in the shape analyze_cutting_plan has always returned."""
+        cutting_summary = self.cutting_result["summary"]
+        return {
+            "feasible": self.feasible,
+            "plan_handle": plan_handle,
+            "analysis": self.section("analysis"),
+            "optimization_results": {
+                "efficiency_percent": cutting_summary["material_efficiency_percent"],
+                "waste_mm": cutting_summary["total_waste_mm"],
+                "unassigned_elements": cutting_summary["unassigned_elements"],
+                "offcut_cuts": cutting_summary["offcut_cuts"],
+                "plan_source": self.cutting_result["plan_source"],
+                "cutting_plan": self.section("cutting_plan"),
+                "beam_assignments": self.section("beam_assignments"),
+            },
+            "feasibility_details": self.section("feasibility_details"),
+            "alternatives": self.section("alternatives"),
+            "recommendations": self.section("recommendations"),
+            "visual_plan": self.section("visual_plan"),
+            "constraints": self.section("constraints"),
+        }
+
+    def _render_analysis(self) -> dict:
+        # Calculate design metrics
+        total_required = sum(self.element_lengths)
+        total_available = sum(beam.remaining_length_mm for beam in self.beams)
+        return {
+            "total_elements": len(self.element_lengths),
+            "total_length_required_mm": total_required,
+            "total_length_available_mm": total_available,
+            "capacity_utilization_percent": (
+                (total_required / total_available * 100) if total_available > 0 else 0
+            ),
+            "largest_element_mm": max(self.element_lengths) if self.element_lengths else 0,
+            "smallest_element_mm": min(self.element_lengths) if self.element_lengths else 0,
+        }
+
+    def _render_cutting_plan(self) -> list:
+        return self.cutting_result["cutting_plan"]
+
+    def _render_beam_assignments(self) -> list:
+        return self.cutting_result["beam_assignments"]
+
+    def _render_feasibility_details(self) -> dict:
+        return self.feasibility_result
+
+    def _render_alternatives(self) -> list:
+        # Generate alternatives if not feasible
+        if self.feasibility_result["feasible"]:
+            return []
+        return _generate_design_alternatives(self.element_lengths, self.beams, self.optimizer)
+
+    def _render_recommendations(self) -> list:
+        return _generate_feasibility_recommendations(
+            self.feasibility_result, self.element_lengths, self.beams
+        )
+
+    def _render_visual_plan(self) -> str:
+        return _format_cutting_plan_visual(self.cutting_result)
+
+    def _render_constraints(self) -> dict:
+        return {
+            "max_beam_length_available_mm": max(
+                (beam.remaining_length_mm for beam in self.beams), default=0
+            ),
+            "min_cut_length_recommended_mm": 50,
+            "kerf_loss_per_cut_mm": 3,
+        }
+
+
 # ==================== HELPER FUNCTIONS ====================
 
 
@@ -1217,12 +1544,18 @@ def create_syslogic_agent(
         # Structural validation tools
         check_element_connectivity,
         generate_geometry_agent_instructions,
+        plan_geometry_corrections,  # One batched plan instead of per-issue instructions
         calculate_closure_correction,
+        detect_truss_modules,  # Closure across all modules of a truss
         validate_planar_orientation,
+        validate_element_updates,  # Incremental checks after Direct Parameter Updates
         # NEW Material tracking tools (refactored for clear separation)
         analyze_cutting_plan,  # Planning tool - does NOT modify inventory
+        get_cutting_plan_details,  # Lazily rendered sections of an analyzed plan
         commit_material_usage,  # Execution tool - commits to inventory
         get_material_status,
+        add_material_stock,  # Mixed stock lengths and cross-sections
+        register_offcut,  # Reclaimed remnants reused before fresh stock
         reset_material_inventory,
     ]
 
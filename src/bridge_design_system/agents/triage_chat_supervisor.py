@@ -13,6 +13,7 @@ from smolagents import CodeAgent, tool
 from ..config.logging_config import get_logger
 from ..config.model_config import ModelProvider
 from ..memory import track_design_changes
+from ..state.assembly_graph import reset_assembly_graph
 from .rational_smolagents import create_rational_agent
 
 logger = get_logger(__name__)
@@ -174,6 +175,9 @@ class BridgeDesignSupervisor:
                             wrapper.internal_component_cache.clear()
                             logger.info(f"✅ Cleared {cache_cleared} {agent_name} component cache entries")
 
+            # Rebuild the incremental validation graph from the current elements
+            reset_assembly_graph()
+
             logger.info("🔄 All bridge design agent memories reset - fresh design session")
             return {
                 "reset": "completed", 
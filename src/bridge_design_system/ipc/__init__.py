@@ -2,7 +2,8 @@
 Inter-Process Communication (IPC) module for Bridge Design System.
 
 Provides TCP-based communication between the main bridge design system
-and external interfaces like voice chat agents.
+and external interfaces like voice chat agents, and a shared memory service
+that all processes of the two-terminal setup read and write.
 """
 
 from .command_server import (
@@ -20,6 +21,18 @@ from .command_client import (
     send_bridge_design_request
 )
 
+from .memory_service import (
+    MemoryService,
+    MemoryServiceClient,
+    MemoryServiceError,
+    MemorySubscription,
+    get_memory_client,
+    get_memory_service,
+    memory_service_available,
+    start_memory_service,
+    stop_memory_service
+)
+
 __all__ = [
     # Server
     "BridgeCommandServer",
@@ -32,5 +45,16 @@ __all__ = [
     # Client
     "BridgeCommandClient",
     "get_command_client", 
-    "send_bridge_design_request"
+    "send_bridge_design_request",
+
+    # Shared memory service
+    "MemoryService",
+    "MemoryServiceClient",
+    "MemoryServiceError",
+    "MemorySubscription",
+    "get_memory_client",
+    "get_memory_service",
+    "memory_service_available",
+    "start_memory_service",
+    "stop_memory_service"
 ]
\ No newline at end of file
@@ -0,0 +1,688 @@
+"""
+Shared Memory Service for the two-terminal setup.
+
+main.py, the voice terminal and the MCP server run as separate processes. The
+memory service gives them one in-memory store instead of each process racing
+on the session's memory file:
+
+- Namespaced key/value store ("memory/<session>/<category>", "bridge", ...)
+- Change subscriptions: a subscribed connection receives every change under a
+  namespace prefix as it happens, so nobody polls
+- Snapshot persistence: the store is written to a JSON file periodically and
+  on shutdown and reloaded on start. Live process status ("bridge") is never
+  persisted, so a crashed run cannot leave a stale busy status behind
+
+The service is reached over a Unix socket (TCP on localhost where Unix sockets
+are unavailable, e.g. Windows) with the same 4-byte length-prefixed JSON
+framing as the command server. Requests look like
+{"id": 1, "op": "put", "namespace": "bridge", "key": "status", "value": {...}}
+and are answered with {"id": 1, "ok": true, "result": ...}.
+
+Every change increments a store version. Each namespace remembers the version
+of its last change, so clients can cheaply ask whether anything under a prefix
+changed since they last read it.
+"""
+
+import asyncio
+import itertools
+import json
+import logging
+import os
+import socket
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SOCKET_PATH = Path(
+    os.environ.get(
+        "BRIDGE_MEMORY_SOCKET", Path(tempfile.gettempdir()) / "bridge_design_memory.sock"
+    )
+)
+DEFAULT_TCP_PORT = 8083  # Used where Unix sockets are unavailable
+MAX_MESSAGE_SIZE = 64 * 1024 * 1024
+TRANSIENT_NAMESPACES = frozenset({"bridge"})  # Only valid while the writing process runs
+MAX_SUBSCRIBER_BACKLOG = 8 * 1024 * 1024  # Unsent event bytes before a subscriber is dropped
+
+Store = Dict[str, Dict[str, Any]]  # namespace -> {key: value}
+
+
+def unix_sockets_supported() -> bool:
+    """Whether this platform can serve the memory service over a Unix socket."""
+    return hasattr(socket, "AF_UNIX") and sys.platform != "win32"
+
+
+def _encode(message: Dict[str, Any]) -> bytes:
+    data = json.dumps(message).encode("utf-8")
+    return len(data).to_bytes(4, byteorder="big") + data
+
+
+def _in_prefix(namespace: str, prefix: str) -> bool:
+    return namespace.startswith(prefix)
+
+
+class MemoryServiceError(Exception):
+    """Raised by MemoryServiceClient when the service rejects a request."""
+
+
+class MemoryService:
+    """
+    Asyncio server holding the shared store.
+
+    The store is only mutated on the server's event loop; the lock lets
+    save_snapshot() run from other threads (e.g. main.py on exit).
+    """
+
+    def __init__(
+        self,
+        socket_path: Optional[Path] = None,
+        snapshot_path: Optional[Path] = None,
+        snapshot_interval: float = 5.0,
+        port: int = DEFAULT_TCP_PORT,
+    ):
+        """
+        Initialize the service and load the last snapshot.
+
+        Args:
+            socket_path: Unix socket to listen on (default DEFAULT_SOCKET_PATH)
+            snapshot_path: JSON file the store is persisted to (None: not persisted)
+            snapshot_interval: Seconds between snapshots while the store changes
+            port: localhost TCP port used where Unix sockets are unavailable
+        """
+        self.socket_path = Path(socket_path or DEFAULT_SOCKET_PATH)
+        self.snapshot_path = Path(snapshot_path) if snapshot_path else None
+        self.snapshot_interval = snapshot_interval
+        self.port = port
+        self.server: Optional[asyncio.AbstractServer] = None
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.running = False
+
+        self._lock = threading.Lock()
+        self._store: Store = {}
+        self._versions: Dict[str, int] = {}  # namespace -> version of its last change
+        self.version = 0
+        self._dirty = False
+        self._subscribers: Dict[asyncio.StreamWriter, Set[str]] = {}
+        self._connections: Set[asyncio.Task] = set()
+        self._snapshot_task: Optional[asyncio.Task] = None
+        self._stopped: Optional[asyncio.Event] = None
+        self.requests_served = 0
+
+        self._load_snapshot()
+        logger.info(f"🧠 Memory service initialized ({self.address})")
+
+    @property
+    def address(self) -> str:
+        if unix_sockets_supported():
+            return f"unix:{self.socket_path}"
+        return f"localhost:{self.port}"
+
+    async def start(self):
+        """Start serving; runs until stop() is called."""
+        if self.running:
+            logger.warning("Memory service already running")
+            return
+
+        try:
+            if unix_sockets_supported():
+                self._remove_stale_socket()
+                self.server = await asyncio.start_unix_server(
+                    self._handle_client, path=str(self.socket_path)
+                )
+            else:
+                self.server = await asyncio.start_server(
+                    self._handle_client, "localhost", self.port
+                )
+            self.loop = asyncio.get_running_loop()
+            self._stopped = asyncio.Event()
+            self.running = True
+            if self.snapshot_path:
+                self._snapshot_task = asyncio.ensure_future(self._snapshot_loop())
+
+            logger.info(f"🚀 Memory service started on {self.address}")
+
+            # Serve until stop() has closed every connection and written the snapshot
+            await self._stopped.wait()
+
+        except Exception as e:
+            logger.error(f"❌ Failed to start memory service: {e}")
+            self.running = False
+            raise
+
+    async def stop(self):
+        """Stop serving and write a final snapshot."""
+        if not self.running:
+            return
+
+        self.running = False
+        if self._snapshot_task:
+            self._snapshot_task.cancel()
+        self._subscribers.clear()
+        if self.server:
+            self.server.close()
+        for task in list(self._connections):
+            task.cancel()
+        await asyncio.gather(*self._connections, return_exceptions=True)
+        if self.server:
+            await self.server.wait_closed()
+        if unix_sockets_supported():
+            try:
+                self.socket_path.unlink()
+            except OSError:
+                pass
+        self.save_snapshot()
+        self._stopped.set()
+        logger.info("🛑 Memory service stopped")
+
+    def _remove_stale_socket(self) -> None:
+        """Remove a socket file left behind by a crashed service; refuse a live one."""
+        if not self.socket_path.exists():
+            return
+        probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            probe.connect(str(self.socket_path))
+        except OSError:
+            self.socket_path.unlink()
+            return
+        finally:
+            probe.close()
+        raise OSError(f"Memory service already running on {self.socket_path}")
+
+    # Persistence
+
+    def _load_snapshot(self) -> None:
+        if not self.snapshot_path or not self.snapshot_path.exists():
+            return
+        try:
+            with open(self.snapshot_path, "r") as f:
+                data = json.load(f)
+            # Snapshots written before transient namespaces were excluded may hold them
+            self._store = {
+                name: values
+                for name, values in data.get("namespaces", {}).items()
+                if name not in TRANSIENT_NAMESPACES
+            }
+            self.version = data.get("version", 0)
+            self._versions = {namespace: self.version for namespace in self._store}
+            logger.info(
+                f"📂 Memory service restored {len(self._store)} namespaces "
+                f"from {self.snapshot_path}"
+            )
+        except Exception as e:
+            logger.warning(f"⚠️ Could not load memory snapshot {self.snapshot_path}: {e}")
+
+    def save_snapshot(self) -> bool:
+        """
+        Write the store to the snapshot file if it changed since the last snapshot.
+
+        Returns:
+            True if a snapshot was written
+        """
+        if not self.snapshot_path:
+            return False
+        with self._lock:
+            if not self._dirty:
+                return False
+            data = json.dumps(
+                {
+                    "version": self.version,
+                    "saved_at": datetime.now().isoformat(),
+                    "namespaces": {
+                        name: values
+                        for name, values in self._store.items()
+                        if name not in TRANSIENT_NAMESPACES
+                    },
+                },
+                indent=2,
+            )
+            self._dirty = False
+
+        temp_path = None
+        try:
+            self.snapshot_path.parent.mkdir(parents=True, exist_ok=True)
+            temp_fd, temp_path = tempfile.mkstemp(
+                dir=self.snapshot_path.parent, prefix=".tmp_memory_service_", suffix=".json"
+            )
+            with os.fdopen(temp_fd, "w") as f:
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp_path, self.snapshot_path)
+            return True
+        except Exception as e:
+            logger.error(f"❌ Failed to write memory snapshot: {e}")
+            if temp_path and os.path.exists(temp_path):
+                os.unlink(temp_path)
+            with self._lock:
+                self._dirty = True
+            return False
+
+    async def _snapshot_loop(self):
+        loop = asyncio.get_running_loop()
+        while self.running:
+            await asyncio.sleep(self.snapshot_interval)
+            if self._dirty:
+                await loop.run_in_executor(None, self.save_snapshot)
+
+    # Connections
+
+    async def _handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Serve requests of one connection until it closes."""
+        task = asyncio.current_task()
+        self._connections.add(task)
+        try:
+            while self.running:
+                try:
+                    length_data = await reader.readexactly(4)
+                except asyncio.IncompleteReadError:
+                    break
+                message_length = int.from_bytes(length_data, byteorder="big")
+                if message_length > MAX_MESSAGE_SIZE:
+                    logger.warning(f"Memory service message too large: {message_length} bytes")
+                    break
+                message_data = await reader.readexactly(message_length)
+
+                request: Dict[str, Any] = {}
+                try:
+                    request = json.loads(message_data.decode("utf-8"))
+                    result = self._execute(request, writer)
+                    response = {"id": request.get("id"), "ok": True, "result": result}
+                except Exception as e:
+                    response = {"id": request.get("id"), "ok": False, "error": str(e)}
+                writer.write(_encode(response))
+                await writer.drain()
+                self.requests_served += 1
+
+        except (ConnectionError, asyncio.IncompleteReadError, asyncio.CancelledError):
+            pass
+        except Exception as e:
+            logger.error(f"❌ Memory service connection error: {e}")
+        finally:
+            self._connections.discard(task)
+            self._subscribers.pop(writer, None)
+            try:
+                writer.close()
+            except Exception:
+                pass
+
+    def _execute(self, request: Dict[str, Any], writer: asyncio.StreamWriter) -> Any:
+        """Run one request against the store."""
+        op = request.get("op")
+        namespace = request.get("namespace")
+        prefix = request.get("prefix", "")
+
+        if op == "ping":
+            return {"version": self.version, "namespaces": len(self._store)}
+        if op == "get":
+            return self._store.get(namespace, {}).get(request["key"])
+        if op == "version":
+            return self._prefix_version(prefix)
+        if op == "dump":
+            return {
+                "version": self._prefix_version(prefix),
+                "namespaces": {
+                    name: records
+                    for name, records in self._store.items()
+                    if _in_prefix(name, prefix)
+                },
+            }
+        if op == "put":
+            previous = self._prefix_version(request.get("prefix", namespace))
+            with self._lock:
+                self._store.setdefault(namespace, {})[request["key"]] = request["value"]
+                self._changed([namespace])
+            self._notify(namespace, "put", request["key"], request["value"])
+            return {"version": self.version, "previous": previous}
+        if op == "delete":
+            previous = self._prefix_version(request.get("prefix", namespace))
+            with self._lock:
+                removed = self._store.get(namespace, {}).pop(request["key"], None) is not None
+                if removed:
+                    self._changed([namespace])
+            if removed:
+                self._notify(namespace, "delete", request["key"])
+            return {"removed": removed, "version": self.version, "previous": previous}
+        if op == "clear":
+            # One namespace, or every namespace under a prefix
+            previous = self._prefix_version(prefix if namespace is None else namespace)
+            with self._lock:
+                if namespace is not None:
+                    names = [namespace] if namespace in self._store else []
+                else:
+                    names = [name for name in self._store if _in_prefix(name, prefix)]
+                removed = sum(len(self._store.pop(name)) for name in names)
+                if names:
+                    self._changed(names)
+            for name in names:
+                self._notify(name, "clear")
+            return {"removed": removed, "version": self.version, "previous": previous}
+        if op == "replace":
+            # Replace every namespace under a prefix at once
+            namespaces = request.get("namespaces", {})
+            if any(not _in_prefix(name, prefix) for name in namespaces):
+                raise ValueError(f"replace: namespaces must start with '{prefix}'")
+            with self._lock:
+                old = [name for name in self._store if _in_prefix(name, prefix)]
+                for name in old:
+                    del self._store[name]
+                self._store.update(namespaces)
+                self._changed(set(old) | set(namespaces))
+            for name in sorted(set(old) | set(namespaces)):
+                self._notify(name, "replace")
+            return {"version": self.version}
+        if op == "subscribe":
+            self._subscribers.setdefault(writer, set()).add(prefix)
+            return {"version": self._prefix_version(prefix)}
+        raise ValueError(f"Unknown memory service operation: {op}")
+
+    def _changed(self, namespaces) -> None:
+        self.version += 1
+        for name in namespaces:
+            self._versions[name] = self.version
+            if name not in TRANSIENT_NAMESPACES:
+                self._dirty = True
+
+    def _prefix_version(self, prefix: str) -> int:
+        """Version of the last change to any namespace under a prefix."""
+        return max(
+            (version for name, version in self._versions.items() if _in_prefix(name, prefix)),
+            default=0,
+        )
+
+    def _notify(self, namespace: str, action: str, key: Optional[str] = None, value: Any = None):
+        """Push a change event to every connection subscribed to the namespace."""
+        if not self._subscribers:
+            return
+        event = _encode(
+            {
+                "event": "change",
+                "action": action,
+                "namespace": namespace,
+                "key": key,
+                "value": value,
+                "version": self.version,
+            }
+        )
+        for writer, prefixes in list(self._subscribers.items()):
+            if any(_in_prefix(namespace, prefix) for prefix in prefixes):
+                try:
+                    # Events are not drained; a subscriber that stops reading is dropped
+                    # instead of growing the write buffer on every change
+                    if writer.transport.get_write_buffer_size() > MAX_SUBSCRIBER_BACKLOG:
+                        logger.warning("⚠️ Dropping memory subscriber that stopped reading")
+                        self._subscribers.pop(writer, None)
+                        writer.transport.abort()
+                        continue
+                    writer.write(event)
+                except Exception:
+                    self._subscribers.pop(writer, None)
+
+    def get_status(self) -> Dict[str, Any]:
+        """Get current service status."""
+        with self._lock:
+            return {
+                "running": self.running,
+                "address": self.address,
+                "version": self.version,
+                "namespaces": len(self._store),
+                "entries": sum(len(records) for records in self._store.values()),
+                "subscribers": len(self._subscribers),
+                "requests_served": self.requests_served,
+                "snapshot_path": str(self.snapshot_path) if self.snapshot_path else None,
+            }
+
+
+class MemoryServiceClient:
+    """
+    Blocking client for the memory service, safe to share between threads.
+
+    Requests reuse one connection and reconnect once if the service restarted.
+    Subscriptions use a connection of their own and a daemon thread.
+    """
+
+    def __init__(
+        self, socket_path: Optional[Path] = None, timeout: float = 2.0, port: int = DEFAULT_TCP_PORT
+    ):
+        self.socket_path = Path(socket_path or DEFAULT_SOCKET_PATH)
+        self.timeout = timeout
+        self.port = port
+        self._sock: Optional[socket.socket] = None
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+
+    def _open(self) -> socket.socket:
+        if unix_sockets_supported():
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            address: Any = str(self.socket_path)
+        else:
+            sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            address = ("localhost", self.port)
+        sock.settimeout(self.timeout)
+        try:
+            sock.connect(address)
+        except OSError:
+            sock.close()
+            raise
+        return sock
+
+    def close(self) -> None:
+        with self._lock:
+            if self._sock:
+                self._sock.close()
+                self._sock = None
+
+    def request(self, op: str, **arguments: Any) -> Any:
+        """
+        Send one request and wait for its result.
+
+        Raises:
+            ConnectionError: If the service cannot be reached
+            MemoryServiceError: If the service rejected the request
+        """
+        message = dict(arguments, op=op, id=next(self._ids))
+        with self._lock:
+            for attempt in range(2):
+                try:
+                    if self._sock is None:
+                        self._sock = self._open()
+                    self._sock.sendall(_encode(message))
+                    response = _read_message(self._sock)
+                    break
+                except OSError as e:
+                    if self._sock:
+                        self._sock.close()
+                        self._sock = None
+                    if attempt == 1:
+                        raise ConnectionError(f"Memory service unavailable: {e}") from e
+        if not response.get("ok"):
+            raise MemoryServiceError(response.get("error", "unknown error"))
+        return response.get("result")
+
+    def ping(self) -> bool:
+        try:
+            self.request("ping")
+            return True
+        except (ConnectionError, MemoryServiceError):
+            return False
+
+    def get(self, namespace: str, key: str) -> Any:
+        return self.request("get", namespace=namespace, key=key)
+
+    def put(self, namespace: str, key: str, value: Any, prefix: Optional[str] = None) -> Dict:
+        """Store a value; "previous" in the result is the prefix version before the write."""
+        arguments = {"prefix": prefix} if prefix is not None else {}
+        return self.request("put", namespace=namespace, key=key, value=value, **arguments)
+
+    def delete(self, namespace: str, key: str) -> bool:
+        return self.request("delete", namespace=namespace, key=key)["removed"]
+
+    def clear(self, namespace: Optional[str] = None, prefix: str = "") -> Dict:
+        return self.request("clear", namespace=namespace, prefix=prefix)
+
+    def dump(self, prefix: str = "") -> Dict[str, Any]:
+        """All namespaces under a prefix as {"version", "namespaces": {namespace: {key: value}}}."""
+        return self.request("dump", prefix=prefix)
+
+    def replace(self, prefix: str, namespaces: Store) -> int:
+        return self.request("replace", prefix=prefix, namespaces=namespaces)["version"]
+
+    def version(self, prefix: str = "") -> int:
+        return self.request("version", prefix=prefix)
+
+    def subscribe(
+        self, prefix: str, callback: Callable[[Dict[str, Any]], None]
+    ) -> "MemorySubscription":
+        """
+        Call callback(event) for every change under a namespace prefix.
+
+        Raises:
+            ConnectionError: If the service cannot be reached
+        """
+        try:
+            sock = self._open()
+            sock.sendall(_encode({"op": "subscribe", "prefix": prefix, "id": 0}))
+            _read_message(sock)
+        except OSError as e:
+            raise ConnectionError(f"Memory service unavailable: {e}") from e
+        return MemorySubscription(sock, prefix, callback)
+
+
+class MemorySubscription:
+    """
+    Change events of one prefix, delivered on a daemon thread.
+
+    The service disconnects subscribers that fall too far behind; the thread then ends.
+    """
+
+    def __init__(self, sock: socket.socket, prefix: str, callback: Callable[[Dict], None]):
+        self.prefix = prefix
+        self._sock = sock
+        self._sock.settimeout(None)
+        self._callback = callback
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while True:
+            try:
+                event = _read_message(self._sock)
+            except (OSError, ValueError):
+                return
+            try:
+                self._callback(event)
+            except Exception as e:
+                logger.warning(f"⚠️ Memory subscription callback failed: {e}")
+
+    def close(self) -> None:
+        try:
+            self._sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        self._sock.close()
+
+
+def _read_message(sock: socket.socket) -> Dict[str, Any]:
+    length = int.from_bytes(_read_exactly(sock, 4), byteorder="big")
+    return json.loads(_read_exactly(sock, length).decode("utf-8"))
+
+
+def _read_exactly(sock: socket.socket, size: int) -> bytes:
+    chunks: List[bytes] = []
+    while size:
+        chunk = sock.recv(min(size, 1 << 20))
+        if not chunk:
+            raise ConnectionError("Memory service closed the connection")
+        chunks.append(chunk)
+        size -= len(chunk)
+    return b"".join(chunks)
+
+
+# Global instances
+_memory_service: Optional[MemoryService] = None
+_memory_client: Optional[MemoryServiceClient] = None
+
+
+def get_memory_service() -> Optional[MemoryService]:
+    """Get the memory service running in this process, if any."""
+    return _memory_service
+
+
+def start_memory_service(
+    socket_path: Optional[Path] = None,
+    snapshot_path: Optional[Path] = None,
+    snapshot_interval: float = 5.0,
+    startup_timeout: float = 2.0,
+) -> MemoryService:
+    """
+    Start the global memory service on a background thread.
+
+    Raises:
+        OSError: If the service could not start (e.g. another one is running)
+    """
+    global _memory_service
+
+    if _memory_service and _memory_service.running:
+        logger.warning("Memory service already running")
+        return _memory_service
+
+    service = MemoryService(socket_path, snapshot_path, snapshot_interval)
+    started = threading.Event()
+    errors: List[Exception] = []
+
+    def run_service():
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        try:
+            loop.run_until_complete(service.start())
+        except Exception as e:
+            errors.append(e)
+        finally:
+            started.set()
+
+    threading.Thread(target=run_service, daemon=True, name="memory-service").start()
+
+    deadline = time.time() + startup_timeout
+    while not service.running and not started.is_set() and time.time() < deadline:
+        time.sleep(0.01)
+    if errors:
+        raise errors[0]
+    if not service.running:
+        raise OSError("Memory service did not start in time")
+
+    _memory_service = service
+    return service
+
+
+def stop_memory_service(timeout: float = 5.0) -> None:
+    """Stop the global memory service, writing its final snapshot."""
+    global _memory_service
+
+    service = _memory_service
+    if service is None:
+        return
+    if service.loop is not None and service.loop.is_running():
+        future = asyncio.run_coroutine_threadsafe(service.stop(), service.loop)
+        try:
+            future.result(timeout)
+        except Exception as e:
+            logger.warning(f"⚠️ Error stopping memory service: {e}")
+            service.save_snapshot()
+    _memory_service = None
+
+
+def get_memory_client() -> MemoryServiceClient:
+    """Get the global memory service client."""
+    global _memory_client
+    if _memory_client is None:
+        _memory_client = MemoryServiceClient()
+    return _memory_client
+
+
+def memory_service_available() -> bool:
+    """Whether a memory service is reachable from this process."""
+    return get_memory_client().ping()
@@ -14,11 +14,17 @@ from .agents.VizorListener import VizorListener
 from .config.logging_config import get_logger
 from .config.model_config import ModelProvider
 from .config.settings import settings
+from .state.assembly_graph import reset_assembly_graph
 from .state.component_registry import initialize_registry
+from .state.transform_queue import TransformUpdateConsumer, TransformUpdateQueue
+from .tools.direct_update import DirectParameterUpdater, mcp_tools_from_agent
 from .tools.material_tools import MaterialInventoryManager
+from .tools.ros_transforms import quaternion_to_direction
 from .voice_input import get_user_input, check_voice_dependencies
 from .monitoring.trace_logger import finalize_workshop_session, get_trace_logger
 from .ipc import start_command_server, stop_command_server, get_command_server
+from .ipc import get_memory_client, start_memory_service, stop_memory_service
+from .tools.memory_tools import MEMORY_PATH, use_memory_backend
 
 logger = get_logger(__name__)
 
@@ -38,41 +44,7 @@ def quaternion_to_direction_vector(quat_dict):
     Returns:
         List of [vx, vy, vz] direction vector components in Rhino coordinates.
     """
-    w = quat_dict['w']
-    x = quat_dict['x']
-    y = quat_dict['y']
-    z = quat_dict['z']
-    print(f"[DEBUG] Raw ROS Quaternion input: w={w}, x={x}, y={y}, z={z}")
-
-    # 1. Calculate the direction vector in ROS coordinates (x-forward, y-right, z-up)
-    #    This formula calculates the rotated X-axis.
-    ros_vx = 1.0 - 2.0 * (y * y + z * z)
-    ros_vy = 2.0 * (x * y + w * z)
-    ros_vz = 2.0 * (x * z - w * y)
-    print(f"[DEBUG] Calculated direction in ROS coords: [{ros_vx:.4f}, {ros_vy:.4f}, {ros_vz:.4f}]")
-
-    # 2. Transform the calculated vector from ROS to Rhino coordinates.
-    #    ROS (x-fwd, y-right, z-up) -> Rhino (x-right, y-fwd, z-up)
-    #    rhino_x = ros_y
-    #    rhino_y = ros_x
-    #    rhino_z = ros_z
-    rhino_vx = ros_vy
-    rhino_vy = ros_vx
-    rhino_vz = ros_vz
-    print(f"[DEBUG] Transformed direction for Rhino: [{rhino_vx:.4f}, {rhino_vy:.4f}, {rhino_vz:.4f}]")
-
-    # 3. Normalize the final vector
-    import math
-    magnitude = math.sqrt(rhino_vx**2 + rhino_vy**2 + rhino_vz**2)
-    if magnitude > 1e-6:
-        rhino_vx /= magnitude
-        rhino_vy /= magnitude
-        rhino_vz /= magnitude
-    else:
-        print(f"[DEBUG] Warning: Zero magnitude vector, using default X-forward")
-        rhino_vx, rhino_vy, rhino_vz = 1.0, 0.0, 0.0
-    
-    return [rhino_vx, rhino_vy, rhino_vz]
+    return quaternion_to_direction(quat_dict)
 
 
 def format_direct_update_task(element_id, new_center, new_direction):
@@ -140,6 +112,28 @@ def clear_legacy_memory_files():
         print(f"❌ Error clearing legacy memory files: {e}")
 
 
+def publish_bridge_status(**status):
+    """Share the main terminal's status with the voice terminal through the memory service."""
+    try:
+        get_memory_client().put("bridge", "status", dict(status, updated_at=time.time()))
+    except Exception as e:
+        logger.debug(f"Bridge status not published: {e}")
+
+
+def run_published_request(triage, request: str, publish: bool):
+    """Run a design request, publishing the bridge's busy status around it when enabled."""
+    if publish:
+        publish_bridge_status(busy=True, request=request, started_at=time.time())
+    success = False
+    try:
+        response = triage.handle_design_request(request=request, gaze_id=None)
+        success = response.success
+        return response
+    finally:
+        if publish:
+            publish_bridge_status(busy=False, request=request, success=success)
+
+
 def validate_environment():
     """Validate that required environment variables are set."""
     # Get unique providers needed
@@ -499,6 +493,10 @@ def interactive_mode(
         print("⚠️ Voice input dependencies not available - falling back to keyboard input")
         voice_input = False
 
+    # Cleaned up in the finally below, however the session ends
+    transform_consumer = None
+    memory_service_running = False
+
     try:
         # Don't start monitoring server - assume it's running separately
         # start_monitoring_server(enable_monitoring=enable_monitoring)
@@ -550,6 +548,21 @@ def interactive_mode(
         else:
             logger.info("📊 OpenTelemetry disabled by CLI flag")
 
+        # Two-terminal setup: memories live in a shared service instead of a session file
+        # so the voice terminal and the MCP server read the same state without file locks
+        if enable_command_server:
+            try:
+                memory_service = start_memory_service(
+                    snapshot_path=MEMORY_PATH / "memory_service.json"
+                )
+                use_memory_backend("service")
+                memory_service_running = True
+                logger.info(f"🧠 Shared memory service running on {memory_service.address}")
+            except Exception as e:
+                logger.error(f"❌ Failed to start memory service: {e}")
+                print(f"⚠️ Memory service failed to start: {e}")
+                print("   Continuing with local memory storage...")
+
         # Initialize component registry
         registry = initialize_registry()
         logger.info("Component registry initialized")
@@ -570,6 +583,10 @@ def interactive_mode(
             )
             logger.info("System initialized with smolagents-native patterns")
 
+        # Agents are not thread-safe: user commands, external commands and AR transform
+        # updates take turns on the triage agent
+        triage_lock = threading.RLock()
+
         # Handle reset options
         if hard_reset:
             print("🧹 HARD RESET: Clearing EVERYTHING (logs, memories, registry, legacy files)...")
@@ -577,11 +594,13 @@ def interactive_mode(
             clear_legacy_memory_files()
             triage.reset_all_agents()
             registry.clear()
+            reset_assembly_graph()
             print("✅ Complete system reset - starting completely fresh!")
         elif reset_memory:
             logger.info("🔄 Resetting agent memories as requested...")
             triage.reset_all_agents()
             registry.clear()
+            reset_assembly_graph()
             logger.info("✅ Started with fresh agent memories")
 
         # Initialize TCP command server for external voice interfaces
@@ -596,7 +615,10 @@ def interactive_mode(
                     """Handle commands from external interfaces (e.g., voice chat)."""
                     try:
                         logger.info(f"📨 [COMMAND SERVER] Processing external request: {user_request[:100]}...")
-                        response = triage.handle_design_request(request=user_request, gaze_id=None)
+                        with triage_lock:
+                            response = run_published_request(
+                                triage, user_request, publish=memory_service_running
+                            )
                         logger.info(f"✅ [COMMAND SERVER] Request completed: {'success' if response.success else 'failed'}")
                         return response
                     except Exception as e:
@@ -689,6 +711,8 @@ def interactive_mode(
             print("   Check with: lsof -i :8082")
         else:
             print("⚠️ Command server disabled (use --enable-command-server to enable)")
+        if memory_service_running:
+            print("🧠 Shared memory service running - both terminals read the same memories")
 
         print(
             "\nType 'exit' to quit, 'reset' to clear agent memories, 'hardreset' to clear everything"
@@ -703,8 +727,55 @@ def interactive_mode(
             print("✅ Started with fresh memories (--reset flag used)")
         print()
 
-        # Initialize Direct Parameter Update queue for HoloLens transformations
-        TRANSFORM_UPDATE_QUEUE = []
+        # Initialize Direct Parameter Update queue for HoloLens transformations.
+        # Thread-safe and coalescing per element; drained continuously in the background.
+        TRANSFORM_UPDATE_QUEUE = TransformUpdateQueue()
+
+        # Deterministic script patching through the geometry agent's MCP connection
+        direct_updater = DirectParameterUpdater(mcp_tools_from_agent(triage.geometry_agent))
+
+        def apply_transform_batch(transform_batch):
+            """Apply the latest pose of each moved element (runs on the consumer thread)."""
+            print(f"\n[SYSTEM] Processing transforms for {len(transform_batch)} element(s)...")
+            updates = {}
+            for element_name, pose in transform_batch.items():
+                # element_name is "dynamic_021", element_id is "021"
+                # Component encoding: 001-009→component_1, 011-019→component_2, 021-029→component_3, etc.
+                element_id = element_name.split("_")[-1]  # Keep full element ID: 021, 022, 023, etc.
+                new_dir = pose.get("direction") or quaternion_to_direction_vector(pose["quaternion"])
+                updates[element_id] = (pose["position"], new_dir)
+
+            # Patch scripts directly; the agents only see elements that fail validation
+            fallback = dict.fromkeys(updates, "direct update unavailable (no MCP connection)")
+            if direct_updater.is_available():
+                with triage_lock:
+                    result = direct_updater.apply(updates)
+                if result.applied:
+                    print(
+                        f"[SYSTEM] ⚡ Updated {', '.join(result.applied)} directly "
+                        f"in {result.elapsed_ms:.0f}ms"
+                    )
+                fallback = result.failed
+
+            for element_id, reason in fallback.items():
+                new_pos, new_dir = updates[element_id]
+
+                # Format the specific, direct task for the agent
+                task = format_direct_update_task(element_id, new_pos, new_dir)
+
+                # Process this single element update
+                print(f"[SYSTEM] Updating element {element_id} via geometry agent ({reason})...")
+                try:
+                    with triage_lock:
+                        response = triage.handle_design_request(request=task, gaze_id=None)
+                    if response.success:
+                        print(f"[SYSTEM] ✅ Element {element_id} updated successfully")
+                    else:
+                        print(f"[SYSTEM] ❌ Element {element_id} update failed: {response.message}")
+                except Exception as e:
+                    print(f"[SYSTEM] ❌ Element {element_id} update error: {e}")
+
+        transform_consumer = TransformUpdateConsumer(TRANSFORM_UPDATE_QUEUE, apply_transform_batch)
 
         # Initialize VizorListener for gaze-assisted spatial command grounding
         vizor_listener = None
@@ -759,6 +830,10 @@ def interactive_mode(
 
                 traceback.print_exc()
                 vizor_listener = None
+
+        # Apply AR moves continuously instead of waiting for the next command
+        transform_consumer.start()
+
         while True:
             try:
                 user_input = get_user_input("Designer> ", voice_enabled=voice_input)
@@ -772,66 +847,25 @@ def interactive_mode(
                 if not user_input:
                     continue
 
-                # Process Direct Parameter Update queue before handling user commands
-                print(f"[DEBUG] TRANSFORM_UPDATE_QUEUE length: {len(TRANSFORM_UPDATE_QUEUE)}")
-                print(f"[DEBUG] TRANSFORM_UPDATE_QUEUE contents: {TRANSFORM_UPDATE_QUEUE}")
-                if vizor_listener and hasattr(vizor_listener, 'update_queue'):
-                    print(f"[DEBUG] VizorListener.update_queue length: {len(vizor_listener.update_queue)}")
-                    print(f"[DEBUG] VizorListener.update_queue contents: {vizor_listener.update_queue}")
-                    print(f"[DEBUG] Queue objects same? {TRANSFORM_UPDATE_QUEUE is vizor_listener.update_queue}")
-                
-                if TRANSFORM_UPDATE_QUEUE:
-                    print(
-                        f"[SYSTEM] Processing {len(TRANSFORM_UPDATE_QUEUE)} queued transform batch(es)..."
-                    )
-
-                    # Process all data batches in the queue
-                    for transform_batch in TRANSFORM_UPDATE_QUEUE:
-                        for element_name, pose in transform_batch.items():
-                            # element_name is "dynamic_021", element_id is "021"
-                            # Component encoding: 001-009→component_1, 011-019→component_2, 021-029→component_3, etc.
-                            element_id = element_name.split("_")[
-                                -1
-                            ]  # Keep full element ID: 021, 022, 023, etc.
-                            print(f"[DEBUG] Processing transform: {element_name} → element_id: {element_id}")
-
-                            # Use the helper function in main.py
-                            new_pos = pose["position"]
-                            new_dir = quaternion_to_direction_vector(pose["quaternion"])
-
-                            # Format the specific, direct task for the agent
-                            task = format_direct_update_task(element_id, new_pos, new_dir)
-
-                            # Process this single element update
-                            print(f"[SYSTEM] Updating element {element_id}...")
-                            try:
-                                response = triage.handle_design_request(request=task, gaze_id=None)
-                                if response.success:
-                                    print(f"[SYSTEM] ✅ Element {element_id} updated successfully")
-                                else:
-                                    print(
-                                        f"[SYSTEM] ❌ Element {element_id} update failed: {response.message}"
-                                    )
-                            except Exception as e:
-                                print(f"[SYSTEM] ❌ Element {element_id} update error: {e}")
-
-                    TRANSFORM_UPDATE_QUEUE.clear()
-                    print("[SYSTEM] Transform queue processed. Now handling your command.")
-
                 if user_input.lower() == "reset":
                     print("🔄 Resetting all agent memories...")
-                    triage.reset_all_agents()
-                    registry.clear()
+                    # The transform consumer thread uses the agents under the same lock
+                    with triage_lock:
+                        triage.reset_all_agents()
+                        registry.clear()
+                        reset_assembly_graph()
                     print("✅ All agent memories and component registry reset - starting fresh!")
                     continue
                 elif user_input.lower() == "hardreset":
                     print(
                         "🧹 HARD RESET: Clearing EVERYTHING (logs, memories, registry, legacy files)..."
                     )
-                    clear_log_files()
-                    clear_legacy_memory_files()
-                    triage.reset_all_agents()
-                    registry.clear()
+                    with triage_lock:
+                        clear_log_files()
+                        clear_legacy_memory_files()
+                        triage.reset_all_agents()
+                        registry.clear()
+                        reset_assembly_graph()
                     print("✅ Complete system reset - starting completely fresh!")
                     continue
                 elif user_input.lower() == "status":
@@ -871,6 +905,14 @@ def interactive_mode(
                     else:
                         print("\n👁️ Gaze Status: VizorListener not available")
 
+                    queue_stats = TRANSFORM_UPDATE_QUEUE.get_stats()
+                    print("\nTransform Updates:")
+                    print(f"  Consumer running: {transform_consumer.is_running()}")
+                    print(
+                        f"  Pending: {queue_stats['pending']} | Received: {queue_stats['received']} | "
+                        f"Coalesced: {queue_stats['coalesced']} | Dropped: {queue_stats['dropped']}"
+                    )
+
                     continue
                 elif user_input.lower() in ["gaze", "gazehistory"]:
                     # Show detailed gaze information
@@ -942,10 +984,10 @@ def interactive_mode(
                             while True:
                                 current = vizor_listener.get_current_element()
                                 recent = vizor_listener.get_recent_gaze(3.0)
-                                summary = vizor_listener.get_gaze_history_summary(5.0)
+                                total_5s = vizor_listener.get_gaze_count(5.0)
 
                                 print(
-                                    f"\r[{time.strftime('%H:%M:%S')}] Current: {current or 'None'} | Recent: {recent or 'None'} | Total(5s): {summary['total_gazes']}",
+                                    f"\r[{time.strftime('%H:%M:%S')}] Current: {current or 'None'} | Recent: {recent or 'None'} | Total(5s): {total_5s}",
                                     end="",
                                     flush=True,
                                 )
@@ -1018,7 +1060,11 @@ def interactive_mode(
                     # Process the request with gaze context embedded in the text
                     print("\nProcessing...")
                     start_time = time.time()
-                    response = triage.handle_design_request(request=final_request, gaze_id=None)
+                    with triage_lock:
+                        # Typed requests show up as busy in the voice terminal too
+                        response = run_published_request(
+                            triage, final_request, publish=memory_service_running
+                        )
                     duration = time.time() - start_time
 
                     # Log the interaction if monitoring is enabled
@@ -1094,6 +1140,11 @@ def interactive_mode(
     except Exception as e:
         logger.error(f"Failed to initialize system: {e}", exc_info=True)
         print(f"Initialization failed: {str(e)}")
+    finally:
+        if transform_consumer is not None:
+            transform_consumer.stop()
+        if memory_service_running:
+            stop_memory_service()  # Writes the final snapshot
 
 
 def main():
@@ -24,6 +24,7 @@ from starlette.responses import JSONResponse
 from starlette.routing import Mount, Route
 from starlette.types import Receive, Scope, Send
 
+from ..ipc.memory_service import get_memory_client
 from .grasshopper_mcp.utils.communication import GrasshopperHttpClient
 
 # Configure logging
@@ -421,6 +422,19 @@ class GrasshopperMCPStreamableServer:
             }
         )
 
+    async def get_shared_state(self, request: Request) -> JSONResponse:
+        """Get shared memories, registry components and terminal status from the memory service.
+
+        Query parameter "prefix" selects namespaces, e.g. "memory/" or "bridge".
+        """
+        prefix = request.query_params.get("prefix", "")
+        try:
+            state = await anyio.to_thread.run_sync(get_memory_client().dump, prefix)
+            return JSONResponse(state)
+        except Exception as e:
+            logger.warning(f"Memory service not available: {e}")
+            return JSONResponse({"error": f"Memory service not available: {e}"}, status_code=503)
+
     def create_app(self) -> Starlette:
         """Create the ASGI application."""
 
@@ -457,6 +471,7 @@ class GrasshopperMCPStreamableServer:
                 Route("/grasshopper/pending_commands", self.get_pending_commands, methods=["GET"]),
                 Route("/grasshopper/command_result", self.receive_command_result, methods=["POST"]),
                 Route("/grasshopper/status", self.get_bridge_status, methods=["GET"]),
+                Route("/grasshopper/shared_state", self.get_shared_state, methods=["GET"]),
             ],
             lifespan=self.lifespan,
         )
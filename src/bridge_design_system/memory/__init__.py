@@ -15,6 +15,14 @@ Key Functions:
 - track_design_changes: Step callback for automatic design state tracking
 - get_original_element_state: Query agent memory for original element values
 - query_design_history: Get complete design history for an element
+- get_element_history: Per-agent index that answers the queries above without
+  re-parsing memory steps
+- get_design_records: Per-agent store of structured design records referenced
+  from step observations
+- get_memory_compactor: Per-agent compaction that keeps memory steps within the
+  max_context_tokens budget
+- get_memory_stats: Per-agent running counters behind get_memory_statistics and
+  validate_memory_integrity
 - Memory transfer utilities for cross-agent communication
 
 References:
@@ -24,6 +32,11 @@ References:
 - Memory access: memory.mdx#_snippet_2
 """
 
+from .design_records import DesignRecord, DesignRecordStore, get_design_records
+from .element_history import ElementHistoryIndex, get_element_history
+from .memory_compaction import CompactionReport, MemoryCompactor, get_memory_compactor
+from .memory_stats import MemoryStatistics, get_memory_stats
+from .memory_transfer import MemoryTransferLog, get_transfer_log
 from .memory_callbacks import track_design_changes
 from .memory_queries import (
     get_original_element_state,
@@ -41,6 +54,18 @@ from .memory_utils import (
 )
 
 __all__ = [
+    "DesignRecord",
+    "DesignRecordStore",
+    "get_design_records",
+    "ElementHistoryIndex",
+    "get_element_history",
+    "CompactionReport",
+    "MemoryCompactor",
+    "get_memory_compactor",
+    "MemoryStatistics",
+    "get_memory_stats",
+    "MemoryTransferLog",
+    "get_transfer_log",
     "track_design_changes",
     "get_original_element_state",
     "query_design_history",
@@ -0,0 +1,215 @@
+"""
+Structured Design Records
+
+Design records (original element state, parameter updates, MCP geometry calls)
+are kept in a side-channel store attached to each agent instead of as JSON
+lines inside memory_step.observations. Observations only carry a short
+reference such as "[MEMORY_ORIGINAL #3] element 002", so the observations
+snapshot of an original state is no longer repeated in every later LLM prompt
+and queries read typed records instead of parsing text.
+
+Steps recorded by earlier versions still carry "[MEMORY_*] {json}" lines;
+parse_memory_records() turns those into the same DesignRecord objects.
+"""
+
+import json
+import threading
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional
+
+from ..config.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+ORIGINAL = "original"
+UPDATE = "update"
+MCP = "mcp"
+
+# Observation line prefixes of the JSON records written by earlier versions
+LEGACY_PREFIXES = {
+    "[MEMORY_ORIGINAL] ": ORIGINAL,
+    "[MEMORY_UPDATE] ": UPDATE,
+    "[MEMORY_MCP] ": MCP,
+}
+
+
+@dataclass(frozen=True)
+class DesignRecord:
+    """One design memory record of a step."""
+
+    record_id: int
+    kind: str  # ORIGINAL, UPDATE or MCP
+    step_number: int
+    action: str
+    step_type: str
+    timestamp: str
+    element_id: Optional[str] = None
+    observations_snapshot: Optional[str] = None  # ORIGINAL: observations before the change
+    original_step: Optional[int] = None  # UPDATE: step holding the original state
+
+    @property
+    def reference(self) -> str:
+        """Short observation line pointing at this record."""
+        reference = f"[MEMORY_{self.kind.upper()} #{self.record_id}]"
+        return f"{reference} element {self.element_id}" if self.element_id else reference
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Record in the dict form (and key order) of the legacy JSON records."""
+        fields = {
+            "element_id": self.element_id,
+            "timestamp": self.timestamp,
+            "step_number": self.step_number,
+            "action": self.action,
+            "step_type": self.step_type,
+            "observations_snapshot": self.observations_snapshot,
+            "original_step": self.original_step,
+        }
+        return {key: value for key, value in fields.items() if value is not None}
+
+
+class DesignRecordStore:
+    """
+    Per-agent store of design records, keyed by step and by element.
+
+    Steps are keyed by identity; the store keeps a reference to every step it
+    holds records for so the keys stay valid.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._next_id = 1
+        self._steps: Dict[int, Any] = {}
+        self._by_step: Dict[int, List[DesignRecord]] = {}
+        self._by_element: Dict[str, List[DesignRecord]] = {}
+
+    def add(
+        self,
+        step: Any,
+        kind: str,
+        action: str,
+        step_type: str,
+        element_id: Optional[str] = None,
+        **fields: Any,
+    ) -> DesignRecord:
+        """
+        Create a record for a step.
+
+        Args:
+            step: ActionStep the record belongs to
+            kind: ORIGINAL, UPDATE or MCP
+            action: Action name, e.g. "first_parameter_update"
+            step_type: Record type, e.g. "design_change_original"
+            element_id: Element the record is about, if any
+            **fields: observations_snapshot or original_step
+
+        Returns:
+            The stored record
+        """
+        with self._lock:
+            record = DesignRecord(
+                record_id=self._next_id,
+                kind=kind,
+                step_number=step.step_number,
+                action=action,
+                step_type=step_type,
+                timestamp=datetime.now().isoformat(),
+                element_id=element_id,
+                **fields,
+            )
+            self._next_id += 1
+            self._append(step, record)
+            return record
+
+    def attach(self, step: Any, records: Iterable[DesignRecord]) -> None:
+        """Share another agent's records for a transferred step."""
+        with self._lock:
+            known = self._by_step.get(id(step), [])
+            for record in records:
+                if record not in known:
+                    self._append(step, record)
+
+    def for_step(self, step: Any) -> List[DesignRecord]:
+        with self._lock:
+            return list(self._by_step.get(id(step), ()))
+
+    def for_element(self, element_id: str) -> List[DesignRecord]:
+        with self._lock:
+            return list(self._by_element.get(element_id, ()))
+
+    def retain(self, steps: Iterable[Any]) -> None:
+        """Drop the records of steps no longer in an agent's memory."""
+        with self._lock:
+            keep = {id(step) for step in steps}
+            self.discard(step for key, step in list(self._steps.items()) if key not in keep)
+
+    def discard(self, steps: Iterable[Any]) -> None:
+        """Drop the records of the given steps."""
+        with self._lock:
+            for step in steps:
+                self._steps.pop(id(step), None)
+                self._by_step.pop(id(step), None)
+            self._by_element = {}
+            for records in self._by_step.values():
+                for record in records:
+                    if record.element_id:
+                        self._by_element.setdefault(record.element_id, []).append(record)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return sum(len(records) for records in self._by_step.values())
+
+    def _append(self, step: Any, record: DesignRecord) -> None:
+        self._steps[id(step)] = step
+        self._by_step.setdefault(id(step), []).append(record)
+        if record.element_id:
+            self._by_element.setdefault(record.element_id, []).append(record)
+
+
+def get_design_records(agent: Any) -> DesignRecordStore:
+    """Get the agent's design record store, creating it on first use."""
+    store = getattr(agent, "design_records", None)
+    if store is None:
+        store = DesignRecordStore()
+        agent.design_records = store
+    return store
+
+
+def parse_memory_records(observations: str) -> List[DesignRecord]:
+    """
+    Parse legacy "[MEMORY_*] {json}" lines embedded in step observations.
+
+    Args:
+        observations: Step observations text
+
+    Returns:
+        Records in order of appearance (record_id 0); malformed lines are skipped
+    """
+    records = []
+    if not observations or "[MEMORY_" not in observations:
+        return records
+    for line in observations.split("\n"):
+        if not line.startswith("[MEMORY_"):
+            continue
+        for prefix, kind in LEGACY_PREFIXES.items():
+            if line.startswith(prefix):
+                try:
+                    data = json.loads(line[len(prefix) :])
+                except json.JSONDecodeError:
+                    break
+                if isinstance(data, dict):
+                    records.append(
+                        DesignRecord(
+                            record_id=0,
+                            kind=kind,
+                            step_number=data.get("step_number", 0),
+                            action=data.get("action", ""),
+                            step_type=data.get("step_type", ""),
+                            timestamp=data.get("timestamp", ""),
+                            element_id=data.get("element_id"),
+                            observations_snapshot=data.get("observations_snapshot"),
+                            original_step=data.get("original_step"),
+                        )
+                    )
+                break
+    return records
@@ -0,0 +1,249 @@
+"""
+Incremental Element History Index
+
+Answers "what was element 002 originally?" and "which steps touched element 002?"
+without walking agent.memory.steps. The index is attached to each agent and fed
+one step at a time by the track_design_changes step callback, taking each step's
+design records from the agent's record store (legacy "[MEMORY_*] {json}" lines
+are parsed once). Steps that reach memory.steps without passing through the
+callback (e.g. transferred from another agent) are picked up by sync() on the
+next query.
+
+Element references are indexed as whole tokens containing a digit ("002",
+"0CB", the "021" of "dynamic_021"). Queries for IDs of any other shape fall
+back to a substring test over the indexed steps.
+"""
+
+import re
+import threading
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from ..config.logging_config import get_logger
+from .design_records import (
+    ORIGINAL,
+    DesignRecord,
+    DesignRecordStore,
+    get_design_records,
+    parse_memory_records,
+)
+
+logger = get_logger(__name__)
+
+_REFERENCE_TOKEN = re.compile(r"[^\W_]*\d[^\W_]*")
+_UPDATED_ELEMENT_PATTERNS = (re.compile(r"element.*?'(\w+)'"), re.compile(r"dynamic_(\d+)"))
+
+# Lowercase observation fragments that mark a step as design-related (shared on transfer)
+DESIGN_INDICATORS = (
+    "parameter update",
+    "element",
+    "[memory_",
+    "direct parameter",
+    "rg.point3d",
+    "rg.vector3d",
+    "mcp",
+)
+
+
+class ElementHistoryIndex:
+    """
+    Per-agent index of element design history over memory steps.
+
+    Features:
+    - Original state lookup in O(1)
+    - History of an element in O(k) for its k referencing steps
+    - Modification counts maintained as steps are added
+    - Rebuilds itself when the agent's memory is reset or replaced
+    """
+
+    def __init__(self, records: Optional[DesignRecordStore] = None):
+        """
+        Initialize the index.
+
+        Args:
+            records: The agent's design record store; without one, records are
+                parsed from legacy observation lines only
+        """
+        self._lock = threading.RLock()
+        self._records = records
+        self.generation = 0  # Incremented whenever the index is rebuilt
+        self.reset()
+
+    def reset(self) -> None:
+        """Forget everything; the next sync() re-indexes the agent's memory."""
+        with self._lock:
+            self.generation += 1
+            self._steps_list: Optional[List[Any]] = None
+            self._scanned = 0
+            self._indexed: Dict[int, Any] = {}  # id(step) -> step, keeps ids stable
+            self._order: List[Any] = []
+            self._step_records: Dict[int, List[DesignRecord]] = {}
+            self._originals: Dict[str, Tuple[Any, DesignRecord]] = {}
+            self._original_steps: Set[int] = set()
+            self._references: Dict[str, List[Any]] = {}
+            self._design_steps: List[Any] = []
+            self._design_ids: Set[int] = set()
+            self._change_counts: Dict[str, int] = {}
+
+    def sync(self, agent: Any) -> "ElementHistoryIndex":
+        """
+        Index any steps appended to agent.memory.steps since the last sync.
+
+        A memory list that was replaced or shortened triggers a full rebuild.
+        """
+        steps = agent.memory.steps
+        with self._lock:
+            if steps is not self._steps_list or len(steps) < self._scanned:
+                if self._steps_list is not None:
+                    logger.debug("🔄 Agent memory was reset, rebuilding element history index")
+                    if self._records is not None:
+                        self._records.retain(steps)
+                self.reset()
+                self._steps_list = steps
+            for step in steps[self._scanned :]:
+                self.add_step(step)
+            self._scanned = len(steps)
+        return self
+
+    def remove_steps(self, steps: List[Any]) -> None:
+        """
+        Forget steps that were removed from the agent's memory.
+
+        The agent's memory list must already be without them; the remaining
+        steps are re-indexed in order.
+        """
+        with self._lock:
+            removed = {id(step) for step in steps}
+            remaining = [step for step in self._order if id(step) not in removed]
+            steps_list, scanned = self._steps_list, self._scanned - len(removed)
+            if self._records is not None:
+                self._records.discard(steps)
+            self.reset()
+            for step in remaining:
+                self.add_step(step)
+            self._steps_list, self._scanned = steps_list, max(scanned, 0)
+
+    def add_step(self, step: Any) -> None:
+        """Index one step; steps that were already indexed are ignored."""
+        from smolagents import ActionStep
+
+        if not isinstance(step, ActionStep):
+            return
+        with self._lock:
+            if id(step) in self._indexed:
+                return
+            self._indexed[id(step)] = step
+            observations = getattr(step, "observations", None)
+            if not observations:
+                return
+            observations = str(observations)
+
+            self._order.append(step)
+            records = self._records.for_step(step) if self._records is not None else []
+            records = records or parse_memory_records(observations)
+            self._step_records[id(step)] = records
+
+            for token in set(_REFERENCE_TOKEN.findall(observations)):
+                self._references.setdefault(token, []).append(step)
+
+            lowered = observations.lower()
+            if records or any(indicator in lowered for indicator in DESIGN_INDICATORS):
+                self._design_steps.append(step)
+                self._design_ids.add(id(step))
+
+            for record in records:
+                if record.kind == ORIGINAL and record.element_id not in self._originals:
+                    self._originals[record.element_id] = (step, record)
+                    self._original_steps.add(id(step))
+
+            if "parameter update" in lowered:
+                updated: Set[str] = set()
+                for pattern in _UPDATED_ELEMENT_PATTERNS:
+                    updated.update(pattern.findall(observations))
+                updated.update(record.element_id for record in records if record.element_id)
+                for element_id in updated:
+                    self._change_counts[element_id] = self._change_counts.get(element_id, 0) + 1
+
+    def original(self, element_id: str) -> Optional[Tuple[Any, DesignRecord]]:
+        """Step and record of the first original-state record for an element."""
+        with self._lock:
+            return self._originals.get(element_id)
+
+    def holds_original(self, step: Any) -> bool:
+        """Whether a step holds the original state of some element."""
+        with self._lock:
+            return id(step) in self._original_steps
+
+    def steps_referencing(self, element_id: str) -> List[Any]:
+        """Steps whose observations mention an element, in memory order."""
+        with self._lock:
+            if _REFERENCE_TOKEN.fullmatch(element_id):
+                return list(self._references.get(element_id, ()))
+            return [step for step in self._order if element_id in str(step.observations)]
+
+    def design_steps_since(
+        self, position: int = 0, element_id: Optional[str] = None
+    ) -> Tuple[List[Any], int]:
+        """
+        Design-related steps indexed after a position, optionally for one element.
+
+        Positions count within the sequence for element_id (or all design steps)
+        and are only comparable within one index generation.
+
+        Args:
+            position: Position returned by the previous call (0 for all steps)
+            element_id: Only steps referencing this element
+
+        Returns:
+            Tuple of the new steps in memory order and the position to pass next time
+        """
+        with self._lock:
+            if element_id is None:
+                sequence = self._design_steps
+            elif _REFERENCE_TOKEN.fullmatch(element_id):
+                sequence = self._references.get(element_id, [])
+            else:
+                sequence = self._order
+            new_steps = [
+                step
+                for step in sequence[position:]
+                if id(step) in self._design_ids
+                and (sequence is not self._order or element_id in str(step.observations))
+            ]
+            return new_steps, len(sequence)
+
+    def records_for(self, step: Any, element_id: str) -> List[DesignRecord]:
+        """Design records of one indexed step that belong to an element."""
+        with self._lock:
+            return [
+                record
+                for record in self._step_records.get(id(step), ())
+                if record.element_id == element_id
+            ]
+
+    def change_counts(self) -> Dict[str, int]:
+        """Number of parameter-update steps per element."""
+        with self._lock:
+            return dict(self._change_counts)
+
+    def __len__(self) -> int:
+        return len(self._order)
+
+
+def get_element_history(agent: Any) -> ElementHistoryIndex:
+    """
+    Get the agent's element history index, synced with its memory steps.
+
+    The index is created on first use and stored on the agent, reading records
+    from the agent's design record store.
+
+    Args:
+        agent: CodeAgent or ToolCallingAgent with memory.steps
+
+    Returns:
+        ElementHistoryIndex covering every step currently in agent.memory.steps
+    """
+    index = getattr(agent, "element_history_index", None)
+    if index is None:
+        index = ElementHistoryIndex(get_design_records(agent))
+        agent.element_history_index = index
+    return index.sync(agent)
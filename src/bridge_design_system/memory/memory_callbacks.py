@@ -7,12 +7,14 @@ patterns for automatic memory management during agent execution.
 Reference: https://github.com/huggingface/smolagents/blob/main/docs/source/en/tutorials/memory.mdx#_snippet_3-4
 """
 
-import json
 import re
-from datetime import datetime
 from typing import Any, Dict, Optional
 
 from ..config.logging_config import get_logger
+from .design_records import MCP, ORIGINAL, UPDATE, get_design_records
+from .element_history import get_element_history
+from .memory_compaction import get_memory_compactor
+from .memory_stats import get_memory_stats
 
 logger = get_logger(__name__)
 
@@ -27,8 +29,10 @@ def track_design_changes(memory_step: "ActionStep", agent: "CodeAgent") -> None:
     This function implements the missing native smolagents memory capability to:
     1. Automatically detect Direct Parameter Update tasks
     2. Extract element IDs and save original values before modifications
-    3. Store structured design history in memory_step.observations
-    4. Clean up old memory data to prevent memory bloat
+    3. Store structured design records in the agent's record store, leaving only a
+       short reference line in memory_step.observations
+    4. Compact old memory steps to keep them within the max_context_tokens budget
+    5. Keep the running memory statistics current (steps appended since the last step)
 
     Args:
         memory_step: Current ActionStep from smolagents execution
@@ -36,7 +40,8 @@ def track_design_changes(memory_step: "ActionStep", agent: "CodeAgent") -> None:
 
     Reference:
         Smolagents step callback pattern from memory.mdx#_snippet_3
-        Memory cleanup pattern from memory.mdx#_snippet_3 (screenshot removal)
+        Memory cleanup pattern from memory.mdx#_snippet_3 (screenshot removal),
+        extended to a token budget by MemoryCompactor
     """
     try:
         # Only process steps that have observations
@@ -63,34 +68,30 @@ def track_design_changes(memory_step: "ActionStep", agent: "CodeAgent") -> None:
                         f"💾 Saving original state for element {element_id} (first modification)"
                     )
 
-                    # Create structured memory record following smolagents patterns
-                    memory_record = {
-                        "element_id": element_id,
-                        "timestamp": datetime.now().isoformat(),
-                        "step_number": memory_step.step_number,
-                        "action": "first_parameter_update",
-                        "step_type": "design_change_original",
-                        "observations_snapshot": observations,
-                    }
-
-                    # Store in memory step observations with structured format
-                    # Following smolagents pattern of adding to observations
-                    memory_step.observations += f"\n[MEMORY_ORIGINAL] {json.dumps(memory_record)}"
+                    # Keep the full snapshot out of the observations sent to the LLM
+                    memory_record = get_design_records(agent).add(
+                        memory_step,
+                        ORIGINAL,
+                        action="first_parameter_update",
+                        step_type="design_change_original",
+                        element_id=element_id,
+                        observations_snapshot=observations,
+                    )
+                    memory_step.observations += f"\n{memory_record.reference}"
 
                 else:
                     # Subsequent modification - record the change
                     logger.debug(f"📝 Recording subsequent modification for element {element_id}")
 
-                    change_record = {
-                        "element_id": element_id,
-                        "timestamp": datetime.now().isoformat(),
-                        "step_number": memory_step.step_number,
-                        "action": "parameter_update",
-                        "step_type": "design_change_update",
-                        "original_step": original_state["step_number"] if original_state else None,
-                    }
-
-                    memory_step.observations += f"\n[MEMORY_UPDATE] {json.dumps(change_record)}"
+                    change_record = get_design_records(agent).add(
+                        memory_step,
+                        UPDATE,
+                        action="parameter_update",
+                        step_type="design_change_update",
+                        element_id=element_id,
+                        original_step=original_state["step_number"],
+                    )
+                    memory_step.observations += f"\n{change_record.reference}"
 
         # Also track MCP tool calls that might modify geometry
         elif any(
@@ -105,38 +106,24 @@ def track_design_changes(memory_step: "ActionStep", agent: "CodeAgent") -> None:
             logger.debug(f"🔧 Detected MCP geometry modification in step {memory_step.step_number}")
 
             # Record potential geometry changes
-            mcp_record = {
-                "timestamp": datetime.now().isoformat(),
-                "step_number": memory_step.step_number,
-                "action": "mcp_geometry_modification",
-                "step_type": "mcp_tool_call",
-            }
-
-            memory_step.observations += f"\n[MEMORY_MCP] {json.dumps(mcp_record)}"
-
-        # Memory cleanup - remove old screenshots/data (smolagents best practice)
-        # Following exact pattern from smolagents documentation memory.mdx#_snippet_3
-        latest_step = memory_step.step_number
-        for previous_step in agent.memory.steps:
-            # Import ActionStep here to avoid circular imports
-            from smolagents import ActionStep
-
-            if (
-                isinstance(previous_step, ActionStep)
-                and previous_step.step_number <= latest_step - 3
-            ):
-                # Keep only last 3 steps with full context to save memory
-                if hasattr(previous_step, "observations_images"):
-                    previous_step.observations_images = None
-
-                # Also clean up very old detailed observations to prevent memory bloat
-                if previous_step.step_number <= latest_step - 10:
-                    if hasattr(previous_step, "observations") and previous_step.observations:
-                        # Keep only memory records, remove verbose observations
-                        lines = previous_step.observations.split("\n")
-                        memory_lines = [line for line in lines if line.startswith("[MEMORY")]
-                        if memory_lines:
-                            previous_step.observations = "\n".join(memory_lines)
+            mcp_record = get_design_records(agent).add(
+                memory_step,
+                MCP,
+                action="mcp_geometry_modification",
+                step_type="mcp_tool_call",
+            )
+            memory_step.observations += f"\n{mcp_record.reference}"
+
+        # Index this step's records once so later queries never re-parse them
+        get_element_history(agent).add_step(memory_step)
+
+        # Memory cleanup - remove old screenshots (smolagents best practice, as in
+        # memory.mdx#_snippet_3), then summarize/evict old steps over the token budget
+        get_memory_compactor(agent).compact(agent)
+
+        # Count steps appended since the previous callback (this step is appended
+        # after the callback returns and is counted next time)
+        get_memory_stats(agent)
 
     except Exception as e:
         logger.error(f"❌ Error in track_design_changes callback: {e}")
@@ -149,8 +136,8 @@ def _find_original_element_state(agent: Any, element_id: str) -> Optional[Dict]:
     """
     Helper function to find the original state record for an element.
 
-    Searches through agent.memory.steps to find the first [MEMORY_ORIGINAL] record
-    for the specified element_id.
+    Looks up the first original-state record for the specified element_id in
+    the agent's element history index.
 
     Args:
         agent: CodeAgent with memory.steps access
@@ -160,23 +147,8 @@ def _find_original_element_state(agent: Any, element_id: str) -> Optional[Dict]:
         Dictionary with original state information, or None if not found
     """
     try:
-        for step in agent.memory.steps:
-            # Import ActionStep here to avoid circular imports
-            from smolagents import ActionStep
-
-            if isinstance(step, ActionStep) and hasattr(step, "observations"):
-                if step.observations and f"[MEMORY_ORIGINAL]" in step.observations:
-                    # Parse memory records from observations
-                    for line in step.observations.split("\n"):
-                        if line.startswith("[MEMORY_ORIGINAL]"):
-                            try:
-                                record_json = line.replace("[MEMORY_ORIGINAL] ", "")
-                                record = json.loads(record_json)
-                                if record.get("element_id") == element_id:
-                                    return record
-                            except json.JSONDecodeError:
-                                continue
-        return None
+        original = get_element_history(agent).original(element_id)
+        return original[1].to_dict() if original else None
 
     except Exception as e:
         logger.error(f"❌ Error finding original element state: {e}")
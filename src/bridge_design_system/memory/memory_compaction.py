@@ -0,0 +1,242 @@
+"""
+Token-Budgeted Memory Compaction
+
+Keeps the memory steps an agent replays into every LLM call within the
+max_context_tokens setting. Token counts are estimated per step (characters
+divided by CHARS_PER_TOKEN plus a flat cost per image) and cached until the
+step changes. Compaction runs from the step callback in stages, oldest steps
+first, and stops as soon as the memory fits the budget:
+
+1. Always: drop images and stored model input messages of steps older than
+   keep_recent (they are never replayed but hold a copy of every prompt)
+2. Over budget: summarize old steps to their memory record references plus the
+   start of their observations and model output
+3. Still over budget: evict old summarized steps from memory.steps
+
+Steps changed or evicted here are reported to the agent's memory statistics,
+if it keeps any, so their running counters stay current.
+
+Steps holding the original state of an element are pinned: they may be
+summarized (the full snapshot stays in the design record store) but are never
+evicted, so "what was element 002 originally?" stays answerable. Task steps and
+the most recent keep_recent steps are never touched. Steps received from another
+agent by transfer_agent_memory are shared objects; they are evicted but never
+summarized in place.
+"""
+
+import threading
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+from ..config.logging_config import get_logger
+from ..config.settings import settings
+from .element_history import get_element_history
+
+logger = get_logger(__name__)
+
+CHARS_PER_TOKEN = 4
+IMAGE_TOKENS = 800  # Rough cost of one observation image
+SUMMARY_CHARS = 200  # Observation/model output characters kept when summarizing
+COMPACTED_MARKER = "[COMPACTED]"
+
+
+@dataclass
+class CompactionReport:
+    """Outcome of one compaction pass."""
+
+    tokens_before: int = 0
+    tokens_after: int = 0
+    images_dropped: int = 0
+    summarized: int = 0
+    evicted: int = 0
+
+    @property
+    def steps_changed(self) -> int:
+        return self.images_dropped + self.summarized + self.evicted
+
+    def to_dict(self) -> Dict[str, int]:
+        return {
+            "tokens_before": self.tokens_before,
+            "tokens_after": self.tokens_after,
+            "images_dropped": self.images_dropped,
+            "summarized": self.summarized,
+            "evicted": self.evicted,
+        }
+
+
+class MemoryCompactor:
+    """
+    Enforce a token budget on an agent's memory steps.
+
+    Features:
+    - Per-step token estimates cached until a step's content changes
+    - Image and model-input cleanup that only visits steps once
+    - Summarize-then-evict policy, oldest first, never evicting original-state steps
+    """
+
+    def __init__(
+        self,
+        max_context_tokens: Optional[int] = None,
+        keep_recent: int = 3,
+        summary_chars: int = SUMMARY_CHARS,
+    ):
+        """
+        Initialize the compactor.
+
+        Args:
+            max_context_tokens: Token budget for memory steps (defaults to the
+                max_context_tokens setting)
+            keep_recent: Number of latest steps kept with full detail
+            summary_chars: Characters of observations and model output kept per
+                summarized step
+        """
+        self.max_context_tokens = max_context_tokens or settings.max_context_tokens
+        self.keep_recent = keep_recent
+        self.summary_chars = summary_chars
+        self._lock = threading.RLock()
+        self._steps_list: Optional[List[Any]] = None
+        self._estimates: Dict[int, Tuple[Tuple[int, ...], int]] = {}
+        self._summarized: Dict[int, Any] = {}  # id(step) -> step
+        self._cleaned_upto = 0  # Steps before this position had images dropped
+
+    def step_tokens(self, step: Any) -> int:
+        """Estimated tokens a step adds to every LLM call."""
+        observations = getattr(step, "observations", None) or ""
+        model_output = getattr(step, "model_output", None)
+        images = getattr(step, "observations_images", None) or ()
+        error = getattr(step, "error", None)
+        signature = (
+            len(observations),
+            len(model_output) if isinstance(model_output, str) else -1,
+            len(images),
+            error is None,
+        )
+        cached = self._estimates.get(id(step))
+        if cached and cached[0] == signature:
+            return cached[1]
+
+        chars = len(observations)
+        chars += len(model_output) if isinstance(model_output, str) else 0
+        chars += len(str(error)) if error is not None else 0
+        tool_calls = getattr(step, "tool_calls", None)
+        chars += len(str(tool_calls)) if tool_calls else 0
+        task = getattr(step, "task", None)
+        chars += len(task) if isinstance(task, str) else 0
+        tokens = chars // CHARS_PER_TOKEN + IMAGE_TOKENS * len(images)
+        self._estimates[id(step)] = (signature, tokens)
+        return tokens
+
+    def total_tokens(self, agent: Any) -> int:
+        """Estimated tokens of all memory steps of an agent."""
+        with self._lock:
+            return sum(self.step_tokens(step) for step in agent.memory.steps)
+
+    def compact(self, agent: Any) -> CompactionReport:
+        """
+        Bring an agent's memory within the token budget.
+
+        Args:
+            agent: CodeAgent or ToolCallingAgent with memory.steps
+
+        Returns:
+            CompactionReport with estimated tokens before and after
+        """
+        from smolagents import ActionStep
+
+        with self._lock:
+            steps = agent.memory.steps
+            if steps is not self._steps_list:
+                # Memory was reset or replaced: cached ids refer to other steps
+                self._steps_list = steps
+                self._estimates.clear()
+                self._summarized.clear()
+                self._cleaned_upto = 0
+            report = CompactionReport(tokens_before=sum(self.step_tokens(s) for s in steps))
+            boundary = max(len(steps) - self.keep_recent, 0)
+            stats = getattr(agent, "memory_stats", None)
+            changed = []
+
+            # Stage 1: images and stored prompts of old steps, each step visited once
+            for step in steps[self._cleaned_upto : boundary]:
+                if getattr(step, "observations_images", None):
+                    step.observations_images = None
+                    report.images_dropped += 1
+                    changed.append(step)
+                if getattr(step, "model_input_messages", None):
+                    step.model_input_messages = None
+            self._cleaned_upto = max(self._cleaned_upto, boundary)
+
+            total = sum(self.step_tokens(step) for step in steps)
+            if total > self.max_context_tokens:
+                candidates = [step for step in steps[:boundary] if isinstance(step, ActionStep)]
+                transfers = getattr(agent, "memory_transfers", None)
+
+                # Stage 2: summarize, oldest first; steps shared by another agent are only evicted
+                for step in candidates:
+                    if total <= self.max_context_tokens:
+                        break
+                    if id(step) in self._summarized or (transfers and transfers.holds(step)):
+                        continue
+                    before = self.step_tokens(step)
+                    self._summarize(step)
+                    total += self.step_tokens(step) - before
+                    report.summarized += 1
+                    changed.append(step)
+
+                # Stage 3: evict summarized steps, oldest first, keeping pinned ones
+                history = get_element_history(agent)
+                evicted = []
+                for step in candidates:
+                    if total <= self.max_context_tokens:
+                        break
+                    if history.holds_original(step):
+                        continue
+                    total -= self.step_tokens(step)
+                    evicted.append(step)
+                if evicted:
+                    evicted_ids = {id(step) for step in evicted}
+                    steps[:] = [step for step in steps if id(step) not in evicted_ids]
+                    for key in evicted_ids:
+                        self._estimates.pop(key, None)
+                        self._summarized.pop(key, None)
+                    self._cleaned_upto = max(self._cleaned_upto - len(evicted), 0)
+                    history.remove_steps(evicted)
+                    if stats is not None:
+                        stats.remove_steps(evicted)
+                    report.evicted = len(evicted)
+
+            if stats is not None:
+                stats.update_steps(changed)  # Evicted steps are no longer counted
+            report.tokens_after = total
+            if report.summarized or report.evicted:
+                logger.info(
+                    f"🗜️ Memory compacted to ~{total} tokens (budget {self.max_context_tokens}): "
+                    f"{report.summarized} summarized, {report.evicted} evicted"
+                )
+            return report
+
+    def _summarize(self, step: Any) -> None:
+        """Reduce a step to its memory references and the start of its text."""
+        observations = getattr(step, "observations", None)
+        if observations and COMPACTED_MARKER not in observations:
+            lines = observations.split("\n")
+            memory_lines = [line for line in lines if line.startswith("[MEMORY")]
+            text = "\n".join(line for line in lines if not line.startswith("[MEMORY"))
+            if len(text) > self.summary_chars:
+                removed = len(text) - self.summary_chars
+                text = f"{text[: self.summary_chars]}…\n{COMPACTED_MARKER} {removed} chars removed"
+            step.observations = "\n".join(([text] if text else []) + memory_lines)
+
+        model_output = getattr(step, "model_output", None)
+        if isinstance(model_output, str) and len(model_output) > self.summary_chars:
+            step.model_output = f"{model_output[: self.summary_chars]}…"
+        self._summarized[id(step)] = step
+
+
+def get_memory_compactor(agent: Any) -> MemoryCompactor:
+    """Get the agent's memory compactor, creating it on first use."""
+    compactor = getattr(agent, "memory_compactor", None)
+    if compactor is None:
+        compactor = MemoryCompactor()
+        agent.memory_compactor = compactor
+    return compactor
@@ -5,16 +5,18 @@ This module implements memory query functions using native smolagents agent.memo
 to retrieve design history and original element values.
 
 Solves the core issue: "What was element 002's original length?" by querying agent memory
-instead of relying on external storage.
+instead of relying on external storage. Lookups go through the per-agent element history
+index (element_history.py), which parses each memory step once.
 
 Reference: https://github.com/huggingface/smolagents/blob/main/docs/source/en/tutorials/memory.mdx#_snippet_2
 """
 
-import json
 import re
 from typing import Any, Dict, List, Optional
 
 from ..config.logging_config import get_logger
+from .element_history import get_element_history
+from .memory_transfer import get_transfer_log, share_design_records
 
 logger = get_logger(__name__)
 
@@ -23,9 +25,9 @@ def get_original_element_state(agent: Any, element_id: str) -> Optional[Dict]:
     """
     Query agent's native memory for original element state.
 
-    Uses smolagents agent.memory.steps to find the earliest record of element
-    before any modifications. This solves the core issue where agents forget
-    original values like element 002's original length.
+    Uses the agent's element history index over agent.memory.steps to find the
+    earliest record of element before any modifications. This solves the core
+    issue where agents forget original values like element 002's original length.
 
     Args:
         agent: CodeAgent or ToolCallingAgent with memory.steps access
@@ -47,43 +49,22 @@ def get_original_element_state(agent: Any, element_id: str) -> Optional[Dict]:
             logger.warning(f"⚠️ Agent does not have memory.steps attribute")
             return None
 
-        logger.debug(
-            f"🔍 Searching for original state of element {element_id} in {len(agent.memory.steps)} memory steps"
-        )
+        original = get_element_history(agent).original(element_id)
+        if original is None:
+            logger.debug(f"🔍 No original state found for element {element_id}")
+            return None
 
-        # Search through memory steps chronologically for first occurrence
-        for step in agent.memory.steps:
-            # Import ActionStep here to avoid circular imports
-            from smolagents import ActionStep
-
-            if isinstance(step, ActionStep) and hasattr(step, "observations"):
-                if step.observations and f"[MEMORY_ORIGINAL]" in step.observations:
-                    # Parse memory records from observations
-                    for line in step.observations.split("\n"):
-                        if line.startswith("[MEMORY_ORIGINAL]"):
-                            try:
-                                record_json = line.replace("[MEMORY_ORIGINAL] ", "")
-                                record = json.loads(record_json)
-
-                                if record.get("element_id") == element_id:
-                                    logger.info(
-                                        f"✅ Found original state for element {element_id} from step {step.step_number}"
-                                    )
-                                    return {
-                                        "element_id": element_id,
-                                        "step_number": step.step_number,
-                                        "original_observations": record.get(
-                                            "observations_snapshot", ""
-                                        ),
-                                        "timestamp": record.get("timestamp"),
-                                        "memory_record": record,
-                                    }
-                            except json.JSONDecodeError as e:
-                                logger.warning(f"⚠️ Failed to parse memory record: {e}")
-                                continue
-
-        logger.debug(f"🔍 No original state found for element {element_id}")
-        return None
+        step, record = original
+        logger.info(
+            f"✅ Found original state for element {element_id} from step {step.step_number}"
+        )
+        return {
+            "element_id": element_id,
+            "step_number": step.step_number,
+            "original_observations": record.observations_snapshot or "",
+            "timestamp": record.timestamp,
+            "memory_record": record.to_dict(),
+        }
 
     except Exception as e:
         logger.error(f"❌ Error querying original element state: {e}")
@@ -94,8 +75,8 @@ def query_design_history(agent: Any, element_id: str) -> List[Dict]:
     """
     Get complete design history for an element from agent memory.
 
-    Returns chronological list of all changes to the element using native
-    smolagents memory.steps access pattern.
+    Returns chronological list of all steps referencing the element, looked up
+    in the agent's element history index instead of scanning memory.steps.
 
     Args:
         agent: CodeAgent or ToolCallingAgent with memory.steps
@@ -121,46 +102,20 @@ def query_design_history(agent: Any, element_id: str) -> List[Dict]:
 
         logger.debug(f"🔍 Querying design history for element {element_id}")
 
-        # Iterate through all memory steps chronologically
-        for step in agent.memory.steps:
-            from smolagents import ActionStep
-
-            if isinstance(step, ActionStep) and hasattr(step, "observations"):
-                if step.observations and element_id in step.observations:
-                    # Extract all memory records for this element
-                    step_records = []
-
-                    for line in step.observations.split("\n"):
-                        if any(
-                            line.startswith(prefix)
-                            for prefix in ["[MEMORY_ORIGINAL]", "[MEMORY_UPDATE]", "[MEMORY_MCP]"]
-                        ):
-                            try:
-                                # Extract JSON from memory line
-                                for prefix in [
-                                    "[MEMORY_ORIGINAL] ",
-                                    "[MEMORY_UPDATE] ",
-                                    "[MEMORY_MCP] ",
-                                ]:
-                                    if line.startswith(prefix):
-                                        record_json = line.replace(prefix, "")
-                                        record = json.loads(record_json)
-                                        if record.get("element_id") == element_id:
-                                            step_records.append(record)
-                                        break
-                            except json.JSONDecodeError:
-                                continue
-
-                    # Add step to history if it contains relevant records
-                    if step_records or element_id in step.observations:
-                        history_entry = {
-                            "step_number": step.step_number,
-                            "observations": step.observations,
-                            "error": getattr(step, "error", None),
-                            "memory_records": step_records,
-                            "has_element_reference": element_id in step.observations,
-                        }
-                        history.append(history_entry)
+        index = get_element_history(agent)
+        for step in index.steps_referencing(element_id):
+            observations = str(step.observations or "")
+            history.append(
+                {
+                    "step_number": step.step_number,
+                    "observations": step.observations,
+                    "error": getattr(step, "error", None),
+                    "memory_records": [
+                        record.to_dict() for record in index.records_for(step, element_id)
+                    ],
+                    "has_element_reference": element_id in observations,
+                }
+            )
 
         logger.info(f"📊 Found {len(history)} history entries for element {element_id}")
         return history
@@ -174,8 +129,8 @@ def get_element_changes_count(agent: Any) -> Dict[str, int]:
     """
     Count how many times each element has been modified using agent memory.
 
-    Provides overview of design activity by analyzing native smolagents memory
-    for parameter update patterns.
+    Provides overview of design activity from the parameter update counts kept
+    by the agent's element history index.
 
     Args:
         agent: CodeAgent or ToolCallingAgent with memory.steps
@@ -191,47 +146,7 @@ def get_element_changes_count(agent: Any) -> Dict[str, int]:
         if not hasattr(agent, "memory") or not hasattr(agent.memory, "steps"):
             return {}
 
-        changes = {}
-
-        for step in agent.memory.steps:
-            from smolagents import ActionStep
-
-            if isinstance(step, ActionStep) and hasattr(step, "observations"):
-                if step.observations:
-                    # Look for parameter update patterns
-                    if "parameter update" in step.observations.lower():
-                        # Extract element ID from observations using multiple patterns
-                        element_matches = []
-
-                        # Pattern 1: element 'XXX' (from Direct Parameter Update)
-                        matches = re.findall(r"element.*?'(\w+)'", step.observations)
-                        element_matches.extend(matches)
-
-                        # Pattern 2: dynamic_XXX (from HoloLens data)
-                        matches = re.findall(r"dynamic_(\d+)", step.observations)
-                        element_matches.extend(matches)
-
-                        # Pattern 3: Memory records
-                        for line in step.observations.split("\n"):
-                            if "[MEMORY_" in line:
-                                try:
-                                    for prefix in [
-                                        "[MEMORY_ORIGINAL] ",
-                                        "[MEMORY_UPDATE] ",
-                                        "[MEMORY_MCP] ",
-                                    ]:
-                                        if line.startswith(prefix):
-                                            record_json = line.replace(prefix, "")
-                                            record = json.loads(record_json)
-                                            if "element_id" in record:
-                                                element_matches.append(record["element_id"])
-                                            break
-                                except json.JSONDecodeError:
-                                    continue
-
-                        # Count unique elements in this step
-                        for element_id in set(element_matches):
-                            changes[element_id] = changes.get(element_id, 0) + 1
+        changes = get_element_history(agent).change_counts()
 
         logger.debug(f"📊 Element modification counts: {changes}")
         return changes
@@ -248,7 +163,11 @@ def transfer_agent_memory(
     Transfer design memory from source agent to target agent.
 
     Uses smolagents native memory.steps transfer pattern from documentation
-    to share design history between geometry and triage agents.
+    to share design history between geometry and triage agents. Steps are
+    selected through the source's element history index and shared by
+    reference; the target's transfer log keeps a watermark per source and
+    filter, so repeated transfers only send steps added since the last one
+    and never append a step twice.
 
     Args:
         source_agent: Agent to copy memory from
@@ -256,7 +175,7 @@ def transfer_agent_memory(
         element_filter: Optional element ID to filter transfer
 
     Returns:
-        True if transfer successful, False otherwise
+        True if new steps were transferred, False otherwise
 
     Example:
         >>> # Transfer all geometry memory to triage agent
@@ -277,38 +196,17 @@ def transfer_agent_memory(
             logger.error("❌ Both agents must have memory.steps attribute")
             return False
 
-        # Selective transfer of design-related steps only
-        design_steps = []
-
-        for step in source_agent.memory.steps:
-            from smolagents import ActionStep
-
-            if isinstance(step, ActionStep) and hasattr(step, "observations"):
-                if step.observations:
-                    # Check if step contains design-related content
-                    is_design_step = any(
-                        indicator in step.observations.lower()
-                        for indicator in [
-                            "parameter update",
-                            "element",
-                            "[memory_",
-                            "direct parameter",
-                            "rg.point3d",
-                            "rg.vector3d",
-                            "mcp",
-                        ]
-                    )
-
-                    # Apply element filter if specified
-                    if element_filter and is_design_step:
-                        is_design_step = element_filter in step.observations
-
-                    if is_design_step:
-                        design_steps.append(step)
+        # Selective transfer of design-related steps not sent to this target before
+        design_steps = get_transfer_log(target_agent).collect(
+            source_agent, get_element_history(source_agent), element_filter or None
+        )
 
         # Add to target agent memory (native smolagents pattern)
         if design_steps:
             target_agent.memory.steps.extend(design_steps)
+
+            # Design records stay with the source agent's store; share them for these steps
+            share_design_records(source_agent, target_agent, design_steps)
             logger.info(f"🔄 Transferred {len(design_steps)} design memory steps to target agent")
 
             if element_filter:
@@ -316,7 +214,7 @@ def transfer_agent_memory(
 
             return True
         else:
-            logger.info("ℹ️ No design-related memory steps found to transfer")
+            logger.info("ℹ️ No new design-related memory steps to transfer")
             return False
 
     except Exception as e:
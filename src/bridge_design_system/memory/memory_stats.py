@@ -0,0 +1,290 @@
+"""
+Incremental Memory Statistics and Integrity Checks
+
+get_memory_statistics and validate_memory_integrity used to walk and parse every
+memory step on each call. MemoryStatistics keeps running counters per agent
+instead: each step is analyzed once, when it first shows up in memory.steps,
+and its contribution (type, design change, element, memory records, estimated
+tokens, images, integrity findings) is added to the totals. The step callback
+syncs the counters after every step, so a monitoring poll only looks at steps
+appended since the last sync.
+
+The compactor reports the steps it changes in place (images dropped,
+observations summarized) and the steps it evicts, so their contributions are
+recomputed or subtracted without rescanning memory.
+"""
+
+import json
+import threading
+from collections import Counter
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from ..config.logging_config import get_logger
+from .memory_compaction import MemoryCompactor, get_memory_compactor
+from .memory_utils import extract_element_id_from_observations
+
+logger = get_logger(__name__)
+
+MCP_INDICATORS = ("edit_python3_script", "get_python3_script", "rg.point3d", "rg.vector3d")
+LEGACY_RECORD_PREFIXES = ("[MEMORY_ORIGINAL] ", "[MEMORY_UPDATE] ", "[MEMORY_MCP] ")
+
+
+@dataclass(frozen=True)
+class StepContribution:
+    """What one memory step adds to the running counters."""
+
+    step_type: str  # Class name, e.g. "ActionStep"
+    design_change: bool
+    element_id: Optional[str]
+    memory_records: int
+    mcp_call: bool
+    size: int  # Observation characters
+    tokens: int
+    images: int
+    issues: Tuple[str, ...] = ()
+    warnings: Tuple[str, ...] = ()
+
+
+class MemoryStatistics:
+    """
+    Running memory statistics of one agent.
+
+    Features:
+    - Steps by type, design changes per element, estimated tokens and retained
+      images, updated per step instead of per query
+    - Integrity findings (corrupted records, design changes without a memory
+      record) computed once per step
+    - Rebuilds itself when the agent's memory is reset or replaced
+    """
+
+    def __init__(self, compactor: Optional[MemoryCompactor] = None):
+        """
+        Initialize the counters.
+
+        Args:
+            compactor: The agent's compactor, whose cached per-step token
+                estimates are reused (a private one is created if omitted)
+        """
+        self._lock = threading.RLock()
+        self._compactor = compactor or MemoryCompactor()
+        self.reset()
+
+    def reset(self) -> None:
+        """Forget everything; the next sync() re-counts the agent's memory."""
+        with self._lock:
+            self._steps_list: Optional[List[Any]] = None
+            self._scanned = 0
+            self._steps: Dict[int, Any] = {}  # id(step) -> step, keeps ids stable
+            self._contributions: Dict[int, StepContribution] = {}
+            self._flagged: Dict[int, StepContribution] = {}  # Steps with integrity findings
+            self.steps_by_type: Counter = Counter()
+            self.design_changes_per_element: Counter = Counter()
+            self.elements_modified: Counter = Counter()
+            self.design_changes = 0
+            self.memory_records = 0
+            self.mcp_tool_calls = 0
+            self.memory_size = 0
+            self.estimated_tokens = 0
+            self.images_retained = 0
+            self.steps_with_images = 0
+            self.corrupted_records = 0
+            self.design_changes_without_memory = 0
+
+    def sync(self, agent: Any) -> "MemoryStatistics":
+        """
+        Count any steps appended to agent.memory.steps since the last sync.
+
+        A memory list that was replaced or shortened triggers a full recount.
+        """
+        steps = agent.memory.steps
+        with self._lock:
+            if steps is not self._steps_list or len(steps) < self._scanned:
+                if self._steps_list is not None:
+                    logger.debug("🔄 Agent memory was reset, recounting memory statistics")
+                self.reset()
+                self._steps_list = steps
+            for step in steps[self._scanned :]:
+                self.add_step(step)
+            self._scanned = len(steps)
+        return self
+
+    def add_step(self, step: Any) -> None:
+        """Count one step; steps that were already counted are ignored."""
+        with self._lock:
+            if id(step) in self._contributions:
+                return
+            self._steps[id(step)] = step
+            self._store(id(step), self._analyze(step))
+
+    def update_steps(self, steps: Iterable[Any]) -> None:
+        """Recount steps that were changed in place (e.g. compacted)."""
+        with self._lock:
+            for step in steps:
+                old = self._contributions.get(id(step))
+                if old is not None:
+                    self._apply(old, -1)
+                    self._store(id(step), self._analyze(step))
+
+    def remove_steps(self, steps: Iterable[Any]) -> None:
+        """
+        Subtract steps that were removed from the agent's memory.
+
+        The agent's memory list must already be without them.
+        """
+        with self._lock:
+            removed = 0
+            for step in steps:
+                contribution = self._contributions.pop(id(step), None)
+                if contribution is not None:
+                    self._apply(contribution, -1)
+                    self._flagged.pop(id(step), None)
+                    del self._steps[id(step)]
+                removed += 1
+            # Rescanning a few counted steps is harmless; skipping uncounted ones is not
+            self._scanned = max(self._scanned - removed, 0)
+
+    def _analyze(self, step: Any) -> StepContribution:
+        """Compute a step's contribution; the only place a step's text is parsed."""
+        from smolagents import ActionStep
+
+        observations = getattr(step, "observations", None) or ""
+        observations = str(observations)
+        lowered = observations.lower()
+        step_number = getattr(step, "step_number", "?")
+
+        memory_lines = [line for line in observations.split("\n") if line.startswith("[MEMORY")]
+        design_change = "parameter update" in lowered
+
+        issues = []
+        for line in memory_lines:
+            for prefix in LEGACY_RECORD_PREFIXES:
+                if line.startswith(prefix):
+                    try:
+                        json.loads(line[len(prefix) :])
+                    except json.JSONDecodeError:
+                        issues.append(f"Corrupted memory record in step {step_number}")
+                    break
+        warnings = []
+        if design_change and "[MEMORY" not in observations and isinstance(step, ActionStep):
+            warnings.append(f"Step {step_number} has design change but no memory record")
+
+        images = getattr(step, "observations_images", None) or ()
+        element_id = extract_element_id_from_observations(observations) if observations else None
+        return StepContribution(
+            step_type=type(step).__name__,
+            design_change=design_change,
+            element_id=element_id,
+            memory_records=len(memory_lines),
+            mcp_call=any(indicator in lowered for indicator in MCP_INDICATORS),
+            size=len(observations),
+            tokens=self._compactor.step_tokens(step),
+            images=len(images),
+            issues=tuple(issues),
+            warnings=tuple(warnings),
+        )
+
+    def _store(self, key: int, contribution: StepContribution) -> None:
+        """Record a step's (new) contribution and add it to the totals."""
+        self._contributions[key] = contribution
+        if contribution.issues or contribution.warnings:
+            self._flagged[key] = contribution  # A recounted step keeps its position
+        else:
+            self._flagged.pop(key, None)
+        self._apply(contribution, 1)
+
+    def _apply(self, contribution: StepContribution, sign: int) -> None:
+        """Add (sign 1) or subtract (sign -1) a contribution from the totals."""
+        _count(self.steps_by_type, contribution.step_type, sign)
+        if contribution.element_id:
+            _count(self.elements_modified, contribution.element_id, sign)
+        if contribution.design_change:
+            self.design_changes += sign
+            if contribution.element_id:
+                _count(self.design_changes_per_element, contribution.element_id, sign)
+        self.memory_records += sign * contribution.memory_records
+        self.mcp_tool_calls += sign * contribution.mcp_call
+        self.memory_size += sign * contribution.size
+        self.estimated_tokens += sign * contribution.tokens
+        self.images_retained += sign * contribution.images
+        self.steps_with_images += sign * (contribution.images > 0)
+        self.corrupted_records += sign * len(contribution.issues)
+        self.design_changes_without_memory += sign * len(contribution.warnings)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Statistics in the form of get_memory_statistics."""
+        with self._lock:
+            design_changes = self.design_changes
+            return {
+                "total_steps": len(self._contributions),
+                "action_steps": self.steps_by_type.get("ActionStep", 0),
+                "task_steps": self.steps_by_type.get("TaskStep", 0),
+                "design_changes": design_changes,
+                "memory_records": self.memory_records,
+                "elements_modified": list(self.elements_modified),
+                "mcp_tool_calls": self.mcp_tool_calls,
+                "steps_with_images": self.steps_with_images,
+                "memory_size_estimate": self.memory_size,
+                "unique_elements_modified": len(self.elements_modified),
+                "steps_by_type": dict(self.steps_by_type),
+                "design_changes_per_element": dict(self.design_changes_per_element),
+                "estimated_tokens": self.estimated_tokens,
+                "images_retained": self.images_retained,
+                "memory_health": {
+                    "has_design_activity": design_changes > 0,
+                    "has_memory_records": self.memory_records > 0,
+                    "memory_size_mb": self.memory_size / (1024 * 1024),
+                    "avg_records_per_change": (
+                        self.memory_records / design_changes if design_changes > 0 else 0
+                    ),
+                },
+            }
+
+    def validation(self) -> Dict[str, Any]:
+        """Integrity findings in the form of validate_memory_integrity."""
+        with self._lock:
+            issues = [issue for c in self._flagged.values() for issue in c.issues]
+            warnings = [warning for c in self._flagged.values() for warning in c.warnings]
+            if self.design_changes_without_memory > 3:
+                warnings.append(
+                    "High number of design changes without memory tracking - "
+                    "step callbacks may not be properly configured"
+                )
+            return {
+                "valid": self.corrupted_records == 0,
+                "issues": issues,
+                "warnings": warnings,
+                "stats": {
+                    "total_steps": len(self._contributions),
+                    "corrupted_records": self.corrupted_records,
+                    "design_changes_without_memory": self.design_changes_without_memory,
+                    "orphaned_memory_records": 0,
+                },
+            }
+
+
+def _count(counter: Counter, key: str, sign: int) -> None:
+    """Adjust a count, dropping keys that reach zero so only what is in memory is named."""
+    counter[key] += sign
+    if counter[key] <= 0:
+        del counter[key]
+
+
+def get_memory_stats(agent: Any) -> MemoryStatistics:
+    """
+    Get the agent's memory statistics, synced with its memory steps.
+
+    The statistics are created on first use and stored on the agent, sharing
+    the token estimates of the agent's compactor.
+
+    Args:
+        agent: CodeAgent or ToolCallingAgent with memory.steps
+
+    Returns:
+        MemoryStatistics covering every step currently in agent.memory.steps
+    """
+    stats = getattr(agent, "memory_stats", None)
+    if stats is None:
+        stats = MemoryStatistics(get_memory_compactor(agent))
+        agent.memory_stats = stats
+    return stats.sync(agent)
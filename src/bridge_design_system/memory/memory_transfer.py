@@ -0,0 +1,96 @@
+"""
+Incremental Memory Transfer Between Agents
+
+transfer_agent_memory shares design-related steps of a source agent (usually
+the geometry agent) with a target agent (the triage manager). Step objects
+are shared by reference, never copied. Each target keeps a MemoryTransferLog
+with:
+
+- a watermark per (source agent, element filter): the position in the source's
+  element history index up to which steps were already considered, so a
+  repeated transfer only looks at steps added since
+- the steps it received, so a step is never appended twice, even when
+  transfers with different filters overlap or the source index was rebuilt
+
+Received steps are shared with the source, so the target's compactor evicts
+them instead of summarizing them in place.
+"""
+
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+from ..config.logging_config import get_logger
+from .design_records import get_design_records
+from .element_history import ElementHistoryIndex
+
+logger = get_logger(__name__)
+
+# (id of source agent, element filter) -> (source index generation, position)
+Watermark = Tuple[int, int]
+
+
+class MemoryTransferLog:
+    """Watermarks and received steps of one target agent."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._watermarks: Dict[Tuple[int, Optional[str]], Watermark] = {}
+        self._received: Dict[int, Any] = {}  # id(step) -> step, keeps ids stable
+
+    def holds(self, step: Any) -> bool:
+        """Whether a step was received from another agent."""
+        return id(step) in self._received
+
+    def collect(
+        self, source_agent: Any, index: ElementHistoryIndex, element_filter: Optional[str]
+    ) -> List[Any]:
+        """
+        Take the source's design steps not yet sent to this target.
+
+        Args:
+            source_agent: Agent the steps come from
+            index: The source agent's synced element history index
+            element_filter: Only steps referencing this element
+
+        Returns:
+            New steps in source memory order, recorded as received
+        """
+        key = (id(source_agent), element_filter)
+        with self._lock:
+            generation, position = self._watermarks.get(key, (index.generation, 0))
+            if generation != index.generation:
+                position = 0  # Source index was rebuilt; received steps prevent duplicates
+            candidates, end = index.design_steps_since(position, element_filter)
+            self._watermarks[key] = (index.generation, end)
+
+            new_steps = [step for step in candidates if id(step) not in self._received]
+            for step in new_steps:
+                self._received[id(step)] = step
+            return new_steps
+
+    def to_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "received_steps": len(self._received),
+                "watermarks": {
+                    f"{source}:{element or '*'}": position
+                    for (source, element), (_, position) in self._watermarks.items()
+                },
+            }
+
+
+def get_transfer_log(agent: Any) -> MemoryTransferLog:
+    """Get the target agent's transfer log, creating it on first use."""
+    log = getattr(agent, "memory_transfers", None)
+    if log is None:
+        log = MemoryTransferLog()
+        agent.memory_transfers = log
+    return log
+
+
+def share_design_records(source_agent: Any, target_agent: Any, steps: List[Any]) -> None:
+    """Give the target the source's design records of transferred steps."""
+    source_records = get_design_records(source_agent)
+    target_records = get_design_records(target_agent)
+    for step in steps:
+        target_records.attach(step, source_records.for_step(step))
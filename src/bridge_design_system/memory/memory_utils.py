@@ -11,6 +11,7 @@ from datetime import datetime
 from typing import Any, Dict, List, Optional
 
 from ..config.logging_config import get_logger
+from .memory_compaction import MemoryCompactor
 
 logger = get_logger(__name__)
 
@@ -109,17 +110,21 @@ def format_memory_record(
         )
 
 
-def cleanup_old_memory_steps(agent: Any, keep_last_n: int = 3) -> int:
+def cleanup_old_memory_steps(
+    agent: Any, keep_last_n: int = 3, max_context_tokens: Optional[int] = None
+) -> int:
     """
     Clean up old memory steps to prevent memory bloat.
 
     Implements the smolagents memory cleanup pattern from documentation,
-    removing old observations_images and compressing old detailed observations
-    while preserving memory records.
+    removing old observations_images, then summarizing and evicting the oldest
+    steps until memory fits the token budget. Steps holding original element
+    state are never summarized or evicted.
 
     Args:
         agent: Agent with memory.steps to clean up
         keep_last_n: Number of recent steps to keep with full detail
+        max_context_tokens: Token budget (defaults to the max_context_tokens setting)
 
     Returns:
         Number of steps cleaned up
@@ -131,42 +136,14 @@ def cleanup_old_memory_steps(agent: Any, keep_last_n: int = 3) -> int:
         if not hasattr(agent, "memory") or not hasattr(agent.memory, "steps"):
             return 0
 
-        cleaned_steps = 0
-        total_steps = len(agent.memory.steps)
-
-        if total_steps <= keep_last_n:
+        if len(agent.memory.steps) <= keep_last_n:
             return 0  # Not enough steps to clean
 
-        # Get the latest step number for reference
-        latest_step_num = max(
-            step.step_number for step in agent.memory.steps if hasattr(step, "step_number")
-        )
-
-        from smolagents import ActionStep
-
-        for step in agent.memory.steps:
-            if isinstance(step, ActionStep):
-                step_age = latest_step_num - getattr(step, "step_number", 0)
-
-                # Clean up observations_images for steps older than keep_last_n
-                if step_age > keep_last_n and hasattr(step, "observations_images"):
-                    if step.observations_images is not None:
-                        step.observations_images = None
-                        cleaned_steps += 1
-
-                # Compress very old detailed observations (keep only memory records)
-                if step_age > keep_last_n * 2 and hasattr(step, "observations"):
-                    if step.observations:
-                        lines = step.observations.split("\n")
-                        memory_lines = [line for line in lines if line.startswith("[MEMORY")]
+        compactor = MemoryCompactor(max_context_tokens, keep_recent=keep_last_n)
+        report = compactor.compact(agent)
 
-                        if memory_lines and len(memory_lines) < len(lines):
-                            # Compress to memory records only
-                            step.observations = "\n".join(memory_lines)
-                            cleaned_steps += 1
-
-        logger.debug(f"🧹 Cleaned up {cleaned_steps} old memory steps")
-        return cleaned_steps
+        logger.debug(f"🧹 Cleaned up {report.steps_changed} old memory steps: {report.to_dict()}")
+        return report.steps_changed
 
     except Exception as e:
         logger.error(f"❌ Error cleaning up memory steps: {e}")
@@ -178,13 +155,16 @@ def get_memory_statistics(agent: Any) -> Dict[str, Any]:
     Get statistics about agent memory usage and content.
 
     Provides overview of memory health, design activity, and storage usage
-    for monitoring and debugging purposes.
+    for monitoring and debugging purposes. Served from the agent's running
+    counters (see memory_stats), so only steps added since the last call are
+    analyzed and polling is cheap.
 
     Args:
         agent: Agent with memory.steps to analyze
 
     Returns:
-        Dictionary with memory statistics
+        Dictionary with memory statistics, including steps_by_type,
+        design_changes_per_element, estimated_tokens and images_retained
 
     Example:
         >>> stats = get_memory_statistics(geometry_agent)
@@ -195,83 +175,9 @@ def get_memory_statistics(agent: Any) -> Dict[str, Any]:
         if not hasattr(agent, "memory") or not hasattr(agent.memory, "steps"):
             return {"error": "Agent has no memory.steps"}
 
-        from smolagents import ActionStep, TaskStep
-
-        stats = {
-            "total_steps": len(agent.memory.steps),
-            "action_steps": 0,
-            "task_steps": 0,
-            "design_changes": 0,
-            "memory_records": 0,
-            "elements_modified": set(),
-            "mcp_tool_calls": 0,
-            "steps_with_images": 0,
-            "memory_size_estimate": 0,
-        }
-
-        for step in agent.memory.steps:
-            # Count step types
-            if isinstance(step, ActionStep):
-                stats["action_steps"] += 1
-
-                # Count image storage
-                if hasattr(step, "observations_images") and step.observations_images:
-                    stats["steps_with_images"] += 1
-
-            elif isinstance(step, TaskStep):
-                stats["task_steps"] += 1
-
-            # Analyze observations for design activity
-            if hasattr(step, "observations") and step.observations:
-                observations = step.observations
-
-                # Count design changes
-                if "parameter update" in observations.lower():
-                    stats["design_changes"] += 1
-
-                # Count memory records
-                memory_lines = [
-                    line for line in observations.split("\n") if line.startswith("[MEMORY")
-                ]
-                stats["memory_records"] += len(memory_lines)
-
-                # Extract modified elements
-                element_id = extract_element_id_from_observations(observations)
-                if element_id:
-                    stats["elements_modified"].add(element_id)
-
-                # Count MCP tool calls
-                if any(
-                    mcp_indicator in observations.lower()
-                    for mcp_indicator in [
-                        "edit_python3_script",
-                        "get_python3_script",
-                        "rg.point3d",
-                        "rg.vector3d",
-                    ]
-                ):
-                    stats["mcp_tool_calls"] += 1
-
-                # Estimate memory size
-                stats["memory_size_estimate"] += len(observations)
-
-        # Convert set to count
-        stats["unique_elements_modified"] = len(stats["elements_modified"])
-        stats["elements_modified"] = list(stats["elements_modified"])
-
-        # Add memory health indicators
-        stats["memory_health"] = {
-            "has_design_activity": stats["design_changes"] > 0,
-            "has_memory_records": stats["memory_records"] > 0,
-            "memory_size_mb": stats["memory_size_estimate"] / (1024 * 1024),
-            "avg_records_per_change": (
-                stats["memory_records"] / stats["design_changes"]
-                if stats["design_changes"] > 0
-                else 0
-            ),
-        }
+        from .memory_stats import get_memory_stats
 
-        return stats
+        return get_memory_stats(agent).to_dict()
 
     except Exception as e:
         logger.error(f"❌ Error getting memory statistics: {e}")
@@ -287,6 +193,9 @@ def validate_memory_integrity(agent: Any) -> Dict[str, Any]:
     - Corrupted JSON in memory records
     - Inconsistent element tracking
 
+    Each step is validated once, when it is added to the running counters, so
+    repeated calls only validate new steps.
+
     Args:
         agent: Agent to validate memory for
 
@@ -297,65 +206,9 @@ def validate_memory_integrity(agent: Any) -> Dict[str, Any]:
         if not hasattr(agent, "memory") or not hasattr(agent.memory, "steps"):
             return {"valid": False, "error": "Agent has no memory.steps"}
 
-        validation = {
-            "valid": True,
-            "issues": [],
-            "warnings": [],
-            "stats": {
-                "total_steps": len(agent.memory.steps),
-                "corrupted_records": 0,
-                "design_changes_without_memory": 0,
-                "orphaned_memory_records": 0,
-            },
-        }
+        from .memory_stats import get_memory_stats
 
-        from smolagents import ActionStep
-
-        for step in agent.memory.steps:
-            if isinstance(step, ActionStep) and hasattr(step, "observations"):
-                if step.observations:
-                    # Check for design changes without memory records
-                    has_design_change = "parameter update" in step.observations.lower()
-                    has_memory_record = "[MEMORY" in step.observations
-
-                    if has_design_change and not has_memory_record:
-                        validation["stats"]["design_changes_without_memory"] += 1
-                        validation["warnings"].append(
-                            f"Step {getattr(step, 'step_number', '?')} has design change but no memory record"
-                        )
-
-                    # Validate JSON in memory records
-                    for line in step.observations.split("\n"):
-                        if line.startswith("[MEMORY"):
-                            try:
-                                # Extract and parse JSON
-                                for prefix in [
-                                    "[MEMORY_ORIGINAL] ",
-                                    "[MEMORY_UPDATE] ",
-                                    "[MEMORY_MCP] ",
-                                ]:
-                                    if line.startswith(prefix):
-                                        record_json = line.replace(prefix, "")
-                                        json.loads(record_json)  # Validate JSON
-                                        break
-                            except json.JSONDecodeError:
-                                validation["stats"]["corrupted_records"] += 1
-                                validation["issues"].append(
-                                    f"Corrupted memory record in step {getattr(step, 'step_number', '?')}"
-                                )
-                                validation["valid"] = False
-
-        # Overall validation
-        if validation["stats"]["corrupted_records"] > 0:
-            validation["valid"] = False
-
-        if validation["stats"]["design_changes_without_memory"] > 3:
-            validation["warnings"].append(
-                "High number of design changes without memory tracking - "
-                "step callbacks may not be properly configured"
-            )
-
-        return validation
+        return get_memory_stats(agent).validation()
 
     except Exception as e:
         logger.error(f"❌ Error validating memory integrity: {e}")
@@ -0,0 +1,23 @@
+"""
+Recording and replay of HOLO1 ROS streams.
+
+Records gaze and model messages to a compact binary log and plays them back
+through a local rosbridge-compatible server, so AR sessions can be reproduced
+and load-tested without HoloLens hardware.
+"""
+
+from .stream_log import (
+    GAZE_TOPIC,
+    MODEL_TOPIC,
+    StreamRecorder,
+    read_stream_log,
+    record_session,
+)
+
+__all__ = [
+    "GAZE_TOPIC",
+    "MODEL_TOPIC",
+    "StreamRecorder",
+    "read_stream_log",
+    "record_session",
+]
@@ -0,0 +1,210 @@
+"""
+Local rosbridge-compatible server that replays a recorded stream log.
+
+Speaks enough of the rosbridge v2 JSON protocol for roslibpy clients such as
+VizorListener: clients subscribe to /HOLO1_GazePoint and /HOLO1_Model and
+receive the recorded messages as "publish" operations, with the original
+timing scaled by a playback rate. Start it on port 9090 and run main.py as
+usual to drive gaze windows, the transform queue and direct updates from a
+recording:
+
+    python -m bridge_design_system.ros_replay.replay_server session.vzrl --rate 10
+"""
+
+import asyncio
+import json
+import logging
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Set, Union
+
+import websockets
+
+from .stream_log import GAZE_TOPIC, MODEL_TOPIC, read_stream_log
+
+logger = logging.getLogger(__name__)
+
+
+class StreamReplayServer:
+    """
+    Replay a stream log to rosbridge clients.
+
+    Features:
+    - Playback at 1x or any accelerated rate (rate=0 sends as fast as possible)
+    - Playback starts once both the gaze and the model topic are subscribed
+      (optionally after a start delay), so no messages are lost
+    - Optional looping for soak tests
+    """
+
+    def __init__(
+        self,
+        log_path: Union[str, Path],
+        host: str = "localhost",
+        port: int = 9090,
+        rate: float = 1.0,
+        loop: bool = False,
+        start_delay: float = 0.0,
+    ):
+        """
+        Initialize the replay server.
+
+        Args:
+            log_path: Stream log to replay
+            host: Interface to listen on
+            port: Port to listen on (rosbridge default 9090)
+            rate: Playback speed multiplier; 0 disables pacing
+            loop: Restart from the beginning when the log ends
+            start_delay: Seconds to wait after both topics are subscribed before playing,
+                for clients that set up more state after subscribing
+        """
+        self.log_path = Path(log_path)
+        self.host = host
+        self.port = port
+        self.rate = rate
+        self.loop = loop
+        self.start_delay = start_delay
+        self._subscriptions: Dict[Any, Set[str]] = {}
+        self._subscribed_topics: Set[str] = set()
+        self._all_subscribed = asyncio.Event()
+        self.published = {GAZE_TOPIC: 0, MODEL_TOPIC: 0}
+        self.finished = False
+
+    async def run(self) -> None:
+        """Serve clients until playback ends (forever when looping)."""
+        async with websockets.serve(self._handle_client, self.host, self.port):
+            logger.info(f"Replay server for {self.log_path} listening on {self.host}:{self.port}")
+            await self._all_subscribed.wait()
+            if self.start_delay > 0:
+                await asyncio.sleep(self.start_delay)
+            while True:
+                await self._play_once()
+                if not self.loop:
+                    break
+            self.finished = True
+            logger.info(f"Replay finished: {self.published}")
+
+    async def _play_once(self) -> None:
+        start_wall = time.monotonic()
+        start_log = None
+        for timestamp, topic, message in read_stream_log(self.log_path):
+            if start_log is None:
+                start_log = timestamp
+            if self.rate > 0:
+                delay = (timestamp - start_log) / self.rate - (time.monotonic() - start_wall)
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            await self._publish(topic, message)
+
+    async def _publish(self, topic: str, message: Dict[str, Any]) -> None:
+        frame = json.dumps({"op": "publish", "topic": topic, "msg": message})
+        for websocket, topics in list(self._subscriptions.items()):
+            if topic not in topics:
+                continue
+            try:
+                await websocket.send(frame)
+            except websockets.exceptions.ConnectionClosed:
+                self._subscriptions.pop(websocket, None)
+        self.published[topic] += 1
+
+    async def _handle_client(self, websocket, path: Optional[str] = None) -> None:
+        self._subscriptions[websocket] = set()
+        try:
+            async for frame in websocket:
+                try:
+                    request = json.loads(frame)
+                except json.JSONDecodeError:
+                    continue
+                await self._handle_operation(websocket, request)
+        except websockets.exceptions.ConnectionClosed:
+            pass
+        finally:
+            self._subscriptions.pop(websocket, None)
+
+    async def _handle_operation(self, websocket, request: Dict[str, Any]) -> None:
+        operation, topic = request.get("op"), request.get("topic")
+        if operation == "subscribe":
+            self._subscriptions[websocket].add(topic)
+            logger.info(f"Client subscribed to {topic}")
+            # Topics may be subscribed by different clients; start once both have one
+            self._subscribed_topics.add(topic)
+            if {GAZE_TOPIC, MODEL_TOPIC} <= self._subscribed_topics:
+                self._all_subscribed.set()
+        elif operation == "unsubscribe":
+            self._subscriptions[websocket].discard(topic)
+        elif operation == "call_service":
+            # No services are replayed; answer so callers do not wait forever
+            await websocket.send(
+                json.dumps(
+                    {
+                        "op": "service_response",
+                        "id": request.get("id"),
+                        "service": request.get("service"),
+                        "values": {},
+                        "result": False,
+                    }
+                )
+            )
+
+
+def replay_to_handlers(
+    log_path: Union[str, Path],
+    handlers: Dict[str, Callable[[Dict[str, Any]], None]],
+    rate: float = 0.0,
+) -> Dict[str, int]:
+    """
+    Replay a stream log straight into message handlers, without a socket.
+
+    For benchmarks: pass e.g. {GAZE_TOPIC: listener._handle_gaze_message,
+    MODEL_TOPIC: listener._handle_model_message}.
+
+    Args:
+        log_path: Stream log to replay
+        handlers: Callback per topic; topics without a handler are skipped
+        rate: Playback speed multiplier; 0 replays as fast as possible
+
+    Returns:
+        Number of messages delivered per topic
+    """
+    delivered = {topic: 0 for topic in handlers}
+    start_wall = time.monotonic()
+    start_log = None
+    for timestamp, topic, message in read_stream_log(log_path):
+        if start_log is None:
+            start_log = timestamp
+        handler = handlers.get(topic)
+        if handler is None:
+            continue
+        if rate > 0:
+            delay = (timestamp - start_log) / rate - (time.monotonic() - start_wall)
+            if delay > 0:
+                time.sleep(delay)
+        handler(message)
+        delivered[topic] += 1
+    return delivered
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Replay a HOLO1 stream log over rosbridge")
+    parser.add_argument("path", help="Stream log file to replay")
+    parser.add_argument("--host", default="localhost")
+    parser.add_argument("--port", type=int, default=9090)
+    parser.add_argument("--rate", type=float, default=1.0, help="Speed multiplier (0 = max)")
+    parser.add_argument("--loop", action="store_true", help="Repeat the log until interrupted")
+    parser.add_argument(
+        "--start-delay",
+        type=float,
+        default=0.0,
+        help="Seconds to wait after both topics are subscribed before playing",
+    )
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+    server = StreamReplayServer(
+        args.path, args.host, args.port, args.rate, args.loop, args.start_delay
+    )
+    try:
+        asyncio.run(server.run())
+    except KeyboardInterrupt:
+        print("\nReplay stopped")
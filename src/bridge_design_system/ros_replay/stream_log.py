@@ -0,0 +1,236 @@
+"""
+Compact binary log of HOLO1 gaze and model messages.
+
+Lets AR sessions be recorded once and replayed without HoloLens hardware.
+Every record is a fixed header followed by a topic-specific payload:
+
+    header:  "<dBI"  timestamp (epoch seconds), topic code, payload length
+    gaze:    UTF-8 element name
+    model:   "<H" element count, then per element "<H" name length, the
+             UTF-8 name and "<7d" position x, y, z and orientation w, x, y, z
+
+A model message with 20 elements takes about 1.4 KB instead of ~3.3 KB as JSON.
+The file starts with MAGIC and a format version byte.
+"""
+
+import logging
+import struct
+import threading
+import time
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, Iterator, Optional, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"VZRL"
+FORMAT_VERSION = 1
+
+GAZE_TOPIC = "/HOLO1_GazePoint"
+MODEL_TOPIC = "/HOLO1_Model"
+TOPIC_TYPES = {GAZE_TOPIC: "std_msgs/String", MODEL_TOPIC: "vizor_package/Model"}
+
+_TOPIC_CODES = {GAZE_TOPIC: 0, MODEL_TOPIC: 1}
+_CODE_TOPICS = {code: topic for topic, code in _TOPIC_CODES.items()}
+_HEADER = struct.Struct("<dBI")
+_COUNT = struct.Struct("<H")
+_POSE = struct.Struct("<7d")
+
+StreamRecord = Tuple[float, str, Dict[str, Any]]  # (timestamp, topic, rosbridge message)
+
+
+def encode_message(topic: str, message: Dict[str, Any]) -> bytes:
+    """Encode a gaze or model message payload."""
+    if topic == GAZE_TOPIC:
+        return str(message.get("data", "")).encode("utf-8")
+
+    names = message.get("names", [])
+    poses = message.get("poses", [])
+    parts = [_COUNT.pack(min(len(names), len(poses)))]
+    for name, pose in zip(names, poses):
+        encoded = str(name).encode("utf-8")
+        position, orientation = pose["position"], pose["orientation"]
+        parts.append(_COUNT.pack(len(encoded)))
+        parts.append(encoded)
+        parts.append(
+            _POSE.pack(*(position[axis] for axis in "xyz"), *(orientation[axis] for axis in "wxyz"))
+        )
+    return b"".join(parts)
+
+
+def decode_message(topic: str, payload: bytes) -> Dict[str, Any]:
+    """Decode a payload back into the message dict rosbridge would deliver."""
+    if topic == GAZE_TOPIC:
+        return {"data": payload.decode("utf-8")}
+
+    (count,) = _COUNT.unpack_from(payload, 0)
+    offset = _COUNT.size
+    names, poses = [], []
+    for _ in range(count):
+        (length,) = _COUNT.unpack_from(payload, offset)
+        offset += _COUNT.size
+        names.append(payload[offset : offset + length].decode("utf-8"))
+        offset += length
+        px, py, pz, qw, qx, qy, qz = _POSE.unpack_from(payload, offset)
+        offset += _POSE.size
+        poses.append(
+            {
+                "position": {"x": px, "y": py, "z": pz},
+                "orientation": {"x": qx, "y": qy, "z": qz, "w": qw},
+            }
+        )
+    return {"names": names, "poses": poses}
+
+
+class StreamRecorder:
+    """
+    Append gaze and model messages to a binary stream log.
+
+    The record methods match roslibpy subscription callbacks and are safe to call
+    from the roslibpy thread:
+
+        recorder = StreamRecorder("session.vzrl")
+        gaze_topic.subscribe(recorder.record_gaze)
+        model_topic.subscribe(recorder.record_model)
+    """
+
+    def __init__(self, path: Union[str, Path], flush_interval: float = 1.0):
+        """
+        Open a new log file (an existing file is overwritten).
+
+        Args:
+            path: Log file path
+            flush_interval: Seconds between flushes to disk
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.flush_interval = flush_interval
+        self._file: Optional[BinaryIO] = open(self.path, "wb")
+        self._file.write(MAGIC + bytes([FORMAT_VERSION]))
+        self._lock = threading.Lock()
+        self._last_flush = time.monotonic()
+        self.counts = {GAZE_TOPIC: 0, MODEL_TOPIC: 0}
+
+    def __enter__(self) -> "StreamRecorder":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def record(self, topic: str, message: Dict[str, Any], timestamp: Optional[float] = None):
+        """Append one message; timestamp defaults to now."""
+        payload = encode_message(topic, message)
+        header = _HEADER.pack(
+            time.time() if timestamp is None else timestamp, _TOPIC_CODES[topic], len(payload)
+        )
+        with self._lock:
+            if self._file is None:
+                return
+            self._file.write(header + payload)
+            self.counts[topic] += 1
+            if time.monotonic() - self._last_flush >= self.flush_interval:
+                self._file.flush()
+                self._last_flush = time.monotonic()
+
+    def record_gaze(self, message: Dict[str, Any]) -> None:
+        self.record(GAZE_TOPIC, message)
+
+    def record_model(self, message: Dict[str, Any]) -> None:
+        self.record(MODEL_TOPIC, message)
+
+    def close(self) -> None:
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+        logger.info(
+            f"Stream log {self.path} closed: {self.counts[GAZE_TOPIC]} gaze, "
+            f"{self.counts[MODEL_TOPIC]} model messages"
+        )
+
+
+def read_stream_log(path: Union[str, Path]) -> Iterator[StreamRecord]:
+    """
+    Iterate over the records of a stream log.
+
+    A record truncated by an interrupted recording ends the iteration.
+
+    Yields:
+        (timestamp, topic, message) with messages in rosbridge dict form
+    """
+    with open(path, "rb") as log_file:
+        preamble = log_file.read(len(MAGIC) + 1)
+        if preamble[: len(MAGIC)] != MAGIC:
+            raise ValueError(f"{path} is not a stream log")
+        if preamble[len(MAGIC)] != FORMAT_VERSION:
+            raise ValueError(f"Unsupported stream log version {preamble[len(MAGIC)]}")
+
+        while True:
+            header = log_file.read(_HEADER.size)
+            if len(header) < _HEADER.size:
+                return
+            timestamp, code, length = _HEADER.unpack(header)
+            payload = log_file.read(length)
+            if len(payload) < length:
+                logger.warning(f"Truncated record at end of {path}")
+                return
+            topic = _CODE_TOPICS[code]
+            yield timestamp, topic, decode_message(topic, payload)
+
+
+def record_session(
+    path: Union[str, Path],
+    host: str = "localhost",
+    port: int = 9090,
+    duration: Optional[float] = None,
+) -> Dict[str, int]:
+    """
+    Record gaze and model messages from a live rosbridge.
+
+    Args:
+        path: Log file to write
+        host: rosbridge host
+        port: rosbridge port
+        duration: Seconds to record (None records until interrupted)
+
+    Returns:
+        Message counts per topic
+    """
+    import roslibpy
+
+    client = roslibpy.Ros(host=host, port=port)
+    client.run()
+    recorder = StreamRecorder(path)
+    topics = [
+        roslibpy.Topic(client, GAZE_TOPIC, TOPIC_TYPES[GAZE_TOPIC]),
+        roslibpy.Topic(client, MODEL_TOPIC, TOPIC_TYPES[MODEL_TOPIC]),
+    ]
+    topics[0].subscribe(recorder.record_gaze)
+    topics[1].subscribe(recorder.record_model)
+    logger.info(f"Recording {GAZE_TOPIC} and {MODEL_TOPIC} from {host}:{port} to {path}")
+
+    try:
+        deadline = None if duration is None else time.monotonic() + duration
+        while deadline is None or time.monotonic() < deadline:
+            time.sleep(0.2)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        for topic in topics:
+            topic.unsubscribe()
+        client.terminate()
+        recorder.close()
+    return dict(recorder.counts)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Record HOLO1 gaze/model messages")
+    parser.add_argument("path", help="Stream log file to write")
+    parser.add_argument("--host", default="localhost")
+    parser.add_argument("--port", type=int, default=9090)
+    parser.add_argument("--duration", type=float, default=None, help="Seconds to record")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+    print(record_session(args.path, args.host, args.port, args.duration))
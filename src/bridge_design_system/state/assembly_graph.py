@@ -0,0 +1,429 @@
+"""
+Persistent assembly graph for incremental structural validation.
+
+Direct Parameter Updates from AR move one or two elements at a time. Instead of
+re-validating the whole element list after every move, the assembly graph keeps
+beam endpoints in a spatial index together with the status of every joint
+(endpoint pair within connection range) and every element's orientation. Moving
+an element only re-examines that element's endpoints, so "what broke after this
+move" costs time proportional to the elements touched.
+"""
+
+import logging
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from ..tools.endpoint_index import (
+    JOINT_GAP,
+    JOINT_OK,
+    JOINT_OVERLAP,
+    JOINT_SEARCH_RADIUS_MM,
+    MAX_JOINT_GAP_MM,
+    MIN_JOINT_GAP_MM,
+    EndpointGrid,
+    classify_joint,
+    connection_suffix,
+)
+from ..tools.geometry_kernel import element_endpoints
+
+logger = logging.getLogger(__name__)
+
+EndpointKey = Tuple[str, int]  # (element_id, START or END)
+JointKey = Tuple[EndpointKey, EndpointKey]  # Ordered by element insertion order
+
+Z_TOLERANCE_MM = 0.001  # Shared with validate_planar_orientation
+
+
+@dataclass
+class Joint:
+    """Status of one endpoint pair within connection range."""
+
+    connection_id: str  # e.g. "021-022_se", same format as check_element_connectivity
+    distance: float  # XY distance between the endpoints in mm
+    status: str  # JOINT_OK, JOINT_GAP or JOINT_OVERLAP
+
+    @property
+    def is_problem(self) -> bool:
+        return self.status != JOINT_OK
+
+    def issue(self) -> str:
+        """Issue text in the same wording as check_element_connectivity."""
+        if self.status == JOINT_OVERLAP:
+            return f"Physical overlap: {self.distance:.3f}mm gap (need ≥{MIN_JOINT_GAP_MM}mm)"
+        return (
+            f"Connection gap: {self.distance:.3f}mm "
+            f"(should be {MIN_JOINT_GAP_MM}-{MAX_JOINT_GAP_MM}mm)"
+        )
+
+
+@dataclass
+class ChangeReport:
+    """What changed in the assembly's validity after an update."""
+
+    touched_elements: List[str] = field(default_factory=list)
+    broken_joints: Dict[str, Joint] = field(default_factory=dict)  # Newly gap/overlap
+    fixed_joints: List[str] = field(default_factory=list)  # Problem before, ok or gone now
+    open_joints: Dict[str, Joint] = field(default_factory=dict)  # Problems at touched elements
+    broken_orientation: List[str] = field(default_factory=list)
+    fixed_orientation: List[str] = field(default_factory=list)
+    affected_modules: List[str] = field(default_factory=list)
+    assembly_valid: bool = True
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serialize for tool results."""
+        return {
+            "valid": self.assembly_valid,
+            "touched_elements": self.touched_elements,
+            "broken": {
+                "gaps": _distances(self.broken_joints, JOINT_GAP),
+                "overlaps": _distances(self.broken_joints, JOINT_OVERLAP),
+                "non_horizontal": self.broken_orientation,
+            },
+            "fixed": {
+                "connections": self.fixed_joints,
+                "non_horizontal": self.fixed_orientation,
+            },
+            "open_issues": [joint.issue() for joint in self.open_joints.values()],
+            "affected_modules": self.affected_modules,
+        }
+
+
+def _distances(joints: Dict[str, Joint], status: str) -> Dict[str, float]:
+    return {cid: round(j.distance, 3) for cid, j in joints.items() if j.status == status}
+
+
+class AssemblyGraph:
+    """
+    Incrementally maintained connectivity and orientation state of an assembly.
+
+    Features:
+    - Thread-safe element upserts and removals
+    - Endpoint grid index for neighbour lookups within connection range
+    - Per-joint and per-element status, updated only around moved elements
+    - Module membership so closure checks can be limited to affected modules
+    """
+
+    def __init__(self):
+        """Initialize an empty assembly graph."""
+        self.elements: Dict[str, Dict[str, Any]] = {}
+        self._order: Dict[str, int] = {}  # element_id -> insertion order
+        self._next_order = 0
+
+        # Indexes
+        self._grid = EndpointGrid(cell_size=JOINT_SEARCH_RADIUS_MM)
+        self._joints: Dict[JointKey, Joint] = {}
+        self._element_joints: Dict[str, Set[JointKey]] = {}
+        self._problem_joints: Set[JointKey] = set()
+        self._non_horizontal: Set[str] = set()
+
+        # Modules
+        self._modules: Dict[str, Tuple[str, List[str]]] = {}  # id -> (type, element ids)
+        self._element_modules: Dict[str, Set[str]] = {}
+
+        # Thread safety
+        self._lock = threading.RLock()
+
+        logger.info("AssemblyGraph initialized")
+
+    def __len__(self) -> int:
+        return len(self.elements)
+
+    # ==================== UPDATES ====================
+
+    def update_elements(self, elements: Iterable[Dict[str, Any]]) -> ChangeReport:
+        """
+        Insert or update elements and re-validate only their joints.
+
+        Updates are merged into the stored element, so a Direct Parameter Update
+        may carry just id, center_point and direction.
+
+        Args:
+            elements: Element dicts with id and any of center_point, direction, length
+
+        Returns:
+            ChangeReport describing what broke and what got fixed
+        """
+        with self._lock:
+            merged = []
+            for element in elements:
+                if "id" not in element:
+                    raise ValueError(f"Element update without id: {element}")
+                element_id = str(element["id"])
+                merged.append({**self.elements.get(element_id, {}), **element, "id": element_id})
+
+            if not merged:
+                return ChangeReport(assembly_valid=self.is_valid())
+
+            touched = list(dict.fromkeys(element["id"] for element in merged))
+            old_joints = self._detach(touched)
+            old_non_horizontal = self._non_horizontal & set(touched)
+
+            starts, ends = element_endpoints(merged)
+            for element, start, end in zip(merged, starts.tolist(), ends.tolist()):
+                element_id = element["id"]
+                self.elements[element_id] = element
+                if element_id not in self._order:
+                    self._order[element_id] = self._next_order
+                    self._next_order += 1
+                self._grid.insert((element_id, 0), start)
+                self._grid.insert((element_id, 1), end)
+                if abs(end[2] - start[2]) > Z_TOLERANCE_MM:
+                    self._non_horizontal.add(element_id)
+                else:
+                    self._non_horizontal.discard(element_id)
+
+            for element_id in touched:
+                self._attach(element_id)
+
+            return self._report(touched, old_joints, old_non_horizontal)
+
+    def remove_elements(self, element_ids: Iterable[str]) -> ChangeReport:
+        """
+        Remove elements and their joints.
+
+        Args:
+            element_ids: IDs of elements to remove; unknown IDs are ignored
+
+        Returns:
+            ChangeReport (removed problem joints are listed as fixed)
+        """
+        with self._lock:
+            touched = [str(eid) for eid in element_ids if str(eid) in self.elements]
+            old_joints = self._detach(touched)
+            old_non_horizontal = self._non_horizontal & set(touched)
+
+            for element_id in touched:
+                del self.elements[element_id]
+                del self._order[element_id]
+                self._non_horizontal.discard(element_id)
+                for module_id in self._element_modules.pop(element_id, ()):
+                    module_type, members = self._modules[module_id]
+                    self._modules[module_id] = (
+                        module_type,
+                        [member for member in members if member != element_id],
+                    )
+
+            return self._report(touched, old_joints, old_non_horizontal)
+
+    def set_module(self, module_id: str, module_type: str, element_ids: List[str]) -> None:
+        """
+        Declare which elements form a module so closure checks can be scoped.
+
+        Args:
+            module_id: Module identifier
+            module_type: "A*", "B*", "A" or "B"
+            element_ids: Elements forming the module
+        """
+        with self._lock:
+            self._drop_module(module_id)
+            element_ids = [str(eid) for eid in element_ids]
+            self._modules[module_id] = (module_type, element_ids)
+            for element_id in element_ids:
+                self._element_modules.setdefault(element_id, set()).add(module_id)
+
+    def clear(self) -> None:
+        """Remove all elements, joints and modules."""
+        with self._lock:
+            self.elements.clear()
+            self._order.clear()
+            self._grid = EndpointGrid(cell_size=JOINT_SEARCH_RADIUS_MM)
+            self._joints.clear()
+            self._element_joints.clear()
+            self._problem_joints.clear()
+            self._non_horizontal.clear()
+            self._modules.clear()
+            self._element_modules.clear()
+
+    # ==================== QUERIES ====================
+
+    def is_valid(self) -> bool:
+        """True when no joint has a gap or overlap and every element is horizontal."""
+        with self._lock:
+            return not self._problem_joints and not self._non_horizontal
+
+    def joints_for(self, element_id: str) -> Dict[str, Joint]:
+        """All joints of one element, keyed by connection ID."""
+        with self._lock:
+            return {
+                self._joints[key].connection_id: self._joints[key]
+                for key in self._element_joints.get(str(element_id), ())
+            }
+
+    def module(self, module_id: str) -> Optional[Tuple[str, List[Dict[str, Any]]]]:
+        """Module type and current element dicts, or None if unknown."""
+        with self._lock:
+            if module_id not in self._modules:
+                return None
+            module_type, element_ids = self._modules[module_id]
+            return module_type, [self.elements[eid] for eid in element_ids if eid in self.elements]
+
+    def connectivity_result(self) -> Dict[str, Any]:
+        """
+        Current problems across the whole assembly.
+
+        Returns:
+            Dict in the check_element_connectivity shape: valid, gaps, overlaps, issues
+        """
+        with self._lock:
+            problems = sorted(
+                (self._joints[key] for key in self._problem_joints),
+                key=lambda joint: joint.connection_id,
+            )
+            return {
+                "valid": not problems,
+                "gaps": _distances({j.connection_id: j for j in problems}, JOINT_GAP),
+                "overlaps": _distances({j.connection_id: j for j in problems}, JOINT_OVERLAP),
+                "issues": [joint.issue() for joint in problems],
+            }
+
+    def get_stats(self) -> Dict[str, int]:
+        """Sizes of the graph's indexes."""
+        with self._lock:
+            return {
+                "elements": len(self.elements),
+                "joints": len(self._joints),
+                "problem_joints": len(self._problem_joints),
+                "non_horizontal_elements": len(self._non_horizontal),
+                "modules": len(self._modules),
+            }
+
+    # ==================== INTERNALS ====================
+
+    def _joint_key(self, a: EndpointKey, b: EndpointKey) -> JointKey:
+        """Order a pair by element insertion order, then endpoint kind."""
+        if (self._order[a[0]], a[1]) <= (self._order[b[0]], b[1]):
+            return a, b
+        return b, a
+
+    def _detach(self, element_ids: List[str]) -> Dict[str, Joint]:
+        """Remove elements' endpoints and joints; return the removed joints by connection ID."""
+        removed = {}
+        for element_id in element_ids:
+            for key in self._element_joints.pop(element_id, set()):
+                joint = self._joints.pop(key, None)
+                if joint is None:
+                    continue  # Already removed from the other element's side
+                removed[joint.connection_id] = joint
+                self._problem_joints.discard(key)
+                (a, _), (b, _) = key
+                other = b if a == element_id else a
+                self._element_joints.get(other, set()).discard(key)
+            self._grid.remove((element_id, 0))
+            self._grid.remove((element_id, 1))
+        return removed
+
+    def _attach(self, element_id: str) -> None:
+        """Find and classify the joints of an element's freshly inserted endpoints."""
+        for end in (0, 1):
+            endpoint = (element_id, end)
+            point = self._grid.point(endpoint)
+            for neighbour, distance in self._grid.query(point, JOINT_SEARCH_RADIUS_MM):
+                if neighbour[0] == element_id:
+                    continue
+                status = classify_joint(distance)
+                if status is None:
+                    continue
+                key = self._joint_key(endpoint, neighbour)
+                if key in self._joints:
+                    continue  # Found from the other touched element
+                (a, end_a), (b, end_b) = key
+                joint = Joint(f"{a}-{b}_{connection_suffix(end_a, end_b)}", distance, status)
+                self._joints[key] = joint
+                self._element_joints.setdefault(a, set()).add(key)
+                self._element_joints.setdefault(b, set()).add(key)
+                if joint.is_problem:
+                    self._problem_joints.add(key)
+
+    def _report(
+        self, touched: List[str], old_joints: Dict[str, Joint], old_non_horizontal: Set[str]
+    ) -> ChangeReport:
+        report = ChangeReport(touched_elements=touched)
+
+        current = {}
+        for element_id in touched:
+            current.update(self.joints_for(element_id))
+
+        for connection_id, joint in current.items():
+            if not joint.is_problem:
+                continue
+            report.open_joints[connection_id] = joint
+            old = old_joints.get(connection_id)
+            if old is None or old.status != joint.status:
+                report.broken_joints[connection_id] = joint
+
+        for connection_id, old in old_joints.items():
+            if not old.is_problem:
+                continue
+            joint = current.get(connection_id)
+            if joint is None or not joint.is_problem:
+                report.fixed_joints.append(connection_id)
+
+        non_horizontal = self._non_horizontal & set(touched)
+        report.broken_orientation = sorted(non_horizontal - old_non_horizontal)
+        report.fixed_orientation = sorted(old_non_horizontal - non_horizontal)
+
+        affected = set()
+        for element_id in touched:
+            affected |= self._element_modules.get(element_id, set())
+        report.affected_modules = sorted(affected)
+        report.assembly_valid = self.is_valid()
+        return report
+
+    def _drop_module(self, module_id: str) -> None:
+        if module_id not in self._modules:
+            return
+        _, element_ids = self._modules.pop(module_id)
+        for element_id in element_ids:
+            modules = self._element_modules.get(element_id)
+            if modules is not None:
+                modules.discard(module_id)
+                if not modules:
+                    del self._element_modules[element_id]
+
+
+# Global assembly graph instance (singleton pattern)
+_global_graph: Optional[AssemblyGraph] = None
+_graph_lock = threading.Lock()
+
+
+def get_assembly_graph() -> AssemblyGraph:
+    """
+    Get the global assembly graph instance.
+
+    Returns:
+        Global AssemblyGraph instance
+    """
+    global _global_graph
+    with _graph_lock:
+        if _global_graph is None:
+            _global_graph = AssemblyGraph()
+        return _global_graph
+
+
+def reset_assembly_graph(elements: Optional[Iterable[Dict[str, Any]]] = None) -> AssemblyGraph:
+    """
+    Replace the global assembly graph with a freshly built one.
+
+    Joint history and module declarations are dropped. The new graph is seeded
+    with the given elements, or with the current graph's elements when none are
+    given, so incremental validation keeps working after an agent reset.
+
+    Args:
+        elements: Element set to seed the new graph with (defaults to the current one)
+
+    Returns:
+        The new global AssemblyGraph instance
+    """
+    global _global_graph
+    with _graph_lock:
+        if elements is None:
+            elements = list(_global_graph.elements.values()) if _global_graph is not None else []
+        else:
+            elements = list(elements)
+        if _global_graph is not None:
+            _global_graph.clear()
+        _global_graph = AssemblyGraph()
+        _global_graph.update_elements(elements)
+        logger.info(f"AssemblyGraph reset with {len(elements)} elements")
+        return _global_graph
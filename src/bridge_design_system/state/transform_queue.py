@@ -0,0 +1,158 @@
+"""
+Thread-safe transform update queue for AR Direct Parameter Updates.
+
+VizorListener receives HOLO1_Model messages on the roslibpy callback thread
+while the main loop and agents run elsewhere. The queue keeps at most one
+pending pose per element (the latest pose wins), so bursts of ROS messages
+coalesce instead of growing memory, and a background consumer applies
+pending updates continuously instead of waiting for the next user command.
+"""
+
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+TransformBatch = Dict[str, Dict[str, Any]]  # element name -> {"position", "quaternion"}
+
+
+class TransformUpdateQueue:
+    """
+    Bounded, thread-safe queue of pending element transforms.
+
+    Features:
+    - Per-element coalescing: a newer pose replaces the pending one
+    - Bounded by max_elements distinct elements (oldest pending dropped beyond that)
+    - Blocking drain with timeout for consumers
+    """
+
+    def __init__(self, max_elements: int = 256):
+        """
+        Initialize the queue.
+
+        Args:
+            max_elements: Maximum number of distinct elements with a pending update
+        """
+        self.max_elements = max_elements
+        self._pending: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._condition = threading.Condition()
+
+        # Statistics
+        self._received = 0
+        self._coalesced = 0
+        self._dropped = 0
+
+    def __len__(self) -> int:
+        with self._condition:
+            return len(self._pending)
+
+    def put_batch(self, transforms: TransformBatch) -> None:
+        """
+        Add a batch of transforms, replacing pending poses of the same elements.
+
+        Args:
+            transforms: Element name to pose mapping from one ROS model message
+        """
+        if not transforms:
+            return
+        with self._condition:
+            for name, pose in transforms.items():
+                self._received += 1
+                if name in self._pending:
+                    self._coalesced += 1
+                    self._pending.move_to_end(name)
+                elif len(self._pending) >= self.max_elements:
+                    dropped, _ = self._pending.popitem(last=False)
+                    self._dropped += 1
+                    logger.warning(f"Transform queue full - dropped pending update for {dropped}")
+                self._pending[name] = pose
+            self._condition.notify_all()
+
+    def drain(self, timeout: Optional[float] = None) -> TransformBatch:
+        """
+        Take all pending transforms, waiting up to timeout for at least one.
+
+        Args:
+            timeout: Seconds to wait when empty (None waits forever, 0 returns at once)
+
+        Returns:
+            Element name to latest pose mapping (empty if the wait timed out)
+        """
+        with self._condition:
+            if not self._pending and timeout != 0:
+                self._condition.wait_for(lambda: bool(self._pending), timeout=timeout)
+            batch = dict(self._pending)
+            self._pending.clear()
+            return batch
+
+    def clear(self) -> None:
+        with self._condition:
+            self._pending.clear()
+
+    def get_stats(self) -> Dict[str, int]:
+        """Queue counters for status output."""
+        with self._condition:
+            return {
+                "pending": len(self._pending),
+                "received": self._received,
+                "coalesced": self._coalesced,
+                "dropped": self._dropped,
+            }
+
+
+class TransformUpdateConsumer:
+    """Background thread that drains a TransformUpdateQueue into a handler."""
+
+    def __init__(
+        self,
+        queue: TransformUpdateQueue,
+        handler: Callable[[TransformBatch], None],
+        poll_interval: float = 0.5,
+    ):
+        """
+        Initialize the consumer.
+
+        Args:
+            queue: Queue to drain
+            handler: Called with each drained batch on the consumer thread
+            poll_interval: Seconds between stop-flag checks while idle
+        """
+        self.queue = queue
+        self.handler = handler
+        self.poll_interval = poll_interval
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.batches_applied = 0
+
+    def start(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="transform-update-consumer", daemon=True
+        )
+        self._thread.start()
+        logger.info("Transform update consumer started")
+
+    def stop(self, timeout: float = 2.0) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=timeout)
+            self._thread = None
+        logger.info("Transform update consumer stopped")
+
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            batch = self.queue.drain(timeout=self.poll_interval)
+            if not batch:
+                continue
+            try:
+                self.handler(batch)
+                self.batches_applied += 1
+            except Exception as e:
+                logger.error(f"Transform update handler failed: {e}", exc_info=True)
@@ -0,0 +1,263 @@
+"""
+Batched correction planning for the Geometry Agent.
+
+SysLogic finds gaps, overlaps, orientation errors and unclosed modules one
+issue at a time. Sending each correction to the Geometry Agent separately
+costs one LLM round trip and one script edit per issue, and corrections for
+the same beam can contradict each other. The planner merges all corrections
+into one update per element, resolves conflicts with fixed rules and groups
+the updates by Grasshopper component, so every component script is edited
+once in a single batched pass.
+"""
+
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+# Conflict rules: lower number wins when requests for the same element disagree
+ISSUE_PRIORITY = {
+    "overlap": 0,  # Physical collision of cross-sections
+    "orientation_error": 1,
+    "connectivity_gap": 2,
+    "missing_closure": 3,
+}
+
+LENGTH_TOLERANCE_MM = 0.01  # Length requests closer than this agree
+
+
+def decode_element_id(element_id: str) -> Optional[Tuple[str, int]]:
+    """
+    Decode a Grasshopper element ID into its component and beam number.
+
+    IDs are "0CB" where C is the component index (0 = component_1) and B the beam
+    number 1-9: 001-009 -> component_1, 011-019 -> component_2, 021 -> ("component_3", 1).
+
+    Returns:
+        Tuple of component ID and beam number, or None for IDs outside the scheme
+    """
+    element_id = str(element_id)
+    if len(element_id) != 3 or not element_id.isdigit() or element_id[2] == "0":
+        return None
+    return f"component_{int(element_id[:2]) + 1}", int(element_id[2])
+
+
+@dataclass
+class ElementUpdate:
+    """Merged parameter changes for one element."""
+
+    element_id: str
+    current_length: Optional[float] = None
+    new_length: Optional[float] = None
+    target_z: Optional[float] = None
+    min_gap: Optional[float] = None  # Required separation for a position adjustment
+    sources: List[str] = field(default_factory=list)
+    conflicts: List[str] = field(default_factory=list)
+    _length_priority: int = field(default=len(ISSUE_PRIORITY), repr=False)
+    _z_priority: int = field(default=len(ISSUE_PRIORITY), repr=False)
+
+    @property
+    def length_delta(self) -> float:
+        if self.new_length is None or self.current_length is None:
+            return 0.0
+        return self.new_length - self.current_length
+
+    def add_source(self, issue_type: str) -> None:
+        if issue_type not in self.sources:
+            self.sources.append(issue_type)
+
+    def request_length(self, new_length: float, issue_type: str) -> None:
+        """
+        Merge a length request.
+
+        Requests in the same direction are deduplicated to the largest change, since
+        one adjustment closes every gap it covers. Opposite requests are a conflict
+        resolved by issue priority (shortening for an overlap beats extending for a
+        gap).
+        """
+        priority = ISSUE_PRIORITY[issue_type]
+        if self.new_length is None:
+            self.new_length, self._length_priority = new_length, priority
+            return
+
+        current = self.current_length if self.current_length is not None else new_length
+        old_delta, new_delta = self.new_length - current, new_length - current
+        if abs(old_delta - new_delta) <= LENGTH_TOLERANCE_MM:
+            return
+        if old_delta * new_delta > 0:
+            if abs(new_delta) > abs(old_delta):
+                self.new_length = new_length
+            self._length_priority = min(self._length_priority, priority)
+            return
+
+        if priority < self._length_priority:
+            self.conflicts.append(
+                f"Length {self.new_length:.2f}mm dropped in favour of "
+                f"{new_length:.2f}mm ({issue_type})"
+            )
+            self.new_length, self._length_priority = new_length, priority
+        else:
+            self.conflicts.append(
+                f"Length {new_length:.2f}mm ({issue_type}) dropped in favour of "
+                f"{self.new_length:.2f}mm"
+            )
+
+    def request_z(self, target_z: float, issue_type: str) -> None:
+        """Merge an orientation request; differing targets are resolved by priority."""
+        priority = ISSUE_PRIORITY[issue_type]
+        if self.target_z is None or priority < self._z_priority:
+            if self.target_z is not None and self.target_z != target_z:
+                self.conflicts.append(f"Z target {self.target_z} replaced by {target_z}")
+            self.target_z, self._z_priority = target_z, priority
+        elif self.target_z != target_z:
+            self.conflicts.append(f"Z target {target_z} dropped in favour of {self.target_z}")
+
+    def to_dict(self) -> Dict[str, Any]:
+        changes = {}
+        if self.new_length is not None and (
+            self.current_length is None or abs(self.length_delta) > LENGTH_TOLERANCE_MM
+        ):
+            # An unknown current length cannot be compared, so the request is kept
+            changes["length"] = {"old": self.current_length, "new": round(self.new_length, 3)}
+        if self.target_z is not None:
+            changes["direction_z"] = {"new": self.target_z}
+        if self.min_gap is not None:
+            changes["position"] = {"min_gap": self.min_gap}
+
+        decoded = decode_element_id(self.element_id)
+        return {
+            "element_id": self.element_id,
+            "component_id": decoded[0] if decoded else None,
+            "beam_number": decoded[1] if decoded else None,
+            "changes": changes,
+            "sources": self.sources,
+            "conflicts": self.conflicts,
+        }
+
+
+def plan_corrections(corrections: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Merge corrections into a minimal, ordered set of element updates.
+
+    Args:
+        corrections: Items with issue_type, element_data and correction_data, the same
+            arguments generate_geometry_agent_instructions takes
+
+    Returns:
+        Dict with updates (one per element, ordered by component and beam), by_component
+        (element IDs per component script), conflicts, skipped and counts
+    """
+    updates: Dict[str, ElementUpdate] = {}
+    skipped = []
+
+    # Apply higher-priority issues first so conflict messages read naturally
+    ordered = sorted(
+        enumerate(corrections),
+        key=lambda item: (ISSUE_PRIORITY.get(item[1].get("issue_type"), 99), item[0]),
+    )
+    for _, correction in ordered:
+        issue_type = correction.get("issue_type")
+        element_data = correction.get("element_data", {}) or {}
+        correction_data = correction.get("correction_data", {}) or {}
+        if issue_type not in ISSUE_PRIORITY:
+            reason = f"Unknown issue type: {issue_type}"
+            skipped.append({"correction": correction, "reason": reason})
+            continue
+
+        if issue_type == "missing_closure":
+            unknown = _plan_closure(updates, element_data, correction_data)
+            if unknown:
+                reason = f"Unknown current length for {', '.join(unknown)}"
+                skipped.append({"correction": correction, "reason": reason})
+            continue
+
+        element_id = str(element_data.get("element_id", ""))
+        if not element_id:
+            skipped.append({"correction": correction, "reason": "Missing element_id"})
+            continue
+        update = _update_for(updates, element_id, element_data.get("current_length"))
+        update.add_source(issue_type)
+
+        if issue_type == "connectivity_gap":
+            if "new_length" in correction_data:
+                update.request_length(correction_data["new_length"], issue_type)
+        elif issue_type == "orientation_error":
+            update.request_z(correction_data.get("target_z", 0), issue_type)
+        elif issue_type == "overlap":
+            required = correction_data.get("required_separation", 2.5)
+            update.min_gap = max(update.min_gap or 0, required)
+            if "new_length" in correction_data:
+                update.request_length(correction_data["new_length"], issue_type)
+
+    ordered_updates = sorted(updates.values(), key=_update_order)
+    by_component: Dict[str, List[str]] = {}
+    for update in ordered_updates:
+        decoded = decode_element_id(update.element_id)
+        component_id = decoded[0] if decoded else "unassigned"
+        by_component.setdefault(component_id, []).append(update.element_id)
+
+    return {
+        "updates": [update.to_dict() for update in ordered_updates],
+        "by_component": by_component,
+        "conflicts": [
+            {"element_id": update.element_id, "details": update.conflicts}
+            for update in ordered_updates
+            if update.conflicts
+        ],
+        "skipped": skipped,
+        "issue_count": len(corrections),
+        "update_count": len(ordered_updates),
+    }
+
+
+def _update_for(
+    updates: Dict[str, ElementUpdate], element_id: str, current_length: Optional[float]
+) -> ElementUpdate:
+    update = updates.get(element_id)
+    if update is None:
+        update = updates[element_id] = ElementUpdate(element_id, current_length=current_length)
+    elif update.current_length is None:
+        update.current_length = current_length
+    return update
+
+
+def closure_adjustment(correction_data: Dict[str, Any]) -> float:
+    """
+    Length change per beam that closes a module gap.
+
+    An explicit "adjustment" wins; otherwise gap_size is spread evenly over the
+    affected beams, the same split detect_loops reports as required_adjustment.
+    """
+    if "adjustment" in correction_data:
+        return correction_data["adjustment"]
+    affected = correction_data.get("affected_elements", [])
+    return correction_data.get("gap_size", 0) / len(affected) if affected else 0.0
+
+
+def _plan_closure(
+    updates: Dict[str, ElementUpdate], element_data: Dict, correction_data: Dict
+) -> List[str]:
+    """
+    Spread a closure adjustment over the module's beams as length requests.
+
+    Returns:
+        IDs of affected beams whose current length is unknown (no request made)
+    """
+    adjustment = closure_adjustment(correction_data)
+    current_lengths = element_data.get("current_lengths", {})
+
+    unknown = []
+    for element_id in correction_data.get("affected_elements", []):
+        element_id = str(element_id)
+        update = _update_for(updates, element_id, current_lengths.get(element_id))
+        update.add_source("missing_closure")
+        if not adjustment:
+            continue
+        if update.current_length is None:
+            unknown.append(element_id)
+        else:
+            update.request_length(update.current_length + adjustment, "missing_closure")
+    return unknown
+
+
+def _update_order(update: ElementUpdate) -> Tuple[bool, str]:
+    """Encoded IDs first, in component then beam order ("001" < "011" < "021")."""
+    return decode_element_id(update.element_id) is None, update.element_id
@@ -0,0 +1,253 @@
+"""
+Deterministic Direct Parameter Updates for moved AR elements.
+
+When elements are moved on the HoloLens, the new pose only has to be written
+into the `centerN = rg.Point3d(...)` and `directionN = rg.Vector3d(...)` lines
+of the owning component script. Sending a natural-language task through the
+triage and geometry agents for every element costs a full LLM loop per beam.
+The updater instead groups a transform batch by component, reads each script
+once, patches every moved beam with a regular expression, writes the script
+once and checks it for errors. Elements it cannot patch, and components whose
+patched script reports errors, are returned as failures so the caller can hand
+just those to the agents.
+"""
+
+import json
+import re
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from ..config.logging_config import get_logger
+from .correction_planner import decode_element_id
+
+logger = get_logger(__name__)
+
+# MCP tool names used by the updater (served by the Grasshopper MCP server)
+LIST_COMPONENTS_TOOL = "get_geometry_agent_components"
+READ_SCRIPT_TOOL = "get_python3_script"
+WRITE_SCRIPT_TOOL = "edit_python3_script"
+SCRIPT_ERRORS_TOOL = "get_python3_script_errors"
+
+COORDINATE_DECIMALS = 6
+
+ElementPose = Tuple[Sequence[float], Sequence[float]]  # (center, direction)
+
+
+@dataclass
+class DirectUpdateResult:
+    """Outcome of one batch of direct updates."""
+
+    applied: List[str] = field(default_factory=list)
+    failed: Dict[str, str] = field(default_factory=dict)  # element_id -> reason
+    components_written: List[str] = field(default_factory=list)
+    elapsed_ms: float = 0.0
+
+    @property
+    def success(self) -> bool:
+        return not self.failed
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "success": self.success,
+            "applied": self.applied,
+            "failed": self.failed,
+            "components_written": self.components_written,
+            "elapsed_ms": round(self.elapsed_ms, 2),
+        }
+
+
+def format_coordinates(values: Sequence[float]) -> str:
+    """Format coordinates as Rhino constructor arguments ("1.5, -2.0, 0.25")."""
+    return ", ".join(repr(round(float(value), COORDINATE_DECIMALS)) for value in values)
+
+
+def patch_beam_parameters(
+    script: str, beam_number: int, center: Sequence[float], direction: Sequence[float]
+) -> Tuple[str, Optional[str]]:
+    """
+    Replace the center and direction lines of one beam in a component script.
+
+    Args:
+        script: Current component script
+        beam_number: Beam number N of the centerN/directionN variables
+        center: New center point [x, y, z]
+        direction: New direction vector [x, y, z]
+
+    Returns:
+        Tuple of the patched script and an error message (None when both lines were
+        replaced). On error the script is returned unchanged.
+    """
+    patched = script
+    for name, constructor, values in (
+        (f"center{beam_number}", "Point3d", center),
+        (f"direction{beam_number}", "Vector3d", direction),
+    ):
+        pattern = re.compile(
+            rf"^(?P<prefix>[ \t]*{name}\s*=\s*rg\.{constructor}\()[^)\n]*\)", re.MULTILINE
+        )
+        arguments = format_coordinates(values)
+        patched, count = pattern.subn(lambda m: f"{m.group('prefix')}{arguments})", patched)
+        if count != 1:
+            found = "not found" if count == 0 else f"found {count} times"
+            return script, f"{name} = rg.{constructor}(...) {found}"
+    return patched, None
+
+
+def mcp_tools_from_agent(agent: Any) -> Dict[str, Callable]:
+    """
+    Get the MCP tools of the geometry agent's persistent connection by name.
+
+    Args:
+        agent: Geometry agent as returned by create_geometry_agent (or its wrapper)
+
+    Returns:
+        Tool name to callable mapping; empty in simulation mode
+    """
+    wrapper = getattr(agent, "_wrapper", agent)
+    if getattr(wrapper, "fallback_mode", False):
+        return {}
+    return {tool.name: tool for tool in getattr(wrapper, "mcp_tools", None) or []}
+
+
+class DirectParameterUpdater:
+    """
+    Apply element poses to Grasshopper component scripts without an LLM.
+
+    Features:
+    - One script read and one script write per component, however many beams moved
+    - Component name to ID lookup cached across batches
+    - Scripts with errors after patching are restored and reported as failures
+    """
+
+    def __init__(self, tools: Dict[str, Callable]):
+        """
+        Initialize the updater.
+
+        Args:
+            tools: MCP tools by name; needs the component list, read, write and
+                error tools
+        """
+        self.tools = tools
+        self._component_ids: Dict[str, str] = {}
+
+    def is_available(self) -> bool:
+        required = (LIST_COMPONENTS_TOOL, READ_SCRIPT_TOOL, WRITE_SCRIPT_TOOL)
+        return all(name in self.tools for name in required)
+
+    def apply(self, updates: Dict[str, ElementPose]) -> DirectUpdateResult:
+        """
+        Apply a batch of element poses.
+
+        Args:
+            updates: Element ID ("021") to (center, direction) in Rhino coordinates
+
+        Returns:
+            DirectUpdateResult listing applied and failed elements
+        """
+        started = time.perf_counter()
+        result = DirectUpdateResult()
+
+        by_component: Dict[str, Dict[str, ElementPose]] = {}
+        for element_id, pose in updates.items():
+            decoded = decode_element_id(element_id)
+            if decoded is None:
+                result.failed[element_id] = "Element ID outside the component encoding"
+                continue
+            by_component.setdefault(decoded[0], {})[element_id] = pose
+
+        for component_name, poses in sorted(by_component.items()):
+            try:
+                self._apply_component(component_name, poses, result)
+            except Exception as e:
+                logger.warning(f"⚠️ Direct update of {component_name} failed: {e}")
+                for element_id in poses:
+                    result.failed.setdefault(element_id, f"MCP error: {e}")
+
+        result.elapsed_ms = (time.perf_counter() - started) * 1000
+        logger.info(
+            f"⚡ Direct update: {len(result.applied)} applied, {len(result.failed)} failed "
+            f"in {result.elapsed_ms:.1f}ms"
+        )
+        return result
+
+    def _apply_component(
+        self, component_name: str, poses: Dict[str, ElementPose], result: DirectUpdateResult
+    ) -> None:
+        component_id = self._resolve_component(component_name)
+        if component_id is None:
+            for element_id in poses:
+                result.failed[element_id] = f"Component {component_name} not found"
+            return
+
+        response = self._call(READ_SCRIPT_TOOL, component_id=component_id)
+        original = _response_data(response).get("script")
+        if not response.get("success", True) or not isinstance(original, str):
+            for element_id in poses:
+                result.failed[element_id] = f"Could not read script of {component_name}"
+            return
+
+        script = original
+        patched_ids = []
+        for element_id, (center, direction) in sorted(poses.items()):
+            script, error = patch_beam_parameters(
+                script, decode_element_id(element_id)[1], center, direction
+            )
+            if error:
+                result.failed[element_id] = error
+            else:
+                patched_ids.append(element_id)
+        if not patched_ids:
+            return
+
+        response = self._call(WRITE_SCRIPT_TOOL, component_id=component_id, script=script)
+        if not response.get("success", True):
+            reason = response.get("error") or "Script write rejected"
+            for element_id in patched_ids:
+                result.failed[element_id] = reason
+            return
+
+        errors = self._script_errors(component_id)
+        if errors:
+            self._call(WRITE_SCRIPT_TOOL, component_id=component_id, script=original)
+            reason = f"Script errors after update (restored): {'; '.join(errors)}"
+            for element_id in patched_ids:
+                result.failed[element_id] = reason
+            return
+
+        result.applied.extend(patched_ids)
+        result.components_written.append(component_name)
+
+    def _resolve_component(self, component_name: str) -> Optional[str]:
+        """Component ID for a name such as "component_3", refreshing the cache on a miss."""
+        if component_name not in self._component_ids:
+            data = _response_data(self._call(LIST_COMPONENTS_TOOL))
+            self._component_ids = {
+                component["name"]: component["id"]
+                for component in data.get("components", [])
+                if component.get("name") and component.get("id")
+            }
+        return self._component_ids.get(component_name)
+
+    def _script_errors(self, component_id: str) -> List[str]:
+        if SCRIPT_ERRORS_TOOL not in self.tools:
+            return []
+        data = _response_data(self._call(SCRIPT_ERRORS_TOOL, component_id=component_id))
+        if not data.get("hasErrors"):
+            return []
+        return [str(error) for error in data.get("errors", [])] or ["unknown error"]
+
+    def _call(self, tool_name: str, **kwargs) -> Dict[str, Any]:
+        output = self.tools[tool_name](**kwargs)
+        if isinstance(output, str):
+            try:
+                output = json.loads(output)
+            except json.JSONDecodeError:
+                return {"success": False, "error": output}
+        return output if isinstance(output, dict) else {"success": False, "error": str(output)}
+
+
+def _response_data(response: Dict[str, Any]) -> Dict[str, Any]:
+    """Payload of a Grasshopper response, which may or may not be wrapped in "data"."""
+    data = response.get("data")
+    return data if isinstance(data, dict) else response
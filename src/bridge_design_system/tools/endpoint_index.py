@@ -0,0 +1,155 @@
+"""
+Spatial indexing of beam endpoints for connectivity checks.
+
+Endpoints are bucketed in a uniform XY grid whose cells are as wide as the
+search radius, so every neighbour within the radius lies in the 3x3 block of
+cells around a point. Finding all close endpoint pairs is then near-linear in
+the number of beams instead of comparing every pair of beams.
+"""
+
+import math
+from typing import Dict, Hashable, List, Optional, Sequence, Set, Tuple
+
+Point = Sequence[float]
+CellKey = Tuple[int, int]
+
+# Endpoint kinds, in the order connection IDs are generated ("ss", "se", "es", "ee")
+START = 0
+END = 1
+ENDPOINT_SUFFIX = ("s", "e")
+
+# Joint gap limits for 5x5mm cross-sections
+MIN_JOINT_GAP_MM = 2.5  # Minimum gap (half the width)
+MAX_JOINT_GAP_MM = 5.0  # Maximum acceptable gap for connection
+JOINT_SEARCH_RADIUS_MM = 15.0  # Larger gaps are not treated as intended connections
+
+JOINT_OK = "ok"
+JOINT_GAP = "gap"
+JOINT_OVERLAP = "overlap"
+
+
+class EndpointGrid:
+    """Uniform XY grid hash over endpoints for fixed-radius neighbour queries."""
+
+    def __init__(self, cell_size: float):
+        """
+        Initialize grid.
+
+        Args:
+            cell_size: Cell width in mm; queries with a radius up to this size
+                only need to look at neighbouring cells
+        """
+        if cell_size <= 0:
+            raise ValueError(f"cell_size must be positive, got {cell_size}")
+        self.cell_size = cell_size
+        self._cells: Dict[CellKey, Set[Hashable]] = {}
+        self._points: Dict[Hashable, Tuple[float, float, float]] = {}
+
+    def __len__(self) -> int:
+        return len(self._points)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._points
+
+    def _cell(self, point: Point) -> CellKey:
+        return (math.floor(point[0] / self.cell_size), math.floor(point[1] / self.cell_size))
+
+    def insert(self, key: Hashable, point: Point) -> None:
+        """Add an endpoint, replacing any previous position stored under the same key."""
+        if key in self._points:
+            self.remove(key)
+        self._points[key] = (float(point[0]), float(point[1]), float(point[2]))
+        self._cells.setdefault(self._cell(point), set()).add(key)
+
+    def remove(self, key: Hashable) -> None:
+        """Remove an endpoint; unknown keys are ignored."""
+        point = self._points.pop(key, None)
+        if point is None:
+            return
+        cell = self._cell(point)
+        bucket = self._cells[cell]
+        bucket.discard(key)
+        if not bucket:
+            del self._cells[cell]
+
+    def point(self, key: Hashable) -> Tuple[float, float, float]:
+        """Stored position of an endpoint."""
+        return self._points[key]
+
+    def query(self, point: Point, radius: float) -> List[Tuple[Hashable, float]]:
+        """
+        Find endpoints within an XY radius of a point (Z is ignored).
+
+        Args:
+            point: Query position
+            radius: Search radius in mm (must not exceed the cell size)
+
+        Returns:
+            List of (key, xy_distance) pairs
+        """
+        if radius > self.cell_size:
+            raise ValueError(f"radius {radius} exceeds grid cell size {self.cell_size}")
+
+        cx, cy = self._cell(point)
+        px, py = point[0], point[1]
+        matches = []
+        for dx in (-1, 0, 1):
+            for dy in (-1, 0, 1):
+                for key in self._cells.get((cx + dx, cy + dy), ()):
+                    qx, qy, _ = self._points[key]
+                    distance = math.hypot(px - qx, py - qy)
+                    if distance <= radius:
+                        matches.append((key, distance))
+        return matches
+
+
+def find_endpoint_pairs(
+    endpoints: Sequence[Tuple[Point, Point]], radius: float
+) -> List[Tuple[int, int, int, int, float]]:
+    """
+    Find all endpoint pairs of different beams within an XY radius.
+
+    Args:
+        endpoints: (start, end) points per beam
+        radius: Search radius in mm
+
+    Returns:
+        Sorted list of (i, j, end_i, end_j, xy_distance) with i < j, where end_i and
+        end_j are START or END. The order matches comparing every beam pair i < j
+        and its endpoint combinations start-start, start-end, end-start, end-end.
+    """
+    grid = EndpointGrid(cell_size=radius)
+    pairs = []
+
+    for j, beam_endpoints in enumerate(endpoints):
+        # Query before inserting beam j so each pair is found once, from the higher index
+        for end_j, point in enumerate(beam_endpoints):
+            for (i, end_i), distance in grid.query(point, radius):
+                pairs.append((i, j, end_i, end_j, distance))
+        for end_j, point in enumerate(beam_endpoints):
+            grid.insert((j, end_j), point)
+
+    pairs.sort(key=lambda pair: pair[:4])
+    return pairs
+
+
+def connection_suffix(end_i: int, end_j: int) -> str:
+    """Connection ID suffix for an endpoint combination, e.g. "se" for start-end."""
+    return ENDPOINT_SUFFIX[end_i] + ENDPOINT_SUFFIX[end_j]
+
+
+def classify_joint(xy_distance: float) -> Optional[str]:
+    """
+    Classify the gap between two endpoints.
+
+    Returns:
+        JOINT_OVERLAP, JOINT_OK or JOINT_GAP, or None when the endpoints are too far
+        apart to be an intended connection
+    """
+    if xy_distance < MIN_JOINT_GAP_MM:
+        return JOINT_OVERLAP
+    if xy_distance <= MAX_JOINT_GAP_MM:
+        return JOINT_OK
+    if xy_distance < JOINT_SEARCH_RADIUS_MM:
+        return JOINT_GAP
+    return None
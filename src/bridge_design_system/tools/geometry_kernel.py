@@ -0,0 +1,147 @@
+"""
+Vectorized geometry kernel for beam and polygon math.
+
+Works on whole assemblies at once: element dicts are packed into NumPy arrays
+of centers, directions and lengths, and endpoints, distances, angles and
+planarity are computed for every element in a single pass instead of one
+Python list at a time.
+"""
+
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+
+DEFAULT_CENTER = (0.0, 0.0, 0.0)
+DEFAULT_DIRECTION = (1.0, 0.0, 0.0)
+
+
+def elements_to_arrays(elements: Sequence[Dict]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Pack AssemblyElement dicts into arrays.
+
+    Args:
+        elements: Element dicts with center_point, direction and length
+
+    Returns:
+        Tuple of centers (n, 3), directions (n, 3) and lengths (n,)
+    """
+    centers = np.array(
+        [element.get("center_point", DEFAULT_CENTER) for element in elements], dtype=float
+    ).reshape(-1, 3)
+    directions = np.array(
+        [element.get("direction", DEFAULT_DIRECTION) for element in elements], dtype=float
+    ).reshape(-1, 3)
+    lengths = np.array([element.get("length", 0) for element in elements], dtype=float)
+    return centers, directions, lengths
+
+
+def normalize(vectors: np.ndarray) -> np.ndarray:
+    """Normalize row vectors; zero-length rows stay zero."""
+    vectors = np.asarray(vectors, dtype=float)
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return np.divide(vectors, norms, out=np.zeros_like(vectors), where=norms != 0)
+
+
+def beam_endpoints(
+    centers: np.ndarray, directions: np.ndarray, lengths: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Calculate start and end points of every beam: center ± direction * length / 2.
+
+    Args:
+        centers: Beam centers (n, 3)
+        directions: Beam directions (n, 3), normalized here
+        lengths: Beam lengths (n,)
+
+    Returns:
+        Tuple of start points (n, 3) and end points (n, 3)
+    """
+    half_vectors = normalize(directions) * (np.asarray(lengths, dtype=float)[:, None] / 2)
+    centers = np.asarray(centers, dtype=float)
+    return centers - half_vectors, centers + half_vectors
+
+
+def element_endpoints(elements: Sequence[Dict]) -> Tuple[np.ndarray, np.ndarray]:
+    """Start and end points (each (n, 3)) for a list of element dicts."""
+    return beam_endpoints(*elements_to_arrays(elements))
+
+
+def point_distances(a: np.ndarray, b: np.ndarray, xy_only: bool = False) -> np.ndarray:
+    """
+    Row-wise distances between two equally shaped point arrays.
+
+    Args:
+        a: Points (n, d)
+        b: Points (n, d)
+        xy_only: Ignore everything but the first two coordinates
+
+    Returns:
+        Distances (n,)
+    """
+    diff = np.asarray(a, dtype=float) - np.asarray(b, dtype=float)
+    if xy_only:
+        diff = diff[..., :2]
+    return np.linalg.norm(diff, axis=-1)
+
+
+def pairwise_distances(a: np.ndarray, b: np.ndarray = None, xy_only: bool = False) -> np.ndarray:
+    """
+    Distance matrix between every point of a and every point of b.
+
+    Args:
+        a: Points (n, d)
+        b: Points (m, d); defaults to a
+        xy_only: Ignore everything but the first two coordinates
+
+    Returns:
+        Distances (n, m)
+    """
+    a = np.asarray(a, dtype=float)
+    b = a if b is None else np.asarray(b, dtype=float)
+    if xy_only:
+        a, b = a[:, :2], b[:, :2]
+    return np.linalg.norm(a[:, None, :] - b[None, :, :], axis=-1)
+
+
+def polygon_side_lengths(vertices: Sequence[Sequence[float]]) -> np.ndarray:
+    """Lengths of the closed polygon's sides, side i running from vertex i to i+1 (XY)."""
+    points = np.asarray(vertices, dtype=float).reshape(len(vertices), -1)[:, :2]
+    return point_distances(points, np.roll(points, -1, axis=0))
+
+
+def polygon_angles(vertices: Sequence[Sequence[float]]) -> np.ndarray:
+    """
+    Angles between consecutive edges of a closed polygon (XY).
+
+    Angle i is between edge (i, i+1) and edge (i+1, i+2), in degrees. Degenerate
+    edges give 0. Polygons with fewer than 3 vertices give an empty array.
+
+    Args:
+        vertices: Polygon vertices [[x, y], ...]
+
+    Returns:
+        Angles in degrees (n,)
+    """
+    if len(vertices) < 3:
+        return np.zeros(0)
+
+    points = np.asarray(vertices, dtype=float).reshape(len(vertices), -1)[:, :2]
+    v1 = np.roll(points, -1, axis=0) - points
+    v2 = np.roll(points, -2, axis=0) - np.roll(points, -1, axis=0)
+    magnitudes = np.linalg.norm(v1, axis=1) * np.linalg.norm(v2, axis=1)
+    dots = np.einsum("ij,ij->i", v1, v2)
+
+    cosines = np.divide(dots, magnitudes, out=np.ones_like(dots), where=magnitudes != 0)
+    angles = np.degrees(np.arccos(np.clip(cosines, -1.0, 1.0)))
+    angles[magnitudes == 0] = 0.0
+    return angles
+
+
+def z_components(starts: np.ndarray, ends: np.ndarray) -> np.ndarray:
+    """Absolute Z rise of every beam from start to end (n,)."""
+    return np.abs(np.asarray(ends, dtype=float)[:, 2] - np.asarray(starts, dtype=float)[:, 2])
+
+
+def non_planar_indices(starts: np.ndarray, ends: np.ndarray, tolerance: float) -> List[int]:
+    """Indices of beams whose Z rise exceeds the tolerance."""
+    return np.flatnonzero(z_components(starts, ends) > tolerance).tolist()
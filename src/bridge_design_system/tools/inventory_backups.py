@@ -0,0 +1,435 @@
+"""
+Incremental backup storage for the material inventory.
+
+Backups are stored as content-addressed JSON objects under ``backups/objects``.
+Each backup is either a full ``base`` snapshot or a ``delta`` against the
+previous backup, and a small ``manifest.json`` index records the chain. Listing
+backups only reads the manifest; restoring rebuilds the state from the base
+snapshot plus the deltas along the chain.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from ..config.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+MANIFEST_FILENAME = "manifest.json"
+OBJECTS_DIRNAME = "objects"
+MANIFEST_FORMAT_VERSION = 1
+
+
+def _canonical_json(data: Any) -> bytes:
+    """Serialize data deterministically so equal content hashes equally."""
+    return json.dumps(data, sort_keys=True, separators=(",", ":")).encode("utf-8")
+
+
+def content_hash(data: Any) -> str:
+    """Return the SHA-256 hex digest of the canonical JSON form of data."""
+    return hashlib.sha256(_canonical_json(data)).hexdigest()
+
+
+def _atomic_write_bytes(path: Path, payload: bytes) -> None:
+    """Write bytes to path via a temp file and atomic rename."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temp_fd, temp_path = tempfile.mkstemp(dir=path.parent, prefix=".tmp_", suffix=".json")
+    try:
+        with os.fdopen(temp_fd, "wb") as f:
+            f.write(payload)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, path)
+    except Exception:
+        if os.path.exists(temp_path):
+            os.unlink(temp_path)
+        raise
+
+
+# ==================== DELTA ENCODING ====================
+
+
+def diff_inventory(base: Dict[str, Any], target: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Compute a delta that turns ``base`` into ``target``.
+
+    Beams are diffed by id and cutting sessions as an append-only log, so the
+    delta size is proportional to what changed rather than to the inventory size.
+    Any other top-level key is replaced wholesale when it differs.
+
+    Args:
+        base: Inventory state the delta applies to
+        target: Inventory state the delta produces
+
+    Returns:
+        Delta dict understood by apply_inventory_delta
+    """
+    delta: Dict[str, Any] = {"set": {}, "unset": [k for k in base if k not in target]}
+
+    for key, value in target.items():
+        base_value = base.get(key)
+        if key == "available_beams" and isinstance(value, list) and isinstance(base_value, list):
+            beams_delta = _diff_beams(base_value, value)
+            if beams_delta:
+                delta["beams"] = beams_delta
+        elif key == "cutting_sessions" and isinstance(value, list) and isinstance(base_value, list):
+            sessions_delta = _diff_sessions(base_value, value)
+            if sessions_delta:
+                delta["sessions"] = sessions_delta
+        elif key not in base or base_value != value:
+            delta["set"][key] = value
+
+    return delta
+
+
+def _diff_beams(base_beams: List[Dict], target_beams: List[Dict]) -> Optional[Dict[str, Any]]:
+    """Diff two beam lists keyed by beam id."""
+    base_by_id = {beam["id"]: beam for beam in base_beams}
+    target_ids = [beam["id"] for beam in target_beams]
+    target_id_set = set(target_ids)
+
+    upsert = {beam["id"]: beam for beam in target_beams if base_by_id.get(beam["id"]) != beam}
+    removed = [beam_id for beam_id in base_by_id if beam_id not in target_id_set]
+
+    # Order is only stored when it cannot be derived from the base order
+    implied_order = [beam["id"] for beam in base_beams if beam["id"] in target_id_set]
+    implied_order += [beam_id for beam_id in target_ids if beam_id not in base_by_id]
+
+    beams_delta: Dict[str, Any] = {}
+    if upsert:
+        beams_delta["upsert"] = upsert
+    if removed:
+        beams_delta["remove"] = removed
+    if implied_order != target_ids:
+        beams_delta["order"] = target_ids
+    return beams_delta or None
+
+
+def _diff_sessions(base_sessions: List[Dict], target_sessions: List[Dict]) -> Optional[Dict]:
+    """Diff two session lists as a log: keep the common prefix, append the rest."""
+    common = 0
+    for base_session, target_session in zip(base_sessions, target_sessions):
+        if base_session != target_session:
+            break
+        common += 1
+
+    if common == len(base_sessions) == len(target_sessions):
+        return None
+    return {"keep": common, "append": target_sessions[common:]}
+
+
+def apply_inventory_delta(base: Dict[str, Any], delta: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Apply a delta produced by diff_inventory to a base state.
+
+    Args:
+        base: Inventory state to start from (not modified)
+        delta: Delta to apply
+
+    Returns:
+        New inventory state
+    """
+    state = dict(base)
+
+    for key in delta.get("unset", []):
+        state.pop(key, None)
+    state.update(delta.get("set", {}))
+
+    beams_delta = delta.get("beams")
+    if beams_delta:
+        beams_by_id = {beam["id"]: beam for beam in state.get("available_beams", [])}
+        removed = set(beams_delta.get("remove", []))
+        upsert = beams_delta.get("upsert", {})
+        order = beams_delta.get("order")
+        if order is None:
+            order = [beam_id for beam_id in beams_by_id if beam_id not in removed]
+            order += [beam_id for beam_id in upsert if beam_id not in beams_by_id]
+        beams_by_id.update(upsert)
+        state["available_beams"] = [beams_by_id[beam_id] for beam_id in order]
+
+    sessions_delta = delta.get("sessions")
+    if sessions_delta:
+        kept = state.get("cutting_sessions", [])[: sessions_delta["keep"]]
+        state["cutting_sessions"] = kept + sessions_delta["append"]
+
+    return state
+
+
+# ==================== BACKUP STORE ====================
+
+
+class InventoryBackupStore:
+    """Content-addressed, delta-encoded backup store with a manifest index."""
+
+    def __init__(self, backups_dir: Path, max_chain_length: int = 10):
+        """
+        Initialize backup store.
+
+        Args:
+            backups_dir: Directory holding the manifest and object store
+            max_chain_length: Maximum number of deltas before a new base snapshot
+        """
+        self.backups_dir = Path(backups_dir)
+        self.objects_dir = self.backups_dir / OBJECTS_DIRNAME
+        self.manifest_path = self.backups_dir / MANIFEST_FILENAME
+        self.max_chain_length = max_chain_length
+        self._manifest: Optional[Dict[str, Any]] = None
+
+    # ---------- manifest ----------
+
+    def _load_manifest(self) -> Dict[str, Any]:
+        """Load the manifest, migrating legacy full-copy backups on first use."""
+        if self._manifest is not None:
+            return self._manifest
+
+        if self.manifest_path.exists():
+            with open(self.manifest_path, "r") as f:
+                self._manifest = json.load(f)
+        else:
+            self._manifest = {
+                "format_version": MANIFEST_FORMAT_VERSION,
+                "head": None,
+                "backups": {},
+            }
+            self._migrate_legacy_backups()
+
+        return self._manifest
+
+    def _save_manifest(self) -> None:
+        """Persist the manifest atomically."""
+        payload = json.dumps(self._load_manifest(), indent=2).encode("utf-8")
+        _atomic_write_bytes(self.manifest_path, payload)
+
+    def _migrate_legacy_backups(self) -> None:
+        """Import full-copy ``<name>.json`` backups into the store, oldest first."""
+        if not self.backups_dir.exists():
+            return
+
+        legacy = []
+        for backup_file in self.backups_dir.glob("*.json"):
+            if backup_file.name == MANIFEST_FILENAME:
+                continue
+            try:
+                with open(backup_file, "r") as f:
+                    data = json.load(f)
+                metadata = data.pop("backup_metadata", {})
+                created_at = metadata.get("created_at") or datetime.fromtimestamp(
+                    backup_file.stat().st_mtime
+                ).isoformat()
+                legacy.append((created_at, backup_file, data, metadata))
+            except Exception as e:
+                logger.warning(f"⚠️ Could not migrate legacy backup {backup_file}: {e}")
+
+        if not legacy:
+            return
+
+        legacy.sort(key=lambda item: item[0])
+        backups = self._load_manifest()["backups"]
+        for created_at, backup_file, data, metadata in legacy:
+            entry = backups.get(backup_file.stem)
+            if entry and entry["state_hash"] == content_hash(data):
+                continue  # Imported before an interrupted cleanup
+            self._add_entry(
+                backup_file.stem,
+                data,
+                created_at=created_at,
+                source_version=metadata.get("source_version", "unknown"),
+                original_file=metadata.get("original_file"),
+            )
+
+        # Legacy files are only deleted once the manifest referencing them is on disk
+        self._save_manifest()
+        self._collect_garbage()
+        for _, backup_file, _, _ in legacy:
+            try:
+                backup_file.unlink()
+            except OSError as e:
+                logger.warning(f"⚠️ Could not remove migrated legacy backup {backup_file}: {e}")
+        logger.info(f"📦 Migrated {len(legacy)} legacy backups into incremental store")
+
+    # ---------- objects ----------
+
+    def _object_path(self, object_hash: str) -> Path:
+        return self.objects_dir / f"{object_hash}.json"
+
+    def _write_object(self, obj: Dict[str, Any]) -> str:
+        """Store an object under its content hash; identical objects are stored once."""
+        payload = _canonical_json(obj)
+        object_hash = hashlib.sha256(payload).hexdigest()
+        path = self._object_path(object_hash)
+        if not path.exists():
+            _atomic_write_bytes(path, payload)
+        return object_hash
+
+    def _read_object(self, object_hash: str) -> Dict[str, Any]:
+        with open(self._object_path(object_hash), "r") as f:
+            return json.load(f)
+
+    # ---------- chain handling ----------
+
+    def _chain(self, name: str) -> List[Dict[str, Any]]:
+        """Return the entries from the base snapshot down to ``name``."""
+        backups = self._load_manifest()["backups"]
+        chain = []
+        current = name
+        while current is not None:
+            entry = backups[current]
+            chain.append(entry)
+            current = entry["parent"]
+        chain.reverse()
+        return chain
+
+    def _materialize(self, name: str) -> Dict[str, Any]:
+        """Rebuild the full state of a backup from its base plus deltas."""
+        chain = self._chain(name)
+        state = self._read_object(chain[0]["object"])["payload"]
+        for entry in chain[1:]:
+            state = apply_inventory_delta(state, self._read_object(entry["object"])["payload"])
+
+        if content_hash(state) != chain[-1]["state_hash"]:
+            raise ValueError(f"Backup '{name}' failed integrity check after reconstruction")
+        return state
+
+    def _encode(self, state: Dict[str, Any], parent: Optional[str]) -> Dict[str, Any]:
+        """Encode state as a delta against parent, or as a base if that is not cheaper."""
+        base_obj = {"kind": "base", "payload": state}
+        if parent is None or len(self._chain(parent)) > self.max_chain_length:
+            return {"object": base_obj, "parent": None}
+
+        delta_obj = {"kind": "delta", "payload": diff_inventory(self._materialize(parent), state)}
+        if len(_canonical_json(delta_obj)) >= len(_canonical_json(base_obj)):
+            return {"object": base_obj, "parent": None}
+        return {"object": delta_obj, "parent": parent}
+
+    def _add_entry(
+        self,
+        name: str,
+        state: Dict[str, Any],
+        created_at: str,
+        source_version: str,
+        original_file: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """Encode state and record it in the in-memory manifest."""
+        manifest = self._load_manifest()
+        if name in manifest["backups"]:
+            self._remove_entry(name)
+
+        encoded = self._encode(state, manifest["head"])
+        object_hash = self._write_object(encoded["object"])
+
+        entry = {
+            "name": name,
+            "kind": encoded["object"]["kind"],
+            "object": object_hash,
+            "parent": encoded["parent"],
+            "state_hash": content_hash(state),
+            "created_at": created_at,
+            "source_version": source_version,
+            "original_file": original_file,
+            "size_bytes": self._object_path(object_hash).stat().st_size,
+        }
+        manifest["backups"][name] = entry
+        manifest["head"] = name
+        return entry
+
+    def _remove_entry(self, name: str) -> None:
+        """Drop an entry, re-encoding its children so their chains stay valid."""
+        manifest = self._load_manifest()
+        backups = manifest["backups"]
+        entry = backups[name]
+
+        children = [child for child in backups.values() if child["parent"] == name]
+        for child in children:
+            state = self._materialize(child["name"])
+            encoded = self._encode(state, entry["parent"])
+            object_hash = self._write_object(encoded["object"])
+            child.update(
+                {
+                    "kind": encoded["object"]["kind"],
+                    "object": object_hash,
+                    "parent": encoded["parent"],
+                    "size_bytes": self._object_path(object_hash).stat().st_size,
+                }
+            )
+
+        del backups[name]
+        if manifest["head"] == name:
+            manifest["head"] = max(
+                backups.values(), key=lambda e: e["created_at"], default={"name": None}
+            )["name"]
+
+    def _collect_garbage(self) -> None:
+        """
+        Delete objects no longer referenced by any manifest entry.
+
+        Only call this after the manifest has been saved: until then the manifest
+        on disk may still reference objects the in-memory one has dropped.
+        """
+        if not self.objects_dir.exists():
+            return
+        referenced = {entry["object"] for entry in self._load_manifest()["backups"].values()}
+        for object_file in self.objects_dir.glob("*.json"):
+            if object_file.stem not in referenced:
+                object_file.unlink()
+
+    # ---------- public API ----------
+
+    def create(
+        self,
+        name: str,
+        state: Dict[str, Any],
+        source_version: str = "unknown",
+        original_file: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """
+        Store a named backup of an inventory state.
+
+        Args:
+            name: Backup name (replaces an existing backup of the same name)
+            state: Inventory state to back up
+            source_version: Inventory metadata version
+            original_file: Path of the inventory file being backed up
+
+        Returns:
+            Manifest entry for the new backup
+        """
+        entry = self._add_entry(
+            name,
+            state,
+            created_at=datetime.now().isoformat(),
+            source_version=source_version,
+            original_file=original_file,
+        )
+        self._save_manifest()
+        self._collect_garbage()  # Objects of a replaced backup and its old children
+        return entry
+
+    def restore(self, name: str) -> Dict[str, Any]:
+        """Return the full inventory state stored under ``name``."""
+        if name not in self._load_manifest()["backups"]:
+            raise FileNotFoundError(f"Backup not found: {name}")
+        return self._materialize(name)
+
+    def list(self) -> List[Dict[str, Any]]:
+        """List backup manifest entries, newest first."""
+        entries = [dict(entry) for entry in self._load_manifest()["backups"].values()]
+        entries.sort(key=lambda entry: entry["created_at"], reverse=True)
+        return entries
+
+    def delete(self, name: str) -> bool:
+        """Delete a named backup, returning False if it does not exist."""
+        if name not in self._load_manifest()["backups"]:
+            return False
+        self._remove_entry(name)
+        self._save_manifest()
+        self._collect_garbage()
+        return True
+
+    def object_path(self, name: str) -> Path:
+        """Path of the object file backing a named backup."""
+        return self._object_path(self._load_manifest()["backups"][name]["object"])
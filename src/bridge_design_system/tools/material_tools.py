@@ -5,17 +5,29 @@ This module provides shared functionality for material inventory management,
 cutting sequence optimization, and waste minimization algorithms.
 """
 
+import bisect
 import json
 import shutil
-from dataclasses import asdict, dataclass
+import threading
+from collections import Counter, OrderedDict
+from dataclasses import dataclass
 from datetime import datetime
+from functools import lru_cache
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 
 from ..config.logging_config import get_logger
+from .inventory_backups import InventoryBackupStore, content_hash
 
 logger = get_logger(__name__)
 
+DEFAULT_CROSS_SECTION = "5x5cm"
+MIN_USABLE_LENGTH_MM = 50  # Remnants shorter than this are counted as waste
+DEFAULT_BEAM_LENGTH_MM = 1980
+DEFAULT_BEAM_COUNT = 13
+REPAIR_MIN_ELEMENTS = 16  # Smaller plans are re-planned in full, which is as fast
+MULTISET_HASH_MASK = (1 << 64) - 1
+
 
 @dataclass
 class MaterialCut:
@@ -42,6 +54,16 @@ class BeamUtilization:
     cuts: List[MaterialCut]
     waste_mm: int
     utilization_percent: float
+    cross_section: str = DEFAULT_CROSS_SECTION
+    source: str = "stock"  # "stock" for purchased beams, "offcut" for reclaimed remnants
+    origin_session_id: Optional[str] = None
+
+    @property
+    def is_remnant(self) -> bool:
+        """Whether this beam is a reusable offcut rather than untouched stock."""
+        if self.remaining_length_mm < MIN_USABLE_LENGTH_MM:
+            return False
+        return self.source == "offcut" or bool(self.cuts)
 
     def can_accommodate(self, length_mm: int, kerf_loss_mm: int = 3) -> bool:
         """Check if beam can accommodate a cut of given length."""
@@ -72,12 +94,95 @@ class BeamUtilization:
         ) * 100
 
         # Update waste (remaining unusable material)
-        if self.remaining_length_mm < 50:  # Unusable if less than 50mm
+        if self.remaining_length_mm < MIN_USABLE_LENGTH_MM:
             self.waste_mm = self.remaining_length_mm
 
         return True
 
 
+class OffcutPool:
+    """
+    Index of reusable remnants grouped by cross-section.
+
+    Each cross-section keeps its remnants sorted by remaining length, so the
+    shortest offcut that still fits a cut is found with a binary search.
+    """
+
+    def __init__(self, beams: Iterable[BeamUtilization] = ()):
+        """Initialize pool from the remnants among the given beams."""
+        self._index: Dict[str, List[Tuple[int, str]]] = {}
+        self._keys: Dict[str, Tuple[int, str]] = {}
+        self._beams: Dict[str, BeamUtilization] = {}
+        for beam in beams:
+            self.add(beam)
+
+    def __len__(self) -> int:
+        return len(self._beams)
+
+    def __contains__(self, beam: BeamUtilization) -> bool:
+        return beam.beam_id in self._beams
+
+    def add(self, beam: BeamUtilization) -> None:
+        """Index a beam if it is a remnant; no-op otherwise."""
+        if not beam.is_remnant or beam in self:
+            return
+        key = (beam.remaining_length_mm, beam.beam_id)
+        bisect.insort(self._index.setdefault(beam.cross_section, []), key)
+        self._keys[beam.beam_id] = key
+        self._beams[beam.beam_id] = beam
+
+    def remove(self, beam: BeamUtilization) -> None:
+        """Drop a beam from the index."""
+        key = self._keys.pop(beam.beam_id, None)
+        if key is None:
+            return
+        indexed = self._beams.pop(beam.beam_id)
+        entries = self._index[indexed.cross_section]
+        entries.pop(bisect.bisect_left(entries, key))
+
+    def refresh(self, beam: BeamUtilization) -> None:
+        """Re-index a beam after its remaining length changed."""
+        self.remove(beam)
+        self.add(beam)
+
+    def best_fit(
+        self, length_mm: int, kerf_loss_mm: int = 3, cross_section: Optional[str] = None
+    ) -> Optional[BeamUtilization]:
+        """
+        Find the shortest remnant that can accommodate a cut.
+
+        Args:
+            length_mm: Required cut length in mm
+            kerf_loss_mm: Kerf loss per cut in mm
+            cross_section: Restrict to this cross-section (None searches all)
+
+        Returns:
+            Best-fitting remnant beam or None if no remnant fits
+        """
+        sections = [cross_section] if cross_section is not None else list(self._index)
+        best: Optional[Tuple[int, str]] = None
+        for section in sections:
+            entries = self._index.get(section, [])
+            position = bisect.bisect_left(entries, (length_mm + kerf_loss_mm, ""))
+            if position < len(entries) and (best is None or entries[position] < best):
+                best = entries[position]
+        return self._beams[best[1]] if best else None
+
+    def summary(self) -> List[Dict[str, Any]]:
+        """Describe indexed remnants ordered by cross-section and length."""
+        return [
+            {
+                "beam_id": beam_id,
+                "length_mm": length_mm,
+                "cross_section": section,
+                "source": self._beams[beam_id].source,
+                "origin_session_id": self._beams[beam_id].origin_session_id,
+            }
+            for section, entries in sorted(self._index.items())
+            for length_mm, beam_id in entries
+        ]
+
+
 class MaterialInventoryManager:
     """Manages material inventory operations with persistent JSON storage."""
 
@@ -90,6 +195,7 @@ class MaterialInventoryManager:
             inventory_path = project_root / "data" / "material_inventory.json"
 
         self.inventory_path = Path(inventory_path)
+        self._backup_store: Optional[InventoryBackupStore] = None
         self.inventory_data = self._load_inventory()
         logger.info(f"Material inventory loaded from {self.inventory_path}")
 
@@ -158,6 +264,9 @@ class MaterialInventoryManager:
 
     def get_beams(self) -> List[BeamUtilization]:
         """Get list of beam utilization objects."""
+        default_section = self.inventory_data.get("metadata", {}).get(
+            "cross_section", DEFAULT_CROSS_SECTION
+        )
         beams = []
         for beam_data in self.inventory_data["available_beams"]:
             # Convert cuts data to MaterialCut objects
@@ -179,6 +288,9 @@ class MaterialInventoryManager:
                 cuts=cuts,
                 waste_mm=beam_data.get("waste_mm", 0),
                 utilization_percent=beam_data.get("utilization_percent", 0.0),
+                cross_section=beam_data.get("cross_section", default_section),
+                source=beam_data.get("source", "stock"),
+                origin_session_id=beam_data.get("origin_session_id"),
             )
             beams.append(beam)
 
@@ -212,7 +324,11 @@ class MaterialInventoryManager:
                     "cuts": cuts_data,
                     "waste_mm": beam.waste_mm,
                     "utilization_percent": beam.utilization_percent,
+                    "cross_section": beam.cross_section,
+                    "source": beam.source,
                 }
+                if beam.origin_session_id is not None:
+                    beam_dict["origin_session_id"] = beam.origin_session_id
 
                 beam_data.append(beam_dict)
                 total_waste += beam.waste_mm
@@ -232,6 +348,160 @@ class MaterialInventoryManager:
             logger.error(f"Failed to update beams: {e}")
             return False
 
+    def add_stock_beams(
+        self, length_mm: int, count: int = 1, cross_section: Optional[str] = None
+    ) -> List[str]:
+        """
+        Register new stock beams, which may differ in length and cross-section.
+
+        Args:
+            length_mm: Stock length of each beam in mm
+            count: Number of beams to add
+            cross_section: Beam cross-section (defaults to the inventory's)
+
+        Returns:
+            IDs of the added beams
+        """
+        return [
+            self._append_beam("beam", length_mm, cross_section, source="stock")
+            for _ in range(count)
+        ]
+
+    def add_offcut(
+        self,
+        length_mm: int,
+        cross_section: Optional[str] = None,
+        origin_session_id: Optional[str] = None,
+    ) -> str:
+        """
+        Register a reclaimed offcut so the optimizer can reuse it.
+
+        Args:
+            length_mm: Usable offcut length in mm
+            cross_section: Offcut cross-section (defaults to the inventory's)
+            origin_session_id: Cutting session that produced the offcut, if known
+
+        Returns:
+            ID of the added offcut
+        """
+        return self._append_beam(
+            "offcut", length_mm, cross_section, source="offcut", origin=origin_session_id
+        )
+
+    def _append_beam(
+        self,
+        prefix: str,
+        length_mm: int,
+        cross_section: Optional[str],
+        source: str,
+        origin: Optional[str] = None,
+    ) -> str:
+        """Append a pristine beam entry and save the inventory."""
+        beams = self.inventory_data.setdefault("available_beams", [])
+        existing_ids = {beam["id"] for beam in beams}
+        index = len(beams) + 1
+        while f"{prefix}_{index:03d}" in existing_ids:
+            index += 1
+        beam_id = f"{prefix}_{index:03d}"
+
+        beam_dict = {
+            "id": beam_id,
+            "original_length_mm": int(length_mm),
+            "remaining_length_mm": int(length_mm),
+            "cuts": [],
+            "waste_mm": 0,
+            "utilization_percent": 0.0,
+            "cross_section": cross_section
+            or self.inventory_data.get("metadata", {}).get("cross_section", DEFAULT_CROSS_SECTION),
+            "source": source,
+        }
+        if origin is not None:
+            beam_dict["origin_session_id"] = origin
+
+        beams.append(beam_dict)
+        self.inventory_data["total_stock_mm"] = sum(b["original_length_mm"] for b in beams)
+        self._save_inventory()
+        logger.info(f"Added {source} {beam_id} ({length_mm}mm, {beam_dict['cross_section']})")
+        return beam_id
+
+    def reset_to_stock(self) -> Dict[str, Any]:
+        """
+        Return every registered stock beam and offcut to its uncut state.
+
+        The configured stock mix (beam lengths, cross-sections and registered
+        offcuts) is kept; cuts, cutting sessions and the session tags of
+        remnants produced by cutting are cleared. An empty inventory is seeded
+        with the default 13 beams of 1980mm.
+
+        Returns:
+            Dict with the number of beams and offcuts reset and the material restored
+        """
+        beams = self.inventory_data.get("available_beams") or [
+            {"id": f"beam_{i:03d}", "original_length_mm": DEFAULT_BEAM_LENGTH_MM}
+            for i in range(1, DEFAULT_BEAM_COUNT + 1)
+        ]
+
+        fresh_beams = []
+        for beam in beams:
+            fresh = {
+                "id": beam["id"],
+                "original_length_mm": beam["original_length_mm"],
+                "remaining_length_mm": beam["original_length_mm"],
+                "cuts": [],
+                "waste_mm": 0,
+                "utilization_percent": 0.0,
+            }
+            fresh.update({key: beam[key] for key in ("cross_section", "source") if key in beam})
+            # Registered offcuts keep their provenance; stock beams are no longer remnants
+            if beam.get("source") == "offcut" and beam.get("origin_session_id") is not None:
+                fresh["origin_session_id"] = beam["origin_session_id"]
+            fresh_beams.append(fresh)
+
+        offcuts = sum(1 for beam in fresh_beams if beam.get("source") == "offcut")
+        total_stock = sum(beam["original_length_mm"] for beam in fresh_beams)
+        statistics = dict(self.inventory_data.get("statistics", {}))
+        statistics.update(
+            {
+                "total_beams": len(fresh_beams),
+                "full_beams": len(fresh_beams),
+                "partial_beams": 0,
+                "average_beam_length_mm": total_stock / len(fresh_beams),
+            }
+        )
+        statistics.setdefault("material_efficiency_target", 95.0)
+        statistics.setdefault("waste_tolerance_mm", 100)
+
+        metadata = self.inventory_data.get("metadata")
+        self.inventory_data = {
+            "total_stock_mm": total_stock,
+            "beam_length_mm": self.inventory_data.get("beam_length_mm", DEFAULT_BEAM_LENGTH_MM),
+            "kerf_loss_mm": self.inventory_data.get("kerf_loss_mm", 3),
+            "available_beams": fresh_beams,
+            "used_elements": [],
+            "total_waste_mm": 0,
+            "total_utilization_percent": 0.0,
+            "cutting_sessions": [],
+            "last_updated": datetime.now().isoformat(),
+            "metadata": metadata or self._create_default_inventory()["metadata"],
+            "statistics": statistics,
+        }
+        self._save_inventory()
+
+        logger.info(f"Inventory reset to stock: {len(fresh_beams)} beams ({offcuts} offcuts)")
+        return {
+            "beams_reset": len(fresh_beams) - offcuts,
+            "offcuts_reset": offcuts,
+            "total_material_restored_mm": total_stock,
+        }
+
+    def inventory_version(self) -> str:
+        """Hash of the current beam state, used to key cached cutting plans."""
+        return content_hash(self.inventory_data.get("available_beams", []))
+
+    def get_offcut_pool(self) -> OffcutPool:
+        """Get an index of the reusable remnants currently in the inventory."""
+        return OffcutPool(self.get_beams())
+
     def get_status(self, detailed: bool = False) -> Dict[str, Any]:
         """Get current inventory status."""
         beams = self.get_beams()
@@ -252,6 +522,8 @@ class MaterialInventoryManager:
             ),
             "waste_percentage": (total_waste / total_original * 100) if total_original > 0 else 0,
             "beams_available": len([beam for beam in beams if beam.remaining_length_mm > 50]),
+            "offcuts_available": len(OffcutPool(beams)),
+            "cross_sections": sorted({beam.cross_section for beam in beams}),
         }
 
         if detailed:
@@ -262,35 +534,35 @@ class MaterialInventoryManager:
                     "utilization_percent": beam.utilization_percent,
                     "cuts_count": len(beam.cuts),
                     "waste_mm": beam.waste_mm,
+                    "cross_section": beam.cross_section,
+                    "source": beam.source,
                 }
                 for beam in beams
             ]
 
         return status
 
+    @property
+    def backup_store(self) -> InventoryBackupStore:
+        """Incremental backup store kept next to the inventory file."""
+        if self._backup_store is None:
+            self._backup_store = InventoryBackupStore(self.inventory_path.parent / "backups")
+        return self._backup_store
+
     def _create_backup(self, backup_name: str) -> str:
         """Create named backup of current inventory state."""
         try:
-            # Create backups directory if it doesn't exist
-            backups_dir = self.inventory_path.parent / "backups"
-            backups_dir.mkdir(exist_ok=True)
-
-            # Create backup file path
-            backup_path = backups_dir / f"{backup_name}.json"
-
-            # Copy current inventory to backup
-            backup_data = self.inventory_data.copy()
-            backup_data["backup_metadata"] = {
-                "name": backup_name,
-                "original_file": str(self.inventory_path),
-                "created_at": datetime.now().isoformat(),
-                "source_version": backup_data.get("metadata", {}).get("version", "unknown"),
-            }
-
-            with open(backup_path, "w") as f:
-                json.dump(backup_data, f, indent=2)
+            entry = self.backup_store.create(
+                backup_name,
+                self.inventory_data,
+                source_version=self.inventory_data.get("metadata", {}).get("version", "unknown"),
+                original_file=str(self.inventory_path),
+            )
+            backup_path = self.backup_store.object_path(backup_name)
 
-            logger.info(f"✅ Backup created: {backup_path}")
+            logger.info(
+                f"✅ Backup created: {backup_name} ({entry['kind']}, {entry['size_bytes']} bytes)"
+            )
             return str(backup_path)
 
         except Exception as e:
@@ -300,19 +572,8 @@ class MaterialInventoryManager:
     def _restore_backup(self, backup_name: str) -> Dict[str, Any]:
         """Restore inventory from named backup."""
         try:
-            # Find backup file
-            backups_dir = self.inventory_path.parent / "backups"
-            backup_path = backups_dir / f"{backup_name}.json"
-
-            if not backup_path.exists():
-                raise FileNotFoundError(f"Backup file not found: {backup_path}")
-
-            # Load backup data
-            with open(backup_path, "r") as f:
-                backup_data = json.load(f)
-
-            # Remove backup metadata for restoration
-            backup_data.pop("backup_metadata", None)
+            # Rebuild state from base snapshot plus deltas
+            backup_data = self.backup_store.restore(backup_name)
 
             # Update last_updated timestamp
             backup_data["last_updated"] = datetime.now().isoformat()
@@ -329,37 +590,22 @@ class MaterialInventoryManager:
             raise
 
     def _list_backups(self) -> List[Dict[str, Any]]:
-        """List available backup files with metadata."""
+        """List available backups with metadata from the manifest index."""
         try:
-            backups_dir = self.inventory_path.parent / "backups"
-
-            if not backups_dir.exists():
-                return []
-
-            backups = []
-            for backup_file in backups_dir.glob("*.json"):
-                try:
-                    with open(backup_file, "r") as f:
-                        backup_data = json.load(f)
-
-                    metadata = backup_data.get("backup_metadata", {})
-                    backups.append(
-                        {
-                            "name": backup_file.stem,
-                            "file_path": str(backup_file),
-                            "created_at": metadata.get("created_at", "unknown"),
-                            "source_version": metadata.get("source_version", "unknown"),
-                            "file_size_bytes": backup_file.stat().st_size,
-                        }
-                    )
-
-                except Exception as e:
-                    logger.warning(f"⚠️ Could not read backup metadata from {backup_file}: {e}")
-
-            # Sort by creation date (newest first)
-            backups.sort(key=lambda x: x["created_at"], reverse=True)
+            backups = [
+                {
+                    "name": entry["name"],
+                    "file_path": str(self.backup_store.object_path(entry["name"])),
+                    "created_at": entry["created_at"],
+                    "source_version": entry["source_version"],
+                    "file_size_bytes": entry["size_bytes"],
+                    "kind": entry["kind"],
+                    "parent": entry["parent"],
+                }
+                for entry in self.backup_store.list()
+            ]
 
-            logger.info(f"📋 Found {len(backups)} backup files")
+            logger.info(f"📋 Found {len(backups)} backups")
             return backups
 
         except Exception as e:
@@ -367,13 +613,9 @@ class MaterialInventoryManager:
             return []
 
     def _delete_backup(self, backup_name: str) -> bool:
-        """Delete a named backup file."""
+        """Delete a named backup."""
         try:
-            backups_dir = self.inventory_path.parent / "backups"
-            backup_path = backups_dir / f"{backup_name}.json"
-
-            if backup_path.exists():
-                backup_path.unlink()
+            if self.backup_store.delete(backup_name):
                 logger.info(f"🗑️ Deleted backup: {backup_name}")
                 return True
             else:
@@ -394,22 +636,51 @@ class CuttingOptimizer:
         logger.info(f"Cutting optimizer initialized with {kerf_loss_mm}mm kerf loss")
 
     def first_fit_decreasing(
-        self, required_lengths: List[int], beams: List[BeamUtilization]
+        self,
+        required_lengths: List[int],
+        beams: List[BeamUtilization],
+        cross_section: Optional[str] = None,
+        prefer_offcuts: bool = True,
     ) -> Dict[str, Any]:
         """
         Implement First Fit Decreasing algorithm for optimal cutting sequence.
 
+        When prefer_offcuts is set, each element first goes to the shortest
+        remnant that fits (offcuts and partially used beams), and a fresh stock
+        beam is only opened when no remnant can take it.
+
         Args:
             required_lengths: List of required element lengths in mm
             beams: List of available beams
+            cross_section: Only cut from beams of this cross-section (None uses any)
+            prefer_offcuts: Whether to fill remnants before opening fresh stock
 
         Returns:
             Dict with cutting plan, assignments, and waste analysis
         """
-        logger.info(f"Planning cuts for {len(required_lengths)} elements using FFD algorithm")
+        return self.plan_cross_sections({cross_section: required_lengths}, beams, prefer_offcuts)
+
+    def plan_cross_sections(
+        self,
+        requirements: Dict[Optional[str], List[int]],
+        beams: List[BeamUtilization],
+        prefer_offcuts: bool = True,
+        element_id_prefix: str = "element",
+    ) -> Dict[str, Any]:
+        """
+        Plan cuts for element lengths grouped by cross-section.
 
-        # Sort required lengths in decreasing order
-        sorted_lengths = sorted(required_lengths, reverse=True)
+        Args:
+            requirements: Mapping of cross-section (None for any) to required lengths in mm
+            beams: List of available beams, possibly of mixed lengths and cross-sections
+            prefer_offcuts: Whether to fill remnants before opening fresh stock
+            element_id_prefix: Prefix for generated element IDs (e.g. a session ID)
+
+        Returns:
+            Dict with cutting plan, assignments, and waste analysis
+        """
+        total_elements = sum(len(lengths) for lengths in requirements.values())
+        logger.info(f"Planning cuts for {total_elements} elements using FFD algorithm")
 
         # Create working copies of beams
         working_beams = [
@@ -420,42 +691,67 @@ class CuttingOptimizer:
                 cuts=beam.cuts.copy(),
                 waste_mm=beam.waste_mm,
                 utilization_percent=beam.utilization_percent,
+                cross_section=beam.cross_section,
+                source=beam.source,
+                origin_session_id=beam.origin_session_id,
             )
             for beam in beams
         ]
+        offcut_pool = OffcutPool(working_beams) if prefer_offcuts else None
+        # Only beams that were remnants before this plan count as offcut cuts
+        remnant_ids = {beam.beam_id for beam in beams if beam.is_remnant}
 
         cutting_plan = []
         unassigned = []
+        element_index = 0
+
+        # Explicit cross-sections go first so "any" elements cannot take their stock
+        for cross_section, lengths in sorted(requirements.items(), key=lambda r: r[0] is None):
+            # Sort required lengths in decreasing order
+            for length in sorted(lengths, reverse=True):
+                element_index += 1
+                element_id = f"{element_id_prefix}_{element_index:03d}"
+                beam = self._select_beam(length, working_beams, cross_section, offcut_pool)
+
+                if beam is None:
+                    unassigned.append(
+                        {
+                            "element_id": element_id,
+                            "length_mm": length,
+                            "cross_section": cross_section,
+                            "reason": "No beam available with sufficient remaining length",
+                        }
+                    )
+                    continue
+
+                from_offcut = beam.beam_id in remnant_ids
+                beam.add_cut(element_id, length, self.kerf_loss_mm)
+                if offcut_pool is not None:
+                    offcut_pool.refresh(beam)
 
-        # Try to assign each element to the first beam that can accommodate it
-        for i, length in enumerate(sorted_lengths):
-            assigned = False
-            element_id = f"element_{i+1:03d}"
-
-            for beam in working_beams:
-                if beam.can_accommodate(length, self.kerf_loss_mm):
-                    if beam.add_cut(element_id, length, self.kerf_loss_mm):
-                        cutting_plan.append(
-                            {
-                                "element_id": element_id,
-                                "length_mm": length,
-                                "beam_id": beam.beam_id,
-                                "position_mm": beam.cuts[-1].position_mm,
-                                "kerf_loss_mm": self.kerf_loss_mm,
-                            }
-                        )
-                        assigned = True
-                        break
-
-            if not assigned:
-                unassigned.append(
+                cutting_plan.append(
                     {
                         "element_id": element_id,
                         "length_mm": length,
-                        "reason": "No beam available with sufficient remaining length",
+                        "beam_id": beam.beam_id,
+                        "position_mm": beam.cuts[-1].position_mm,
+                        "kerf_loss_mm": self.kerf_loss_mm,
+                        "cross_section": beam.cross_section,
+                        "requested_cross_section": cross_section,
+                        "from_offcut": from_offcut,
                     }
                 )
 
+        return self._build_result(working_beams, cutting_plan, unassigned, total_elements)
+
+    def _build_result(
+        self,
+        working_beams: List[BeamUtilization],
+        cutting_plan: List[Dict[str, Any]],
+        unassigned: List[Dict[str, Any]],
+        total_elements: int,
+    ) -> Dict[str, Any]:
+        """Assemble the cutting result dict from planned beam state."""
         # Calculate waste and efficiency
         total_waste = sum(beam.waste_mm for beam in working_beams)
         total_original = sum(beam.original_length_mm for beam in working_beams)
@@ -470,25 +766,274 @@ class CuttingOptimizer:
                     "beam_id": beam.beam_id,
                     "original_length_mm": beam.original_length_mm,
                     "remaining_length_mm": beam.remaining_length_mm,
-                    "cuts": [asdict(cut) for cut in beam.cuts],
+                    "cuts": [
+                        {
+                            "element_id": cut.element_id,
+                            "length_mm": cut.length_mm,
+                            "position_mm": cut.position_mm,
+                            "kerf_loss_mm": cut.kerf_loss_mm,
+                            "timestamp": cut.timestamp,
+                        }
+                        for cut in beam.cuts
+                    ],
                     "utilization_percent": beam.utilization_percent,
                     "waste_mm": beam.waste_mm,
+                    "cross_section": beam.cross_section,
+                    "source": beam.source,
+                    "origin_session_id": beam.origin_session_id,
                 }
                 for beam in working_beams
             ],
             "unassigned_elements": unassigned,
             "summary": {
-                "total_elements": len(required_lengths),
+                "total_elements": total_elements,
                 "assigned_elements": len(cutting_plan),
                 "unassigned_elements": len(unassigned),
                 "total_waste_mm": total_waste,
                 "material_efficiency_percent": efficiency,
+                "offcut_cuts": sum(1 for cut in cutting_plan if cut["from_offcut"]),
                 "feasible": len(unassigned) == 0,
             },
         }
 
+    def plan_cached(
+        self,
+        requirements: Dict[Optional[str], List[int]],
+        beams: List[BeamUtilization],
+        inventory_version: str,
+        cache: Optional["CuttingPlanCache"] = None,
+        prefer_offcuts: bool = True,
+    ) -> Dict[str, Any]:
+        """
+        Plan cuts, reusing or repairing earlier plans for the same inventory.
+
+        An identical multiset of lengths returns the memoized plan. If a cached
+        plan differs by exactly one element length, that plan is repaired
+        instead of re-running FFD from scratch. A repair that would waste more
+        material or open more beams than the plan it started from is discarded
+        in favour of a full plan, and small plans are always planned in full.
+
+        Cached plans are shared rather than copied: the returned dict is a fresh
+        top-level dict, but its lists and nested dicts must be treated as read-only.
+
+        Args:
+            requirements: Mapping of cross-section (None for any) to required lengths in mm
+            beams: List of available beams
+            inventory_version: Hash identifying the beam state the plan is for
+            cache: Plan cache to use (defaults to the module-level plan_cache)
+            prefer_offcuts: Whether to fill remnants before opening fresh stock
+
+        Returns:
+            Cutting result dict with a "plan_source" of "cache", "repair" or "full"
+        """
+        cache = cache if cache is not None else plan_cache
+        key = self.plan_key(inventory_version, requirements, prefer_offcuts)
+
+        result = cache.get(key)
+        if result is not None:
+            return {**result, "plan_source": "cache"}
+
+        result = None
+        total_elements = sum(len(lengths) for lengths in requirements.values())
+        neighbor = cache.find_neighbor(key) if total_elements >= REPAIR_MIN_ELEMENTS else None
+        if neighbor is not None:
+            previous, (old_section, old_length), (_, new_length) = neighbor
+            try:
+                repaired = self.repair_plan(
+                    previous, old_length, new_length, old_section or None, prefer_offcuts
+                )
+                if _repair_keeps_quality(previous, repaired):
+                    result = {**repaired, "plan_source": "repair"}
+                else:
+                    logger.debug("Plan repair would waste material, re-planning from scratch")
+            except ValueError as e:
+                logger.warning(f"Plan repair failed, re-planning from scratch: {e}")
+
+        if result is None:
+            result = self.plan_cross_sections(requirements, beams, prefer_offcuts)
+            result["plan_source"] = "full"
+
+        cache.put(key, result)
+        return dict(result)
+
+    def plan_key(
+        self,
+        inventory_version: str,
+        requirements: Dict[Optional[str], List[int]],
+        prefer_offcuts: bool = True,
+    ) -> Tuple:
+        """Cache key under which plan_cached stores the plan for these requirements."""
+        return CuttingPlanCache.make_key(
+            inventory_version, requirements, kerf_loss_mm=self.kerf_loss_mm, offcuts=prefer_offcuts
+        )
+
+    def repair_plan(
+        self,
+        cutting_result: Dict[str, Any],
+        old_length_mm: int,
+        new_length_mm: int,
+        cross_section: Optional[str] = None,
+        prefer_offcuts: bool = True,
+    ) -> Dict[str, Any]:
+        """
+        Update an existing plan after one element changed length.
+
+        The element's cut is removed from its beam and the new length is placed
+        back on the same beam if it still fits, otherwise on the best remnant or
+        first fitting beam. Only the beams losing or gaining the cut (and the
+        plan entries on them) are rebuilt; every other cut and beam assignment
+        is shared with cutting_result.
+
+        Args:
+            cutting_result: Plan produced by this optimizer (not modified)
+            old_length_mm: Previous length of the changed element
+            new_length_mm: New length of the changed element
+            cross_section: Requested cross-section of the changed element (None for any)
+            prefer_offcuts: Whether to fill remnants before opening fresh stock
+
+        Returns:
+            Repaired cutting result dict
+        """
+        cutting_plan = list(cutting_result["cutting_plan"])
+        assignments = list(cutting_result["beam_assignments"])
+        unassigned = list(cutting_result["unassigned_elements"])
+
+        def matches(entry: Dict[str, Any], section_key: str) -> bool:
+            return entry["length_mm"] == old_length_mm and entry.get(section_key) == cross_section
+
+        previous = None
+        position = next((i for i, e in enumerate(unassigned) if matches(e, "cross_section")), None)
+        if position is not None:
+            changed = unassigned.pop(position)
+        else:
+            position = next(
+                (i for i, c in enumerate(cutting_plan) if matches(c, "requested_cross_section")),
+                None,
+            )
+            if position is None:
+                raise ValueError(f"No {old_length_mm}mm element found in cutting plan")
+            changed = cutting_plan.pop(position)
+            previous = next(
+                i for i, a in enumerate(assignments) if a["beam_id"] == changed["beam_id"]
+            )
+            assignments[previous] = _without_cut(assignments[previous], changed["element_id"])
+            # Cuts after the removed one moved up the beam
+            positions = {
+                cut["element_id"]: cut["position_mm"] for cut in assignments[previous]["cuts"]
+            }
+            for i, cut in enumerate(cutting_plan):
+                if cut["beam_id"] == changed["beam_id"]:
+                    if cut["position_mm"] != positions[cut["element_id"]]:
+                        cutting_plan[i] = {**cut, "position_mm": positions[cut["element_id"]]}
+
+        element_id = changed["element_id"]
+        required = new_length_mm + self.kerf_loss_mm
+        if previous is not None and assignments[previous]["remaining_length_mm"] >= required:
+            target = previous
+            from_offcut = changed.get("from_offcut", False)
+        else:
+            target = self._select_assignment(
+                new_length_mm, assignments, cross_section, prefer_offcuts
+            )
+            from_offcut = target is not None and _was_remnant_before_plan(
+                assignments[target], cutting_plan
+            )
+
+        if target is None:
+            unassigned.append(
+                {
+                    "element_id": element_id,
+                    "length_mm": new_length_mm,
+                    "cross_section": cross_section,
+                    "reason": "No beam available with sufficient remaining length",
+                }
+            )
+        else:
+            assignments[target] = _with_cut(
+                assignments[target], element_id, new_length_mm, self.kerf_loss_mm
+            )
+            cutting_plan.append(
+                {
+                    "element_id": element_id,
+                    "length_mm": new_length_mm,
+                    "beam_id": assignments[target]["beam_id"],
+                    "position_mm": assignments[target]["cuts"][-1]["position_mm"],
+                    "kerf_loss_mm": self.kerf_loss_mm,
+                    "cross_section": assignments[target]["cross_section"],
+                    "requested_cross_section": cross_section,
+                    "from_offcut": from_offcut,
+                }
+            )
+
+        logger.info(f"Repaired cutting plan: {old_length_mm}mm -> {new_length_mm}mm")
+        total_original = sum(a["original_length_mm"] for a in assignments)
+        total_used = sum(cut["length_mm"] + cut["kerf_loss_mm"] for cut in cutting_plan)
+        return {
+            "cutting_plan": cutting_plan,
+            "beam_assignments": assignments,
+            "unassigned_elements": unassigned,
+            "summary": {
+                **cutting_result["summary"],
+                "assigned_elements": len(cutting_plan),
+                "unassigned_elements": len(unassigned),
+                "total_waste_mm": sum(a["waste_mm"] for a in assignments),
+                "material_efficiency_percent": (
+                    (total_used / total_original) * 100 if total_original > 0 else 0
+                ),
+                "offcut_cuts": sum(1 for cut in cutting_plan if cut["from_offcut"]),
+                "feasible": len(unassigned) == 0,
+            },
+        }
+
+    def _select_assignment(
+        self,
+        length_mm: int,
+        assignments: List[Dict[str, Any]],
+        cross_section: Optional[str],
+        prefer_offcuts: bool,
+    ) -> Optional[int]:
+        """Index of the beam assignment _select_beam would pick for a cut, or None."""
+        required = length_mm + self.kerf_loss_mm
+        candidates = [
+            (i, a)
+            for i, a in enumerate(assignments)
+            if a["remaining_length_mm"] >= required
+            and (cross_section is None or a["cross_section"] == cross_section)
+        ]
+        if prefer_offcuts:
+            remnants = [
+                (a["remaining_length_mm"], a["beam_id"], i) for i, a in candidates if _is_remnant(a)
+            ]
+            if remnants:
+                return min(remnants)[2]
+        return candidates[0][0] if candidates else None
+
+    def _select_beam(
+        self,
+        length_mm: int,
+        beams: List[BeamUtilization],
+        cross_section: Optional[str],
+        offcut_pool: Optional[OffcutPool],
+    ) -> Optional[BeamUtilization]:
+        """Pick the best remnant for a cut, falling back to the first fitting beam."""
+        if offcut_pool is not None:
+            beam = offcut_pool.best_fit(length_mm, self.kerf_loss_mm, cross_section)
+            if beam is not None:
+                return beam
+
+        for beam in beams:
+            if cross_section is not None and beam.cross_section != cross_section:
+                continue
+            if beam.can_accommodate(length_mm, self.kerf_loss_mm):
+                return beam
+        return None
+
     def validate_feasibility(
-        self, required_lengths: List[int], beams: List[BeamUtilization]
+        self,
+        required_lengths: List[int],
+        beams: List[BeamUtilization],
+        cross_section: Optional[str] = None,
+        cutting_result: Optional[Dict[str, Any]] = None,
     ) -> Dict[str, Any]:
         """
         Validate if required cuts are feasible with available material.
@@ -496,12 +1041,17 @@ class CuttingOptimizer:
         Args:
             required_lengths: List of required element lengths in mm
             beams: List of available beams
+            cross_section: Only consider beams of this cross-section (None uses any)
+            cutting_result: Already computed plan for these lengths, to avoid re-planning
 
         Returns:
             Dict with feasibility analysis and suggestions
         """
         logger.info(f"Validating feasibility for {len(required_lengths)} elements")
 
+        if cross_section is not None:
+            beams = [beam for beam in beams if beam.cross_section == cross_section]
+
         total_required = sum(required_lengths) + (len(required_lengths) * self.kerf_loss_mm)
         total_available = sum(beam.remaining_length_mm for beam in beams)
 
@@ -538,7 +1088,8 @@ class CuttingOptimizer:
             }
 
         # Run cutting optimization to check detailed feasibility
-        cutting_result = self.first_fit_decreasing(required_lengths, beams)
+        if cutting_result is None:
+            cutting_result = self.first_fit_decreasing(required_lengths, beams, cross_section)
 
         return {
             "feasible": cutting_result["summary"]["feasible"],
@@ -575,8 +1126,181 @@ class CuttingOptimizer:
         return suggestions if suggestions else ["Cutting plan is optimal"]
 
 
+class CuttingPlanCache:
+    """
+    Bounded, thread-safe LRU cache of cutting plans.
+
+    Plans are keyed by the inventory version plus the canonical multiset of
+    (cross-section, length) requirements, so element order does not matter.
+    Stored plans are never copied or modified; callers get the stored dict.
+
+    Plans that differ by one element are found through an index of multiset
+    hashes with one element removed: two multisets are one substitution apart
+    exactly when removing one element from each leaves equal hashes.
+
+    Data derived from a plan (such as a rendered report) can be attached to its
+    entry under a short handle and is evicted together with the plan.
+    """
+
+    def __init__(self, max_entries: int = 64):
+        """Initialize cache holding at most max_entries plans."""
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple, Dict[str, Any]]" = OrderedDict()
+        # (version, options, reduced hash) -> keys; lists, as hashing a key tuple is O(n)
+        self._reduced: Dict[Tuple, List[Tuple]] = {}
+        self._attached: Dict[str, Tuple[Tuple, Any]] = {}  # handle -> (key, attached data)
+        self._lock = threading.RLock()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    @staticmethod
+    def make_key(
+        inventory_version: str, requirements: Dict[Optional[str], List[int]], **options: Any
+    ) -> Tuple:
+        """Build a cache key that ignores element order."""
+        multiset = Counter(
+            (cross_section or "", int(length))
+            for cross_section, lengths in requirements.items()
+            for length in lengths
+        )
+        return (inventory_version, tuple(sorted(multiset.items())), tuple(sorted(options.items())))
+
+    @staticmethod
+    def _reduced_keys(key: Tuple) -> Dict[Tuple, Tuple[str, int]]:
+        """Index keys of the multiset with each distinct element removed once."""
+        version, items, options = key
+        hashes = [_mix_hash(item) for item, _ in items]
+        total = sum(h * count for h, (_, count) in zip(hashes, items))
+        return {
+            (version, options, (total - h) & MULTISET_HASH_MASK): item
+            for h, (item, _) in zip(hashes, items)
+        }
+
+    def get(self, key: Tuple) -> Optional[Dict[str, Any]]:
+        """Return the cached plan (read-only), marking it most recently used."""
+        with self._lock:
+            result = self._entries.get(key)
+            if result is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return result
+
+    def put(self, key: Tuple, result: Dict[str, Any]) -> None:
+        """Store a plan, evicting the least recently used entry when full."""
+        with self._lock:
+            if key not in self._entries:
+                for reduced in self._reduced_keys(key):
+                    self._reduced.setdefault(reduced, []).append(key)
+            self._entries[key] = result
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                evicted, _ = self._entries.popitem(last=False)
+                self._unindex(evicted)
+
+    @staticmethod
+    def handle_for(key: Tuple) -> str:
+        """Deterministic short handle for a cache key."""
+        return f"plan_{content_hash(list(key))[:12]}"
+
+    def attach(self, key: Tuple, data: Any) -> str:
+        """
+        Attach data to a cached plan.
+
+        Returns:
+            Handle for attached(); the data is dropped when the plan is evicted
+        """
+        handle = self.handle_for(key)
+        with self._lock:
+            if key in self._entries:
+                self._attached[handle] = (key, data)
+        return handle
+
+    def attached(self, handle: str) -> Optional[Any]:
+        """Return the data attached under handle, marking its plan most recently used."""
+        with self._lock:
+            entry = self._attached.get(handle)
+            if entry is None:
+                return None
+            key, data = entry
+            self._entries.move_to_end(key)
+            return data
+
+    def _unindex(self, key: Tuple) -> None:
+        for handle, (attached_key, _) in list(self._attached.items()):
+            if attached_key is key or attached_key == key:
+                del self._attached[handle]
+        for reduced in self._reduced_keys(key):
+            keys = [other for other in self._reduced.get(reduced, ()) if other is not key]
+            if keys:
+                self._reduced[reduced] = keys
+            else:
+                self._reduced.pop(reduced, None)
+
+    def find_neighbor(
+        self, key: Tuple
+    ) -> Optional[Tuple[Dict[str, Any], Tuple[str, int], Tuple[str, int]]]:
+        """
+        Find a cached plan for the same inventory that differs by one element length.
+
+        Returns:
+            (cached plan, removed (section, length), added (section, length)) or None
+        """
+        with self._lock:
+            wanted = None
+            for reduced, added in self._reduced_keys(key).items():
+                for cached_key in self._reduced.get(reduced, ()):
+                    if cached_key is key or cached_key == key:
+                        continue
+                    # Verify the hash match and find the removed element
+                    wanted = wanted or Counter(dict(key[1]))
+                    cached = Counter(dict(cached_key[1]))
+                    removed = list((cached - wanted).elements())
+                    if (
+                        len(removed) == 1
+                        and list((wanted - cached).elements()) == [added]
+                        and removed[0][0] == added[0]
+                    ):
+                        self._entries.move_to_end(cached_key)
+                        return self._entries[cached_key], removed[0], added
+            return None
+
+    def clear(self) -> None:
+        """Drop all cached plans."""
+        with self._lock:
+            self._entries.clear()
+            self._reduced.clear()
+            self._attached.clear()
+
+
+@lru_cache(maxsize=8192)
+def _mix_hash(item: Tuple[str, int]) -> int:
+    """
+    Well-mixed 64-bit hash of a multiset element (splitmix64 finalizer).
+
+    Tuple hashes of nearby lengths differ by near-constant amounts, which would
+    make sums of them collide for every pair of lengths the same distance apart.
+    """
+    z = (hash(item) + 0x9E3779B97F4A7C15) & MULTISET_HASH_MASK
+    z = ((z ^ (z >> 30)) * 0xBF58476D1CE4E5B9) & MULTISET_HASH_MASK
+    z = ((z ^ (z >> 27)) * 0x94D049BB133111EB) & MULTISET_HASH_MASK
+    return z ^ (z >> 31)
+
+
+# Shared across tool calls, which create a fresh optimizer each time
+plan_cache = CuttingPlanCache()
+
+
 def create_session_record(
-    session_id: str, elements: List[Dict[str, Any]], cutting_plan: Dict[str, Any]
+    session_id: str,
+    elements: List[Dict[str, Any]],
+    cutting_plan: Dict[str, Any],
+    offcuts: Optional[Dict[str, Any]] = None,
 ) -> Dict[str, Any]:
     """Create a cutting session record for tracking."""
     return {
@@ -584,6 +1308,7 @@ def create_session_record(
         "timestamp": datetime.now().isoformat(),
         "elements": elements,
         "cutting_plan": cutting_plan,
+        "offcuts": offcuts or {"consumed": [], "produced": []},
         "summary": {
             "total_elements": len(elements),
             "total_length_mm": sum(elem.get("length", 0) for elem in elements),
@@ -595,46 +1320,205 @@ def create_session_record(
     }
 
 
-def extract_element_lengths(elements: List[Any]) -> List[int]:
+def track_session_offcuts(
+    beams_before: List[BeamUtilization], cutting_result: Dict[str, Any], session_id: str
+) -> Dict[str, Any]:
     """
-    Extract lengths from various element formats.
+    Work out which remnants a cutting session consumed and which it produced.
+
+    Beams left with a usable remainder are tagged with the session that produced
+    them, so later sessions can trace every offcut back to where it came from.
 
     Args:
-        elements: List of elements (AssemblyElement objects, dicts, etc.)
+        beams_before: Beams as they were before the session
+        cutting_result: Result of CuttingOptimizer planning for the session
+        session_id: Identifier of the session
 
     Returns:
-        List of lengths in millimeters
+        Dict with consumed and produced offcut descriptions
     """
-    lengths = []
+    remnants_before = {beam.beam_id for beam in beams_before if beam.is_remnant}
+    cut_beam_ids = {cut["beam_id"] for cut in cutting_result.get("cutting_plan", [])}
 
-    for element in elements:
-        try:
-            # Handle different element formats
-            if hasattr(element, "length"):
-                # AssemblyElement object or similar
-                length = element.length
-            elif isinstance(element, dict):
-                # Dictionary format
-                length = element.get("length", element.get("length_mm", 0))
-            elif isinstance(element, (int, float)):
-                # Direct length value
-                length = element
-            else:
-                logger.warning(f"Unknown element format: {type(element)}")
-                continue
+    consumed = sorted(cut_beam_ids & remnants_before)
+    produced = []
+    for assignment in cutting_result.get("beam_assignments", []):
+        if assignment["beam_id"] not in cut_beam_ids:
+            continue
+        if assignment["remaining_length_mm"] < MIN_USABLE_LENGTH_MM:
+            continue
+        # A remnant keeps the session that first produced it
+        if assignment.get("origin_session_id") is None:
+            assignment["origin_session_id"] = session_id
+        produced.append(
+            {
+                "beam_id": assignment["beam_id"],
+                "length_mm": assignment["remaining_length_mm"],
+                "cross_section": assignment.get("cross_section", DEFAULT_CROSS_SECTION),
+            }
+        )
 
-            # Convert to mm if needed (assume cm if < 100)
-            if isinstance(length, (int, float)) and length > 0:
-                if length < 100:  # Assume centimeters, convert to mm
-                    length = int(length * 10)
-                else:  # Already in mm
-                    length = int(length)
+    return {"consumed": consumed, "produced": produced}
 
-                lengths.append(length)
 
-        except Exception as e:
-            logger.warning(f"Failed to extract length from element: {e}")
+def _is_remnant(assignment: Dict[str, Any]) -> bool:
+    """BeamUtilization.is_remnant for a beam assignment dict."""
+    if assignment["remaining_length_mm"] < MIN_USABLE_LENGTH_MM:
+        return False
+    return assignment.get("source") == "offcut" or bool(assignment["cuts"])
+
+
+def _was_remnant_before_plan(
+    assignment: Dict[str, Any], cutting_plan: List[Dict[str, Any]]
+) -> bool:
+    """Whether a planned beam was already a reusable remnant before the plan's cuts."""
+    planned = {cut["element_id"] for cut in cutting_plan if cut["beam_id"] == assignment["beam_id"]}
+    earlier_cuts = [cut for cut in assignment["cuts"] if cut["element_id"] not in planned]
+    remaining = assignment["original_length_mm"] - sum(
+        cut["length_mm"] + cut["kerf_loss_mm"] for cut in earlier_cuts
+    )
+    if remaining < MIN_USABLE_LENGTH_MM:
+        return False
+    return assignment.get("source") == "offcut" or bool(earlier_cuts)
+
+
+def _with_cut(
+    assignment: Dict[str, Any], element_id: str, length_mm: int, kerf_loss_mm: int
+) -> Dict[str, Any]:
+    """Copy of a beam assignment with one more cut at its end."""
+    position_mm = assignment["original_length_mm"] - assignment["remaining_length_mm"]
+    cut = {
+        "element_id": element_id,
+        "length_mm": length_mm,
+        "position_mm": position_mm,
+        "kerf_loss_mm": kerf_loss_mm,
+        "timestamp": datetime.now().isoformat(),
+    }
+    return _laid_out({**assignment, "cuts": assignment["cuts"] + [cut]})
+
+
+def _without_cut(assignment: Dict[str, Any], element_id: str) -> Dict[str, Any]:
+    """Copy of a beam assignment without one cut, its later cuts moved up the beam."""
+    cuts = []
+    position_mm = 0
+    for cut in assignment["cuts"]:
+        if cut["element_id"] == element_id:
             continue
+        cuts.append(
+            cut if cut["position_mm"] == position_mm else {**cut, "position_mm": position_mm}
+        )
+        position_mm += cut["length_mm"] + cut["kerf_loss_mm"]
+    return _laid_out({**assignment, "cuts": cuts})
+
+
+def _laid_out(assignment: Dict[str, Any]) -> Dict[str, Any]:
+    """Recompute remaining length, utilization and waste from an assignment's cuts."""
+    used = sum(cut["length_mm"] + cut["kerf_loss_mm"] for cut in assignment["cuts"])
+    remaining = assignment["original_length_mm"] - used
+    assignment["remaining_length_mm"] = remaining
+    assignment["utilization_percent"] = (used / assignment["original_length_mm"]) * 100
+    assignment["waste_mm"] = remaining if remaining < MIN_USABLE_LENGTH_MM else 0
+    return assignment
+
+
+def _repair_keeps_quality(previous: Dict[str, Any], repaired: Dict[str, Any]) -> bool:
+    """Whether a repaired plan uses no more beams and wastes no more than its source plan."""
+
+    def beams_cut(result: Dict[str, Any]) -> int:
+        return sum(1 for assignment in result["beam_assignments"] if assignment["cuts"])
+
+    before, after = previous["summary"], repaired["summary"]
+    return (
+        after["unassigned_elements"] <= before["unassigned_elements"]
+        and after["total_waste_mm"] <= before["total_waste_mm"]
+        and beams_cut(repaired) <= beams_cut(previous)
+    )
+
+
+def beams_from_assignments(beam_assignments: List[Dict[str, Any]]) -> List[BeamUtilization]:
+    """Rebuild beam utilization objects from optimizer beam assignments."""
+    return [
+        BeamUtilization(
+            beam_id=assignment["beam_id"],
+            original_length_mm=assignment["original_length_mm"],
+            remaining_length_mm=assignment["remaining_length_mm"],
+            cuts=[MaterialCut(**cut) for cut in assignment["cuts"]],
+            waste_mm=assignment["waste_mm"],
+            utilization_percent=assignment["utilization_percent"],
+            cross_section=assignment.get("cross_section", DEFAULT_CROSS_SECTION),
+            source=assignment.get("source", "stock"),
+            origin_session_id=assignment.get("origin_session_id"),
+        )
+        for assignment in beam_assignments
+    ]
+
+
+def group_lengths_by_cross_section(elements: List[Any]) -> Dict[Optional[str], List[int]]:
+    """
+    Group element lengths by cross-section.
+
+    Elements without a cross_section attribute or key are grouped under None,
+    which the optimizer treats as "any cross-section".
+
+    Args:
+        elements: List of elements (AssemblyElement objects, dicts, or plain lengths)
+
+    Returns:
+        Mapping of cross-section to lengths in millimeters
+    """
+    groups: Dict[Optional[str], List[int]] = {}
+    for element in elements:
+        length = _element_length_mm(element)
+        if length is None:
+            continue
+        if isinstance(element, dict):
+            cross_section = element.get("cross_section")
+        else:
+            cross_section = getattr(element, "cross_section", None)
+        groups.setdefault(cross_section, []).append(length)
+    return groups
+
+
+def _element_length_mm(element: Any) -> Optional[int]:
+    """Extract a single element length in mm, or None if unavailable."""
+    try:
+        # Handle different element formats
+        if hasattr(element, "length"):
+            # AssemblyElement object or similar
+            length = element.length
+        elif isinstance(element, dict):
+            # Dictionary format
+            length = element.get("length", element.get("length_mm", 0))
+        elif isinstance(element, (int, float)):
+            # Direct length value
+            length = element
+        else:
+            logger.warning(f"Unknown element format: {type(element)}")
+            return None
+
+        # Convert to mm if needed (assume cm if < 100)
+        if isinstance(length, (int, float)) and length > 0:
+            if length < 100:  # Assume centimeters, convert to mm
+                return int(length * 10)
+            return int(length)  # Already in mm
+
+    except Exception as e:
+        logger.warning(f"Failed to extract length from element: {e}")
+
+    return None
+
+
+def extract_element_lengths(elements: List[Any]) -> List[int]:
+    """
+    Extract lengths from various element formats.
+
+    Args:
+        elements: List of elements (AssemblyElement objects, dicts, etc.)
+
+    Returns:
+        List of lengths in millimeters
+    """
+    lengths = [length for length in map(_element_length_mm, elements) if length is not None]
 
     logger.info(f"Extracted {len(lengths)} element lengths: {lengths}")
     return lengths
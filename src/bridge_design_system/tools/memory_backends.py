@@ -0,0 +1,715 @@
+"""Storage backends for persistent agent memory.
+
+The memory tools store records of the form
+{"value", "timestamp", "category", "metadata"?} under (category, key).
+
+- SQLiteMemoryBackend (default): one row per memory in a WAL-mode database, so a
+  write is a single-row upsert, readers never block the writer and concurrent
+  agents and processes wait on SQLite's own locking instead of a spin lock.
+  Triggers keep an FTS5 index of keys and values current on every write.
+- JsonFileBackend: the original whole-file JSON format, kept for existing
+  session files and for environments where SQLite is unavailable.
+- MemoryServiceBackend: memories held by the shared memory service
+  (ipc.memory_service) that main.py runs for the two-terminal setup, so every
+  process reads and writes one in-memory store over a local socket.
+
+Select with BRIDGE_MEMORY_BACKEND=sqlite|json|service.
+"""
+
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from .memory_search import KEY_WEIGHT, VALUE_WEIGHT, SearchHit, fts_match_expression, rank_memories
+
+MemoryRecord = Dict[str, Any]
+MemoryItem = Tuple[str, str, MemoryRecord]  # (category, key, record)
+
+
+class MemoryBackend:
+    """
+    Interface shared by all memory storage backends.
+
+    Reads are served from a process-local copy of all memories. The copy is
+    validated on every read with a cheap change token (a file stat or SQLite's
+    data_version) that moves whenever any process writes; this process's own
+    writes update the copy in place, so read-heavy turns do not touch disk.
+    """
+
+    name = "base"
+
+    def __init__(self, session_id: str):
+        self.session_id = session_id
+        self._cache: Optional[Dict[str, Dict[str, MemoryRecord]]] = None
+        self._cache_token: Any = None
+        self._cache_lock = threading.RLock()
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    # Storage hooks implemented by each backend
+
+    def _change_token(self) -> Any:
+        """Value that changes whenever another process writes (None: never cache)."""
+        return None
+
+    def _read_all(self) -> Dict[str, Dict[str, MemoryRecord]]:
+        """Uncached {category: {key: record}} read from storage."""
+        raise NotImplementedError
+
+    def put(self, category: str, key: str, record: MemoryRecord) -> None:
+        raise NotImplementedError
+
+    def clear(self, category: Optional[str] = None) -> int:
+        """Delete one category (or everything) and return the number of memories removed."""
+        raise NotImplementedError
+
+    def replace_all(self, memory_data: Dict[str, Any]) -> None:
+        """Replace all memories with the contents of a legacy memory dict."""
+        raise NotImplementedError
+
+    # Cached reads
+
+    def _memories(self) -> Dict[str, Dict[str, MemoryRecord]]:
+        """The cached memories, reloaded if storage changed since they were read."""
+        with self._cache_lock:
+            token = self._change_token()
+            if self._cache is not None and token is not None and token == self._cache_token:
+                self.cache_hits += 1
+                return self._cache
+            self.cache_misses += 1
+            self._cache = self._read_all()
+            self._cache_token = token
+            return self._cache
+
+    def _cache_is_current(self) -> bool:
+        with self._cache_lock:
+            return self._cache is not None and self._change_token() == self._cache_token
+
+    def _update_cache(self, was_current: bool, apply: Callable[[Dict], None], token: Any) -> None:
+        """
+        Apply this process's own write to the cache.
+
+        Args:
+            was_current: Whether the cache matched storage right before the write;
+                otherwise it is dropped and reloaded on the next read
+            apply: Function that mutates the cached {category: {key: record}} dict
+            token: Change token of storage right after the write
+        """
+        with self._cache_lock:
+            if was_current and self._cache is not None:
+                apply(self._cache)
+                self._cache_token = token
+            else:
+                self._cache = None
+
+    def _set_cache(self, memories: Dict[str, Dict[str, MemoryRecord]], token: Any) -> None:
+        with self._cache_lock:
+            self._cache = memories
+            self._cache_token = token
+
+    def invalidate_cache(self) -> None:
+        with self._cache_lock:
+            self._cache = None
+
+    def get(self, category: str, key: str) -> Optional[MemoryRecord]:
+        record = self._memories().get(category, {}).get(key)
+        return dict(record) if record is not None else None
+
+    def items(self, category: Optional[str] = None) -> Iterator[MemoryItem]:
+        """Memories grouped by category in insertion order, optionally of one category."""
+        with self._cache_lock:
+            memories = self._memories()
+            if category is not None:
+                selected = [(category, memories.get(category, {}))]
+            else:
+                selected = list(memories.items())
+            items = [
+                (item_category, key, dict(record))
+                for item_category, records in selected
+                for key, record in records.items()
+            ]
+        return iter(items)
+
+    def category_counts(self) -> Dict[str, int]:
+        with self._cache_lock:
+            return {
+                category: len(records) for category, records in self._memories().items() if records
+            }
+
+    def search(
+        self, query: str, limit: int = 10, category: Optional[str] = None
+    ) -> List[SearchHit]:
+        """
+        Rank memories by prefix-matching BM25 over their keys and values.
+
+        Backends without an index rank every memory; see memory_search. All
+        categories are passed so the BM25 statistics match the SQLite index.
+        """
+        return rank_memories(self.items(), query, limit, category)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """All memories in the legacy {"session_id", "memories": {category: {key: record}}} form."""
+        with self._cache_lock:
+            memories = {
+                category: {key: dict(record) for key, record in records.items()}
+                for category, records in self._memories().items()
+            }
+        return {"session_id": self.session_id, "memories": memories}
+
+    def get_cache_stats(self) -> Dict[str, int]:
+        return {"hits": self.cache_hits, "misses": self.cache_misses}
+
+    def close(self) -> None:
+        pass
+
+
+class SQLiteMemoryBackend(MemoryBackend):
+    """Memories as rows of a WAL-mode SQLite database."""
+
+    name = "sqlite"
+
+    def __init__(self, path: Path, session_id: str, busy_timeout: float = 5.0):
+        """
+        Open (and create if needed) the memory database.
+
+        Args:
+            path: Database file
+            session_id: Session the memories belong to
+            busy_timeout: Seconds to wait for another writer before failing
+        """
+        super().__init__(session_id)
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # One connection shared by the process; the lock (also guarding the cache)
+        # serializes threads and SQLite's file locking serializes processes
+        self._lock = self._cache_lock
+        self._conn = sqlite3.connect(
+            str(self.path), timeout=busy_timeout, isolation_level=None, check_same_thread=False
+        )
+        self._conn.row_factory = sqlite3.Row
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=FULL")  # fsync every commit, as before
+            self._create_schema()
+
+    def _create_schema(self) -> None:
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS memories (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                category TEXT NOT NULL,
+                key TEXT NOT NULL,
+                value TEXT NOT NULL,
+                timestamp TEXT NOT NULL,
+                metadata TEXT,
+                UNIQUE (category, key)
+            );
+            CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value TEXT);
+            """
+        )
+        self._create_search_index()
+        self._conn.execute(
+            "INSERT OR IGNORE INTO meta (name, value) VALUES ('session_id', ?)", (self.session_id,)
+        )
+
+    def _create_search_index(self) -> None:
+        """Create the FTS5 index and its triggers; without FTS5, search ranks in Python."""
+        exists = self._conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE name = 'memories_fts'"
+        ).fetchone()
+        if exists:
+            self.has_search_index = True
+            return
+        try:
+            self._conn.executescript(
+                """
+                BEGIN;
+                CREATE VIRTUAL TABLE memories_fts USING fts5(
+                    key, value, content='memories', content_rowid='id', tokenize='unicode61'
+                );
+                CREATE TRIGGER memories_fts_insert AFTER INSERT ON memories BEGIN
+                    INSERT INTO memories_fts (rowid, key, value)
+                    VALUES (new.id, new.key, new.value);
+                END;
+                CREATE TRIGGER memories_fts_delete AFTER DELETE ON memories BEGIN
+                    INSERT INTO memories_fts (memories_fts, rowid, key, value)
+                    VALUES ('delete', old.id, old.key, old.value);
+                END;
+                CREATE TRIGGER memories_fts_update AFTER UPDATE ON memories BEGIN
+                    INSERT INTO memories_fts (memories_fts, rowid, key, value)
+                    VALUES ('delete', old.id, old.key, old.value);
+                    INSERT INTO memories_fts (rowid, key, value)
+                    VALUES (new.id, new.key, new.value);
+                END;
+                INSERT INTO memories_fts (memories_fts) VALUES ('rebuild');
+                COMMIT;
+                """
+            )
+            self.has_search_index = True
+        except sqlite3.OperationalError:
+            # SQLite built without FTS5 (or another process created the index first)
+            if self._conn.in_transaction:
+                self._conn.execute("ROLLBACK")
+            self.has_search_index = bool(
+                self._conn.execute(
+                    "SELECT 1 FROM sqlite_master WHERE name = 'memories_fts'"
+                ).fetchone()
+            )
+
+    def _transaction(self):
+        return _Transaction(self._conn, self._lock)
+
+    def _change_token(self) -> Any:
+        # data_version changes when another connection commits, never for our own commits
+        with self._lock:
+            return self._conn.execute("PRAGMA data_version").fetchone()[0]
+
+    def _read_all(self) -> Dict[str, Dict[str, MemoryRecord]]:
+        with self._lock:
+            rows = self._conn.execute("SELECT * FROM memories ORDER BY id").fetchall()
+        memories: Dict[str, Dict[str, MemoryRecord]] = {}
+        for row in rows:
+            memories.setdefault(row["category"], {})[row["key"]] = _row_to_record(row)
+        return memories
+
+    def put(self, category: str, key: str, record: MemoryRecord) -> None:
+        record = _normalize_record(category, record)
+        metadata = record.get("metadata")
+        with self._lock:
+            with self._transaction() as conn:
+                was_current = self._cache_is_current()
+                conn.execute(
+                    """
+                    INSERT INTO memories (category, key, value, timestamp, metadata)
+                    VALUES (?, ?, ?, ?, ?)
+                    ON CONFLICT (category, key) DO UPDATE SET
+                        value = excluded.value,
+                        timestamp = excluded.timestamp,
+                        metadata = excluded.metadata
+                    """,
+                    (
+                        category,
+                        key,
+                        record["value"],
+                        record["timestamp"],
+                        json.dumps(metadata) if metadata is not None else None,
+                    ),
+                )
+
+            def apply(memories):
+                memories.setdefault(category, {})[key] = record
+
+            self._update_cache(was_current, apply, self._cache_token)
+
+    def clear(self, category: Optional[str] = None) -> int:
+        with self._lock:
+            with self._transaction() as conn:
+                was_current = self._cache_is_current()
+                if category is None:
+                    removed = conn.execute("DELETE FROM memories").rowcount
+                else:
+                    removed = conn.execute(
+                        "DELETE FROM memories WHERE category = ?", (category,)
+                    ).rowcount
+
+            def apply(memories):
+                if category is None:
+                    memories.clear()
+                else:
+                    memories.pop(category, None)
+
+            self._update_cache(was_current, apply, self._cache_token)
+        return removed
+
+    def replace_all(self, memory_data: Dict[str, Any]) -> None:
+        memories = {
+            category: {key: _normalize_record(category, record) for key, record in items.items()}
+            for category, items in memory_data.get("memories", {}).items()
+        }
+        with self._lock:
+            with self._transaction() as conn:
+                conn.execute("DELETE FROM memories")
+                for category, items in memories.items():
+                    for key, record in items.items():
+                        metadata = record.get("metadata")
+                        conn.execute(
+                            "INSERT INTO memories (category, key, value, timestamp, metadata) "
+                            "VALUES (?, ?, ?, ?, ?)",
+                            (
+                                category,
+                                key,
+                                record["value"],
+                                record["timestamp"],
+                                json.dumps(metadata) if metadata is not None else None,
+                            ),
+                        )
+                token = self._change_token()
+            self._set_cache(memories, token)
+
+    def search(
+        self, query: str, limit: int = 10, category: Optional[str] = None
+    ) -> List[SearchHit]:
+        if not self.has_search_index:
+            return super().search(query, limit, category)
+        expression = fts_match_expression(query)
+        if expression is None:
+            return []
+
+        sql = (
+            "SELECT m.*, -bm25(memories_fts, ?, ?) AS score FROM memories_fts "
+            "JOIN memories m ON m.id = memories_fts.rowid WHERE memories_fts MATCH ?"
+        )
+        params: List[Any] = [KEY_WEIGHT, VALUE_WEIGHT, expression]
+        if category is not None:
+            sql += " AND m.category = ?"
+            params.append(category)
+        sql += " ORDER BY score DESC LIMIT ?"
+        params.append(limit)
+
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return [(row["category"], row["key"], _row_to_record(row), row["score"]) for row in rows]
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class _Transaction:
+    """Immediate write transaction: takes the write lock up front, commits or rolls back."""
+
+    def __init__(self, conn: sqlite3.Connection, lock: threading.RLock):
+        self._conn = conn
+        self._lock = lock
+
+    def __enter__(self) -> sqlite3.Connection:
+        self._lock.acquire()
+        try:
+            self._conn.execute("BEGIN IMMEDIATE")
+        except Exception:
+            self._lock.release()
+            raise
+        return self._conn
+
+    def __exit__(self, exc_type, exc, traceback) -> None:
+        try:
+            self._conn.execute("COMMIT" if exc_type is None else "ROLLBACK")
+        finally:
+            self._lock.release()
+
+
+def _normalize_record(category: str, record: MemoryRecord) -> MemoryRecord:
+    """Copy of a record with exactly the fields the SQLite backend stores."""
+    normalized = {
+        "value": record.get("value", ""),
+        "timestamp": record.get("timestamp", ""),
+        "category": category,
+    }
+    if record.get("metadata") is not None:
+        normalized["metadata"] = record["metadata"]
+    return normalized
+
+
+def _row_to_record(row: sqlite3.Row) -> MemoryRecord:
+    record = {"value": row["value"], "timestamp": row["timestamp"], "category": row["category"]}
+    if row["metadata"] is not None:
+        record["metadata"] = json.loads(row["metadata"])
+    return record
+
+
+class JsonFileBackend(MemoryBackend):
+    """Legacy backend: the whole session as one JSON file, rewritten on every change."""
+
+    name = "json"
+
+    def __init__(self, path: Path, session_id: str):
+        super().__init__(session_id)
+        self.path = Path(path)
+        self.lock_path = self.path.parent / f".{self.path.stem}.lock"
+        self._last_write_token: Any = None
+
+    def acquire_lock(self, timeout: float = 5.0) -> Optional[Path]:
+        """Acquire the lock file for a write.
+
+        Returns:
+            Lock file path if successful, None if failed
+        """
+        start_time = time.time()
+
+        while time.time() - start_time < timeout:
+            try:
+                # Try to create lock file exclusively
+                fd = os.open(str(self.lock_path), os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+                # Write PID to help with debugging
+                os.write(fd, str(os.getpid()).encode())
+                os.close(fd)
+                return self.lock_path
+            except FileExistsError:
+                # Lock is held by another process; remove it if stale (older than 30 seconds)
+                try:
+                    if self.lock_path.exists():
+                        lock_age = time.time() - self.lock_path.stat().st_mtime
+                        if lock_age > 30:
+                            self.lock_path.unlink()
+                            continue
+                except OSError:
+                    pass
+                time.sleep(0.05)  # Brief wait before retry
+            except Exception:
+                return None
+
+        return None
+
+    def release_lock(self, lock: Optional[Path]) -> None:
+        if lock:
+            try:
+                lock.unlink()
+            except OSError:
+                pass
+
+    def load(self) -> Dict[str, Any]:
+        """Load memory from the JSON file with error handling."""
+        default_memory = {"session_id": self.session_id, "memories": {}}
+
+        if not self.path.exists():
+            return default_memory
+
+        # Try to read with retries for transient failures
+        for attempt in range(3):
+            try:
+                with open(self.path, "r") as f:
+                    content = f.read()
+                    if content:
+                        return json.loads(content)
+                    return default_memory
+            except (json.JSONDecodeError, ValueError) as e:
+                print(f"Warning: Corrupted memory file {self.path}, starting fresh. Error: {e}")
+                return default_memory
+            except (IOError, OSError) as e:
+                if attempt < 2:
+                    time.sleep(0.1)  # Brief retry delay
+                    continue
+                print(f"Warning: Could not read memory file after 3 attempts. Error: {e}")
+                return default_memory
+            except Exception as e:
+                print(f"Warning: Unexpected error reading memory. Using defaults. Error: {e}")
+                return default_memory
+
+        return default_memory
+
+    def save(self, memory_data: Dict[str, Any]) -> bool:
+        """Save memory to the JSON file with atomic writes and error handling.
+
+        Returns:
+            bool: True if save succeeded, False otherwise
+        """
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+        except Exception as e:
+            print(f"Warning: Could not create memory directory. Error: {e}")
+            return False
+
+        # Acquire lock for exclusive write access
+        lock = self.acquire_lock(timeout=2.0)  # Shorter timeout for workshop responsiveness
+        if not lock:
+            print("Warning: Could not acquire lock for memory write. Another operation running.")
+            # In workshop setting, we'll continue without lock rather than fail
+
+        try:
+            for attempt in range(3):
+                temp_path = None
+                try:
+                    # Write a temp file in the same directory, then rename atomically
+                    temp_fd, temp_path = tempfile.mkstemp(
+                        dir=self.path.parent, prefix=".tmp_memory_", suffix=".json"
+                    )
+                    with os.fdopen(temp_fd, "w") as f:
+                        json.dump(memory_data, f, indent=2)
+                        f.flush()
+                        os.fsync(f.fileno())  # Force write to disk
+                    os.replace(temp_path, self.path)
+                    self._last_write_token = self._change_token()  # Still under the lock
+                    return True
+
+                except Exception as e:
+                    if temp_path and os.path.exists(temp_path):
+                        try:
+                            os.unlink(temp_path)
+                        except OSError:
+                            pass
+
+                    if attempt < 2:
+                        time.sleep(0.1)  # Brief retry delay
+                        continue
+
+                    print(f"Warning: Could not save memory after 3 attempts. Error: {e}")
+                    return False
+
+            return False
+
+        finally:
+            self.release_lock(lock)
+
+    def _change_token(self) -> Any:
+        # os.replace gives every save a new inode, so same-size rewrites are detected too
+        try:
+            stat = self.path.stat()
+        except FileNotFoundError:
+            return "missing"
+        return stat.st_ino, stat.st_mtime_ns, stat.st_size
+
+    def _read_all(self) -> Dict[str, Dict[str, MemoryRecord]]:
+        return self.load().get("memories", {})
+
+    def _write(self, memory_data: Dict[str, Any]) -> None:
+        """Save and cache memory_data (read-modify-write always starts from a fresh load)."""
+        if not self.save(memory_data):
+            self.invalidate_cache()
+            raise OSError(f"Could not save memory to {self.path}")
+        self._set_cache(memory_data.get("memories", {}), self._last_write_token)
+
+    def put(self, category: str, key: str, record: MemoryRecord) -> None:
+        memory_data = self.load()
+        memory_data.setdefault("memories", {}).setdefault(category, {})[key] = dict(record)
+        self._write(memory_data)
+
+    def clear(self, category: Optional[str] = None) -> int:
+        memory_data = self.load()
+        memories = memory_data.setdefault("memories", {})
+        if category is None:
+            removed = sum(len(items) for items in memories.values())
+            memory_data["memories"] = {}
+        else:
+            removed = len(memories.pop(category, {}))
+        self._write(memory_data)
+        return removed
+
+    def replace_all(self, memory_data: Dict[str, Any]) -> None:
+        self._write(json.loads(json.dumps(memory_data)))
+
+
+class MemoryServiceBackend(MemoryBackend):
+    """Memories as namespaces "memory/<session>/<category>" of the shared memory service."""
+
+    name = "service"
+
+    def __init__(self, client: Any, session_id: str):
+        """
+        Use a running memory service.
+
+        Args:
+            client: Connected ipc.memory_service.MemoryServiceClient
+            session_id: Session the memories belong to
+        """
+        super().__init__(session_id)
+        self.client = client
+        self.prefix = f"memory/{session_id}/"
+
+    def _change_token(self) -> Any:
+        # The service versions every namespace, so this is one small round trip
+        return self.client.version(self.prefix)
+
+    def _read_all(self) -> Dict[str, Dict[str, MemoryRecord]]:
+        return self._strip_prefix(self.client.dump(self.prefix)["namespaces"])
+
+    def _memories(self) -> Dict[str, Dict[str, MemoryRecord]]:
+        with self._cache_lock:
+            token = self._change_token()
+            if self._cache is not None and token == self._cache_token:
+                self.cache_hits += 1
+                return self._cache
+            self.cache_misses += 1
+            dump = self.client.dump(self.prefix)  # Carries its own version, no second trip
+            self._cache = self._strip_prefix(dump["namespaces"])
+            self._cache_token = dump["version"]
+            return self._cache
+
+    def _strip_prefix(self, namespaces: Dict[str, Any]) -> Dict[str, Dict[str, MemoryRecord]]:
+        return {name[len(self.prefix) :]: records for name, records in namespaces.items()}
+
+    def _apply_write(self, result: Dict[str, Any], apply: Callable[[Dict], None]) -> None:
+        """Apply our write to the cache if nothing else changed the session before it."""
+        with self._cache_lock:
+            was_current = self._cache is not None and result["previous"] == self._cache_token
+            self._update_cache(was_current, apply, result["version"])
+
+    def put(self, category: str, key: str, record: MemoryRecord) -> None:
+        record = dict(record)
+        with self._cache_lock:
+            result = self.client.put(self.prefix + category, key, record, prefix=self.prefix)
+
+            def apply(memories):
+                memories.setdefault(category, {})[key] = record
+
+            self._apply_write(result, apply)
+
+    def clear(self, category: Optional[str] = None) -> int:
+        with self._cache_lock:
+            if category is None:
+                result = self.client.clear(prefix=self.prefix)
+            else:
+                result = self.client.clear(namespace=self.prefix + category)
+            if result["removed"]:
+
+                def apply(memories):
+                    if category is None:
+                        memories.clear()
+                    else:
+                        memories.pop(category, None)
+
+                self._apply_write(result, apply)
+        return result["removed"]
+
+    def replace_all(self, memory_data: Dict[str, Any]) -> None:
+        memories = json.loads(json.dumps(memory_data.get("memories", {})))
+        namespaces = {self.prefix + category: items for category, items in memories.items()}
+        with self._cache_lock:
+            version = self.client.replace(self.prefix, namespaces)
+            self._set_cache(memories, version)
+
+    def close(self) -> None:
+        self.client.close()
+
+
+def create_memory_backend(kind: str, directory: Path, session_id: str) -> MemoryBackend:
+    """
+    Create the memory backend for a session.
+
+    A new SQLite session imports the session's legacy JSON file if one exists.
+    The service backend falls back to SQLite when no memory service is running.
+
+    Args:
+        kind: "sqlite", "json" or "service"
+        directory: Directory holding the session files
+        session_id: Session identifier (file name stem)
+
+    Returns:
+        Backend instance
+    """
+    json_path = Path(directory) / f"{session_id}.json"
+    if kind == "json":
+        return JsonFileBackend(json_path, session_id)
+    if kind == "service":
+        from ..ipc.memory_service import MemoryServiceClient
+
+        client = MemoryServiceClient()
+        if client.ping():
+            return MemoryServiceBackend(client, session_id)
+        print("Warning: Memory service not running, using the SQLite memory backend.")
+        kind = "sqlite"
+    if kind != "sqlite":
+        raise ValueError(
+            f"Unknown memory backend '{kind}' (expected 'sqlite', 'json' or 'service')"
+        )
+
+    sqlite_path = Path(directory) / f"{session_id}.sqlite3"
+    is_new = not sqlite_path.exists()
+    backend = SQLiteMemoryBackend(sqlite_path, session_id)
+    if is_new and json_path.exists():
+        backend.replace_all(JsonFileBackend(json_path, session_id).load())
+    return backend
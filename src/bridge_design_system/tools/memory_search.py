@@ -0,0 +1,117 @@
+"""Tokenization and BM25 ranking for search_memory.
+
+Memories are matched on word tokens of their key and value: lowercase runs of
+letters and digits, so "comp_123" is the tokens "comp" and "123". Every query
+token is a prefix match ("timb" finds "timber") and documents are ranked with
+BM25, with key matches weighted above value matches.
+
+The SQLite backend runs the same search on its FTS5 index; this module builds
+its MATCH expression and provides the in-Python ranking used by backends
+without an index.
+"""
+
+import math
+import re
+from collections import Counter
+from typing import Iterable, List, Optional, Tuple
+
+_TOKEN = re.compile(r"[^\W_]+")
+
+KEY_WEIGHT = 10.0  # A query token in the key counts as much as ten in the value
+VALUE_WEIGHT = 1.0
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+SearchHit = Tuple[str, str, dict, float]  # (category, key, record, score)
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase letter/digit runs of a text."""
+    return _TOKEN.findall(text.lower())
+
+
+def fts_match_expression(query: str) -> Optional[str]:
+    """
+    FTS5 MATCH expression for a query: any query token as a key/value prefix.
+
+    Returns:
+        Expression such as '{key value}: ("timber"* OR "truss"*)', or None when the
+        query has no tokens
+    """
+    tokens = list(dict.fromkeys(tokenize(query)))
+    if not tokens:
+        return None
+    return "{key value}: (" + " OR ".join(f'"{token}"*' for token in tokens) + ")"
+
+
+def rank_memories(
+    items: Iterable[Tuple[str, str, dict]],
+    query: str,
+    limit: int = 10,
+    category: Optional[str] = None,
+) -> List[SearchHit]:
+    """
+    Rank memories against a query with prefix-matching BM25.
+
+    Scores are computed the way FTS5's bm25() computes them, so both backends
+    order hits the same: each query token is one phrase whose key and value
+    matches add up to a weighted frequency, its IDF is log((N - n + 0.5) /
+    (n + 0.5)) floored at 1e-6, and documents are normalized by their total
+    token count against the average over every memory. Pass all memories and
+    filter with category, since N, n and the average length cover the whole
+    table as they do in FTS5.
+
+    Args:
+        items: (category, key, record) triples
+        query: Search text
+        limit: Number of hits to return
+        category: Only return hits of this category
+
+    Returns:
+        Best hits first, at most limit
+    """
+    query_tokens = list(dict.fromkeys(tokenize(query)))
+    if not query_tokens:
+        return []
+
+    documents = []
+    for item_category, key, record in items:
+        key_tokens = Counter(tokenize(key))
+        value_tokens = Counter(tokenize(record.get("value", "")))
+        frequencies = [
+            KEY_WEIGHT * _prefix_count(key_tokens, token)
+            + VALUE_WEIGHT * _prefix_count(value_tokens, token)
+            for token in query_tokens
+        ]
+        length = sum(key_tokens.values()) + sum(value_tokens.values())
+        documents.append((item_category, key, record, frequencies, length))
+    if not documents:
+        return []
+
+    total = len(documents)
+    average_length = sum(doc[4] for doc in documents) / total
+    idf = []
+    for t in range(len(query_tokens)):
+        matching = sum(1 for doc in documents if doc[3][t])
+        value = math.log((total - matching + 0.5) / (matching + 0.5))
+        idf.append(value if value > 0 else 1e-6)
+
+    hits = []
+    for item_category, key, record, frequencies, length in documents:
+        if category is not None and item_category != category:
+            continue
+        score = 0.0
+        for t, frequency in enumerate(frequencies):
+            if not frequency:
+                continue
+            norm = BM25_K1 * (1 - BM25_B + BM25_B * length / average_length)
+            score += idf[t] * frequency * (BM25_K1 + 1) / (frequency + norm)
+        if score > 0:
+            hits.append((item_category, key, record, score))
+
+    hits.sort(key=lambda hit: hit[3], reverse=True)
+    return hits[:limit]
+
+
+def _prefix_count(tokens: Counter, prefix: str) -> int:
+    return sum(count for token, count in tokens.items() if token.startswith(prefix))
@@ -4,196 +4,96 @@ This module provides three SmolaGents tools for memory management:
 - remember: Store information in persistent memory
 - recall: Retrieve stored information
 - search_memory: Search across all memories
+
+Memories are stored through a pluggable backend (see memory_backends), SQLite
+in WAL mode by default, so each remember is a single-key upsert. In the
+two-terminal setup main.py switches to the shared memory service.
 """
 
-import json
 import os
+import threading
 import time
 from datetime import datetime
 from pathlib import Path
 from typing import Any, Dict, Optional
 
-# Platform-specific imports for file locking
-try:
-    import fcntl
-
-    HAS_FCNTL = True
-except ImportError:
-    HAS_FCNTL = False
-import tempfile
-
 from smolagents import tool
 
+from .memory_backends import MemoryBackend, create_memory_backend
+
 # Session management
 SESSION_ID = os.environ.get(
     "BRIDGE_SESSION_ID", f'session_{datetime.now().strftime("%Y%m%d_%H%M%S")}'
 )
 MEMORY_PATH = Path(__file__).parent.parent / "data" / "memory"
 MEMORY_PATH.mkdir(parents=True, exist_ok=True)
+MEMORY_BACKEND = os.environ.get("BRIDGE_MEMORY_BACKEND", "sqlite")
+
+_backend: Optional[MemoryBackend] = None
+_backend_lock = threading.Lock()
 
 
 def get_memory_file() -> Path:
-    """Get the path to the current session's memory file."""
+    """Get the path to the current session's legacy JSON memory file."""
     return MEMORY_PATH / f"{SESSION_ID}.json"
 
 
-def get_lock_file() -> Path:
-    """Get the path to the lock file for the current session."""
-    return MEMORY_PATH / f".{SESSION_ID}.lock"
-
+def get_memory_backend() -> MemoryBackend:
+    """Get the storage backend for the current session, opening it on first use."""
+    global _backend
+    with _backend_lock:
+        if _backend is None:
+            _backend = create_memory_backend(MEMORY_BACKEND, MEMORY_PATH, SESSION_ID)
+        return _backend
 
-def acquire_lock(timeout: float = 5.0) -> Optional[Any]:
-    """Acquire a file lock for memory operations.
 
-    Returns:
-        Lock object if successful, None if failed
-    """
-    lock_file = get_lock_file()
-    start_time = time.time()
-
-    while time.time() - start_time < timeout:
-        try:
-            # Try to create lock file exclusively
-            fd = os.open(str(lock_file), os.O_CREAT | os.O_EXCL | os.O_WRONLY)
-            # Write PID to help with debugging
-            os.write(fd, str(os.getpid()).encode())
-            os.close(fd)
-            return lock_file  # Return the lock file path as our "lock object"
-        except FileExistsError:
-            # Lock is held by another process
-            # Check if lock is stale (older than 30 seconds)
-            try:
-                if lock_file.exists():
-                    lock_age = time.time() - lock_file.stat().st_mtime
-                    if lock_age > 30:  # Stale lock
-                        lock_file.unlink()  # Remove stale lock
-                        continue
-            except:
-                pass
-            time.sleep(0.05)  # Brief wait before retry
-        except Exception:
-            return None
-
-    return None
-
-
-def release_lock(lock: Any) -> None:
-    """Release a file lock."""
-    if lock and isinstance(lock, Path):
-        try:
-            lock.unlink()
-        except:
-            pass
+def use_memory_backend(kind: str) -> MemoryBackend:
+    """Switch the session to another backend, e.g. "service" once the memory service runs."""
+    global _backend, MEMORY_BACKEND
+    with _backend_lock:
+        if _backend is not None:
+            _backend.close()
+        MEMORY_BACKEND = kind
+        _backend = create_memory_backend(kind, MEMORY_PATH, SESSION_ID)
+        return _backend
 
 
 def load_memory() -> Dict[str, Any]:
-    """Load memory from JSON file with error handling."""
-    memory_file = get_memory_file()
-    default_memory = {"session_id": SESSION_ID, "memories": {}}
-
-    if not memory_file.exists():
-        return default_memory
-
-    # Try to read with retries for transient failures
-    for attempt in range(3):
-        try:
-            with open(memory_file, "r") as f:
-                # Non-blocking read attempt
-                content = f.read()
-                if content:
-                    return json.loads(content)
-                else:
-                    return default_memory
-        except (json.JSONDecodeError, ValueError) as e:
-            print(f"Warning: Corrupted memory file {memory_file}, starting fresh. Error: {e}")
-            return default_memory
-        except (IOError, OSError) as e:
-            if attempt < 2:
-                time.sleep(0.1)  # Brief retry delay
-                continue
-            print(f"Warning: Could not read memory file after 3 attempts. Error: {e}")
-            return default_memory
-        except Exception as e:
-            print(f"Warning: Unexpected error reading memory. Using defaults. Error: {e}")
-            return default_memory
-
-    return default_memory
+    """Load all memories as {"session_id", "memories": {category: {key: record}}}.
+
+    Served from the backend's process-local cache, which is re-read only after
+    another process has written.
+    """
+    try:
+        return get_memory_backend().snapshot()
+    except Exception as e:
+        print(f"Warning: Unexpected error reading memory. Using defaults. Error: {e}")
+        return {"session_id": SESSION_ID, "memories": {}}
 
 
 def save_memory(memory_data: Dict[str, Any]) -> bool:
-    """Save memory to JSON file with atomic writes and error handling.
+    """Replace all memories with memory_data.
 
     Returns:
         bool: True if save succeeded, False otherwise
     """
-    memory_file = get_memory_file()
-
-    # Ensure directory exists
     try:
-        memory_file.parent.mkdir(parents=True, exist_ok=True)
+        get_memory_backend().replace_all(memory_data)
+        return True
     except Exception as e:
-        print(f"Warning: Could not create memory directory. Error: {e}")
+        print(f"Warning: Could not save memory. Error: {e}")
         return False
 
-    # Acquire lock for exclusive write access
-    lock = acquire_lock(timeout=2.0)  # Shorter timeout for workshop responsiveness
-    if not lock:
-        print("Warning: Could not acquire lock for memory write. Another operation in progress.")
-        # In workshop setting, we'll continue without lock rather than fail
 
+def _store(category: str, key: str, record: Dict[str, Any]) -> bool:
+    """Upsert one memory; returns False instead of raising so agents can continue."""
     try:
-        # Use atomic write with temp file to prevent corruption
-        temp_fd = None
-        temp_path = None
-
-        for attempt in range(3):
-            try:
-                # Create temp file in same directory for atomic rename
-                temp_fd, temp_path = tempfile.mkstemp(
-                    dir=memory_file.parent, prefix=".tmp_memory_", suffix=".json"
-                )
-
-                # Write to temp file
-                with os.fdopen(temp_fd, "w") as f:
-                    json.dump(memory_data, f, indent=2)
-                    f.flush()
-                    os.fsync(f.fileno())  # Force write to disk
-
-                # Atomic rename (works on same filesystem)
-                if os.name == "nt":  # Windows
-                    # Windows doesn't support atomic rename if target exists
-                    if memory_file.exists():
-                        memory_file.unlink()
-                os.rename(temp_path, memory_file)
-
-                return True
-
-            except Exception as e:
-                # Clean up temp file if it exists
-                if temp_fd is not None:
-                    try:
-                        os.close(temp_fd)
-                    except:
-                        pass
-                if temp_path and os.path.exists(temp_path):
-                    try:
-                        os.unlink(temp_path)
-                    except:
-                        pass
-
-                if attempt < 2:
-                    time.sleep(0.1)  # Brief retry delay
-                    continue
-
-                print(f"Warning: Could not save memory after 3 attempts. Error: {e}")
-                return False
-
+        get_memory_backend().put(category, key, record)
+        return True
+    except Exception as e:
+        print(f"Warning: Could not save memory '{category}/{key}'. Error: {e}")
         return False
 
-    finally:
-        # Always release lock
-        release_lock(lock)
-
 
 @tool
 def remember(category: str, key: str, value: str) -> str:
@@ -214,24 +114,12 @@ def remember(category: str, key: str, value: str) -> str:
     """
     start_time = time.time()
 
-    # Load current memory
-    memory_data = load_memory()
-
-    # Ensure category exists
-    if "memories" not in memory_data:
-        memory_data["memories"] = {}
-    if category not in memory_data["memories"]:
-        memory_data["memories"][category] = {}
-
-    # Store the memory with metadata
-    memory_data["memories"][category][key] = {
-        "value": value,
-        "timestamp": datetime.now().isoformat(),
-        "category": category,
-    }
-
-    # Save to file
-    success = save_memory(memory_data)
+    # Store the memory with metadata (a single-key upsert)
+    success = _store(
+        category,
+        key,
+        {"value": value, "timestamp": datetime.now().isoformat(), "category": category},
+    )
 
     elapsed_ms = (time.time() - start_time) * 1000
 
@@ -260,33 +148,30 @@ def recall(category: Optional[str] = None, key: Optional[str] = None) -> str:
     """
     start_time = time.time()
 
-    memory_data = load_memory()
-    memories = memory_data.get("memories", {})
-
-    # No parameters - show summary
-    if category is None:
-        if not memories:
-            return "No memories stored yet"
-
-        summary = (
-            f"Memory categories available (session: {memory_data.get('session_id', 'unknown')}):\n"
-        )
-        for cat, items in memories.items():
-            summary += f"- {cat}: {len(items)} items\n"
+    try:
+        backend = get_memory_backend()
 
-        elapsed_ms = (time.time() - start_time) * 1000
-        summary += f"\n(Query took {elapsed_ms:.1f}ms)"
-        return summary
+        # No parameters - show summary
+        if category is None:
+            counts = backend.category_counts()
+            if not counts:
+                return "No memories stored yet"
 
-    # Category specified but not found
-    if category not in memories:
-        return f"No memories found in category '{category}'"
+            summary = f"Memory categories available (session: {backend.session_id}):\n"
+            for cat, count in counts.items():
+                summary += f"- {cat}: {count} items\n"
 
-    # Specific key requested
-    if key is not None:
-        if key in memories[category]:
-            item = memories[category][key]
             elapsed_ms = (time.time() - start_time) * 1000
+            summary += f"\n(Query took {elapsed_ms:.1f}ms)"
+            return summary
+
+        # Specific key requested
+        if key is not None:
+            item = backend.get(category, key)
+            if item is None:
+                if not backend.category_counts().get(category):
+                    return f"No memories found in category '{category}'"
+                return f"No memory found for key '{key}' in category '{category}'"
 
             # CRITICAL FIX: Strip metadata if present to prevent component ID pollution
             result = item["value"]
@@ -294,12 +179,18 @@ def recall(category: Optional[str] = None, key: Optional[str] = None) -> str:
                 result = result.split("\n(Stored at:")[0].strip()
 
             return result
-        else:
-            return f"No memory found for key '{key}' in category '{category}'"
 
-    # All items in category
+        # All items in category
+        items = list(backend.items(category))
+    except Exception as e:
+        return f"⚠️ Could not read memory: {e}"
+
+    # Category specified but not found
+    if not items:
+        return f"No memories found in category '{category}'"
+
     result = f"Memories in category '{category}':\n"
-    for key, item in memories[category].items():
+    for _, key, item in items:
         result += f"\n[{key}]: {item['value']}\n  (Stored: {item['timestamp']})\n"
 
     elapsed_ms = (time.time() - start_time) * 1000
@@ -308,12 +199,16 @@ def recall(category: Optional[str] = None, key: Optional[str] = None) -> str:
 
 
 @tool
-def search_memory(query: str, limit: int = 10) -> str:
+def search_memory(query: str, limit: int = 10, category: Optional[str] = None) -> str:
     """Search across all memories for matching content.
 
+    Words in the query match words in memory keys and values by prefix
+    ("timb" finds "timber"), ranked by relevance with key matches first.
+
     Args:
         query: Text to search for (case-insensitive)
         limit: Maximum number of results to return (default: 10)
+        category: Optional - only search this category
 
     Returns:
         Matching memories with their categories and keys
@@ -322,60 +217,27 @@ def search_memory(query: str, limit: int = 10) -> str:
         search_memory("timber") -> Find all memories mentioning timber
         search_memory("comp_") -> Find all component IDs
         search_memory("error", limit=5) -> Find up to 5 error-related memories
+        search_memory("truss", category="components") -> Only component memories
     """
     start_time = time.time()
 
-    memory_data = load_memory()
-    memories = memory_data.get("memories", {})
-
-    if not memories:
-        return "No memories to search"
-
-    # Case-insensitive search
-    query_lower = query.lower()
-    results = []
-
-    # Search through all memories
-    for category, items in memories.items():
-        for key, item in items.items():
-            value_lower = item["value"].lower()
-            key_lower = key.lower()
-
-            # Check if query matches in key or value
-            if query_lower in value_lower or query_lower in key_lower:
-                score = 0
-                # Higher score for exact matches
-                if query_lower == key_lower:
-                    score = 100
-                elif query_lower in key_lower:
-                    score = 50
-                elif query_lower in value_lower:
-                    # Score based on position (earlier = better)
-                    score = 25 - (value_lower.index(query_lower) / len(value_lower) * 20)
-
-                results.append(
-                    {
-                        "category": category,
-                        "key": key,
-                        "value": item["value"],
-                        "timestamp": item["timestamp"],
-                        "score": score,
-                    }
-                )
+    try:
+        backend = get_memory_backend()
+        results = backend.search(query, limit=limit, category=category)
+        if not results and not backend.category_counts():
+            return "No memories to search"
+    except Exception as e:
+        return f"⚠️ Could not search memory: {e}"
 
     if not results:
         return f"No memories found matching '{query}'"
 
-    # Sort by score (highest first) and limit
-    results.sort(key=lambda x: x["score"], reverse=True)
-    results = results[:limit]
-
-    # Format results
+    # Format results (best match first)
     output = f"Found {len(results)} memories matching '{query}':\n"
-    for i, result in enumerate(results, 1):
-        output += f"\n{i}. [{result['category']}/{result['key']}]:\n"
-        output += f"   {result['value']}\n"
-        output += f"   (Stored: {result['timestamp']})\n"
+    for i, (result_category, key, item, _) in enumerate(results, 1):
+        output += f"\n{i}. [{result_category}/{key}]:\n"
+        output += f"   {item['value']}\n"
+        output += f"   (Stored: {item['timestamp']})\n"
 
     elapsed_ms = (time.time() - start_time) * 1000
     output += f"\n(Search took {elapsed_ms:.1f}ms)"
@@ -402,28 +264,25 @@ def clear_memory(category: Optional[str] = None, confirm: str = "no") -> str:
     if confirm != "yes":
         return "Memory clear aborted. To confirm deletion, use confirm='yes'"
 
-    memory_data = load_memory()
-
-    if category is None:
-        # Clear all memory
-        old_count = sum(len(items) for items in memory_data.get("memories", {}).values())
-        memory_data["memories"] = {}
-        if save_memory(memory_data):
+    try:
+        backend = get_memory_backend()
+        if category is None:
+            # Clear all memory
+            old_count = backend.clear()
             return f"🗑️ Cleared ALL memory ({old_count} items deleted). Fresh start!"
-        else:
-            return "⚠️ Had issues clearing memory but will continue"
 
-    elif category in memory_data.get("memories", {}):
-        # Clear specific category
-        old_count = len(memory_data["memories"][category])
-        del memory_data["memories"][category]
-        if save_memory(memory_data):
-            return f"🗑️ Cleared category '{category}' ({old_count} items deleted)"
-        else:
-            return f"⚠️ Had issues clearing category '{category}' but will continue"
+        counts = backend.category_counts()
+        if category not in counts:
+            return f"Category '{category}' not found. Available: {list(counts.keys())}"
 
-    else:
-        return f"Category '{category}' not found. Available: {list(memory_data.get('memories', {}).keys())}"
+        # Clear specific category
+        old_count = backend.clear(category)
+        return f"🗑️ Cleared category '{category}' ({old_count} items deleted)"
+    except Exception as e:
+        print(f"Warning: Could not clear memory. Error: {e}")
+        if category is None:
+            return "⚠️ Had issues clearing memory but will continue"
+        return f"⚠️ Had issues clearing category '{category}' but will continue"
 
 
 # ==================== TRUE SMOL-AGENTS NATIVE SOLUTION (CORRECTED) ====================
@@ -522,21 +381,14 @@ def remember_component(component_id: str, component_type: str, description: str)
     value = (
         f"Type: {component_type}, Description: {description}, Created: {datetime.now().isoformat()}"
     )
-    # Direct memory manipulation for efficiency
-    memory_data = load_memory()
-    if "memories" not in memory_data:
-        memory_data["memories"] = {}
-    if "components" not in memory_data["memories"]:
-        memory_data["memories"]["components"] = {}
-
-    memory_data["memories"]["components"][component_id] = {
-        "value": value,
-        "timestamp": datetime.now().isoformat(),
-        "category": "components",
-        "metadata": {"type": component_type, "description": description},
-    }
     # Best effort save - don't crash component creation if memory fails
-    try:
-        save_memory(memory_data)
-    except Exception as e:
-        print(f"Warning: Could not save component to memory: {e}")
+    _store(
+        "components",
+        component_id,
+        {
+            "value": value,
+            "timestamp": datetime.now().isoformat(),
+            "category": "components",
+            "metadata": {"type": component_type, "description": description},
+        },
+    )
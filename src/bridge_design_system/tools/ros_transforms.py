@@ -0,0 +1,161 @@
+"""
+Vectorized conversion of HOLO1_Model messages into Rhino element poses.
+
+A model message lists every element of the scene with its pose. Converting
+them one by one in Python (with a debug line per element) costs more than the
+rest of the update pipeline. The functions here load a whole message into
+NumPy arrays, drop unmoved elements with one vectorized identity/zero test,
+swap ROS axes to Rhino axes and turn all quaternions into direction vectors
+in a single pass.
+
+Axis conventions: ROS is x-forward, y-right, z-up; Rhino is x-right,
+y-forward, z-up, so positions and directions swap their x and y components.
+"""
+
+import logging
+from dataclasses import dataclass
+from typing import Any, Dict, List, Mapping, Tuple
+
+import numpy as np
+
+from ..config.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+POSE_TOLERANCE = 1e-6  # Positions and quaternion components closer to rest count as unmoved
+DEFAULT_DIRECTION = (1.0, 0.0, 0.0)  # Used when a quaternion gives a zero-length direction
+
+
+@dataclass
+class PoseBatch:
+    """Poses of moved elements as arrays in Rhino coordinates."""
+
+    names: List[str]
+    positions: np.ndarray  # (n, 3) Rhino positions
+    quaternions: np.ndarray  # (n, 4) raw ROS quaternions as w, x, y, z
+    directions: np.ndarray  # (n, 3) unit direction vectors in Rhino coordinates
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def to_transforms(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Convert to the element name -> pose mapping used by the transform queue.
+
+        Each pose has the Rhino "position" and "direction" as lists and the raw
+        "quaternion" as a dict, as produced by earlier versions of the listener.
+        """
+        transforms = {}
+        for name, position, quaternion, direction in zip(
+            self.names,
+            self.positions.tolist(),
+            self.quaternions.tolist(),
+            self.directions.tolist(),
+        ):
+            transforms[name] = {
+                "position": position,
+                "quaternion": dict(zip("wxyz", quaternion)),
+                "direction": direction,
+            }
+        return transforms
+
+
+def message_to_arrays(message: Mapping[str, Any]) -> Tuple[List[str], np.ndarray, np.ndarray]:
+    """
+    Load a HOLO1_Model message into arrays.
+
+    Args:
+        message: Dict with "names" and "poses" (geometry_msgs/Pose as dicts)
+
+    Returns:
+        Tuple of names, ROS positions (n, 3) and quaternions (n, 4) as w, x, y, z
+    """
+    names = list(message.get("names", []))
+    poses = message.get("poses", [])[: len(names)]
+    names = names[: len(poses)]
+    positions = np.array(
+        [(p["position"]["x"], p["position"]["y"], p["position"]["z"]) for p in poses],
+        dtype=float,
+    ).reshape(-1, 3)
+    quaternions = np.array(
+        [[p["orientation"][axis] for axis in "wxyz"] for p in poses], dtype=float
+    ).reshape(-1, 4)
+    return names, positions, quaternions
+
+
+def moved_mask(
+    positions: np.ndarray, quaternions: np.ndarray, tolerance: float = POSE_TOLERANCE
+) -> np.ndarray:
+    """
+    Flag elements with a non-zero position or a non-identity rotation.
+
+    Both w = 1 and w = -1 with zero x, y, z are identity rotations.
+    """
+    translated = np.any(np.abs(positions) > tolerance, axis=1)
+    identity = (np.abs(np.abs(quaternions[:, 0]) - 1.0) < tolerance) & np.all(
+        np.abs(quaternions[:, 1:]) < tolerance, axis=1
+    )
+    return translated | ~identity
+
+
+def ros_to_rhino(vectors: np.ndarray) -> np.ndarray:
+    """Swap the x and y components of ROS vectors to get Rhino vectors."""
+    return np.asarray(vectors, dtype=float)[:, [1, 0, 2]]
+
+
+def quaternions_to_directions(quaternions: np.ndarray) -> np.ndarray:
+    """
+    Rotate the ROS x-axis by each quaternion and return it in Rhino coordinates.
+
+    Args:
+        quaternions: Raw ROS quaternions (n, 4) as w, x, y, z
+
+    Returns:
+        Unit direction vectors (n, 3); zero-length results become DEFAULT_DIRECTION
+    """
+    quaternions = np.asarray(quaternions, dtype=float).reshape(-1, 4)
+    w, x, y, z = quaternions.T
+    ros = np.stack(
+        [1.0 - 2.0 * (y * y + z * z), 2.0 * (x * y + w * z), 2.0 * (x * z - w * y)], axis=1
+    )
+    directions = ros_to_rhino(ros)
+
+    magnitudes = np.linalg.norm(directions, axis=1)
+    degenerate = magnitudes <= POSE_TOLERANCE
+    if degenerate.any():
+        logger.warning(f"{int(degenerate.sum())} zero-length direction(s), using X-forward")
+    directions[~degenerate] /= magnitudes[~degenerate, None]
+    directions[degenerate] = DEFAULT_DIRECTION
+    return directions
+
+
+def convert_model_message(message: Mapping[str, Any]) -> PoseBatch:
+    """
+    Convert a HOLO1_Model message into the poses of its moved elements.
+
+    Args:
+        message: Dict with "names" and "poses"
+
+    Returns:
+        PoseBatch with Rhino positions and directions of moved elements only
+    """
+    names, positions, quaternions = message_to_arrays(message)
+    mask = moved_mask(positions, quaternions)
+    moved_names = [name for name, moved in zip(names, mask.tolist()) if moved]
+
+    if logger.isEnabledFor(logging.DEBUG):
+        skipped = [name for name, moved in zip(names, mask.tolist()) if not moved]
+        logger.debug(f"Model message: {len(moved_names)} moved {moved_names}, skipped {skipped}")
+
+    return PoseBatch(
+        names=moved_names,
+        positions=ros_to_rhino(positions[mask]),
+        quaternions=quaternions[mask],
+        directions=quaternions_to_directions(quaternions[mask]),
+    )
+
+
+def quaternion_to_direction(quaternion: Mapping[str, float]) -> List[float]:
+    """Direction vector [x, y, z] in Rhino coordinates for one raw ROS quaternion dict."""
+    row = [quaternion["w"], quaternion["x"], quaternion["y"], quaternion["z"]]
+    return quaternions_to_directions(np.array([row], dtype=float))[0].tolist()
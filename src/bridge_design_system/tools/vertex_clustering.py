@@ -0,0 +1,348 @@
+"""
+Vertex clustering and closed-loop detection for truss assemblies.
+
+Beam endpoints closer than a tolerance are merged into shared vertices with a
+union-find over a uniform 3D grid (cells as wide as the tolerance), so only
+neighbouring cells are compared. Beams then form edges of a vertex graph in
+which closed loops (triangles and larger polygons) are found with a bounded
+search around each beam, and open chains whose free end almost meets a vertex
+of the chain (or one a few beams away, e.g. a vertex shared with a neighbouring
+module) are reported as loops with a closure gap. Both steps are near-linear in
+the number of beams.
+"""
+
+import math
+from collections import deque
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .geometry_kernel import element_endpoints, point_distances
+
+VERTEX_TOLERANCE_MM = 0.5  # Endpoints closer than this are the same vertex
+MAX_LOOP_SIZE = 8  # Largest polygon searched for
+MAX_CLOSURE_GAP_MM = 15.0  # Open chains with ends further apart are not loops
+
+
+class UnionFind:
+    """Disjoint sets over 0..n-1 with path halving and union by size."""
+
+    def __init__(self, size: int):
+        self.parent = list(range(size))
+        self.size = [1] * size
+
+    def find(self, item: int) -> int:
+        parent = self.parent
+        while parent[item] != item:
+            parent[item] = parent[parent[item]]
+            item = parent[item]
+        return item
+
+    def union(self, a: int, b: int) -> None:
+        root_a, root_b = self.find(a), self.find(b)
+        if root_a == root_b:
+            return
+        if self.size[root_a] < self.size[root_b]:
+            root_a, root_b = root_b, root_a
+        self.parent[root_b] = root_a
+        self.size[root_a] += self.size[root_b]
+
+
+def cluster_vertices(
+    points: Sequence[Sequence[float]], tolerance: float = VERTEX_TOLERANCE_MM
+) -> Tuple[List[int], List[List[float]]]:
+    """
+    Merge points closer than the tolerance (3D, transitively) into vertices.
+
+    Args:
+        points: Points [[x, y, z], ...]
+        tolerance: Merge distance in mm
+
+    Returns:
+        Tuple of vertex label per point and vertex positions. Vertices are numbered
+        in order of first appearance and positioned at their first point.
+    """
+    points = np.asarray(points, dtype=float).reshape(-1, 3)
+    cells = np.floor(points / tolerance).astype(np.int64)
+    grid: Dict[Tuple[int, int, int], List[int]] = {}
+    union_find = UnionFind(len(points))
+
+    offsets = [(dx, dy, dz) for dx in (-1, 0, 1) for dy in (-1, 0, 1) for dz in (-1, 0, 1)]
+    for index, cell in enumerate(map(tuple, cells.tolist())):
+        for dx, dy, dz in offsets:
+            candidates = grid.get((cell[0] + dx, cell[1] + dy, cell[2] + dz))
+            if not candidates:
+                continue
+            distances = point_distances(points[candidates], points[index])
+            for other, distance in zip(candidates, distances.tolist()):
+                if distance < tolerance:
+                    union_find.union(index, other)
+        grid.setdefault(cell, []).append(index)
+
+    labels = []
+    vertices = []
+    root_labels: Dict[int, int] = {}
+    for index in range(len(points)):
+        root = union_find.find(index)
+        if root not in root_labels:
+            root_labels[root] = len(vertices)
+            vertices.append(points[index].tolist())
+        labels.append(root_labels[root])
+    return labels, vertices
+
+
+def find_closed_loops(
+    edges: Sequence[Tuple[int, int]], max_size: int = MAX_LOOP_SIZE
+) -> List[List[int]]:
+    """
+    Find the smallest closed loop through every edge of a vertex graph.
+
+    For each edge, a breadth-first search limited to max_size - 1 steps looks for
+    the shortest other path between its vertices; the edge plus that path is a
+    loop. Loops found from several of their edges are reported once.
+
+    Args:
+        edges: (vertex_a, vertex_b) per beam
+        max_size: Largest number of edges in a loop
+
+    Returns:
+        Loops as lists of edge indices, ordered around the loop
+    """
+    adjacency: Dict[int, List[Tuple[int, int]]] = {}
+    for edge_index, (a, b) in enumerate(edges):
+        if a == b:
+            continue  # Degenerate beam
+        adjacency.setdefault(a, []).append((b, edge_index))
+        adjacency.setdefault(b, []).append((a, edge_index))
+
+    loops = []
+    seen = set()
+    for edge_index, (a, b) in enumerate(edges):
+        if a == b:
+            continue
+        path = _shortest_path(adjacency, a, b, edge_index, max_size - 1)
+        if path is None:
+            continue
+        loop = [edge_index] + path
+        key = frozenset(loop)
+        if key not in seen:
+            seen.add(key)
+            loops.append(loop)
+    return loops
+
+
+def _shortest_path(
+    adjacency: Dict[int, List[Tuple[int, int]]],
+    start: int,
+    goal: int,
+    excluded_edge: int,
+    max_steps: int,
+) -> Optional[List[int]]:
+    """Edge indices of the shortest path from goal back to start avoiding one edge."""
+    previous: Dict[int, Tuple[int, int]] = {goal: (goal, -1)}
+    queue = deque([(goal, 0)])
+    while queue:
+        vertex, depth = queue.popleft()
+        if depth == max_steps:
+            continue
+        for neighbour, edge_index in adjacency[vertex]:
+            if edge_index == excluded_edge or neighbour in previous:
+                continue
+            previous[neighbour] = (vertex, edge_index)
+            if neighbour == start:
+                path = []
+                while neighbour != goal:
+                    neighbour, edge_index = previous[neighbour]
+                    path.append(edge_index)
+                return path
+            queue.append((neighbour, depth + 1))
+    return None
+
+
+def find_open_chains(
+    edges: Sequence[Tuple[int, int]],
+    vertices: Sequence[Sequence[float]],
+    max_gap: float,
+    max_size: int = MAX_LOOP_SIZE,
+) -> List[Tuple[List[int], float]]:
+    """
+    Find chains of beams that almost close into a loop.
+
+    A chain starts at a free end (a vertex of a single beam) and follows vertices
+    shared by exactly two beams until it reaches another free end or a junction,
+    such as a vertex shared with a neighbouring module. The free end is matched to
+    the nearest vertex within max_gap that closes a loop: a vertex of the chain
+    itself, or one reachable from the chain's last vertex within max_size beams.
+
+    Args:
+        edges: (vertex_a, vertex_b) per beam
+        vertices: Vertex positions
+        max_gap: Largest distance between the free end and the vertex it should meet
+        max_size: Largest number of edges in a loop
+
+    Returns:
+        List of (edge indices along the loop starting at the free end, gap at the free end)
+    """
+    if max_gap <= 0:
+        return []
+
+    adjacency: Dict[int, List[Tuple[int, int]]] = {}
+    for edge_index, (a, b) in enumerate(edges):
+        if a != b:
+            adjacency.setdefault(a, []).append((b, edge_index))
+            adjacency.setdefault(b, []).append((a, edge_index))
+
+    points = np.asarray(vertices, dtype=float).reshape(-1, 3)
+    grid: Dict[Tuple[int, int, int], List[int]] = {}
+    for index, cell in enumerate(map(tuple, np.floor(points / max_gap).astype(np.int64).tolist())):
+        grid.setdefault(cell, []).append(index)
+
+    chains = []
+    seen = set()
+    for start, links in adjacency.items():
+        if len(links) != 1:
+            continue  # Chains start at free ends
+        chain, chain_vertices = [], [start]
+        neighbour, edge_index = links[0]
+        while True:
+            chain.append(edge_index)
+            chain_vertices.append(neighbour)
+            onward = [link for link in adjacency[neighbour] if link[1] != edge_index]
+            if len(onward) != 1 or len(chain) == max_size:
+                break  # Free end, junction or longest loop reached
+            neighbour, edge_index = onward[0]
+
+        for gap, vertex in _vertices_near(points, grid, max_gap, start):
+            if vertex in chain_vertices:
+                loop = chain[: chain_vertices.index(vertex)]
+                if len(loop) < 2:
+                    continue  # The free end's own beam
+            else:
+                path = _shortest_path(
+                    adjacency, vertex, chain_vertices[-1], chain[-1], max_size - len(chain)
+                )
+                if path is None:
+                    continue
+                loop = chain + path[::-1]
+            key = frozenset(loop)
+            if key not in seen:
+                seen.add(key)
+                chains.append((loop, gap))
+            break
+    return chains
+
+
+def _vertices_near(
+    points: np.ndarray, grid: Dict[Tuple[int, int, int], List[int]], radius: float, index: int
+) -> List[Tuple[float, int]]:
+    """Other vertices within radius of a vertex as (distance, vertex), nearest first."""
+    cell = np.floor(points[index] / radius).astype(np.int64).tolist()
+    candidates = [
+        other
+        for dx in (-1, 0, 1)
+        for dy in (-1, 0, 1)
+        for dz in (-1, 0, 1)
+        for other in grid.get((cell[0] + dx, cell[1] + dy, cell[2] + dz), ())
+        if other != index
+    ]
+    if not candidates:
+        return []
+    distances = point_distances(points[candidates], points[index]).tolist()
+    return sorted((d, other) for d, other in zip(distances, candidates) if d <= radius)
+
+
+def detect_loops(
+    elements: Sequence[Dict],
+    tolerance: float = VERTEX_TOLERANCE_MM,
+    max_size: int = MAX_LOOP_SIZE,
+    max_gap: float = MAX_CLOSURE_GAP_MM,
+) -> List[Dict]:
+    """
+    Detect closed and almost-closed loops across a whole truss.
+
+    Args:
+        elements: AssemblyElements with id, center_point, direction and length
+        tolerance: Endpoint merge distance in mm
+        max_size: Largest polygon searched for
+        max_gap: Largest gap for an open chain to count as an unclosed loop
+
+    Returns:
+        One dict per loop with element_ids, vertices, side_lengths, closed,
+        closure_gap and required_adjustment (gap spread evenly over the loop's beams).
+        For closed loops the closure gap is the largest mismatch between the beam
+        endpoints merged into one corner (at most the tolerance).
+    """
+    starts, ends = element_endpoints(elements)
+    points = np.stack([starts, ends], axis=1).reshape(-1, 3)
+    labels, vertices = cluster_vertices(points, tolerance)
+    edges = [(labels[2 * i], labels[2 * i + 1]) for i in range(len(elements))]
+    element_ids = [element.get("id", f"elem_{i}") for i, element in enumerate(elements)]
+
+    loops = []
+    for loop in find_closed_loops(edges, max_size):
+        loop_vertices = _loop_vertices([edges[e] for e in loop])
+        side_lengths = [
+            math.dist(vertices[a], vertices[b])
+            for a, b in zip(loop_vertices, loop_vertices[1:] + loop_vertices[:1])
+        ]
+        closure_gap = _corner_mismatch(loop, labels, points)
+        loops.append(
+            {
+                "element_ids": [element_ids[e] for e in loop],
+                "vertices": [vertices[v] for v in loop_vertices],
+                "side_lengths": side_lengths,
+                "closed": True,
+                "closure_gap": closure_gap,
+                "required_adjustment": closure_gap / len(loop),
+            }
+        )
+
+    for chain, gap in find_open_chains(edges, vertices, max_gap, max_size):
+        loops.append(
+            {
+                "element_ids": [element_ids[e] for e in chain],
+                "vertices": [vertices[v] for v in _chain_vertices([edges[e] for e in chain])],
+                "side_lengths": [
+                    math.dist(vertices[edges[e][0]], vertices[edges[e][1]]) for e in chain
+                ],
+                "closed": False,
+                "closure_gap": gap,
+                "required_adjustment": gap / len(chain),
+            }
+        )
+    return loops
+
+
+def _corner_mismatch(loop: List[int], labels: List[int], points: np.ndarray) -> float:
+    """Largest distance between the beam endpoints meeting at a corner of a closed loop."""
+    corners: Dict[int, List[int]] = {}
+    for edge_index in loop:
+        for point_index in (2 * edge_index, 2 * edge_index + 1):
+            corners.setdefault(labels[point_index], []).append(point_index)
+    return max(
+        (
+            float(math.dist(points[a], points[b]))
+            for members in corners.values()
+            for a, b in zip(members, members[1:])
+        ),
+        default=0.0,
+    )
+
+
+def _loop_vertices(loop_edges: List[Tuple[int, int]]) -> List[int]:
+    """Vertices in order around a loop given its edges in order."""
+    first, second = loop_edges[0], loop_edges[1]
+    vertex = first[0] if first[0] not in second else first[1]
+    order = []
+    for a, b in loop_edges:
+        order.append(vertex)
+        vertex = b if vertex == a else a
+    return order
+
+
+def _chain_vertices(chain_edges: List[Tuple[int, int]]) -> List[int]:
+    """Vertices along an open chain from its first free end to its last."""
+    order = _loop_vertices(chain_edges)
+    last = chain_edges[-1]
+    order.append(last[1] if order[-1] == last[0] else last[0])
+    return order
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""Regression test for the incremental inventory backup store."""
+
+import sys
+import tempfile
+from pathlib import Path
+
+# Add src to path
+src_path = Path(__file__).parent / "src"
+sys.path.insert(0, str(src_path))
+
+from bridge_design_system.tools.inventory_backups import InventoryBackupStore
+
+
+def inventory(remaining_first_beam):
+    """Inventory state with 13 beams, the first one cut down to the given length."""
+    beams = [
+        {
+            "id": f"beam_{i:03d}",
+            "original_length_mm": 1980,
+            "remaining_length_mm": 1980,
+            "cuts": [],
+            "waste_mm": 0,
+        }
+        for i in range(1, 14)
+    ]
+    beams[0]["remaining_length_mm"] = remaining_first_beam
+    return {"available_beams": beams, "cutting_sessions": [], "total_stock_mm": 25740}
+
+
+def test_crash_during_delete_keeps_other_backups():
+    """A crash before the manifest is saved must not delete objects it still references."""
+    print("🧪 Testing crash while deleting a delta chain's base backup...")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = InventoryBackupStore(Path(tmp))
+        store.create("a", inventory(1980))
+        store.create("b", inventory(1500))
+        if store.list()[0]["kind"] != "delta":
+            print(f"❌ Expected 'b' to be stored as a delta, got {store.list()[0]}")
+            return False
+
+        def crash():
+            raise OSError("simulated crash before the manifest is written")
+
+        store._save_manifest = crash
+        try:
+            store.delete("a")
+        except OSError:
+            pass
+
+        reopened = InventoryBackupStore(Path(tmp))
+        try:
+            restored = reopened.restore("b")
+        except FileNotFoundError as e:
+            print(f"❌ Backup 'b' lost after interrupted delete: {e}")
+            return False
+        if restored != inventory(1500):
+            print("❌ Backup 'b' restored with different content")
+            return False
+
+    print("✅ Backup 'b' survives an interrupted delete of 'a'")
+    return True
+
+
+def test_delete_collects_unreferenced_objects():
+    """After a completed delete only objects referenced by the manifest remain."""
+    print("🧪 Testing object cleanup after delete...")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = InventoryBackupStore(Path(tmp))
+        store.create("a", inventory(1980))
+        store.create("b", inventory(1500))
+        store.delete("a")
+
+        objects = {path.stem for path in store.objects_dir.glob("*.json")}
+        referenced = {entry["object"] for entry in store.list()}
+        if objects != referenced:
+            print(f"❌ Expected objects {referenced}, found {objects}")
+            return False
+        if InventoryBackupStore(Path(tmp)).restore("b") != inventory(1500):
+            print("❌ Backup 'b' restored with different content")
+            return False
+
+    print("✅ Unreferenced objects removed once the manifest is saved")
+    return True
+
+
+if __name__ == "__main__":
+    print("📦 Testing Inventory Backup Store")
+    print("=" * 60)
+
+    results = [
+        test_crash_during_delete_keeps_other_backups(),
+        test_delete_collects_unreferenced_objects(),
+    ]
+
+    print("\n" + "=" * 60)
+    if all(results):
+        print("✅ All backup store tests passed!")
+    else:
+        print("❌ Some tests failed. Check the errors above.")
+        sys.exit(1)